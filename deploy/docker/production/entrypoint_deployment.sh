@@ -10,6 +10,9 @@ poetry run python -m assume_identity
 
 poetry run delete-revision-history production.ini --app-name app --prod
 
+# Create the propsheets external_id index (used by TissueSample validation) if it does not exist
+poetry run create-external-id-index production.ini --app-name app
+
 # Clear db/es on smaht-devtest eventually if we run an "initial" deploy
 # Do nothing on other environments
 # TEMP: add --allow-prod
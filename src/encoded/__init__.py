@@ -65,6 +65,11 @@ def include_encoded(config):
         For detailed explanation see: https://docs.pylonsproject.org/projects/pyramid/en/latest/api/config.html
     """
     config.include('encoded.authentication')
+    config.include('encoded.authorization')
+    config.include('encoded.local_roles')
+    config.include('encoded.download_analytics')
+    config.include('encoded.bulk_download')
+    config.include('encoded.bulk_patch')
     config.include('encoded.root')
     config.include('encoded.types')
     config.include('encoded.metadata')
@@ -1,16 +1,122 @@
 import json
+import threading
+import time
+from typing import List, Optional
 
 from dcicutils.misc_utils import PRINT
 from snovault import COLLECTIONS
+from pyramid.registry import Registry
 from pyramid.security import Authenticated
 from snovault.authorization import DEBUG_PERMISSIONS
+from snovault.interfaces import AfterModified, Created
 from structlog import getLogger
 
 
 log = getLogger(__name__)
 
+PRINCIPALS_CACHE = 'principals_cache'
+PRINCIPALS_CACHE_TTL_SETTING = 'principals_cache_ttl'
+
+
+def includeme(config):
+    config.add_subscriber(invalidate_principals_cache, Created)
+    config.add_subscriber(invalidate_principals_cache, AfterModified)
+    get_principals_cache(config.registry)
+
+
+class PrincipalsCache:
+    """ Short-TTL cache of the principals computed by smaht_groupfinder, keyed by login,
+        so that the User (and AccessKey) need not be loaded on every authenticated request.
+        Entries for a user are invalidated when that User, or any of its AccessKeys, is
+        created or edited within this process (see invalidate_principals_cache); edits
+        made by other processes are reflected within the (short) TTL.
+    """
+    TTL_SECONDS = 60
+
+    def __init__(self, ttl: int = TTL_SECONDS) -> None:
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # login -> (expiration time, user uuid, principals)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, login: str) -> Optional[List[str]]:
+        with self._lock:
+            if (entry := self._entries.get(login)) is not None:
+                expiration, _, principals = entry
+                if expiration > time.time():
+                    self.hits += 1
+                    return list(principals)
+                del self._entries[login]
+            self.misses += 1
+        return None
+
+    def put(self, login: str, user_uuid: str, principals: List[str]) -> None:
+        with self._lock:
+            self._entries[login] = (time.time() + self._ttl, user_uuid, list(principals))
+
+    def invalidate(self, user_uuid: Optional[str] = None, localname: Optional[str] = None) -> None:
+        """ Invalidates the entries for the given user uuid, and/or with the given login localname
+            (e.g. the email of a User or the access_key_id of an AccessKey, i.e. for items re-created).
+        """
+        with self._lock:
+            logins = [login for login, (_, uuid, _) in self._entries.items()
+                      if (user_uuid and uuid == user_uuid) or
+                      (localname and login.split('.', 1)[-1] == localname)]
+            for login in logins:
+                del self._entries[login]
+            self.invalidations += len(logins)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+
+    def info(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'ttl': self._ttl, 'size': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                    'invalidations': self.invalidations}
+
+
+def get_principals_cache(registry: Registry) -> PrincipalsCache:
+    """ Returns the PrincipalsCache held by the given registry (created on startup; see includeme). """
+    if (principals_cache := registry.get(PRINCIPALS_CACHE)) is None:
+        ttl = int(registry.settings.get(PRINCIPALS_CACHE_TTL_SETTING, PrincipalsCache.TTL_SECONDS))
+        principals_cache = registry.setdefault(PRINCIPALS_CACHE, PrincipalsCache(ttl=ttl))
+    return principals_cache
+
+
+def invalidate_principals_cache(event) -> None:
+    """ Invalidates cached principals for a User or AccessKey which has been created or edited. """
+    item_type = getattr(event.object.type_info, 'item_type', None)
+    if item_type == 'user':
+        properties = event.object.properties
+        get_principals_cache(event.request.registry).invalidate(
+            user_uuid=str(event.object.uuid), localname=properties.get('email'))
+    elif item_type == 'access_key':
+        properties = event.object.properties
+        get_principals_cache(event.request.registry).invalidate(
+            user_uuid=properties.get('user'), localname=properties.get('access_key_id'))
+
 
 def smaht_groupfinder(login, request):
+    """ Specialized groupfinder for SMaHT; principals for (real) users are cached
+        for a short time (see PrincipalsCache), except when DEBUG_PERMISSIONS is set.
+    """
+    if DEBUG_PERMISSIONS:
+        return _smaht_groupfinder(login, request)
+    principals_cache = get_principals_cache(request.registry)
+    if (principals := principals_cache.get(login)) is not None:
+        return principals
+    principals = _smaht_groupfinder(login, request)
+    if principals and principals[0].startswith('userid.'):
+        principals_cache.put(login, principals[0][len('userid.'):], principals)
+    return principals
+
+
+def _smaht_groupfinder(login, request):
     """ Specialized groupfinder for SMaHT
         TODO: refactor snovault.authorization.groupfinder so most of this can be re-used
     """
@@ -0,0 +1,120 @@
+import json
+from typing import Any, Dict, Generator, List, Optional
+
+from pyramid.httpexceptions import HTTPBadRequest
+from pyramid.response import Response
+from pyramid.view import view_config
+from snovault import CONNECTION
+from snovault.util import check_user_is_logged_in, debug_log
+
+from encoded_core.file_views import is_file_to_download
+from encoded.types.file import (
+    File,
+    validate_user_has_protected_access,
+    validate_user_has_public_protected_access,
+)
+from encoded.types.file_format import get_cached_file_format
+
+# Bulk variant of the File @@download endpoint (see types/file.download), returning the download
+# (presigned or open data) URLs for many files, and optionally their extra files, in one request,
+# rather than one @@download request (and redirect) per file. The access checks based on the user
+# (rather than on the file) are done once for the request, and file formats come from the FileFormatCache.
+#
+# N.B. Everything which touches the database is done before the response is returned, i.e. within
+# the request transaction; the (JSON lines) response is then streamed from the resolved results.
+
+MAX_ACCESSIONS = 10000
+RESTRICTED_STATUSES = ["protected-network", "protected-early"]
+PROTECTED_STATUSES = ["protected"]
+
+
+def includeme(config):
+    config.add_route("bulk_download", "/bulk_download")
+    config.scan(__name__)
+
+
+@view_config(route_name="bulk_download", request_method="POST")
+@debug_log
+def bulk_download(context, request):
+    """
+    Returns download URLs for the files with the given accessions, as JSON lines, i.e. one JSON object
+    per line, in order, for each file (and each of its extra files if include_extra_files, the default),
+    e.g. with a request body like {"accessions": ["SMAFI1234567"], "include_extra_files": true}:
+
+      {"accession": "SMAFI1234567", "filename": "SMAFI1234567.bam", "url": "https://...", "extra_file": false}
+      {"accession": "SMAFI1234567", "filename": "SMAFI1234567.bam.bai", "url": "https://...", "extra_file": true}
+
+    Files which are not found, not viewable, or restricted for the user get a line with an error:
+
+      {"accession": "SMAFI7654321", "error": "Not found"}
+
+    Unlike @@download, handing out these URLs is not tracked (e.g. with Google Analytics) as downloads;
+    the same as for @@download_cli.
+    """
+    check_user_is_logged_in(request)
+    try:
+        accessions = request.json_body.get("accessions")
+        include_extra_files = request.json_body.get("include_extra_files", True) is not False
+    except Exception:
+        accessions = None
+    if not isinstance(accessions, list) or not all(isinstance(accession, str) for accession in accessions):
+        raise HTTPBadRequest(detail="Request body must be a JSON object with an accessions list of strings.")
+    if len(accessions) > MAX_ACCESSIONS:
+        raise HTTPBadRequest(detail=f"Too many accessions ({len(accessions)}); the maximum is {MAX_ACCESSIONS}.")
+    results = get_bulk_download_urls(request, accessions, include_extra_files=include_extra_files)
+    return Response(content_type="application/x-ndjson", app_iter=generate_json_lines(results))
+
+
+def get_bulk_download_urls(request, accessions: List[str], include_extra_files: bool = True) -> List[Dict[str, Any]]:
+    """
+    Returns a list of dictionaries with the download URL (or error) for each of the files, and their
+    extra files, with the given accessions; see bulk_download.
+    """
+    has_protected_access = validate_user_has_protected_access(request)
+    has_public_protected_access = validate_user_has_public_protected_access(request)
+    connection = request.registry[CONNECTION]
+    results = []
+    for accession in accessions:
+        item = connection.get_by_unique_key("accession", accession, datastore="database")
+        if not isinstance(item, File) or not request.has_permission("view", item):
+            results.append({"accession": accession, "error": "Not found"})
+            continue
+        properties = item.upgrade_properties()
+        status = properties.get("status")
+        if ((status in RESTRICTED_STATUSES and not has_protected_access) or
+                (status in PROTECTED_STATUSES and not (has_public_protected_access or has_protected_access))):
+            results.append({"accession": accession, "error": "Restricted; requires dbGaP approval"})
+            continue
+        targets = [(properties, get_cached_file_format(request, properties.get("file_format")), False)]
+        if include_extra_files:
+            targets += [(extra_file, get_cached_file_format(request, extra_file.get("file_format")), True)
+                        for extra_file in properties.get("extra_files", [])]
+        for target_properties, file_format, extra_file in targets:
+            results.append(_get_download_url(request, item, accession, target_properties, file_format, extra_file))
+    return results
+
+
+def _get_download_url(request, item: File, accession: str, properties: dict,
+                      file_format: Optional[dict], extra_file: bool) -> Dict[str, Any]:
+    # Same as for types/file.download, less tracking and the download proxy.
+    if not (filename := is_file_to_download(properties, file_format)):
+        return {"accession": accession, "error": "No file to download", "extra_file": extra_file}
+    try:
+        if extra_file:
+            external = item.propsheets.get("external" + file_format.get("uuid"))
+        else:
+            external = item.propsheets.get("external", {})
+        if not external:
+            external = item.build_external_creds(request.registry, item.uuid, properties)
+        if external.get("service") != "s3":
+            return {"accession": accession, "filename": filename,
+                    "error": f"Unsupported service: {external.get('service')}", "extra_file": extra_file}
+        url = item.get_open_data_url_or_presigned_url_location(external, request, filename, True)
+        return {"accession": accession, "filename": filename, "url": url, "extra_file": extra_file}
+    except Exception as e:
+        return {"accession": accession, "filename": filename, "error": str(e), "extra_file": extra_file}
+
+
+def generate_json_lines(results: List[Dict[str, Any]]) -> Generator[bytes, None, None]:
+    for result in results:
+        yield (json.dumps(result) + "\n").encode("utf-8")
@@ -0,0 +1,101 @@
+from typing import Any, Dict, List
+
+from pyramid.httpexceptions import HTTPBadRequest, HTTPException
+from pyramid.settings import asbool
+from pyramid.view import view_config
+from snovault.embed import make_subrequest
+from snovault.util import check_user_is_logged_in, debug_log
+
+# Bulk variant of PATCH (with or without check_only) for many items in one request, e.g. for the
+# release scripts (see commands/release_file and commands/release_donor_metadata), which otherwise
+# validate, and then apply, each of their (dozens to hundreds of) patches with a request each.
+#
+# Each patch is done as a PATCH subrequest (without tweens), so the usual validators and permission
+# checks apply to each, and all of them share the transaction of this request; so patches are
+# applied all together or, if any of them fails, not at all.
+
+MAX_PATCHES = 5000
+STATUS_NOT_ATTEMPTED = "not attempted"
+
+
+def includeme(config):
+    config.add_route("bulk_patch", "/bulk_patch")
+    config.scan(__name__)
+
+
+@view_config(route_name="bulk_patch", request_method="POST")
+@debug_log
+def bulk_patch(context, request):
+    """
+    Validates and (unless check_only=true) applies the given patches, with a request body like:
+
+      {"patches": [{"uuid": "<uuid>", "patch": {"status": "released"}}, ...]}
+
+    All patches are first validated (as for PATCH with check_only=true); if any are not valid,
+    none are applied. Otherwise they are applied in the given order, in a single transaction,
+    i.e. if any of them fails, none are applied (and those after it are not attempted).
+    Returns the (per patch) results, in order:
+
+      {"status": "success", "check_only": false,
+       "results": [{"uuid": "<uuid>", "status": "success"}, ...]}
+
+    Failed patches have an "error" status and a list of errors, and patches not attempted a
+    "not attempted" status; the status code is then 422.
+    """
+    check_user_is_logged_in(request)
+    check_only = asbool(request.params.get("check_only", False))
+    try:
+        patches = request.json_body.get("patches")
+    except Exception:
+        patches = None
+    if not isinstance(patches, list) or not all(
+            isinstance(patch, dict) and isinstance(patch.get("uuid"), str) and isinstance(patch.get("patch"), dict)
+            for patch in patches):
+        raise HTTPBadRequest(detail="Request body must be a JSON object with a patches list of"
+                                    " {\"uuid\": <uuid>, \"patch\": <object>} objects.")
+    if len(patches) > MAX_PATCHES:
+        raise HTTPBadRequest(detail=f"Too many patches ({len(patches)}); the maximum is {MAX_PATCHES}.")
+
+    results = [_patch_item(request, patch["uuid"], patch["patch"], check_only=True) for patch in patches]
+    if not check_only and _all_succeeded(results):
+        results = _apply_patches(request, patches)
+    if _all_succeeded(results):
+        status = "success"
+    else:
+        status = "error"
+        request.response.status = 422
+    return {"status": status, "check_only": check_only, "results": results}
+
+
+def _apply_patches(request, patches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    results = []
+    for index, patch in enumerate(patches):
+        results.append(result := _patch_item(request, patch["uuid"], patch["patch"], check_only=False))
+        if result["status"] != "success":
+            request.tm.doom()  # i.e. none applied
+            results += [{"uuid": rest["uuid"], "status": STATUS_NOT_ATTEMPTED} for rest in patches[index + 1:]]
+            break
+    return results
+
+
+def _patch_item(request, uuid: str, patch: Dict[str, Any], check_only: bool) -> Dict[str, Any]:
+    path = f"/{uuid}?check_only=true" if check_only else f"/{uuid}?render=false"
+    subrequest = make_subrequest(request, path, method="PATCH", json_body=patch)
+    try:
+        request.invoke_subrequest(subrequest)
+        return {"uuid": uuid, "status": "success"}
+    except HTTPException as e:
+        return {"uuid": uuid, "status": "error", "errors": _get_errors(subrequest, e)}
+    except Exception as e:
+        return {"uuid": uuid, "status": "error", "errors": [{"description": str(e)}]}
+
+
+def _get_errors(subrequest, exception: HTTPException) -> List[Dict[str, Any]]:
+    # Validation errors (i.e. ValidationFailure) are on the subrequest; others are just the exception.
+    if errors := getattr(subrequest, "errors", None):
+        return list(errors)
+    return [{"name": exception.title, "description": exception.detail or exception.explanation}]
+
+
+def _all_succeeded(results: List[Dict[str, Any]]) -> bool:
+    return all(result["status"] == "success" for result in results)
@@ -1,13 +1,18 @@
 import argparse
 import pkg_resources
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
 from ..tests.utils import get_item_type, load_inserts
 from dcicutils import ff_utils
-from dcicutils.misc_utils import PRINT
+from dcicutils.misc_utils import PRINT, to_camel_case
 from dcicutils.creds_utils import SMaHTKeyManager
 
 
+SEARCH_CHUNK_SIZE = 100
+DEFAULT_MAX_WORKERS = 8
+
+
 class InsertConsistencyChecker:
 
     def __init__(self, env='data', item_type='all', fix=False):
@@ -34,48 +39,117 @@ class InsertConsistencyChecker:
 
             Consistent --> identifier/accession all map to the same uuid
         """
-        result = {
+        result = self.get_empty_result()
+        for k, items in self.get_inserts_to_check().items():
+            self.add_item_type(result, k)
+            for v in items:
+                uuid = v.get('uuid')
+                try:
+                    meta = ff_utils.get_metadata(f'{uuid}', key=self.key)
+                except Exception as e:
+                    msg = str(e)
+                    if 'HTTPUnauthorized' not in msg and 'HTTPNotFound' in msg:
+                        self.add_new(result, k, uuid)
+                        continue
+                    return self.handle_error(result, msg)
+                self.compare(result, k, v, meta)
+        return result
+
+    def check_bulk(self, max_workers: int = DEFAULT_MAX_WORKERS) -> dict:
+        """ Same as check, but the items of each type are searched for by uuid in chunks,
+            with the types searched concurrently, rather than fetched one at a time.
+        """
+        result = self.get_empty_result()
+        inserts = self.get_inserts_to_check()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {k: executor.submit(self.get_metadata_bulk, k, items) for k, items in inserts.items()}
+            for k, items in inserts.items():
+                try:
+                    metadata = futures[k].result()
+                except Exception as e:
+                    for future in futures.values():
+                        future.cancel()
+                    return self.handle_error(result, str(e))
+                self.add_item_type(result, k)
+                for v in items:
+                    uuid = v.get('uuid')
+                    if uuid not in metadata:
+                        self.add_new(result, k, uuid)
+                    else:
+                        self.compare(result, k, v, metadata[uuid])
+        return result
+
+    def get_metadata_bulk(self, item_type: str, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """ Returns identifier/accession (by uuid) of the given items of the given (snake case) type
+            present on the server, searching in chunks of uuids.
+
+            Items not found by search (e.g. deleted ones) are checked individually.
+        """
+        uuids = list(dict.fromkeys(v.get('uuid') for v in items if v.get('uuid')))
+        metadata = {}
+        for i in range(0, len(uuids), SEARCH_CHUNK_SIZE):
+            query = (f'search/?type={to_camel_case(item_type)}&field=uuid&field=identifier&field=accession'
+                     + ''.join(f'&uuid={uuid}' for uuid in uuids[i:i + SEARCH_CHUNK_SIZE]))
+            for meta in ff_utils.search_metadata(query, key=self.key):
+                metadata[meta['uuid']] = meta
+        for uuid in uuids:
+            if uuid not in metadata:
+                try:
+                    metadata[uuid] = ff_utils.get_metadata(f'{uuid}', key=self.key)
+                except Exception as e:
+                    if 'HTTPUnauthorized' in str(e) or 'HTTPNotFound' not in str(e):
+                        raise
+        return metadata
+
+    def get_inserts_to_check(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {k: items for k, items in self.inserts.items() if self.item_type == k or self.item_type == 'all'}
+
+    @staticmethod
+    def get_empty_result() -> dict:
+        return {
             'new': {},
             'mismatched_identifier': {},
             'mismatched_accession': {}
         }
-        for k, items in self.inserts.items():
-            if self.item_type == k or self.item_type == 'all':
-                result['new'][k], result['mismatched_identifier'][k], result['mismatched_accession'][k] = [], [], []
-                for v in items:
-                    uuid = v.get('uuid')
-                    identifier = v.get('identifier')
-                    accession = v.get('accession')
-                    try:
-                        meta = ff_utils.get_metadata(f'{uuid}', key=self.key)
-                    except Exception as e:
-                        msg = str(e)
-                        if 'HTTPUnauthorized' in msg:
-                            PRINT(f'Authorization error - exiting with partial result: {msg}')
-                            return result
-                        elif 'HTTPNotFound' in msg:
-                            PRINT(f'Found new uuid on local not present on {self.key["server"]}')
-                            if uuid not in result['new'][k]:
-                                result['new'][k] += [uuid]
-                            continue
-                        else:
-                            PRINT(f'Other error encountered  - exiting: {msg}')
-                            return {}
-                    if identifier:
-                        if meta.get('identifier') != identifier:
-                            PRINT(f'Found mismatch for identifier with uuid {uuid}\n'
-                                  f'    Expected (from inserts): {identifier}\n'
-                                  f'    Found (on {self.key["server"]}): {meta.get("identifier")}')
-                            if uuid not in result['mismatched_identifier'][k]:
-                                result['mismatched_identifier'][k] += [uuid]
-                    if accession:
-                        if meta.get('accession') != accession:
-                            PRINT(f'Found mismatch for accession with uuid {uuid}\n'
-                                  f'    Expected (from inserts): {accession}\n'
-                                  f'    Found (on {self.key["server"]}): {meta.get("accession")}')
-                            if uuid not in result['mismatched_accession'][k]:
-                                result['mismatched_accession'][k] += [uuid]
-        return result
+
+    @staticmethod
+    def add_item_type(result: dict, k: str) -> None:
+        result['new'][k], result['mismatched_identifier'][k], result['mismatched_accession'][k] = [], [], []
+
+    def handle_error(self, result: dict, msg: str) -> dict:
+        """ Returns the partial result on authorization errors, otherwise an empty one """
+        if 'HTTPUnauthorized' in msg:
+            PRINT(f'Authorization error - exiting with partial result: {msg}')
+            return result
+        PRINT(f'Other error encountered  - exiting: {msg}')
+        return {}
+
+    def add_new(self, result: dict, k: str, uuid: str) -> None:
+        PRINT(f'Found new uuid on local not present on {self.key["server"]}')
+        if uuid not in result['new'][k]:
+            result['new'][k] += [uuid]
+
+    def compare(self, result: dict, k: str, v: Dict[str, Any], meta: Dict[str, Any]) -> None:
+        """ Adds the uuid of the given insert to the mismatches if its identifier/accession
+            differs from that of the item (meta) on the server.
+        """
+        uuid = v.get('uuid')
+        identifier = v.get('identifier')
+        accession = v.get('accession')
+        if identifier:
+            if meta.get('identifier') != identifier:
+                PRINT(f'Found mismatch for identifier with uuid {uuid}\n'
+                      f'    Expected (from inserts): {identifier}\n'
+                      f'    Found (on {self.key["server"]}): {meta.get("identifier")}')
+                if uuid not in result['mismatched_identifier'][k]:
+                    result['mismatched_identifier'][k] += [uuid]
+        if accession:
+            if meta.get('accession') != accession:
+                PRINT(f'Found mismatch for accession with uuid {uuid}\n'
+                      f'    Expected (from inserts): {accession}\n'
+                      f'    Found (on {self.key["server"]}): {meta.get("accession")}')
+                if uuid not in result['mismatched_accession'][k]:
+                    result['mismatched_accession'][k] += [uuid]
 
     @staticmethod
     def summary(result):
@@ -104,9 +178,12 @@ def main():
     # the right fix is, and it could assume wrong. - Will 22 May 24
     parser.add_argument("--fix", action='store_true', default=False,
                         help="Whether to fix the inserts")
+    parser.add_argument("--bulk", action='store_true', default=False,
+                        help="Search for the items of each type in bulk (types concurrently) "
+                             "rather than get them one at a time")
     args = parser.parse_args()
     checker = InsertConsistencyChecker(args.env, args.item_type, args.fix)
-    result = checker.check()
+    result = checker.check_bulk() if args.bulk else checker.check()
     checker.summary(result)
     exit(0)
 
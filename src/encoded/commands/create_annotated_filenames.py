@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import re
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from dcicutils import ff_utils
 
@@ -78,6 +79,34 @@ CNV_VARIANT_TYPE = "cnv"
 SV_VARIANT_TYPE = "sv"
 MEI_VARIANT_TYPE = "mei"
 
+DEFAULT_CONCURRENCY = 8
+SEARCH_CHUNK_SIZE = 100
+MAX_PREFETCH_DEPTH = 8
+# Links followed (from files, level by level) to prefetch associated items in pipeline mode;
+# anything else needed is fetched (and then cached) as usual on first use.
+PREFETCH_LINK_FIELDS = [
+    "file_format",
+    "sequencing_center",
+    "submission_centers",
+    "software",
+    "reference_genome",
+    "annotation",
+    "donor_specific_assembly",
+    "file_sets",
+    "libraries",
+    "assay",
+    "sequencing",
+    "sequencer",
+    "samples",
+    "parent_samples",
+    "sample_sources",
+    "cell_line",
+    "donor",
+]
+UUID_REGEX = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE
+)
+
 
 @dataclass(frozen=True)
 class FilenamePart:
@@ -108,6 +137,47 @@ def get_identifier(annotated_filename: AnnotatedFilename) -> str:
     return annotated_filename.accession
 
 
+@dataclass(frozen=True)
+class PrefetchRequestHandler(RequestHandler):
+    """RequestHandler with an item cache shared by all files of a batch.
+
+    Items are cached under their UUID, @id, and accession (if any), and
+    the cache can be filled in bulk (see prefetch_associated_items).
+    Items not already cached are fetched as usual, and then cached.
+    """
+
+    items: Dict[str, Dict[str, Any]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    def get_item(
+        self, identifier: Union[str, Dict[str, Any]], collection: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get item from cache, or from request or auth_key if not cached."""
+        if not identifier:
+            return {}
+        identifier = self._get_identifier(identifier)
+        if (item := self.items.get(identifier)) is None:
+            item = super().get_item(identifier, collection=collection)
+            self.add_items([item], identifier)
+        return item
+
+    def add_items(self, items: Iterable[Dict[str, Any]], *identifiers: str) -> None:
+        """Cache given items, also under any given (e.g. lookup) identifiers."""
+        for item in items:
+            for key in (
+                item_utils.get_uuid(item),
+                item_utils.get_at_id(item),
+                item_utils.get_accession(item),
+                *identifiers,
+            ):
+                if key:
+                    self.items[key] = item
+
+    def is_cached(self, identifier: str) -> bool:
+        return identifier in self.items
+
+
 @dataclass(frozen=True)
 class AssociatedItems:
 
@@ -473,14 +543,25 @@ def create_annotated_filenames(
     identifiers: List[str],
     auth_key: Dict[str, str],
     dry_run: bool = False,
+    pipeline: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
 ) -> None:
     """Create annotated filenames for given files.
 
+    In pipeline mode, the items associated with all files are first
+    fetched in bulk, annotated filenames are then generated and patched
+    concurrently, with the extra files of all files fetched in bulk
+    (see create_annotated_filenames_pipeline).
+
     NOTE: Algorithm here is highly dependent on data model and items on
     the portal as well as subjective choices made for the annotated
     filename. Will almost certainly need updates as different types of
     data included and whenever relevant data model changes are made.
     """
+    if pipeline:
+        return create_annotated_filenames_pipeline(
+            search, identifiers, auth_key, dry_run=dry_run, concurrency=concurrency
+        )
     request_handler = RequestHandler(auth_key=auth_key)
     files = get_files(search, identifiers, request_handler)
     logger.info(f"Found {len(files)} files to process")
@@ -493,6 +574,39 @@ def create_annotated_filenames(
         patch_annotated_filenames(annotated_filenames, auth_key)
 
 
+def create_annotated_filenames_pipeline(
+    search: str,
+    identifiers: List[str],
+    auth_key: Dict[str, str],
+    dry_run: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> None:
+    """Create annotated filenames for given files, in bulk.
+
+    Associated items are collected across all files and fetched level
+    by level (e.g. file sets, then samples, then sample sources, ...),
+    with a search per chunk of UUIDs, into an item cache shared by all
+    files, so each item is fetched once per batch rather than per file.
+    """
+    request_handler = PrefetchRequestHandler(auth_key=auth_key)
+    files = get_files(search, identifiers, request_handler)
+    logger.info(f"Found {len(files)} files to process")
+    request_handler.add_items(files)
+    prefetch_associated_items(files, request_handler, concurrency=concurrency)
+    logger.info(f"Prefetched {len(request_handler.items)} associated item identifiers")
+    annotated_filenames = get_annotated_filenames(
+        files, request_handler, concurrency=concurrency
+    )
+    logger.info(f"Generated {len(annotated_filenames)} annotated filenames")
+    log_annotated_filenames(annotated_filenames)
+    if dry_run:
+        logger.info("Dry run: not patching filenames")
+    else:
+        patch_annotated_filenames_concurrently(
+            annotated_filenames, request_handler, concurrency=concurrency
+        )
+
+
 def get_files(
     search: str,
     identifiers: List[str],
@@ -538,10 +652,24 @@ def get_files_from_identifiers(
 
 
 def get_annotated_filenames(
-    files: List[Dict[str, Any]], request_handler: RequestHandler
+    files: List[Dict[str, Any]],
+    request_handler: RequestHandler,
+    concurrency: int = 1,
 ) -> List[AnnotatedFilename]:
-    """Get annotated filenames for given files."""
-    return [get_annotated_filename(file_item, request_handler) for file_item in files]
+    """Get annotated filenames for given files, in order.
+
+    With concurrency, files are processed by a thread pool, as
+    (uncached) items are fetched along the way.
+    """
+    if concurrency <= 1 or len(files) <= 1:
+        return [get_annotated_filename(file_item, request_handler) for file_item in files]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(
+            executor.map(
+                lambda file_item: get_annotated_filename(file_item, request_handler),
+                files,
+            )
+        )
 
 
 def get_annotated_filename(
@@ -1678,6 +1806,171 @@ def patch_file(
         logger.error(f"Error patching file {get_identifier(annotated_filename)}: {e}")
 
 
+def prefetch_associated_items(
+    files: List[Dict[str, Any]],
+    request_handler: PrefetchRequestHandler,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> None:
+    """Fetch items linked from files (see PREFETCH_LINK_FIELDS) into cache.
+
+    Links are followed level by level, fetching all not yet cached items
+    of each level together.
+    """
+    items = files
+    for _ in range(MAX_PREFETCH_DEPTH):
+        identifiers = [
+            identifier
+            for identifier in get_linked_identifiers(items)
+            if not request_handler.is_cached(identifier)
+        ]
+        if not identifiers:
+            break
+        items = fetch_items(identifiers, request_handler, concurrency=concurrency)
+
+
+def get_linked_identifiers(items: List[Dict[str, Any]]) -> List[str]:
+    """Get unique identifiers linked from items (see PREFETCH_LINK_FIELDS)."""
+    identifiers = []
+    for item in items:
+        for link_field in PREFETCH_LINK_FIELDS:
+            values = item.get(link_field)
+            for value in values if isinstance(values, list) else [values]:
+                if isinstance(value, dict):
+                    value = item_utils.get_uuid(value)
+                if value and isinstance(value, str):
+                    identifiers.append(value)
+    return list(dict.fromkeys(identifiers))
+
+
+def fetch_items(
+    identifiers: List[str],
+    request_handler: PrefetchRequestHandler,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """Fetch items for identifiers into cache, and return them.
+
+    Items identified by UUID (including @ids with a UUID) are searched
+    for in chunks; any others (or not found, e.g. deleted) are fetched
+    individually, concurrently.
+    """
+    uuids = {}
+    for identifier in identifiers:
+        if match := UUID_REGEX.search(identifier):
+            uuids[match.group(0).lower()] = identifier
+    chunks = [
+        list(uuids)[index:index + SEARCH_CHUNK_SIZE]
+        for index in range(0, len(uuids), SEARCH_CHUNK_SIZE)
+    ]
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        for items in executor.map(
+            lambda chunk: search_items_by_uuid(chunk, request_handler.auth_key), chunks
+        ):
+            for item in items:
+                request_handler.add_items(
+                    [item], uuids.get(item_utils.get_uuid(item), "")
+                )
+        remaining = [
+            identifier
+            for identifier in identifiers
+            if not request_handler.is_cached(identifier)
+        ]
+        list(executor.map(request_handler.get_item, remaining))
+    return [request_handler.get_item(identifier) for identifier in identifiers]
+
+
+def search_items_by_uuid(
+    uuids: List[str], auth_key: Dict[str, str]
+) -> List[Dict[str, Any]]:
+    """Search for items (frame=object) with given UUIDs."""
+    query = "search/?type=Item&frame=object" + "".join(
+        f"&uuid={uuid}" for uuid in uuids
+    )
+    try:
+        return ff_utils.search_metadata(query, key=auth_key)
+    except Exception as e:
+        logger.error(f"Error searching for items: {e}")
+        return []
+
+
+def patch_annotated_filenames_concurrently(
+    annotated_filenames: List[AnnotatedFilename],
+    request_handler: PrefetchRequestHandler,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> None:
+    """Patch files with annotated filenames, with bounded concurrency.
+
+    As for patch_annotated_filenames, but with the file formats of extra
+    files from the cache.
+    """
+    to_patch = [
+        annotated_filename
+        for annotated_filename in annotated_filenames
+        if not has_errors(annotated_filename)
+    ]
+    for annotated_filename in annotated_filenames:
+        if has_errors(annotated_filename):
+            logger.info(
+                f"Skipping file {get_identifier(annotated_filename)} due to errors."
+            )
+
+    def patch(annotated_filename: AnnotatedFilename) -> None:
+        patch_body = get_patch_body_from_raw_file(
+            annotated_filename,
+            get_raw_file(get_identifier(annotated_filename), request_handler.auth_key),
+            request_handler,
+        )
+        patch_file(annotated_filename, patch_body, request_handler.auth_key)
+
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        list(executor.map(patch, to_patch))
+
+
+def get_raw_file(
+    identifier: str, auth_key: Dict[str, str]
+) -> Optional[Dict[str, Any]]:
+    """Get raw view (e.g. for extra files) of file from the database.
+
+    Not from search, which may lag the database, as the whole extra_files
+    of the file are patched from this.
+    """
+    try:
+        return ff_utils.get_metadata(
+            identifier, key=auth_key, add_on="frame=raw&datastore=database"
+        )
+    except Exception as e:
+        logger.error(f"Error getting file {identifier}: {e}")
+        return None
+
+
+def get_patch_body_from_raw_file(
+    annotated_filename: AnnotatedFilename,
+    raw_file: Optional[Dict[str, Any]],
+    request_handler: RequestHandler,
+) -> Dict[str, Any]:
+    """Get patch body for annotated filename, given raw view of file.
+
+    Falls back to get_patch_body if the raw view was not found.
+    """
+    if raw_file is None:
+        return get_patch_body(annotated_filename, request_handler.auth_key)
+    extra_files_to_patch = [
+        {
+            **extra_file,
+            file_constants.FILENAME: get_annotated_extra_file_name(
+                annotated_filename,
+                file_format_utils.get_standard_file_extension(
+                    request_handler.get_item(file_utils.get_file_format(extra_file))
+                ),
+            ),
+        }
+        for extra_file in get_extra_files(raw_file)
+    ]
+    extra_files_patch = (
+        {file_constants.EXTRA_FILES: extra_files_to_patch} if extra_files_to_patch else {}
+    )
+    return {**get_filename_patch(annotated_filename), **extra_files_patch}
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -1705,6 +1998,20 @@ def main() -> None:
         default=False,
         help="Dry run: do not PATCH annotated filenames",
     )
+    parser.add_argument(
+        "--pipeline",
+        "-p",
+        action="store_true",
+        default=False,
+        help="Prefetch associated items in bulk and process files concurrently",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Number of concurrent requests in pipeline mode (default: {DEFAULT_CONCURRENCY})",
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -1724,6 +2031,8 @@ def main() -> None:
             args.identifiers,
             auth_key,
             dry_run=args.dry_run,
+            pipeline=args.pipeline,
+            concurrency=args.concurrency,
         )
 
 
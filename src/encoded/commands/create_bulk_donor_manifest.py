@@ -60,6 +60,10 @@ Optional Arguments
         WARNING: This option has no effect when --search or --donors are
         provided, since those explicitly control which donors are included.
 
+    --stream
+        Generate and write out the manifest in chunks of donors, rather than
+        building it all in memory first; for very large donor sets.
+
     NOTE: The default if none of the above optional arguments are provided
     is to generate a manifest containing protected metadata from ProtectedDonors
     having the status 'protected'.
@@ -103,6 +107,7 @@ Examples
 from typing import Dict, List, Any, Optional
 import pandas as pd
 import argparse
+import csv
 import structlog
 from pathlib import Path
 
@@ -153,6 +158,20 @@ IGNORED_PROPERTIES = [
     "uuid",
 ]
 
+DONOR_LINKED_ITEM_TYPES = [
+    "Demographic",
+    "DeathCircumstances",
+    "TissueCollection",
+    "FamilyHistory",
+]
+MEDICAL_HISTORY_LINKED_ITEM_TYPES = [
+    "Exposure",
+    "Diagnosis",
+    "MedicalTreatment",
+]
+SEARCH_CHUNK_SIZE = 100  # Values per search query
+STREAM_CHUNK_SIZE = 500  # Donors per chunk written when streaming
+
 CHANGED_COLUMNS = {
     "DeathCircumstances.death_pronounced_interval": "DeathCircumstances.death_pronounced_interval_h",
     "DeathCircumstances.ventilator_time": "DeathCircumstances.ventilator_time_h",
@@ -172,13 +191,24 @@ def create_bulk_donor_manifest(
     search: Optional[str] = None,
     identifiers: Optional[List[str]] = None,
     public: bool = False,
+    stream: bool = False,
 ) -> None:
-    """Create bulk donor manifest file for given donors."""
+    """Create bulk donor manifest file for given donors.
+
+    If stream, the manifest is generated and written in chunks of donors
+    rather than all at once (see write_bulk_donor_manifest_streaming).
+    """
 
     request_handler = RequestHandler(auth_key=auth_key)
     donors = get_donors(request_handler, search, identifiers)
     log.info(f"Found {len(donors)} Benchmarking and Production donors to process")
     schemas = ff_utils.get_schemas(key=auth_key)
+    if stream:
+        log.info(f"Generating and writing out bulk donor manifest to {output}")
+        write_bulk_donor_manifest_streaming(
+            donors, schemas, request_handler, output, public
+        )
+        return
     log.info("Generating bulk donor manifest")
     bulk_donor_manifest = get_bulk_donor_manifest(
         donors, schemas, request_handler, public
@@ -244,10 +274,9 @@ def map_public_accessions_to_protected_donors(donors, request_handler):
     """Return a dict mapping ProtectedDonor external_id -> public Donor accession."""
     external_ids = [item_utils.get_external_id(d) for d in donors]
     # Search for all Donor items with matching external_ids
-    query = "search/?type=Donor"
-    for ext_id in external_ids:
-        query += f"&external_id={ext_id}"
-    results = ff_utils.search_metadata(query, key=request_handler.auth_key)
+    results = search_by_values(
+        "search/?type=Donor", "external_id", external_ids, request_handler
+    )
     # quick check that the number of results matches number of donors/external_ids
     assert len(results) == len(donors), f"external_id Donor query result mismatch: Donors: {len(donors)} != Results{len(results)}"
 
@@ -265,40 +294,143 @@ def get_bulk_donor_manifest(
     request_handler: RequestHandler,
     public: bool = False,
 ) -> pd.DataFrame:
-    """Generate dataframe of bulk donor manifest from list of donors."""
+    """Generate dataframe of bulk donor manifest from list of donors.
+
+    Items linked to the donors are fetched in bulk, per item type, and the
+    dataframe is built once from the resulting columns.
+    """
     kept_properties = get_kept_properties(schemas, public)
-    donor_manifest = pd.DataFrame(columns=modify_properties(kept_properties))
-    external_ids = [item_utils.get_external_id(donor) for donor in donors]
-    medical_histories = get_medical_histories(external_ids, request_handler)
+    columns = get_manifest_columns(donors, kept_properties, request_handler, public)
+    return pd.DataFrame(
+        columns, columns=get_manifest_column_names(kept_properties, public), dtype=object
+    )
 
-    public_accession_map = {}
+
+def get_manifest_column_names(
+    kept_properties: List[str], public: bool = False
+) -> List[str]:
+    """Get manifest column names, with public Donor accession if protected."""
+    column_names = modify_properties(kept_properties)
+    if not public:
+        # have to do some gymnastics to add the public donor accession to protected donor manifest
+        column_names.append("Donor.accession")
+    return column_names
+
+
+def get_manifest_columns(
+    donors: List[Dict[str, Any]],
+    kept_properties: List[str],
+    request_handler: RequestHandler,
+    public: bool = False,
+) -> Dict[str, List[Any]]:
+    """Get manifest column values (in donor order) for all donors."""
+    item_types = PUBLIC_ITEM_TYPES if public else PROTECTED_ITEM_TYPES
+    linked_items = get_linked_items(donors, item_types[1:], kept_properties, request_handler)
+    columns = {}
+    for item_type in item_types:
+        if item_type == item_types[0]:
+            items_per_donor = [[donor] for donor in donors]
+        else:
+            items_per_donor = linked_items.get(item_type, [[] for _ in donors])
+        for sub in get_subcolumns(item_type, kept_properties):
+            columns[get_column_name(item_type, sub)] = [
+                format_value(items, sub) for items in items_per_donor
+            ]
     if not public:
         # map external_id → public Donor accession if we’re in protected mode
         public_accession_map = map_public_accessions_to_protected_donors(
             donors, request_handler
         )
-        # Add an extra column to manifest for it
-        donor_manifest["Donor.accession"] = ""
-
-    for idx, donor in enumerate(donors):
-        medical_history = medical_histories[idx]
-        donor_manifest = generate_manifest_row(
-            donor_manifest,
-            idx,
-            donor,
-            medical_history,
-            kept_properties,
-            request_handler,
-            public,
-        )
+        columns["Donor.accession"] = [
+            public_accession_map.get(item_utils.get_external_id(donor), "NA")
+            for donor in donors
+        ]
+    return columns
 
-        # Add the public accession (if applicable)
-        if not public:
-            ext_id = item_utils.get_external_id(donor)
-            donor_manifest.at[idx, "Donor.accession"] = public_accession_map.get(
-                ext_id, "NA"
+
+def get_linked_items(
+    donors: List[Dict[str, Any]],
+    item_types: List[str],
+    kept_properties: List[str],
+    request_handler: RequestHandler,
+) -> Dict[str, List[List[Dict[str, Any]]]]:
+    """Get items of given types linked to donors, per type and donor.
+
+    Items are searched for by type for all donors at once (in chunks),
+    rather than per donor, and then grouped by donor (or by medical
+    history, for items linked to medical histories).
+    """
+    item_types = [
+        item_type for item_type in item_types if get_subcolumns(item_type, kept_properties)
+    ]
+    if not item_types:
+        return {}
+    external_ids = [item_utils.get_external_id(donor) for donor in donors]
+    donor_uuids = [item_utils.get_uuid(donor) for donor in donors]
+    medical_histories = get_medical_histories(external_ids, request_handler)
+    medical_history_uuids = [item_utils.get_uuid(mh) for mh in medical_histories]
+    linked_items = {
+        "MedicalHistory": [[mh] if mh else [] for mh in medical_histories]
+    }
+    for item_type in item_types:
+        if item_type in DONOR_LINKED_ITEM_TYPES:
+            hits = search_by_values(
+                f"search/?type={item_type}&frame=raw", "donor", external_ids, request_handler
             )
-    return donor_manifest
+            linked_items[item_type] = group_items(hits, "donor", donor_uuids)
+        elif item_type in MEDICAL_HISTORY_LINKED_ITEM_TYPES:
+            hits = search_by_values(
+                f"search/?type={item_type}&frame=raw",
+                "medical_history",
+                [item_utils.get_submitted_id(mh) for mh in medical_histories if mh],
+                request_handler,
+            )
+            linked_items[item_type] = group_items(
+                hits, "medical_history", medical_history_uuids
+            )
+    return linked_items
+
+
+def search_by_values(
+    search_query: str,
+    field: str,
+    values: List[str],
+    request_handler: RequestHandler,
+) -> List[Dict[str, Any]]:
+    """Search for items with any of given values for field, in chunks."""
+    values = list(dict.fromkeys(value for value in values if value))
+    hits = []
+    for index in range(0, len(values), SEARCH_CHUNK_SIZE):
+        query = search_query + "".join(
+            f"&{field}={value}" for value in values[index:index + SEARCH_CHUNK_SIZE]
+        )
+        hits += ff_utils.search_metadata(query, key=request_handler.auth_key)
+    return hits
+
+
+def group_items(
+    items: List[Dict[str, Any]], field: str, uuids: List[str]
+) -> List[List[Dict[str, Any]]]:
+    """Group (raw) items by the UUID they link to with field, in given order."""
+    grouped = {}
+    for item in items:
+        grouped.setdefault(item.get(field), []).append(item)
+    return [grouped.get(uuid, []) if uuid else [] for uuid in uuids]
+
+
+def get_subcolumns(item_type: str, kept_properties: List[str]) -> List[str]:
+    """Get (unmodified) property names kept for given item type."""
+    return [
+        column.split(".")[1]
+        for column in kept_properties
+        if column.split(".")[0] == item_type
+    ]
+
+
+def get_column_name(item_type: str, sub: str) -> str:
+    """Get manifest column name for item type property."""
+    column = f"{item_type}.{sub}"
+    return CHANGED_COLUMNS.get(column, column)
 
 
 def modify_properties(properties: List[str]) -> List[str]:
@@ -334,150 +466,44 @@ def get_kept_properties(schemas: Dict[str, Any], public: bool = False) -> List[s
 def get_medical_histories(
     external_ids: List[str], request_handler: RequestHandler
 ) -> List[Dict[str, Any]]:
-    """Get medical history list from protected donors."""
-    search_query = "search/?type=MedicalHistory&frame=embedded"
-    for external_id in external_ids:
-        search_query += f"&donor={external_id}"
-    mh_list = ff_utils.search_metadata(search_query, key=request_handler.auth_key)
-    return order_items_by_donor(mh_list, external_ids)
-
-
-def order_items_by_donor(items: List[Dict[str, Any]], donor_order: List[str]):
-    """Reorder list of item properties to match donor order."""
-    new_items = []
-    for id in donor_order:
-        for item in items:
-            if item_utils.get_display_title(mh_utils.get_donor(item)) == id:
-                new_items.append(item)
-    return new_items
-
-
-def generate_manifest_row(
-    donor_manifest: pd.DataFrame,
-    idx: int,
-    donor: str,
-    medical_history: Dict[str, Any],
-    kept_properties: List[str],
-    request_handler: RequestHandler,
-    public: bool = False,
-):
-    """Generate row for manifest."""
-    donor_type = "ProtectedDonor"
-    # have to do some gymnastics to add the public donor accession to protected donor manifest
-    if public:
-        donor_type = "Donor"
-    donor_external_id = item_utils.get_external_id(donor)
-    mh_submitted_id = item_utils.get_submitted_id(medical_history)
-    donor_search_dict = {
-        "Demographic": f"search/?type=Demographic&donor={donor_external_id}&frame=raw",
-        "DeathCircumstances": f"search/?type=DeathCircumstances&donor={donor_external_id}&frame=raw",
-        "TissueCollection": f"search/?type=TissueCollection&donor={donor_external_id}&frame=raw",
-        "FamilyHistory": f"search/?type=FamilyHistory&donor={donor_external_id}&frame=raw",
-    }
-    mh_search_dict = {
-        "Exposure": f"search/?type=Exposure&medical_history={mh_submitted_id}&frame=raw",
-        "Diagnosis": f"search/?type=Diagnosis&medical_history={mh_submitted_id}&frame=raw",
-        "MedicalTreatment": f"search/?type=MedicalTreatment&medical_history={mh_submitted_id}&frame=raw",
-    }
-
-    donor_manifest = add_row_from_item(
-        donor_manifest, idx, donor_type, [donor], kept_properties
-    )
-    donor_manifest = add_row_from_item(
-        donor_manifest, idx, "MedicalHistory", [medical_history], kept_properties
-    )
-    donor_manifest = add_row_from_search(
-        donor_manifest, idx, donor_search_dict, kept_properties, request_handler
-    )
-    donor_manifest = add_row_from_search(
-        donor_manifest, idx, mh_search_dict, kept_properties, request_handler
-    )
-    return donor_manifest
-
-
-def add_row_from_item(
-    donor_manifest: pd.DataFrame,
-    idx: int,
-    item_type: str,
-    items: List[Dict[str, Any]],
-    kept_properties: List[str],
-):
-    """Add row to dataframe from item properties."""
-    return format_value_from_properties(
-        donor_manifest, idx, item_type, kept_properties, items
+    """Get medical history (if any) of each protected donor, in order."""
+    mh_list = search_by_values(
+        "search/?type=MedicalHistory&frame=embedded", "donor", external_ids, request_handler
     )
+    return order_items_by_donor(mh_list, external_ids)
 
 
-def add_row_from_search(
-    donor_manifest: pd.DataFrame,
-    idx: int,
-    search_dict: Dict[str, Any],
-    kept_properties: List[str],
-    request_handler: RequestHandler,
-) -> pd.DataFrame:
-    """Add row to dataframe from portal search."""
-    tmp_dataframe = donor_manifest
-    for item_type, search in search_dict.items():
-        hits = ff_utils.search_metadata(search, key=request_handler.auth_key)
-        tmp_dataframe = format_value_from_properties(
-            tmp_dataframe, idx, item_type, kept_properties, hits
+def order_items_by_donor(
+    items: List[Dict[str, Any]], donor_order: List[str]
+) -> List[Dict[str, Any]]:
+    """Reorder list of item properties to match donor order.
+
+    Donors without an item get an empty one, so items stay aligned with donors.
+    """
+    items_by_donor = {}
+    for item in items:
+        items_by_donor.setdefault(
+            item_utils.get_display_title(mh_utils.get_donor(item)), item
         )
-    return donor_manifest
+    return [items_by_donor.get(id, {}) for id in donor_order]
 
 
-def format_value_from_properties(
-    donor_manifest: pd.DataFrame,
-    idx: int,
-    item_type: str,
-    kept_properties: List[str],
-    results: Dict[str, Any],
-):
-    """Format and fill in dataframe columns from item properties."""
-    subcolumns = [
-        column.split(".")[1]
-        for column in kept_properties
-        if column.split(".")[0] == item_type
-    ]
-    if len(results) > 1:  # multiple items returned from search
-        for sub in subcolumns:
-            col = f"{item_type}.{sub}"
-            if col in CHANGED_COLUMNS.keys():
-                col = CHANGED_COLUMNS[col]
-            values = []
-            for hit in results:
-                if sub in hit:
-                    value = hit[sub]
-                    if type(value) is list:
-                        value = ";".join(value)
-                    if value or value == 0:
-                        values.append(str(value))
-                    else:
-                        values.append("NA")
-                else:
-                    values.append("NA")
-            donor_manifest.at[idx, col] = "|".join(values)
-    elif len(results) == 1:
-        for sub in subcolumns:
-            col = f"{item_type}.{sub}"
-            if col in CHANGED_COLUMNS.keys():
-                col = CHANGED_COLUMNS[col]
-            if sub in results[0]:
-                value = results[0][sub]
-                if type(value) is list:
-                    value = ";".join(value)
-                if value or value == 0:
-                    donor_manifest.at[idx, col] = value
-                else:
-                    donor_manifest.at[idx, col] = "NA"
-            else:
-                donor_manifest.at[idx, col] = "NA"
-    else:
-        for sub in subcolumns:
-            col = f"{item_type}.{sub}"
-            if col in CHANGED_COLUMNS.keys():
-                col = CHANGED_COLUMNS[col]
-            donor_manifest.at[idx, col] = "NA"
-    return donor_manifest
+def format_value(items: List[Dict[str, Any]], sub: str) -> Any:
+    """Format manifest value for property of (donor's) items.
+
+    Values of multiple items are joined with "|" and missing values are "NA".
+    """
+    values = []
+    for item in items:
+        value = item.get(sub)
+        if type(value) is list:
+            value = ";".join(value)
+        values.append(value if value or value == 0 else "NA")
+    if len(values) > 1:  # multiple items returned from search
+        return "|".join(str(value) for value in values)
+    elif len(values) == 1:
+        return values[0]
+    return "NA"
 
 
 def write_bulk_donor_manifest(donor_manifest: pd.DataFrame, output: Path) -> None:
@@ -492,6 +518,37 @@ def write_bulk_donor_manifest(donor_manifest: pd.DataFrame, output: Path) -> Non
     log.info(f"Workbook written to: {output}")
 
 
+def write_bulk_donor_manifest_streaming(
+    donors: List[Dict[str, Any]],
+    schemas: Dict[str, Any],
+    request_handler: RequestHandler,
+    output: Path,
+    public: bool = False,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> None:
+    """Generate and write out TSV of the bulk donor manifest in chunks of donors.
+
+    Same output as write_bulk_donor_manifest, but only a chunk of donors
+    (and their linked items) is held in memory at a time.
+    """
+    kept_properties = get_kept_properties(schemas, public)
+    column_names = get_manifest_column_names(kept_properties, public)
+    column_names = ["Donor.accession"] + [
+        c for c in column_names if c != "Donor.accession"
+    ]
+    with open(output, "w", newline="") as output_file:
+        writer = csv.writer(output_file, delimiter="\t", lineterminator="\n")
+        writer.writerow(column_names)
+        for index in range(0, len(donors), chunk_size):
+            chunk = donors[index:index + chunk_size]
+            columns = get_manifest_columns(chunk, kept_properties, request_handler, public)
+            writer.writerows(
+                zip(*[columns.get(column, [None] * len(chunk)) for column in column_names])
+            )
+            log.info(f"Wrote {index + len(chunk)} of {len(donors)} donors")
+    log.info(f"Workbook written to: {output}")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -527,6 +584,12 @@ def main() -> None:
         default=False,
         help="Create open-network manifest (only public donor properties including network-released donors) WARNING: Has no effect when --search or --donors are provided.",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=False,
+        help="Generate and write out manifest in chunks of donors (for very large donor sets)",
+    )
     args = parser.parse_args()
     auth_key = get_auth_key(args.env)
     # support providing both search and donors, but if only one is provided
@@ -561,6 +624,7 @@ def main() -> None:
         search_query,
         args.donors,
         args.public,
+        stream=args.stream,
     )
 
 
@@ -0,0 +1,51 @@
+import argparse
+import logging
+
+import structlog
+from pyramid.paster import get_app
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+from snovault import DBSESSION
+
+from encoded.types.tissue_sample import EXTERNAL_ID_INDEX
+
+
+logger = structlog.getLogger(__name__)
+
+
+def get_create_index_statement() -> str:
+    """
+    Returns the statement creating EXTERNAL_ID_INDEX, if it does not already exist, without
+    blocking writes to the propsheets table (so it cannot be run within a transaction).
+    """
+    statement = str(CreateIndex(EXTERNAL_ID_INDEX, if_not_exists=True).compile(dialect=postgresql.dialect()))
+    return statement.replace("CREATE INDEX ", "CREATE INDEX CONCURRENTLY ", 1)
+
+
+def create_external_id_index(app) -> None:
+    """
+    Creates EXTERNAL_ID_INDEX (see tissue_sample.get_tissue_samples_by_external_ids) in the database
+    of the given app, if it does not already exist; i.e. for a database created before the index was
+    added, as it is otherwise created along with the tables.
+    """
+    engine = app.registry[DBSESSION]().get_bind()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        logger.info(f"Creating index {EXTERNAL_ID_INDEX.name} (if it does not exist)")
+        connection.execute(text(get_create_index_statement()))
+        logger.info(f"Created index {EXTERNAL_ID_INDEX.name}")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Create the propsheets external_id index, if it does not already exist."
+    )
+    parser.add_argument("config_uri", help="path to configfile")
+    parser.add_argument("--app-name", help="Pyramid app name in configfile")
+    args = parser.parse_args()
+    create_external_id_index(get_app(args.config_uri, args.app_name))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
-import json, sys, subprocess, pprint, time, csv, datetime
+import json, os, sys, subprocess, pprint, time, csv, datetime
 import requests
 import click
 from pathlib import Path
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dcicutils import ff_utils
 from dcicutils.creds_utils import SMaHTKeyManager
 from functools import lru_cache
@@ -21,6 +22,7 @@ SEARCH_QUERY_QC = (
     "&submission_centers.display_title=NYGC+GCC"
     "&submission_centers.display_title=BCM+GCC"
     "&field=uuid"
+    "&field=accession"
     "&type=FileSet"
     "&limit=10000"
     #"&limit=50&from=800"  # for testing
@@ -28,6 +30,34 @@ SEARCH_QUERY_QC = (
     #"&accession=SMAFSRUZ6AX4"
 )
 
+# Fields of the (embedded) file sets used here; see _build_file_set_embedded_list
+FILESET_FIELDS = [
+    "uuid",
+    "accession",
+    "tags",
+    "tissue_types",
+    "submission_centers.display_title",
+    "libraries.assay.display_title",
+    "libraries.analytes.samples.sample_sources.uuid",
+    "libraries.analytes.samples.sample_sources.@type",
+    "libraries.analytes.samples.sample_sources.code",
+    "libraries.analytes.samples.sample_sources.cell_line.code",
+    "sequencing.sequencer.display_title",
+    "meta_workflow_runs.uuid",
+    "meta_workflow_runs.status",
+    "meta_workflow_runs.final_status",
+    "meta_workflow_runs.date_created",
+    "meta_workflow_runs.meta_workflow.category",
+    "meta_workflow_runs.meta_workflow.name",
+]
+
+# Workflow runs (by name) that may have the final output file; see get_final_output_file
+FINAL_OUTPUT_WORKFLOW_RUNS = ["sentieon_Dedup", "bam_to_cram", "samtools_merge"]
+
+# Number of concurrent requests, and file sets fetched (and checkpointed) together
+MAX_WORKERS = 8
+CHUNK_SIZE = 100
+CHECKPOINT_VERSION = 1
 
 # Portal Constants
 UUID = "uuid"
@@ -213,11 +243,17 @@ QC_THRESHOLDS = {
 
 
 class FileStats:
-    def __init__(self, output, somalier_output):
+    def __init__(self, output, somalier_output, checkpoint=None, previous=None, max_workers=MAX_WORKERS):
         self.errors = []
         self.warnings = []
         self.output_path = output
         self.somalier_output_path = somalier_output
+        # Processed file sets (results and warnings) are saved here after each chunk, to resume from
+        self.checkpoint_path = checkpoint
+        # Previous (main) QC JSON, whose results are reused for file sets not modified since (incremental)
+        self.previous = previous
+        self.max_workers = max_workers
+        self.generated = datetime.datetime.now(datetime.timezone.utc).isoformat()
         self.all_tissues = self.get_all_tissues()
         # self.all_donors = self.get_all_donors()
         self.stats = []
@@ -228,7 +264,7 @@ class FileStats:
                 "qc_metrics": {},
                 "grouping": DEFAULT_FACET_GROUPING,
                 "assay": DEFAULT_FACET_ASSAY,
-                "sample_source": DEFAULT_FACET_SAMPLE_SOURCE,
+                "sample_source": list(DEFAULT_FACET_SAMPLE_SOURCE),
                 "sequencer": DEFAULT_FACET_SEQUENCER,
                 "sample_identity_donors": [],
             },
@@ -267,194 +303,41 @@ class FileStats:
     def get_stats(self):
         print(f"Retrieving filesets...")
 
-        sample_source_codes_for_facets = []
-
         filesets = search(SEARCH_QUERY_QC)
         print(f"Number of filesets considered: {len(filesets)}")
-        for fileset_from_search in progressbar(filesets, "Processing filesets "):
-
-            fileset = get_item(fileset_from_search[UUID])
-            fileset_accession = fileset[ACCESSION]
-
-            # Get information from the fileset
-            tags = fileset.get("tags", [])
-            tags.sort()
-            tags = ", ".join(tags)
-            submission_centers = [
-                s["display_title"] for s in fileset[SUBMISSION_CENTERS]
-            ]
-            submission_centers.sort()
-            submission_centers = ", ".join(submission_centers)
-            assays = [l[ASSAY]["display_title"] for l in fileset[LIBRARIES]]
-
-            assay = None
-            if set(assays) & set(WGS_ASSAYS):
-                assay = WGS
-            elif set(assays) & set(RNA_ASSAYS):
-                assay = RNA_SEQ
-
-            if not assay:
-                self.warnings.append(
-                    f"Warning: Fileset {fileset[ACCESSION]} has no supported assay: {','.join(assays)}"
-                )
-                continue
 
-            sequencer = fileset[SEQUENCING][SEQUENCER]["display_title"]
-            if sequencer not in SUPPORTED_SEQUENCERS:
-                self.warnings.append(
-                    f"Warning: Fileset {fileset[ACCESSION]} has no supported sequencer"
-                )
-                continue
-
-            study = ""
-            sample_source_codes = []
-            sample_source_descriptions = []
-            donor_display_title = "NA"
-            tissue_or_cell_line = None
-            for sample_source in self.get_sample_sources_from_fileset(fileset):
-                code = sample_source.get("code")
-                if "Tissue" in sample_source["@type"]:
-                    tissue_or_cell_line = TISSUES
-
-                    tissue_uuid = sample_source[UUID]
-                    tissue = self.all_tissues.get(tissue_uuid)
-                    tissue_display_title = tissue[DISPLAY_TITLE]
-                    tissue_external_id = tissue["external_id"]
-                    if tissue_external_id.startswith("ST"):
-                        study = BENCHMARKING
-                    elif tissue_external_id.startswith("SMHT"):
-                        study = PRODUCTION
-                    else:
-                        raise Exception(
-                            f"Could not determine study for tissue {tissue_external_id}"
-                        )
-                    donor = tissue.get("donor")
-                    donor_display_title = donor[DISPLAY_TITLE]
-                    tissue_types = fileset.get("tissue_types", [])
-                    tissue_types_display = ", ".join(tissue_types)
-                    sample_source_codes.append(f"{tissue_display_title}")
-                    sample_source_descriptions.append(f"{tissue_types_display}")
-                else:
-                    if not code:
-                        cell_line = sample_source.get("cell_line", {})
-                        if isinstance(cell_line, list):
-                            for cl in cell_line:
-                                code = cl.get("code", "")
-                                sample_source_codes.append(f"{code}")
-                                sample_source_descriptions.append(f"{code}")
-                        else:
-                            code = sample_source.get("cell_line", {}).get("code", None)
-                            if code:
-                                sample_source_codes.append(f"{code}")
-                                sample_source_descriptions.append(f"{code}")
-                    else:
-                        sample_source_codes.append(f"{code}")
-                        sample_source_descriptions.append(f"{code}")
-
-                    tissue_or_cell_line = CELL_LINE
-                    study = BENCHMARKING
-
-            if not sample_source_codes:
-                self.warnings.append(
-                    f"Warning: Fileset {fileset[ACCESSION]} has no sample source codes"
-                )
-                continue
-            sample_source_codes = list(set(sample_source_codes))
-            sample_source_codes.sort()
-            sample_source_descriptions = list(set(sample_source_descriptions))
-            sample_source_descriptions.sort()
-
-            sample_source_codes = ", ".join(sample_source_codes)
-            sample_source_descriptions = ", ".join(sample_source_descriptions)
-            sample_source_display = sample_source_descriptions
-            sample_source_descriptions = f"{sample_source_descriptions} - {study}"
-
-            # Get the alignment MWFR to process the fastp outputs and get the final BAM
-            mwfr = self.get_alignment_mwfr(fileset)
-            if not mwfr:
-                continue
-
-            # Search the aligned BAM and extract quality metrics from it
-            final_ouput_file = self.get_final_output_file(mwfr, assay)
+        # Per file set: {"record": <result and QC metrics, or None if skipped>, "warnings": [...]}
+        processed = self.load_checkpoint()
+        if self.previous:
+            processed.update(self.get_unmodified_from_previous(filesets, processed))
+        to_process = [fs[UUID] for fs in filesets if fs[UUID] not in processed]
+        print(f"Number of filesets to process: {len(to_process)}")
+
+        for chunk in progressbar(chunk_list(to_process, CHUNK_SIZE), "Processing fileset chunks "):
+            for fileset in self.get_filesets_for_chunk(chunk):
+                first_warning = len(self.warnings)
+                record = self.process_fileset(fileset)
+                processed[fileset[UUID]] = {
+                    "record": record,
+                    "warnings": self.warnings[first_warning:],
+                }
+            self.save_checkpoint(processed)
+            # Items are only needed for the chunk; don't keep them all in memory
+            get_item.cache_clear()
 
-            if not final_ouput_file:
-                self.warnings.append(
-                    f"Warning: Fileset {fileset[ACCESSION]} has no final output file"
-                )
+        self.warnings = []
+        sample_source_codes_for_facets = []
+        for fileset in filesets:
+            entry = processed.get(fileset[UUID])
+            if not entry:
                 continue
-
-            if final_ouput_file[STATUS] not in [
-                "uploaded",
-                "released",
-                "open",
-                "protected",
-                "open-early",
-                "open-network",
-                "protected-early",
-                "protected-network",
-            ]:
-                self.warnings.append(
-                    f"Warning: Fileset {fileset[ACCESSION]} has no uploaded or released output file. Status: {final_ouput_file[STATUS]}"
-                )
+            self.warnings += entry["warnings"]
+            record = entry["record"]
+            if not record:
                 continue
-
-            sample_source_codes_for_facets.append(sample_source_descriptions)
-
-            result = {}
-            result["fileset"] = fileset_accession
-            result["file_accession"] = final_ouput_file[ACCESSION]
-            result["file_status"] = final_ouput_file[STATUS]
-            result["file_display_title"] = final_ouput_file[DISPLAY_TITLE]
-            result[SUBMISSION_CENTER] = submission_centers
-            result[ASSAY] = assay
-            result["assay_label"] = ",".join(assays)
-            result[SEQUENCER] = sequencer
-            if sequencer in SHORT_READ_SEQS:
-                result["sequencer_group"] = ALL_ILLUMINA
-            elif sequencer in LONG_READ_SEQS:
-                result["sequencer_group"] = ALL_LONG_READ
-            result[SAMPLE_SOURCE] = sample_source_codes
-            result["sample_source_display"] = sample_source_display
-            result["sample_source_subgroup"] = sample_source_descriptions
-            result[SAMPLE_SOURCE_GROUP] = tissue_or_cell_line
-            result["donor"] = donor_display_title
-            result["study"] = study
-            result["read_length"] = "long" if sequencer in LONG_READ_SEQS else "short"
-            result["quality_metrics"] = {}
-
-            qm = self.get_quality_metrics(final_ouput_file)
-            qc_values = qm["qc_values"]
-            result["quality_metrics"]["overall_quality_status"] = qm.get(
-                "overall_quality_status", "NA"
-            )
-            result["quality_metrics"]["qc_values"] = {}
-            for qc_value in qc_values:
-                derived_from = qc_value["derived_from"]
-                value = qc_value["value"]
-                result["quality_metrics"]["qc_values"][derived_from] = {
-                    "value": value,
-                }
-                flag = qc_value.get("flag")
-                if flag:
-                    result["quality_metrics"]["qc_values"][derived_from]["flag"] = flag
-                if derived_from not in self.qc_info or (
-                    self.qc_info[derived_from]
-                    not in self.viz_info["facets"]["qc_metrics"][assay]
-                ):
-                    self.qc_info[derived_from] = {
-                        "derived_from": derived_from,
-                        "tooltip": qc_value.get("tooltip", ""),
-                        "key": qc_value.get("key", ""),
-                    }
-                    if not isinstance(value, str):
-                        self.viz_info["facets"]["qc_metrics"].setdefault(
-                            assay, []
-                        ).append(self.qc_info[derived_from])
-
-            self.viz_info["facets"]["qc_metrics"][assay].sort(
-                key=lambda x: x["derived_from"]
-            )
-
+            result = record["result"]
+            sample_source_codes_for_facets.append(result["sample_source_subgroup"])
+            self.add_qc_metrics(result[ASSAY], record["qc_metrics"])
             self.stats.append(result)
 
         for w in self.warnings:
@@ -476,6 +359,289 @@ class FileStats:
 
         self.get_somalier_results()
 
+    def get_filesets_for_chunk(self, fileset_uuids):
+        """Get the file sets, and prefetch the items needed for them (into the get_item cache).
+
+        File sets come from a search (with only the fields needed); their alignment MWFRs,
+        the output files of these, and their quality metrics are each fetched concurrently.
+        """
+        filesets = get_items_bulk_by_uuid("FileSet", FILESET_FIELDS, fileset_uuids)
+        filesets = {fs[UUID]: fs for fs in filesets}
+        missing = [uuid for uuid in fileset_uuids if uuid not in filesets]
+        for uuid, fileset in zip(missing, map_concurrently(get_item, missing, self.max_workers)):
+            filesets[uuid] = fileset
+        filesets = [filesets[uuid] for uuid in fileset_uuids]
+
+        mwfr_uuids = [
+            alignment_mwfrs[0][UUID]
+            for alignment_mwfrs in map(get_alignment_mwfrs, filesets)
+            if alignment_mwfrs
+        ]
+        mwfrs = map_concurrently(get_item, mwfr_uuids, self.max_workers)
+        file_uuids = [
+            workflow_run["output"][0]["file"][UUID]
+            for mwfr in mwfrs
+            for workflow_run in mwfr.get("workflow_runs", [])
+            if workflow_run.get("name") in FINAL_OUTPUT_WORKFLOW_RUNS and workflow_run.get("output")
+        ]
+        files = map_concurrently(get_item, list(dict.fromkeys(file_uuids)), self.max_workers)
+        qm_uuids = [file[QUALITY_METRICS][-1][UUID] for file in files if file.get(QUALITY_METRICS)]
+        map_concurrently(get_item, qm_uuids, self.max_workers)
+        return filesets
+
+    def process_fileset(self, fileset):
+        """Returns the result (and QC metrics) for the file set, or None (with a warning) if skipped."""
+        fileset_accession = fileset[ACCESSION]
+
+        # Get information from the fileset
+        tags = fileset.get("tags", [])
+        tags.sort()
+        tags = ", ".join(tags)
+        submission_centers = [
+            s["display_title"] for s in fileset[SUBMISSION_CENTERS]
+        ]
+        submission_centers.sort()
+        submission_centers = ", ".join(submission_centers)
+        assays = [l[ASSAY]["display_title"] for l in fileset[LIBRARIES]]
+
+        assay = None
+        if set(assays) & set(WGS_ASSAYS):
+            assay = WGS
+        elif set(assays) & set(RNA_ASSAYS):
+            assay = RNA_SEQ
+
+        if not assay:
+            self.warnings.append(
+                f"Warning: Fileset {fileset[ACCESSION]} has no supported assay: {','.join(assays)}"
+            )
+            return None
+
+        sequencer = fileset[SEQUENCING][SEQUENCER]["display_title"]
+        if sequencer not in SUPPORTED_SEQUENCERS:
+            self.warnings.append(
+                f"Warning: Fileset {fileset[ACCESSION]} has no supported sequencer"
+            )
+            return None
+
+        study = ""
+        sample_source_codes = []
+        sample_source_descriptions = []
+        donor_display_title = "NA"
+        tissue_or_cell_line = None
+        for sample_source in self.get_sample_sources_from_fileset(fileset):
+            code = sample_source.get("code")
+            if "Tissue" in sample_source["@type"]:
+                tissue_or_cell_line = TISSUES
+
+                tissue_uuid = sample_source[UUID]
+                tissue = self.all_tissues.get(tissue_uuid)
+                tissue_display_title = tissue[DISPLAY_TITLE]
+                tissue_external_id = tissue["external_id"]
+                if tissue_external_id.startswith("ST"):
+                    study = BENCHMARKING
+                elif tissue_external_id.startswith("SMHT"):
+                    study = PRODUCTION
+                else:
+                    raise Exception(
+                        f"Could not determine study for tissue {tissue_external_id}"
+                    )
+                donor = tissue.get("donor")
+                donor_display_title = donor[DISPLAY_TITLE]
+                tissue_types = fileset.get("tissue_types", [])
+                tissue_types_display = ", ".join(tissue_types)
+                sample_source_codes.append(f"{tissue_display_title}")
+                sample_source_descriptions.append(f"{tissue_types_display}")
+            else:
+                if not code:
+                    cell_line = sample_source.get("cell_line", {})
+                    if isinstance(cell_line, list):
+                        for cl in cell_line:
+                            code = cl.get("code", "")
+                            sample_source_codes.append(f"{code}")
+                            sample_source_descriptions.append(f"{code}")
+                    else:
+                        code = sample_source.get("cell_line", {}).get("code", None)
+                        if code:
+                            sample_source_codes.append(f"{code}")
+                            sample_source_descriptions.append(f"{code}")
+                else:
+                    sample_source_codes.append(f"{code}")
+                    sample_source_descriptions.append(f"{code}")
+
+                tissue_or_cell_line = CELL_LINE
+                study = BENCHMARKING
+
+        if not sample_source_codes:
+            self.warnings.append(
+                f"Warning: Fileset {fileset[ACCESSION]} has no sample source codes"
+            )
+            return None
+        sample_source_codes = list(set(sample_source_codes))
+        sample_source_codes.sort()
+        sample_source_descriptions = list(set(sample_source_descriptions))
+        sample_source_descriptions.sort()
+
+        sample_source_codes = ", ".join(sample_source_codes)
+        sample_source_descriptions = ", ".join(sample_source_descriptions)
+        sample_source_display = sample_source_descriptions
+        sample_source_descriptions = f"{sample_source_descriptions} - {study}"
+
+        # Get the alignment MWFR to process the fastp outputs and get the final BAM
+        mwfr = self.get_alignment_mwfr(fileset)
+        if not mwfr:
+            return None
+
+        # Search the aligned BAM and extract quality metrics from it
+        final_ouput_file = self.get_final_output_file(mwfr, assay)
+
+        if not final_ouput_file:
+            self.warnings.append(
+                f"Warning: Fileset {fileset[ACCESSION]} has no final output file"
+            )
+            return None
+
+        if final_ouput_file[STATUS] not in [
+            "uploaded",
+            "released",
+            "open",
+            "protected",
+            "open-early",
+            "open-network",
+            "protected-early",
+            "protected-network",
+        ]:
+            self.warnings.append(
+                f"Warning: Fileset {fileset[ACCESSION]} has no uploaded or released output file. Status: {final_ouput_file[STATUS]}"
+            )
+            return None
+
+        result = {}
+        result["fileset"] = fileset_accession
+        result["file_accession"] = final_ouput_file[ACCESSION]
+        result["file_status"] = final_ouput_file[STATUS]
+        result["file_display_title"] = final_ouput_file[DISPLAY_TITLE]
+        result[SUBMISSION_CENTER] = submission_centers
+        result[ASSAY] = assay
+        result["assay_label"] = ",".join(assays)
+        result[SEQUENCER] = sequencer
+        if sequencer in SHORT_READ_SEQS:
+            result["sequencer_group"] = ALL_ILLUMINA
+        elif sequencer in LONG_READ_SEQS:
+            result["sequencer_group"] = ALL_LONG_READ
+        result[SAMPLE_SOURCE] = sample_source_codes
+        result["sample_source_display"] = sample_source_display
+        result["sample_source_subgroup"] = sample_source_descriptions
+        result[SAMPLE_SOURCE_GROUP] = tissue_or_cell_line
+        result["donor"] = donor_display_title
+        result["study"] = study
+        result["read_length"] = "long" if sequencer in LONG_READ_SEQS else "short"
+        result["quality_metrics"] = {}
+
+        qm = self.get_quality_metrics(final_ouput_file)
+        qc_values = qm["qc_values"]
+        result["quality_metrics"]["overall_quality_status"] = qm.get(
+            "overall_quality_status", "NA"
+        )
+        result["quality_metrics"]["qc_values"] = {}
+        qc_metrics = []
+        for qc_value in qc_values:
+            derived_from = qc_value["derived_from"]
+            value = qc_value["value"]
+            result["quality_metrics"]["qc_values"][derived_from] = {
+                "value": value,
+            }
+            flag = qc_value.get("flag")
+            if flag:
+                result["quality_metrics"]["qc_values"][derived_from]["flag"] = flag
+            qc_metrics.append({
+                "derived_from": derived_from,
+                "tooltip": qc_value.get("tooltip", ""),
+                "key": qc_value.get("key", ""),
+                "value": value,
+            })
+
+        return {"result": result, "qc_metrics": qc_metrics}
+
+    def add_qc_metrics(self, assay, qc_metrics):
+        """Adds the QC metrics (of a result) to the QC info and the (numeric) QC metric facets of the assay."""
+        for qc_metric in qc_metrics:
+            derived_from = qc_metric["derived_from"]
+            if derived_from not in self.qc_info or (
+                self.qc_info[derived_from]
+                not in self.viz_info["facets"]["qc_metrics"].get(assay, [])
+            ):
+                self.qc_info[derived_from] = {
+                    "derived_from": derived_from,
+                    "tooltip": qc_metric["tooltip"],
+                    "key": qc_metric["key"],
+                }
+                if not isinstance(qc_metric["value"], str):
+                    self.viz_info["facets"]["qc_metrics"].setdefault(
+                        assay, []
+                    ).append(self.qc_info[derived_from])
+
+        self.viz_info["facets"]["qc_metrics"].get(assay, []).sort(
+            key=lambda x: x["derived_from"]
+        )
+
+    def load_checkpoint(self):
+        """Returns the file sets processed so far (by an interrupted run), if any."""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path) as file:
+            checkpoint = json.load(file)
+        if checkpoint.get("version") != CHECKPOINT_VERSION or checkpoint.get("query") != SEARCH_QUERY_QC:
+            print(f"Ignoring checkpoint {self.checkpoint_path} from a different version or query")
+            return {}
+        print(f"Resuming from checkpoint {self.checkpoint_path}: {len(checkpoint['processed'])} filesets processed")
+        return checkpoint["processed"]
+
+    def save_checkpoint(self, processed):
+        if not self.checkpoint_path:
+            return
+        checkpoint = {"version": CHECKPOINT_VERSION, "query": SEARCH_QUERY_QC, "processed": processed}
+        # Write then rename, so an interrupted write never leaves a broken checkpoint
+        with open(f"{self.checkpoint_path}.tmp", "w") as file:
+            json.dump(checkpoint, file)
+        os.replace(f"{self.checkpoint_path}.tmp", self.checkpoint_path)
+
+    def remove_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def get_unmodified_from_previous(self, filesets, processed):
+        """Returns the results of the previous QC JSON for the file sets not modified since it was generated.
+
+        File sets count as modified if they, or any of their meta workflow runs, files, quality metrics,
+        tissues or donors, were modified (on or after the day) since (see get_modified_fileset_identifiers);
+        file sets without previous results (e.g. skipped) are processed again.
+        """
+        generated = self.previous.get("generated")
+        if not generated:
+            raise Exception("Previous QC JSON has no generated date; can't run incrementally")
+        modified = get_modified_fileset_identifiers(generated[:10])
+        previous_results = {result["fileset"]: result for result in self.previous.get("qc_results", [])}
+        previous_qc_info = self.previous.get("qc_info", {})
+        unmodified = {}
+        for fileset in filesets:
+            if fileset[UUID] in processed or fileset[UUID] in modified or fileset[ACCESSION] in modified:
+                continue
+            result = previous_results.get(fileset[ACCESSION])
+            if not result:
+                continue
+            qc_metrics = [
+                {
+                    "derived_from": derived_from,
+                    "tooltip": previous_qc_info.get(derived_from, {}).get("tooltip", ""),
+                    "key": previous_qc_info.get(derived_from, {}).get("key", ""),
+                    "value": qc_value["value"],
+                }
+                for derived_from, qc_value in result["quality_metrics"]["qc_values"].items()
+            ]
+            unmodified[fileset[UUID]] = {"record": {"result": result, "qc_metrics": qc_metrics}, "warnings": []}
+        print(f"Reusing previous results for {len(unmodified)} unmodified filesets")
+        return unmodified
+
     def get_somalier_results(self):
 
         # GET SAMPLE IDENTITY CHECK RESULTS
@@ -487,10 +653,18 @@ class FileStats:
         # Hapmap does not have a single donor, so we need to add it manually
         donors.append({ACCESSION: "HAPMAP", DISPLAY_TITLE: "HAPMAP"})
         donors = sorted(donors, key=lambda x: x[DISPLAY_TITLE])
-        for donor in progressbar(donors, "Processing donors "):
+        latest_runs = map_concurrently(
+            get_latest_somalier_run_for_donor, [donor[ACCESSION] for donor in donors], self.max_workers
+        )
+        tsv_contents = map_concurrently(
+            lambda latest_run: get_somalier_relate_output(latest_run[0]) if latest_run else None,
+            latest_runs,
+            self.max_workers,
+        )
+        for donor, latest_run, tsv_content in progressbar(
+                list(zip(donors, latest_runs, tsv_contents)), "Processing donors "):
             donor_accession = donor[ACCESSION]
 
-            latest_run = get_latest_somalier_run_for_donor(donor_accession)
             if not latest_run:
                 continue
 
@@ -505,7 +679,6 @@ class FileStats:
             overall_quality_status = somalier_relate_wfr["output"][0]["file"][
                 "quality_metrics"
             ][0]["overall_quality_status"]
-            tsv_content = get_somalier_relate_output(latest_run)
             if not tsv_content:
                 raise Exception(
                     f"Could not get TSV content for somalier run {latest_run[ACCESSION]}"
@@ -575,6 +748,11 @@ class FileStats:
         threshold = 0.55 if donor_accession == "SMADOLCPQL1J" else 0.9
 
         results = self.somalier_results[donor_accession]["results"]
+        # Get the assays of the files involved (cached) concurrently up front
+        map_concurrently(get_assay_from_file, list(dict.fromkeys(
+            result[sample] for result in results if result["relatedness"] < threshold
+            for sample in ["sample_a", "sample_b"]
+        )), self.max_workers)
         problematic_files = {}
         for result in results:
             if result["relatedness"] < threshold:
@@ -613,6 +791,7 @@ class FileStats:
 
         print(f"Writing results to {self.output_path}")
         data = {
+            "generated": self.generated,
             "viz_info": self.viz_info,
             "qc_info": self.qc_info,
             "qc_results": self.stats,
@@ -624,21 +803,10 @@ class FileStats:
         with open(self.somalier_output_path, "w") as file:
             json.dump(self.somalier_results, file, indent=4)
 
+        self.remove_checkpoint()
+
     def get_alignment_mwfr(self, fileset):
-        mwfrs = fileset.get("meta_workflow_runs", [])
-        # Sort the MWFRs by date_created in descending order. The first one is the most recent.
-        mwfrs_sorted = sorted(mwfrs, key=lambda x: datetime.datetime.fromisoformat(x['date_created']), reverse=True)
-
-        alignment_mwfrs = [
-            mwfr
-            for mwfr in mwfrs_sorted
-            if mwfr[STATUS] != DELETED
-            and mwfr["final_status"] == COMPLETED
-            and (
-                "Alignment" in mwfr["meta_workflow"]["category"]
-                or mwfr["meta_workflow"]["name"] == "bam_to_cram"
-            )
-        ]
+        alignment_mwfrs = get_alignment_mwfrs(fileset)
         if len(alignment_mwfrs) > 1:
             self.warnings.append(
                 f"Warning: Fileset {fileset[ACCESSION]} has multiple alignment MWFRs. Taking most recent one."
@@ -725,6 +893,23 @@ class FileStats:
         ]
 
 
+def get_alignment_mwfrs(fileset):
+    mwfrs = fileset.get("meta_workflow_runs", [])
+    # Sort the MWFRs by date_created in descending order. The first one is the most recent.
+    mwfrs_sorted = sorted(mwfrs, key=lambda x: datetime.datetime.fromisoformat(x['date_created']), reverse=True)
+
+    return [
+        mwfr
+        for mwfr in mwfrs_sorted
+        if mwfr[STATUS] != DELETED
+        and mwfr["final_status"] == COMPLETED
+        and (
+            "Alignment" in mwfr["meta_workflow"]["category"]
+            or mwfr["meta_workflow"]["name"] == "bam_to_cram"
+        )
+    ]
+
+
 def get_fileset_from_ouput_file(file_acccesion):
     file = get_item(file_acccesion, add_on="embedded")
     mwfr = file.get("meta_workflow_run_outputs")
@@ -772,6 +957,68 @@ def get_items_bulk(type, fields, accessions):
     return all_results
 
 
+def get_items_bulk_by_uuid(type, fields, uuids):
+    return get_items_bulk_by_field(type, fields, UUID, uuids)
+
+
+def get_items_bulk_by_field(type, fields, field, values):
+    """Returns the items of the type with any of the values for the field, e.g. donor.uuid."""
+    all_results = []
+
+    fields_param = "&".join([f"field={f}" for f in fields])
+    for values_chunk in chunk_list(values, 100):
+        values_param = "&".join([f"{field}={v}" for v in values_chunk])
+        query = f"search/?type={type}" f"&{fields_param}&{values_param}"
+        all_results += search(query)
+    return all_results
+
+
+def get_modified_fileset_identifiers(date):
+    """Returns the identifiers (uuids and accessions) of file sets which were modified, or whose
+    meta workflow runs, files (or their quality metrics), or tissues (or their donors) were
+    modified, on or after the given (YYYY-MM-DD) date."""
+    identifiers = set()
+    modified_filter = f"&last_modified.date_modified.from={date}"
+
+    def get_modified_uuids(type):
+        return sorted({item[UUID] for item in search(f"search/?type={type}&field=uuid{modified_filter}")})
+
+    def add_file_sets(items):
+        for item in items:
+            for fileset in item.get("file_sets", []):
+                if isinstance(fileset, dict):
+                    identifiers.add(fileset.get(UUID))
+                else:  # @id
+                    identifiers.add(fileset.strip("/").split("/")[-1])
+
+    identifiers.update(get_modified_uuids("FileSet"))
+    for type in ["MetaWorkflowRun", "File"]:
+        add_file_sets(search(f"search/?type={type}&field=file_sets{modified_filter}"))
+    add_file_sets(get_items_bulk_by_field(
+        "File", ["file_sets"], "quality_metrics.uuid", get_modified_uuids("QualityMetric")
+    ))
+    tissue_uuids = set(get_modified_uuids("Tissue"))
+    tissue_uuids.update(
+        tissue[UUID]
+        for tissue in get_items_bulk_by_field("Tissue", [UUID], "donor.uuid", get_modified_uuids("Donor"))
+    )
+    identifiers.update(
+        fileset[UUID]
+        for fileset in get_items_bulk_by_field(
+            "FileSet", [UUID], "libraries.analytes.samples.sample_sources.uuid", sorted(tissue_uuids)
+        )
+    )
+    return identifiers
+
+
+def map_concurrently(function, values, max_workers=MAX_WORKERS):
+    """Returns the results of the function for each of the values, in order, with at most max_workers at a time."""
+    if not values:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(function, values))
+
+
 def chunk_list(lst, chunk_size=100):
     return [lst[i : i + chunk_size] for i in range(0, len(lst), chunk_size)]
 
@@ -836,9 +1083,9 @@ def progressbar(it, prefix="", size=60, out=sys.stdout):
     start = time.time()  # time estimate start
 
     def show(j):
-        x = int(size * j / count)
+        x = int(size * j / count) if count else size
         # time estimate calculation and string
-        remaining = ((time.time() - start) / j) * (count - j)
+        remaining = ((time.time() - start) / j) * (count - j) if count else 0
         mins, sec = divmod(remaining, 60)  # limited to minutes
         time_str = f"{int(mins):02}:{sec:03.1f}"
         print(
@@ -858,16 +1105,29 @@ def progressbar(it, prefix="", size=60, out=sys.stdout):
 @click.command()
 @click.option("--output", help="Output path for the main QC JSON (optional)")
 @click.option("--somalier-output", help="Output path for the somalier results JSON (optional)")
-def main(output, somalier_output):
+@click.option("--checkpoint", help="Path of the checkpoint to resume an interrupted run from (optional)")
+@click.option("--incremental", type=click.Path(exists=True),
+              help="Previous main QC JSON; only filesets modified since it was generated are processed (optional)")
+@click.option("--workers", type=int, default=MAX_WORKERS, show_default=True, help="Number of concurrent requests")
+def main(output, somalier_output, checkpoint, incremental, workers):
     """Create JSON files that are input to the QC overview page.
 
     Produces two files: the main QC JSON and a separate somalier results JSON.
+
+    Processed filesets are checkpointed (by default next to the main QC JSON), so a rerun
+    with the same output resumes where an interrupted run stopped.
     """
     dt = datetime.datetime.now()
     output_path = output or f"./file_statistics_{dt.year}_{dt.month}_{dt.day}.json"
     somalier_output_path = somalier_output or output_path.replace(".json", "_somalier.json")
-
-    FS = FileStats(output_path, somalier_output_path)
+    checkpoint_path = checkpoint or f"{output_path}.checkpoint"
+    previous = None
+    if incremental:
+        with open(incremental) as file:
+            previous = json.load(file)
+
+    FS = FileStats(output_path, somalier_output_path, checkpoint=checkpoint_path, previous=previous,
+                   max_workers=workers)
     FS.get_stats()
     FS.write_json()
     print("Done!")
@@ -1,11 +1,17 @@
 import argparse
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import copy
+import json
 import logging
+import os
 import sys
+import threading
 import time
 from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
 
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 import structlog
 import transaction
 from dcicutils.env_utils import is_stg_or_prd_env
@@ -45,6 +51,21 @@ DEFAULT_SCAN_BATCH_SIZE = 2000
 PROGRESS_PAGE_INTERVAL = 500
 PROGRESS_TIME_INTERVAL_SECONDS = 20.0
 
+# Parallel cleanup (see `delete_revision_history(workers=...)`): the target
+# rids of each item type are split into up to `workers` contiguous rid ranges,
+# and each (item type, rid range) partition is cleaned up by a worker on its
+# own connection, committing each batch. Serial (in-session) cleanup remains
+# the default.
+DEFAULT_WORKERS = 1
+
+# Parallel inventory (see `collect_revision_inventory_in_parallel`): each scan
+# is split into this many key ranges per worker (more ranges than workers, so
+# unevenly filled ranges still keep every worker busy), and each range's scan
+# state is checkpointed every CHECKPOINT_PAGE_INTERVAL pages and on completion.
+INVENTORY_PARTITIONS_PER_WORKER = 4
+CHECKPOINT_PAGE_INTERVAL = 50
+INVENTORY_CHECKPOINT_VERSION = 1
+
 _RESOURCE_BATCH_FIRST = text(
     """
     SELECT rid, item_type
@@ -85,6 +106,95 @@ _REVISION_BATCH_AFTER = text(
      LIMIT :batch_size
     """
 )
+_RESOURCE_RANGE_FIRST = text(
+    """
+    SELECT rid, item_type
+      FROM resources
+     WHERE rid >= :first AND rid <= :last
+     ORDER BY rid
+     LIMIT :batch_size
+    """
+)
+_RESOURCE_RANGE_AFTER = text(
+    """
+    SELECT rid, item_type
+      FROM resources
+     WHERE rid > :after AND rid <= :last
+     ORDER BY rid
+     LIMIT :batch_size
+    """
+)
+_REVISION_RANGE_FIRST = text(
+    """
+    SELECT p.sid, r.item_type, c.sid
+      FROM propsheets AS p
+      JOIN resources AS r ON r.rid = p.rid
+      LEFT JOIN current_propsheets AS c
+        ON c.rid = p.rid AND c.name = p.name AND c.sid = p.sid
+     WHERE p.sid >= :first AND p.sid <= :last
+     ORDER BY p.sid
+     LIMIT :batch_size
+    """
+)
+_REVISION_RANGE_AFTER = text(
+    """
+    SELECT p.sid, r.item_type, c.sid
+      FROM propsheets AS p
+      JOIN resources AS r ON r.rid = p.rid
+      LEFT JOIN current_propsheets AS c
+        ON c.rid = p.rid AND c.name = p.name AND c.sid = p.sid
+     WHERE p.sid > :after AND p.sid <= :last
+     ORDER BY p.sid
+     LIMIT :batch_size
+    """
+)
+
+# Per-partition snapshot of the current sids, so candidate selection is an
+# anti-join against a small, analyzed temp table (which Postgres can hash)
+# rather than a correlated NOT EXISTS lookup per propsheet row. Temp tables
+# are per connection, so each worker has its own.
+_CREATE_CURRENT_SIDS = text(
+    """
+    CREATE TEMPORARY TABLE revision_cleanup_current_sids AS
+    SELECT c.sid
+      FROM current_propsheets AS c
+      JOIN resources AS r ON r.rid = c.rid
+     WHERE r.item_type = :item_type
+       AND c.rid BETWEEN :first_rid AND :last_rid
+    """
+)
+_ANALYZE_CURRENT_SIDS = text("ANALYZE revision_cleanup_current_sids")
+_DROP_CURRENT_SIDS = text("DROP TABLE IF EXISTS revision_cleanup_current_sids")
+_MAX_SID = text("SELECT max(sid) FROM propsheets")
+_PARTITION_OLD_SIDS = text(
+    """
+    SELECT p.sid
+      FROM propsheets AS p
+      JOIN resources AS r ON r.rid = p.rid
+      LEFT JOIN revision_cleanup_current_sids AS c ON c.sid = p.sid
+     WHERE r.item_type = :item_type
+       AND p.rid BETWEEN :first_rid AND :last_rid
+       AND p.sid > :after_sid
+       AND p.sid <= :max_sid
+       AND c.sid IS NULL
+     ORDER BY p.sid
+     LIMIT :batch_size
+    """
+)
+# The snapshot can be stale by the time a page is deleted (e.g. a concurrent
+# edit of an item), so current-row protection is rechecked against the live
+# current_propsheets, the same as for `_delete_revision_sids`.
+_DELETE_PARTITION_SIDS = text(
+    """
+    DELETE FROM propsheets AS p
+     WHERE p.sid IN :sids
+       AND NOT EXISTS (
+           SELECT 1
+             FROM current_propsheets AS c
+            WHERE c.rid = p.rid AND c.name = p.name AND c.sid = p.sid
+       )
+    """
+).bindparams(bindparam("sids", expanding=True))
 
 
 def _emit_operator_line(line: str) -> None:
@@ -137,6 +247,44 @@ def _validate_batch_size(batch_size: int) -> int:
     return batch_size
 
 
+def _positive_workers(value: str) -> int:
+    try:
+        workers = int(value)
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError("workers must be a positive integer")
+    if workers < 1:
+        raise argparse.ArgumentTypeError("workers must be a positive integer")
+    return workers
+
+
+def _positive_rate(value: str) -> float:
+    try:
+        rate = float(value)
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError("rate must be a positive number")
+    if not rate > 0:
+        raise argparse.ArgumentTypeError("rate must be a positive number")
+    return rate
+
+
+def _validate_workers(workers: int) -> int:
+    if isinstance(workers, bool) or not isinstance(workers, int) or workers < 1:
+        raise ValueError("workers must be a positive integer")
+    return workers
+
+
+def _validate_rate(rows_per_second: Optional[float]) -> Optional[float]:
+    if rows_per_second is None:
+        return None
+    if (
+        isinstance(rows_per_second, bool)
+        or not isinstance(rows_per_second, (int, float))
+        or not rows_per_second > 0
+    ):
+        raise ValueError("rate must be a positive number")
+    return rows_per_second
+
+
 def _empty_inventory_row() -> Dict[str, int]:
     return {
         "resource_count": 0,
@@ -161,7 +309,8 @@ class _ScanProgress:
     elapsed-time interval is exceeded - never once per page. The completion
     event always fires, including for a scan that never sees a row, and its
     cumulative counters cover any final partial interval that a periodic
-    event never separately reported.
+    event never separately reported. Pages may be recorded concurrently by
+    the workers of a parallel scan, which then share one instance.
     """
 
     def __init__(
@@ -182,6 +331,7 @@ class _ScanProgress:
         self.start_time = clock()
         self.last_log_time = self.start_time
         self.last_log_page = 0
+        self._lock = threading.Lock()
 
     def _elapsed(self, now: float) -> float:
         return round(now - self.start_time, 3)
@@ -194,27 +344,28 @@ class _ScanProgress:
         )
 
     def record_page(self, row_count: int) -> None:
-        self.pages += 1
-        self.rows += row_count
-        now = self.clock()
-        first_page = self.pages == 1
-        pages_since_log = self.pages - self.last_log_page
-        time_since_log = now - self.last_log_time
-        if (
-            first_page
-            or pages_since_log >= self.page_interval
-            or time_since_log >= self.time_interval
-        ):
-            _operator_event(
-                "revision_inventory_scan_progress",
-                scan=self.scan,
-                pages=self.pages,
-                rows=self.rows,
-                scan_batch_size=self.scan_batch_size,
-                elapsed_seconds=self._elapsed(now),
-            )
-            self.last_log_time = now
-            self.last_log_page = self.pages
+        with self._lock:
+            self.pages += 1
+            self.rows += row_count
+            now = self.clock()
+            first_page = self.pages == 1
+            pages_since_log = self.pages - self.last_log_page
+            time_since_log = now - self.last_log_time
+            if (
+                first_page
+                or pages_since_log >= self.page_interval
+                or time_since_log >= self.time_interval
+            ):
+                _operator_event(
+                    "revision_inventory_scan_progress",
+                    scan=self.scan,
+                    pages=self.pages,
+                    rows=self.rows,
+                    scan_batch_size=self.scan_batch_size,
+                    elapsed_seconds=self._elapsed(now),
+                )
+                self.last_log_time = now
+                self.last_log_page = self.pages
 
     def complete(self) -> None:
         now = self.clock()
@@ -246,7 +397,6 @@ def collect_revision_inventory(
     """
     scan_batch_size = _validate_batch_size(scan_batch_size)
     by_item_type: Dict[str, Dict[str, int]] = {}
-    totals = _empty_inventory_row()
 
     resource_progress = _ScanProgress(
         "resource_inventory",
@@ -270,12 +420,7 @@ def collect_revision_inventory(
             break
         resource_progress.record_page(len(resource_rows))
 
-        resource_counts = Counter(item_type for _rid, item_type in resource_rows)
-        for item_type, resource_count in resource_counts.items():
-            row = by_item_type.setdefault(item_type, _empty_inventory_row())
-            row["resource_count"] += resource_count
-
-        totals["resource_count"] += len(resource_rows)
+        _add_resource_rows(by_item_type, resource_rows)
         after_rid = resource_rows[-1][0]
     resource_progress.complete()
 
@@ -301,24 +446,248 @@ def collect_revision_inventory(
             break
         revision_progress.record_page(len(revision_rows))
 
-        for sid, item_type, current_sid in revision_rows:
-            row = by_item_type.setdefault(item_type, _empty_inventory_row())
-            row["total_revision_count"] += 1
-            if current_sid is None:
-                row["excess_historical_revisions"] += 1
-            totals["total_revision_count"] += 1
-            if current_sid is None:
-                totals["excess_historical_revisions"] += 1
-
+        _add_revision_rows(by_item_type, revision_rows)
         after_sid = revision_rows[-1][0]
     revision_progress.complete()
 
+    return _inventory_report(by_item_type)
+
+
+def _add_resource_rows(by_item_type: Dict[str, Dict[str, int]], resource_rows) -> None:
+    resource_counts = Counter(item_type for _rid, item_type in resource_rows)
+    for item_type, resource_count in resource_counts.items():
+        row = by_item_type.setdefault(item_type, _empty_inventory_row())
+        row["resource_count"] += resource_count
+
+
+def _add_revision_rows(by_item_type: Dict[str, Dict[str, int]], revision_rows) -> None:
+    for _sid, item_type, current_sid in revision_rows:
+        row = by_item_type.setdefault(item_type, _empty_inventory_row())
+        row["total_revision_count"] += 1
+        if current_sid is None:
+            row["excess_historical_revisions"] += 1
+
+
+def _inventory_report(by_item_type: Dict[str, Dict[str, int]]) -> Dict[str, Dict]:
+    totals = _empty_inventory_row()
+    for row in by_item_type.values():
+        for field, count in row.items():
+            totals[field] += count
     return {
         "by_item_type": dict(sorted(by_item_type.items())),
         "totals": totals,
     }
 
 
+_RANGE_SCANS = {
+    "resource_inventory": (_RESOURCE_RANGE_FIRST, _RESOURCE_RANGE_AFTER, _add_resource_rows),
+    "revision_inventory": (_REVISION_RANGE_FIRST, _REVISION_RANGE_AFTER, _add_revision_rows),
+}
+
+
+def _uuid_ranges(partition_count: int) -> List[Tuple[str, str]]:
+    """Split the whole rid (UUID) key space into contiguous, inclusive ranges."""
+    step = 2**128 // partition_count
+    return [
+        (
+            str(UUID(int=index * step)),
+            str(UUID(int=2**128 - 1 if index == partition_count - 1 else (index + 1) * step - 1)),
+        )
+        for index in range(partition_count)
+    ]
+
+
+def _sid_ranges(max_sid: Optional[int], partition_count: int) -> List[Tuple[int, int]]:
+    """Split sids up to ``max_sid`` into contiguous, inclusive ranges."""
+    if max_sid is None:
+        return []
+    step = -(-(max_sid + 1) // partition_count)
+    return [(first, min(first + step - 1, max_sid)) for first in range(0, max_sid + 1, step)]
+
+
+class _InventoryCheckpoint:
+    """Scan state of every inventory partition, persisted to a local JSON file.
+
+    Each partition entry holds its key range, the last key scanned (``after``),
+    whether it is done, and its own per-item-type counts, always saved
+    together, so a resumed scan continues each partition after its last saved
+    page without counting any row twice. Saves are atomic (write, then
+    rename). Without a path the state is only kept in memory.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        save_page_interval: int = CHECKPOINT_PAGE_INTERVAL,
+    ) -> None:
+        self.path = path
+        self.save_page_interval = save_page_interval
+        self._lock = threading.Lock()
+        self._pages_since_save = 0
+        self.state = self._load()
+
+    def _load(self) -> Dict:
+        if self.path and os.path.exists(self.path):
+            with open(self.path) as checkpoint_file:
+                state = json.load(checkpoint_file)
+            if state.get("version") == INVENTORY_CHECKPOINT_VERSION:
+                partitions = state["partitions"].values()
+                _operator_event(
+                    "revision_inventory_checkpoint_resumed",
+                    path=self.path,
+                    partitions=len(partitions),
+                    completed_partitions=sum(entry["done"] for entry in partitions),
+                )
+                return state
+            logger.warning("Ignoring revision inventory checkpoint of another version: %s", self.path)
+        return {"version": INVENTORY_CHECKPOINT_VERSION, "partitions": {}}
+
+    def partitions(self, scan: str) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                key: copy.deepcopy(entry)
+                for key, entry in self.state["partitions"].items()
+                if key.split(":")[0] == scan
+            }
+
+    def add_partitions(self, scan: str, ranges: Sequence[Tuple]) -> None:
+        with self._lock:
+            for index, (first, last) in enumerate(ranges):
+                self.state["partitions"][f"{scan}:{index}"] = {
+                    "first": first,
+                    "last": last,
+                    "after": None,
+                    "done": False,
+                    "by_item_type": {},
+                }
+            self._save()
+
+    def update(self, key: str, entry: Dict, force: bool = False) -> None:
+        with self._lock:
+            self.state["partitions"][key] = copy.deepcopy(entry)
+            self._pages_since_save += 1
+            if force or entry["done"] or self._pages_since_save >= self.save_page_interval:
+                self._save()
+
+    def remove(self) -> None:
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _save(self) -> None:
+        self._pages_since_save = 0
+        if not self.path:
+            return
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump(self.state, checkpoint_file)
+        os.replace(temporary_path, self.path)
+
+
+def _scan_inventory_partition(
+    engine,
+    scan: str,
+    key: str,
+    entry: Dict,
+    scan_batch_size: int,
+    checkpoint: _InventoryCheckpoint,
+    progress: _ScanProgress,
+) -> None:
+    """Keyset-page one partition of a scan, on its own connection."""
+    first_batch, after_batch, add_rows = _RANGE_SCANS[scan]
+    try:
+        with engine.connect() as connection:
+            while not entry["done"]:
+                if entry["after"] is None:
+                    parameters = {"first": entry["first"], "last": entry["last"]}
+                    batch = first_batch
+                else:
+                    parameters = {"after": entry["after"], "last": entry["last"]}
+                    batch = after_batch
+                parameters["batch_size"] = scan_batch_size
+                rows = connection.execute(batch, parameters).fetchall()
+                if not rows:
+                    entry["done"] = True
+                else:
+                    progress.record_page(len(rows))
+                    add_rows(entry["by_item_type"], rows)
+                    last_key = rows[-1][0]
+                    entry["after"] = last_key if isinstance(last_key, int) else str(last_key)
+                checkpoint.update(key, entry)
+    finally:
+        checkpoint.update(key, entry, force=True)
+
+
+def collect_revision_inventory_in_parallel(
+    engine,
+    scan_batch_size: int = DEFAULT_SCAN_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    checkpoint_path: Optional[str] = None,
+    progress_page_interval: int = PROGRESS_PAGE_INTERVAL,
+    progress_time_interval: float = PROGRESS_TIME_INTERVAL_SECONDS,
+    clock: Callable[[], float] = time.monotonic,
+) -> Dict[str, Dict]:
+    """Collect the same inventory as `collect_revision_inventory`, in parallel.
+
+    Each scan (resources by rid, then propsheets by sid up to the maximum sid
+    when the scan first starts) is split into key ranges, which ``workers``
+    threads keyset-page concurrently, each on its own connection, reporting
+    to one shared `_ScanProgress` per scan. With a ``checkpoint_path``, the
+    state of every range is saved there as it goes, so a rerun after a crash
+    resumes where each range left off (progress events then count only the
+    rows scanned by the rerun); the file is removed once the inventory is
+    complete.
+    """
+    scan_batch_size = _validate_batch_size(scan_batch_size)
+    workers = _validate_workers(workers)
+    partition_count = workers * INVENTORY_PARTITIONS_PER_WORKER
+    checkpoint = _InventoryCheckpoint(checkpoint_path)
+
+    for scan in _RANGE_SCANS:
+        if not checkpoint.partitions(scan):
+            if scan == "resource_inventory":
+                ranges = _uuid_ranges(partition_count)
+            else:
+                with engine.connect() as connection:
+                    ranges = _sid_ranges(connection.execute(_MAX_SID).scalar(), partition_count)
+            checkpoint.add_partitions(scan, ranges)
+        progress = _ScanProgress(
+            scan,
+            scan_batch_size,
+            page_interval=progress_page_interval,
+            time_interval=progress_time_interval,
+            clock=clock,
+        )
+        progress.start()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _scan_inventory_partition,
+                    engine,
+                    scan,
+                    key,
+                    entry,
+                    scan_batch_size,
+                    checkpoint,
+                    progress,
+                )
+                for key, entry in checkpoint.partitions(scan).items()
+                if not entry["done"]
+            ]
+            for future in as_completed(futures):
+                future.result()
+        progress.complete()
+
+    by_item_type: Dict[str, Dict[str, int]] = {}
+    for scan in _RANGE_SCANS:
+        for entry in checkpoint.partitions(scan).values():
+            for item_type, partition_row in entry["by_item_type"].items():
+                row = by_item_type.setdefault(item_type, _empty_inventory_row())
+                for field, count in partition_row.items():
+                    row[field] += count
+    checkpoint.remove()
+    return _inventory_report(by_item_type)
+
+
 def _format_inventory_line(
     phase: str, scope: str, row: Dict[str, int]
 ) -> str:
@@ -469,6 +838,7 @@ def _process_rid_chunk(
     commit_each_batch: bool,
     batch_number: int,
     processed_count: int,
+    limiter: Optional["_ThroughputLimiter"] = None,
 ) -> Tuple[int, int, int]:
     """Process one rid chunk until no old revision remains in it."""
     total = 0
@@ -514,6 +884,8 @@ def _process_rid_chunk(
             )
             if commit_each_batch:
                 transaction.commit()
+            if limiter is not None:
+                limiter.throttle(len(sids))
 
         if dry_run or pass_total == 0:
             break
@@ -528,8 +900,12 @@ def delete_old_revision_history_for_item_type(
     batch_size: int = DEFAULT_BATCH_SIZE,
     rids: Optional[Sequence] = None,
     commit_each_batch: bool = False,
+    limiter: Optional["_ThroughputLimiter"] = None,
 ) -> int:
-    """Delete or count all non-current propsheet rows for an item type in batches."""
+    """Delete or count all non-current propsheet rows for an item type in batches.
+
+    Paced by the given `_ThroughputLimiter`, if any, after each batch.
+    """
     batch_size = _validate_batch_size(batch_size)
     if rids is None:
         rids = _target_rids_by_type(session).get(item_type, [])
@@ -547,11 +923,186 @@ def delete_old_revision_history_for_item_type(
             commit_each_batch,
             batch_number,
             processed_count,
+            limiter=limiter,
         )
         total += chunk_total
     return total
 
 
+class _ThroughputLimiter:
+    """Pace the rows processed by all cleanup workers to a global rate.
+
+    Each batch reserves ``row_count / rows_per_second`` seconds of a single,
+    shared schedule; a worker whose reservation starts in the future sleeps
+    until then (outside the lock), so N workers together never exceed the
+    rate, however many there are. Without a rate this never sleeps.
+    """
+
+    def __init__(
+        self,
+        rows_per_second: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rows_per_second = rows_per_second
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._next_time = None
+
+    def throttle(self, row_count: int) -> float:
+        if not self.rows_per_second or row_count <= 0:
+            return 0.0
+        with self._lock:
+            now = self.clock()
+            start = now if self._next_time is None else max(self._next_time, now)
+            self._next_time = start + row_count / self.rows_per_second
+        delay = start - now
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+
+def _rid_partitions(
+    rids_by_type: Dict[str, List], partitions_per_type: int
+) -> List[Tuple[str, object, object]]:
+    """Split each type's (rid-ordered) target rids into contiguous rid ranges.
+
+    Returns (item_type, first_rid, last_rid) tuples, at most
+    ``partitions_per_type`` per item type, and none for a type without rids.
+    """
+    partitions = []
+    for item_type, rids in rids_by_type.items():
+        if not rids:
+            continue
+        partition_size = -(-len(rids) // partitions_per_type)
+        for rid_range in _chunks(rids, partition_size):
+            partitions.append((item_type, rid_range[0], rid_range[-1]))
+    return partitions
+
+
+def _process_rid_partition(
+    engine,
+    partition: Tuple[str, object, object],
+    batch_size: int,
+    dry_run: bool,
+    limiter: _ThroughputLimiter,
+) -> int:
+    """Delete (or count) the old revisions of one partition on its own connection.
+
+    The current sids of the partition and the maximum sid are snapshotted
+    first; candidates are then keyset-paged by sid up to that maximum (rows
+    written since are never candidates), and each page is deleted, with the
+    live current-row recheck, and committed in its own transaction.
+    """
+    item_type, first_rid, last_rid = partition
+    range_parameters = {
+        "item_type": item_type,
+        "first_rid": first_rid,
+        "last_rid": last_rid,
+    }
+    total = 0
+    batch_number = 0
+    with engine.connect() as connection:
+        try:
+            with connection.begin():
+                max_sid = connection.execute(_MAX_SID).scalar()
+                connection.execute(_CREATE_CURRENT_SIDS, range_parameters)
+                connection.execute(_ANALYZE_CURRENT_SIDS)
+            after_sid = 0
+            while max_sid is not None:
+                with connection.begin():
+                    sids = [
+                        sid
+                        for (sid,) in connection.execute(
+                            _PARTITION_OLD_SIDS,
+                            dict(
+                                range_parameters,
+                                after_sid=after_sid,
+                                max_sid=max_sid,
+                                batch_size=batch_size,
+                            ),
+                        ).fetchall()
+                    ]
+                    if not sids:
+                        break
+                    if dry_run:
+                        affected_count = len(sids)
+                    else:
+                        affected_count = connection.execute(
+                            _DELETE_PARTITION_SIDS, {"sids": sids}
+                        ).rowcount
+                batch_number += 1
+                after_sid = sids[-1]
+                total += affected_count
+                _operator_event(
+                    "delete_revision_history_batch",
+                    item_type=item_type,
+                    dry_run=dry_run,
+                    batch=batch_number,
+                    partition=f"{first_rid}..{last_rid}",
+                    selected_count=len(sids),
+                    affected_count=affected_count,
+                    processed_count=total,
+                    batch_size=batch_size,
+                )
+                limiter.throttle(len(sids))
+        finally:
+            with connection.begin():
+                connection.execute(_DROP_CURRENT_SIDS)
+    return total
+
+
+def delete_old_revision_history_in_parallel(
+    engine,
+    rids_by_type: Dict[str, List],
+    dry_run: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    max_rows_per_second: Optional[float] = None,
+    clock: Callable[[], float] = time.monotonic,
+) -> Dict[str, int]:
+    """Delete or count old revisions of all target types with parallel workers.
+
+    Each (item type, rid range) partition (see `_rid_partitions`) runs on a
+    worker with its own connection and per-batch transactions; all workers
+    share one `_ThroughputLimiter`. If any partition fails, no further
+    partitions are started and the error is raised once the running ones
+    finish; batches already committed stay deleted, as for serial cleanup.
+    """
+    batch_size = _validate_batch_size(batch_size)
+    workers = _validate_workers(workers)
+    limiter = _ThroughputLimiter(_validate_rate(max_rows_per_second), clock=clock)
+    partitions = _rid_partitions(rids_by_type, workers)
+    deleted_by_type = {item_type: 0 for item_type in rids_by_type}
+    cleanup_start = clock()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                _process_rid_partition, engine, partition, batch_size, dry_run, limiter
+            ): partition
+            for partition in partitions
+        }
+        for future in as_completed(futures):
+            item_type, first_rid, last_rid = futures[future]
+            try:
+                affected_count = future.result()
+            except Exception:
+                for pending in futures:
+                    pending.cancel()
+                raise
+            deleted_by_type[item_type] += affected_count
+            _operator_event(
+                "delete_revision_history_cleanup_partition_complete",
+                item_type=item_type,
+                dry_run=dry_run,
+                partition=f"{first_rid}..{last_rid}",
+                affected_count=affected_count,
+                elapsed_seconds=round(clock() - cleanup_start, 3),
+            )
+    return deleted_by_type
+
+
 def _get_app(app):
     if not hasattr(app, "registry"):
         app = app.app
@@ -572,10 +1123,25 @@ def _get_app_and_session(app):
 
 
 def report_revision_inventory(
-    app, scan_batch_size: int = DEFAULT_SCAN_BATCH_SIZE
+    app,
+    scan_batch_size: int = DEFAULT_SCAN_BATCH_SIZE,
+    scan_workers: int = DEFAULT_WORKERS,
+    checkpoint_path: Optional[str] = None,
 ) -> Dict[str, Dict]:
-    """Collect the deployment-wide inventory using the application's DB session."""
+    """Collect the deployment-wide inventory using the application's DB session.
+
+    With more than one scan worker or a checkpoint path, the inventory is
+    collected by `collect_revision_inventory_in_parallel` on connections from
+    the session's engine instead.
+    """
     _app, session = _get_app_and_session(app)
+    if scan_workers > 1 or checkpoint_path:
+        return collect_revision_inventory_in_parallel(
+            session.get_bind(),
+            scan_batch_size=scan_batch_size,
+            workers=scan_workers,
+            checkpoint_path=checkpoint_path,
+        )
     return collect_revision_inventory(session, scan_batch_size=scan_batch_size)
 
 
@@ -585,14 +1151,24 @@ def delete_revision_history(
     dry_run: bool = False,
     batch_size: int = DEFAULT_BATCH_SIZE,
     clock: Callable[[], float] = time.monotonic,
+    workers: int = DEFAULT_WORKERS,
+    max_rows_per_second: Optional[float] = None,
 ) -> Optional[Dict[str, int]]:
     """
     Remove already-stored Postgres revision history for Workflow and MetaWorkflowRun.
 
     Current propsheet rows are preserved. Only old PropertySheet rows not pointed
     at by CurrentPropertySheet for the same (rid, name) are deleted.
+
+    With more than one worker, cleanup runs in parallel per item type and rid
+    range, each worker on its own connection from the session's engine (see
+    `delete_old_revision_history_in_parallel`); otherwise serially in the
+    session. Either way it is paced to at most ``max_rows_per_second`` rows
+    (across all workers) if given.
     """
     batch_size = _validate_batch_size(batch_size)
+    workers = _validate_workers(workers)
+    max_rows_per_second = _validate_rate(max_rows_per_second)
     app = _get_app(app)
 
     if "env.name" in app.registry.settings:
@@ -629,15 +1205,30 @@ def delete_revision_history(
             dry_run=dry_run,
         )
         cleanup_start = clock()
-        for item_type in ITEM_TYPES_TO_PURGE:
-            deleted_by_type[item_type] = delete_old_revision_history_for_item_type(
-                session,
-                item_type,
+        if workers > 1:
+            # Workers use their own connections; end the session's read first.
+            transaction.commit()
+            deleted_by_type = delete_old_revision_history_in_parallel(
+                session.get_bind(),
+                rids_by_type,
                 dry_run=dry_run,
                 batch_size=batch_size,
-                rids=rids_by_type[item_type],
-                commit_each_batch=True,
+                workers=workers,
+                max_rows_per_second=max_rows_per_second,
+                clock=clock,
             )
+        limiter = _ThroughputLimiter(max_rows_per_second, clock=clock)
+        for item_type in ITEM_TYPES_TO_PURGE:
+            if workers == 1:
+                deleted_by_type[item_type] = delete_old_revision_history_for_item_type(
+                    session,
+                    item_type,
+                    dry_run=dry_run,
+                    batch_size=batch_size,
+                    rids=rids_by_type[item_type],
+                    commit_each_batch=True,
+                    limiter=limiter,
+                )
             _operator_event(
                 "delete_revision_history_cleanup_type_complete",
                 item_type=item_type,
@@ -696,6 +1287,43 @@ def main() -> None:
         type=_positive_batch_size,
         default=DEFAULT_SCAN_BATCH_SIZE,
     )
+    parser.add_argument(
+        "--scan-workers",
+        help=(
+            "Number of parallel inventory scan workers, each with its own "
+            "database connection, over rid/sid ranges (default: %(default)s)"
+        ),
+        type=_positive_workers,
+        default=DEFAULT_WORKERS,
+    )
+    parser.add_argument(
+        "--scan-checkpoint",
+        help=(
+            "Local file in which to checkpoint the inventory scans, so that a "
+            "rerun after a failure resumes them; removed once they complete"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--workers",
+        help=(
+            "Number of parallel cleanup workers, each with its own database "
+            "connection, over item type/rid range partitions; 1 cleans up "
+            "serially in the application's session (default: %(default)s)"
+        ),
+        type=_positive_workers,
+        default=DEFAULT_WORKERS,
+    )
+    parser.add_argument(
+        "--max-rows-per-second",
+        help=(
+            "Maximum number of old revision rows processed per second, across "
+            "all parallel workers if more than one, to limit load on a live "
+            "database (default: unlimited)"
+        ),
+        type=_positive_rate,
+        default=None,
+    )
     args = parser.parse_args()
 
     # Validate both explicitly before any database work. argparse's own
@@ -717,13 +1345,20 @@ def main() -> None:
         dry_run=args.dry_run,
         prod=args.prod,
     )
-    inventory = report_revision_inventory(app, scan_batch_size=args.scan_batch_size)
+    inventory = report_revision_inventory(
+        app,
+        scan_batch_size=args.scan_batch_size,
+        scan_workers=args.scan_workers,
+        checkpoint_path=args.scan_checkpoint,
+    )
     log_revision_inventory(inventory)
     deleted_by_type = delete_revision_history(
         app,
         prod=args.prod,
         dry_run=args.dry_run,
         batch_size=args.batch_size,
+        workers=args.workers,
+        max_rows_per_second=args.max_rows_per_second,
     )
     if deleted_by_type is not None:
         log_post_cleanup_revision_inventory(
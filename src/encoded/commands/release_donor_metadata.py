@@ -70,7 +70,7 @@ from typing import Dict, List, Any
 
 from dcicutils import ff_utils  # noqa
 
-from encoded.commands.utils import get_auth_key
+from encoded.commands.utils import bulk_patch_metadata, get_auth_key
 from encoded.item_utils import (
     donor as donor_utils,
     item as item_utils,
@@ -351,8 +351,7 @@ class DonorRelease:
             print("Validating all patch dictionaries...")
         self.donor = self.get_metadata(item_utils.get_uuid(self.donor))
         try:
-            for patch_dict in self.patch_dicts:
-                self.validate_patch(patch_dict)
+            self.validate_patches(self.patch_dicts)
         except Exception as e:
             print(str(e))
             self.print_error_and_exit(f"Validation failed for donor {self.donor_accession}.")
@@ -360,8 +359,7 @@ class DonorRelease:
         if self.verbose:
             print("Validation done. Patching...")
         try:
-            for patch_dict in self.patch_dicts:
-                self.patch_metadata(patch_dict)
+            self.patch_metadata_bulk(self.patch_dicts)
         except Exception as e:
             print(str(e))
             self.print_error_and_exit(f"Patching failed for donor {self.donor_accession}.")
@@ -369,15 +367,11 @@ class DonorRelease:
         to_print = f"Release of Donor {self.donor_accession} completed."
         print(ok_green_text(to_print))
 
-    def validate_patch(self, patch_body: Dict[str, Any]) -> None:
-        uuid = item_utils.get_uuid(patch_body)
-        ff_utils.patch_metadata(
-            patch_body, obj_id=uuid, add_on="?check_only=true", key=self.key
-        )
+    def validate_patches(self, patch_bodies: List[Dict[str, Any]]) -> None:
+        bulk_patch_metadata(patch_bodies, self.key, check_only=True)
 
-    def patch_metadata(self, patch_body: Dict[str, Any]) -> None:
-        uuid = item_utils.get_uuid(patch_body)
-        ff_utils.patch_metadata(patch_body, obj_id=uuid, key=self.key)
+    def patch_metadata_bulk(self, patch_bodies: List[Dict[str, Any]]) -> None:
+        bulk_patch_metadata(patch_bodies, self.key)
 
     def get_patch_body(self, patch_dict: Dict[str, Any]) -> Dict[str, Any]:
         return {
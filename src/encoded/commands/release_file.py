@@ -1,15 +1,17 @@
 import argparse
 import pprint
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import cached_property, partial
-from typing import Callable, Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional, Union
 
 from dcicutils import ff_utils  # noqa
 from dcicutils.creds_utils import SMaHTKeyManager  # noqa
 
 from encoded.commands import create_annotated_filenames as caf
-from encoded.commands.utils import get_auth_key
+from encoded.commands.utils import bulk_patch_metadata, get_auth_key
 from encoded.item_utils import (
     analyte as analyte_utils,
     cell_culture_mixture as cell_culture_mixture_utils,
@@ -99,13 +101,92 @@ EXTERNAL_OUTPUT_FILE_RELEASE = "ExternalOutputFileRelease"
 ANALYSIS_RUN_FILE_RELEASE = "AnalysisRunFileRelease"
 FILESET_FILE_RELEASE = "FilesetFileRelease"
 
+# Batch release
+DEFAULT_CONCURRENCY = 8
+BULK_PATCH_CHUNK_SIZE = 500
+
+
+class ReleaseItemCache:
+    """Items (by frame) and search results fetched for file releases.
+
+    Shared by all FileReleases of a batch release (see FileReleaseBatch) so
+    that upstream items common to the files (libraries, assays, sample
+    sources, donors, etc.) are fetched once; items not yet cached are
+    fetched with up to `concurrency` concurrent requests. Cached items must
+    not be modified.
+    """
+
+    def __init__(self, concurrency: int = 1) -> None:
+        self.concurrency = max(concurrency, 1)
+        self._lock = threading.Lock()
+        self._items = {}  # (frame, identifier/uuid/@id) -> item
+        self._searches = {}  # query -> items
+        self.fetches = 0
+        self.hits = 0
+
+    def get_items(
+        self,
+        identifiers: List[Union[str, Dict[str, Any]]],
+        fetch: Callable[[str], Dict[str, Any]],
+        frame: str = "object",
+    ) -> List[Dict[str, Any]]:
+        """Get items (without duplicates or empty items), fetching those not cached."""
+        identifiers = [
+            item_utils.get_uuid(identifier) if isinstance(identifier, dict) else identifier
+            for identifier in identifiers
+        ]
+        identifiers = [identifier for identifier in identifiers if identifier]
+        with self._lock:
+            to_fetch = list(dict.fromkeys(
+                identifier for identifier in identifiers if (frame, identifier) not in self._items
+            ))
+            self.hits += len(identifiers) - len(to_fetch)
+        if to_fetch:
+            if self.concurrency > 1 and len(to_fetch) > 1:
+                with ThreadPoolExecutor(max_workers=min(self.concurrency, len(to_fetch))) as executor:
+                    fetched = list(executor.map(fetch, to_fetch))
+            else:
+                fetched = [fetch(identifier) for identifier in to_fetch]
+            with self._lock:
+                self.fetches += len(to_fetch)
+                for identifier, item in zip(to_fetch, fetched):
+                    for key in [identifier, item_utils.get_uuid(item or {}), (item or {}).get("@id")]:
+                        if key:
+                            self._items[(frame, key)] = item
+        with self._lock:
+            items = [self._items[(frame, identifier)] for identifier in identifiers]
+        seen = set()
+        return [
+            item for item in items
+            if item and not (item_utils.get_uuid(item) in seen or seen.add(item_utils.get_uuid(item)))
+        ]
+
+    def get_item(
+        self, identifier: str, fetch: Callable[[str], Dict[str, Any]], frame: str = "object"
+    ) -> Dict[str, Any]:
+        items = self.get_items([identifier], fetch, frame=frame)
+        return items[0] if items else {}
+
+    def search(self, query: str, fetch: Callable[[str], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            if query in self._searches:
+                self.hits += 1
+                return self._searches[query]
+        result = fetch(query)
+        with self._lock:
+            self.fetches += 1
+            self._searches[query] = result
+        return result
+
 
 class FileRelease:
 
     TISSUE = "tissue"
 
-    def __init__(self, auth_key: dict, file_identifier: str, mode: str = MODE_EARLY_ACCESS, verbose: bool = True):
+    def __init__(self, auth_key: dict, file_identifier: str, mode: str = MODE_EARLY_ACCESS, verbose: bool = True,
+                 item_cache: Optional[ReleaseItemCache] = None):
         self.key = auth_key
+        self.item_cache = item_cache or ReleaseItemCache()
         self.request_handler = self.get_request_handler()
         self.request_handler_embedded = self.get_request_handler_embedded()
         self.file = self.get_metadata_embedded(file_identifier)
@@ -302,7 +383,7 @@ class FileRelease:
         search_filter = "/search/?type=TissueSample&submission_centers.display_title=NDRI+TPC"
         for tissue in self.tissues:
             search_filter += f"&sample_sources.uuid={item_utils.get_uuid(tissue)}"
-        return ff_utils.search_metadata(search_filter, key=self.key)
+        return self.search_metadata(search_filter)
 
     # Items that are associated with the Protected Donor
     @cached_property
@@ -360,14 +441,21 @@ class FileRelease:
         return RequestHandler(auth_key=self.key, frame="embedded", datastore="database")
 
     def get_metadata(self, identifier: str) -> dict:
-        return self.request_handler.get_item(identifier)
+        return self.item_cache.get_item(identifier, self.request_handler.get_item)
 
     def get_metadata_embedded(self, identifier: str) -> dict:
-        return self.request_handler_embedded.get_item(identifier)
+        return self.item_cache.get_item(
+            identifier, self.request_handler_embedded.get_item, frame="embedded"
+        )
 
     def get_items(self, identifiers: List[str]) -> List[dict]:
         """Get metadata for a list of identifiers."""
-        return self.request_handler.get_items(identifiers)
+        return self.item_cache.get_items(identifiers, self.request_handler.get_item)
+
+    def search_metadata(self, search_filter: str) -> List[dict]:
+        return self.item_cache.search(
+            search_filter, partial(ff_utils.search_metadata, key=self.key)
+        )
 
     def get_links(self, items: List[Dict[str, Any]], getter: Callable) -> List[str]:
         """Get links from a list of items using a getter function.
@@ -395,7 +483,7 @@ class FileRelease:
             f"/search/?type=MetaWorkflowRun&workflow_runs.output.file.uuid="
             f"{item_utils.get_uuid(self.file)}"
         )
-        mwfrs = ff_utils.search_metadata(search_filter, key=self.key)
+        mwfrs = self.search_metadata(search_filter)
         if len(mwfrs) != 1:    
             self.print_error_and_exit(
                 (
@@ -420,7 +508,7 @@ class FileRelease:
         )
         if additional_filter:
             search_filter += f"&{additional_filter}"
-        return ff_utils.search_metadata(search_filter, key=self.key)
+        return self.search_metadata(search_filter)
 
     def get_release_type(self) -> str:
         if "ExternalOutputFile" in self.file.get("@type", []):
@@ -444,7 +532,7 @@ class FileRelease:
         )
         if additional_filter:
             search_filter += f"&{additional_filter}"
-        return ff_utils.search_metadata(search_filter, key=self.key)
+        return self.search_metadata(search_filter)
 
     def get_file_sets_from_file(self) -> List[dict]:
         if self.release_type == ANALYSIS_RUN_FILE_RELEASE:
@@ -636,11 +724,10 @@ class FileRelease:
     def execute(self) -> None:
         if self.verbose:
             print("Validating all patch dictionaries...")
-        self.file = self.get_metadata(item_utils.get_uuid(self.file))
+        self.refresh_file()
         self.validate_file_after_patch()
         try:
-            for patch_dict in self.patch_dicts[1:]:
-                self.validate_patch(patch_dict)
+            self.validate_patches(self.patch_dicts[1:])
         except Exception as e:
             print(str(e))
             self.print_error_and_exit(f"Validation failed for file {self.file_accession}.")
@@ -648,8 +735,7 @@ class FileRelease:
         if self.verbose:
             print("Validation done. Patching...")
         try:
-            for patch_dict in self.patch_dicts[1:]:
-                self.patch_metadata(patch_dict)
+            self.patch_metadata_bulk(self.patch_dicts[1:])
         except Exception as e:
             print(str(e))
             self.print_error_and_exit(f"Patching failed for file {self.file_accession}.")
@@ -657,6 +743,10 @@ class FileRelease:
         to_print = f"Release of File {self.file_accession} completed."
         print(ok_green_text(to_print))
 
+    def refresh_file(self) -> None:
+        """Get the file again (not from the cache), i.e. after the initial patch."""
+        self.file = self.request_handler.get_item(item_utils.get_uuid(self.file))
+
     def validate_patch(self, patch_body: Dict[str, Any]) -> None:
         uuid = item_utils.get_uuid(patch_body)
         ff_utils.patch_metadata(
@@ -667,6 +757,12 @@ class FileRelease:
         uuid = item_utils.get_uuid(patch_body)
         ff_utils.patch_metadata(patch_body, obj_id=uuid, key=self.key)
 
+    def validate_patches(self, patch_bodies: List[Dict[str, Any]]) -> None:
+        bulk_patch_metadata(patch_bodies, self.key, check_only=True)
+
+    def patch_metadata_bulk(self, patch_bodies: List[Dict[str, Any]]) -> None:
+        bulk_patch_metadata(patch_bodies, self.key)
+
     def get_patch_body(self, patch_dict: Dict[str, Any]) -> Dict[str, Any]:
         return {
             key: value
@@ -1359,9 +1455,7 @@ class FileRelease:
         return False
 
     def print_error_and_exit(self, msg: str) -> None:
-        error_message = f"ERROR: {msg} Exiting."
-        print(f"{fail_text(error_message)}")
-        exit()
+        print_error_and_exit(msg)
 
     def add_warning(self, msg: str) -> None:
         warning_message = "WARNING"
@@ -1383,6 +1477,155 @@ class FileRelease:
         return f"{okay_message} {add_on}" if add_on else okay_message
 
 
+class FileReleaseBatch:
+    """Release of multiple files, sharing upstream items and patches.
+
+    The FileReleases of all files share a ReleaseItemCache, so that items
+    common to the files are fetched once, and their patches (other than the
+    initial patch of each file; see FileRelease.execute_initial) are merged
+    into a single plan without duplicates, which is validated and then applied
+    in chunks (see /bulk_patch), in order; items are fetched with up to
+    `concurrency` concurrent requests.
+    """
+
+    def __init__(
+        self,
+        auth_key: dict,
+        file_identifiers: List[str],
+        mode: str = MODE_EARLY_ACCESS,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        self.key = auth_key
+        self.mode = mode
+        self.concurrency = concurrency
+        self.item_cache = ReleaseItemCache(concurrency=concurrency)
+        self.file_releases = [
+            FileRelease(
+                auth_key=auth_key,
+                file_identifier=file_identifier,
+                mode=mode,
+                verbose=False,
+                item_cache=self.item_cache,
+            )
+            for file_identifier in dict.fromkeys(file_identifiers)
+        ]
+        self.patch_dicts = []
+
+    def prepare(self, dataset: str) -> None:
+        for file_release in self.file_releases:
+            file_release.prepare(dataset=dataset)
+        self.patch_dicts = self.merge_patch_dicts(
+            [
+                patch_dict
+                for file_release in self.file_releases
+                for patch_dict in file_release.patch_dicts[1:]
+            ]
+        )
+        patch_count = sum(len(file_release.patch_dicts) for file_release in self.file_releases)
+        print(
+            f"\n{len(self.file_releases)} files: {len(self.file_releases)} initial patches and"
+            f" {len(self.patch_dicts)} release patches ({patch_count} before de-duplication);"
+            f" {self.item_cache.fetches} items fetched ({self.item_cache.hits} found in cache)."
+        )
+
+    def merge_patch_dicts(self, patch_dicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge patch dicts for the same item, keeping the order of first occurrence."""
+        merged = {}
+        for patch_dict in patch_dicts:
+            uuid = item_utils.get_uuid(patch_dict)
+            if uuid not in merged:
+                merged[uuid] = dict(patch_dict)
+                continue
+            for key, value in patch_dict.items():
+                if key in merged[uuid] and merged[uuid][key] != value:
+                    print_error_and_exit(
+                        f"Conflicting patches for item {uuid}: {key} is set to both"
+                        f" {merged[uuid][key]} and {value}."
+                    )
+                merged[uuid][key] = value
+        return list(merged.values())
+
+    def show_patch_dicts(self) -> None:
+        for file_release in self.file_releases:
+            print(f"\nInitial patch dict for file {warning_text(file_release.file_accession)}:")
+            pp.pprint(file_release.patch_dicts[:1])
+        print("\nRelease patch dicts (all files):")
+        pp.pprint(self.patch_dicts)
+
+    def execute_initial(self) -> None:
+        print("Validating initial file patch dictionaries...")
+        initial_patch_dicts = [file_release.patch_dicts[0] for file_release in self.file_releases]
+        try:
+            self.bulk_patch(initial_patch_dicts, check_only=True)
+        except Exception as e:
+            print(str(e))
+            print_error_and_exit("Validation failed for initial file patches.")
+        print("Validation done. Patching file metadata...")
+        try:
+            self.bulk_patch(initial_patch_dicts)
+        except Exception as e:
+            print(str(e))
+            print_error_and_exit("Patching failed for initial file patches.")
+        print(ok_green_text(f"Initial patching of {len(self.file_releases)} files completed."))
+
+    def execute(self) -> None:
+        print("Validating all patch dictionaries...")
+        for file_release in self.file_releases:
+            file_release.refresh_file()
+            file_release.validate_file_after_patch()
+        try:
+            self.bulk_patch(self.patch_dicts, check_only=True)
+        except Exception as e:
+            print(str(e))
+            print_error_and_exit("Validation failed for release patches.")
+        print("Validation done. Patching...")
+        try:
+            self.bulk_patch(self.patch_dicts)
+        except Exception as e:
+            print(str(e))
+            print_error_and_exit("Patching failed for release patches.")
+        print(ok_green_text(f"Release of {len(self.file_releases)} files completed."))
+
+    def bulk_patch(self, patch_dicts: List[Dict[str, Any]], check_only: bool = False) -> None:
+        """Validate or apply the given patches in chunks, one chunk at a time.
+
+        Patches within a chunk are applied all together or not at all, each
+        chunk in its own transaction; so chunks are applied in order, stopping
+        at the first that fails, which is raised with the outcome of each chunk.
+        """
+        chunks = [
+            patch_dicts[index:index + BULK_PATCH_CHUNK_SIZE]
+            for index in range(0, len(patch_dicts), BULK_PATCH_CHUNK_SIZE)
+        ]
+        for index, chunk in enumerate(chunks):
+            try:
+                bulk_patch_metadata(chunk, self.key, check_only=check_only)
+            except Exception as e:
+                outcomes = (
+                    ["validated" if check_only else "applied"] * index
+                    + ["failed"]
+                    + ["not attempted"] * (len(chunks) - index - 1)
+                )
+                raise Exception("\n".join([str(e)] + [
+                    f"Chunk {chunk_index + 1} of {len(chunks)} ({len(chunks[chunk_index])} patches): {outcome}"
+                    for chunk_index, outcome in enumerate(outcomes)
+                ])) from e
+
+
+def get_files_from_search(auth_key: dict, search_filter: str) -> List[str]:
+    """Get uuids of files found with the given search, e.g. /search/?type=OutputFile&..."""
+    return [
+        item_utils.get_uuid(file)
+        for file in ff_utils.search_metadata(search_filter, key=auth_key)
+    ]
+
+
+def print_error_and_exit(msg: str) -> None:
+    error_message = f"ERROR: {msg} Exiting."
+    print(f"{fail_text(error_message)}")
+    exit()
+
+
 class bcolors:
     HEADER = "\033[95m"
     OKBLUE = "\033[94m"
@@ -1418,7 +1661,12 @@ def fail_text(text: str) -> str:
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument(
-        "--file", "-f", action='append', help="Identifier of the file to release", required=True
+        "--file", "-f", action='append', help="Identifier of the file to release"
+    )
+    parser.add_argument(
+        "--search",
+        "-s",
+        help="Search for files to release, e.g. '/search/?type=OutputFile&...' (in addition to --file)",
     )
     parser.add_argument("--dataset", "-d", help="Associated dataset. When releasing multiple files, this will be used for all files", required=True)
     parser.add_argument(
@@ -1439,45 +1687,55 @@ def main() -> None:
         help="Dry run, show patches but do not execute",
         action="store_true",
     )
-    
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum concurrent requests when releasing multiple files (default: {DEFAULT_CONCURRENCY})",
+    )
 
     args = parser.parse_args()
 
-    if not args.file or len(args.file) < 1:
+    auth_key = get_auth_key(args.env)
+    server = auth_key.get("server")
+
+    files_to_release = list(args.file or [])
+    if args.search:
+        files_to_release += get_files_from_search(auth_key, args.search)
+
+    if len(files_to_release) < 1:
         error = fail_text("Please specify at least one file to release.")
         parser.error(error)
 
-    mode = 'single' if len(args.file) == 1 else 'bulk'
+    mode = 'single' if len(files_to_release) == 1 else 'bulk'
 
     if mode == 'bulk' and args.replace:
         error = fail_text("In 'bulk' mode, you cannot replace a file. Please release files individually.")
         parser.error(error)
 
-    auth_key = get_auth_key(args.env)
-    server = auth_key.get("server")
-
-    files_to_release = args.file
-    verbose = mode == 'single' # Print more information in single mode
     release_mode = args.release_mode
 
-    file_releases: List[FileRelease] = []
-    for file_identifier in files_to_release:
-        file_release = FileRelease(
+    if mode == 'single':
+        release = FileRelease(
             auth_key=auth_key,
-            file_identifier=file_identifier,
+            file_identifier=files_to_release[0],
             mode=release_mode,
-            verbose=verbose,
-        ) 
-        
-        file_release.prepare(
+            verbose=True,  # Print more information in single mode
+        )
+        release.prepare(
             dataset=args.dataset, obsolete_file_identifier=args.replace
         )
-        file_releases.append(file_release)
+    else:
+        release = FileReleaseBatch(
+            auth_key=auth_key,
+            file_identifiers=files_to_release,
+            mode=release_mode,
+            concurrency=args.concurrency,
+        )
+        release.prepare(dataset=args.dataset)
 
     if args.dry_run:
-        for file_release in file_releases: 
-            print(f"\nPatch dicts for file {warning_text(file_release.file_accession)}:\n")
-            file_release.show_patch_dicts()
+        release.show_patch_dicts()
         exit()
 
     while True:
@@ -1493,8 +1751,7 @@ def main() -> None:
         )
 
         if resp in ["y", "yes"]:
-            for file_release in file_releases: 
-                file_release.execute_initial()
+            release.execute_initial()
 
             resp = input(
                 f"\nDo you want to proceed with the release and execute all patches above? "
@@ -1507,22 +1764,17 @@ def main() -> None:
             )
 
             if resp in ["y", "yes"]:
-                for file_release in file_releases: 
-                    file_release.execute()
+                release.execute()
                 break
             elif resp in ["p"]:
-                for file_release in file_releases: 
-                    print(f"\nPatch dicts for file {warning_text(file_release.file_accession)}:")
-                    file_release.show_patch_dicts()
+                release.show_patch_dicts()
                 continue
             else:
                 print(f"{warning_text('Aborted by user.')}")
                 exit()
 
         elif resp in ["p"]:
-            for file_release in file_releases:
-                print(f"\nPatch dicts for file {warning_text(file_release.file_accession)}:")
-                file_release.show_patch_dicts()
+            release.show_patch_dicts()
             continue
         else:
             print(f"{warning_text('Aborted by user.')}")
@@ -1,4 +1,4 @@
-from typing import Dict, Set
+from typing import Any, Dict, List, Set
 
 from dcicutils import ff_utils  # noqa
 from dcicutils.creds_utils import SMaHTKeyManager
@@ -21,4 +21,24 @@ def search_list(items, key):
     query = f"search/?type=Item"
     for item in items:
         query += f"&uuid={item}"
-    return ff_utils.search_metadata(query, key=key)
\ No newline at end of file
+    return ff_utils.search_metadata(query, key=key)
+
+
+def bulk_patch_metadata(
+    patch_dicts: List[Dict[str, Any]], key: Dict[str, str], check_only: bool = False
+) -> Dict[str, Any]:
+    """Validate (check_only) or apply the given patches (each with a uuid) with a single request.
+
+    See the /bulk_patch endpoint; patches are applied all together or not at all.
+    Raises an exception with the errors of any failed patches.
+    """
+    patches = [{"uuid": patch_dict["uuid"], "patch": patch_dict} for patch_dict in patch_dicts]
+    add_on = "?check_only=true" if check_only else ""
+    response = ff_utils.post_metadata({"patches": patches}, "bulk_patch", key=key, add_on=add_on)
+    if response.get("status") != "success":
+        errors = [
+            f"{result.get('uuid')}: {result.get('errors')}"
+            for result in response.get("results", []) if result.get("status") == "error"
+        ]
+        raise Exception("Bulk patch failed:\n" + ("\n".join(errors) or str(response)))
+    return response
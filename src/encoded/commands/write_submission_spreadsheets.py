@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
@@ -55,6 +56,14 @@ If token expires, delete the token file and run the script again to generate
 a new token.
 """
 
+# Bulk mode (--bulk): all Google Sheets updates (clearing, tabs, values with
+# comments as notes, and column formats) are submitted together in as few
+# batchUpdate calls as possible, as Sheets applies the requests of a call in
+# order, and schemas and example items are fetched with as few (or concurrent)
+# requests as possible.
+MAX_BATCH_UPDATE_REQUESTS = 5000
+BULK_WORKERS = 8
+
 ITEM_SPREADSHEET_SUFFIX = "_submission.xlsx"
 WORKBOOK_FILENAME = "submission_workbook.xlsx"
 
@@ -182,9 +191,17 @@ def update_google_sheets(
     items: List[str] = None,
     eqm: Union[str, None] = None,
     example: bool = False,
+    bulk: bool = False,
 ) -> None:
     """Update Google Sheets with the latest submission schemas."""
-    spreadsheets = get_spreadsheets(request_handler, gcc=gcc, tpc=tpc, items=items, eqm=eqm, example=example)
+    spreadsheets = get_spreadsheets(
+        request_handler, gcc=gcc, tpc=tpc, items=items, eqm=eqm, example=example, bulk=bulk
+    )
+    if bulk:
+        log.info("Updating Google sheets in bulk.")
+        update_google_sheets_in_bulk(sheets_client, spreadsheets)
+        log.info("Google sheets updated.")
+        return
     log.info("Clearing existing Google sheets.")
     delete_existing_sheets(sheets_client)
     log.info("Updating Google sheets with tabs.")
@@ -196,6 +213,20 @@ def update_google_sheets(
     log.info("Google sheets updated.")
 
 
+def update_google_sheets_in_bulk(
+    sheets_client: SheetsClient, spreadsheets: List[Spreadsheet]
+) -> None:
+    """Clear, add, write and format all sheets in as few requests as possible."""
+    requests = (
+        get_delete_existing_sheets_requests(sheets_client)
+        + get_update_or_add_spreadsheets_requests(spreadsheets)
+        + get_write_values_requests(spreadsheets)
+        + get_format_column_widths_requests(spreadsheets)
+    )
+    for start in range(0, len(requests), MAX_BATCH_UPDATE_REQUESTS):
+        sheets_client.submit_requests(requests[start:start + MAX_BATCH_UPDATE_REQUESTS])
+
+
 def get_spreadsheets(
         request_handler: RequestHandler,
         gcc: bool = False,
@@ -203,6 +234,7 @@ def get_spreadsheets(
         items: List[str] = None,
         eqm: Union[str, None] = None,
         example: bool = False,
+        bulk: bool = False,
     ) -> List[Spreadsheet]:
     submission_schemas = get_all_submission_schemas(request_handler)
     ordered_submission_schemas = get_ordered_submission_schemas(submission_schemas, gcc=gcc, tpc=tpc)
@@ -212,10 +244,10 @@ def get_spreadsheets(
         spreadsheets = []
         for item, submission_schema in submission_schemas.items():
             unlinked_spreadsheet = get_example_spreadsheet(
-                item,request_handler,example_fields,submission_schema
+                item,request_handler,example_fields,submission_schema,bulk=bulk
             )
             spreadsheet,example_fields = get_linked_spreadsheet(
-                request_handler,unlinked_spreadsheet,example_fields
+                request_handler,unlinked_spreadsheet,example_fields,bulk=bulk
             )
             spreadsheets.append(spreadsheet)
         if gcc:
@@ -236,7 +268,7 @@ def get_spreadsheets(
         ]
     if eqm:
         eqm_schema ={
-            'schema': get_submission_schema('ExternalQualityMetric', request_handler)
+            'schema': get_eqm_submission_schema(request_handler, submission_schemas, bulk=bulk)
         }
         spreadsheets.append(get_eqm_spreadsheet(eqm, eqm_schema, request_handler))
     return spreadsheets
@@ -254,6 +286,13 @@ def reorder_spreadsheets(spreadsheets: List[Spreadsheet], order: List[str]):
 
 def delete_existing_sheets(sheets_client: SheetsClient) -> None:
     """Delete existing sheets from Google Sheets."""
+    requests = get_delete_existing_sheets_requests(sheets_client)
+    if requests:
+        sheets_client.submit_requests(requests)
+
+
+def get_delete_existing_sheets_requests(sheets_client: SheetsClient) -> List[Dict[str, Any]]:
+    """Get requests to delete existing sheets (and clear the first)."""
     requests = []
     for sheet in sheets_client.get_worksheets():
         sheet_id = get_worksheet_id(sheet)
@@ -261,8 +300,7 @@ def delete_existing_sheets(sheets_client: SheetsClient) -> None:
             requests.append(get_clear_values_request(sheet_id))
         else:
             requests.append(get_delete_sheet_request(sheet_id))
-    if requests:
-        sheets_client.submit_requests(requests)
+    return requests
 
 
 def get_worksheet_id(sheet: Dict[str, Any]) -> int:
@@ -284,14 +322,22 @@ def update_or_add_spreadsheets(
     sheets_client: SheetsClient, spreadsheets: List[Spreadsheet]
 ) -> None:
     """Update or add spreadsheets to Google Sheets."""
+    requests = get_update_or_add_spreadsheets_requests(spreadsheets)
+    if requests:
+        sheets_client.submit_requests(requests)
+
+
+def get_update_or_add_spreadsheets_requests(
+    spreadsheets: List[Spreadsheet],
+) -> List[Dict[str, Any]]:
+    """Get requests to update the first sheet and add the others."""
     requests = []
     for idx, spreadsheet in enumerate(spreadsheets):
         if idx == 0:
             requests.append(get_update_sheet_title_request(spreadsheet, idx))
         else:
             requests.append(get_add_sheet_request(spreadsheet, idx))
-    if requests:
-        sheets_client.submit_requests(requests)
+    return requests
 
 
 def get_update_sheet_title_request(
@@ -337,13 +383,19 @@ def write_values_to_sheets(
     spreadsheets: List[Spreadsheet]
 ) -> None:
     """Write values to the Google Sheets."""
-    requests = []
-    for idx, spreadsheet in enumerate(spreadsheets):
-        requests.append(get_update_cells_request(spreadsheet, idx))
+    requests = get_write_values_requests(spreadsheets)
     if requests:
         sheets_client.submit_requests(requests)
 
 
+def get_write_values_requests(spreadsheets: List[Spreadsheet]) -> List[Dict[str, Any]]:
+    """Get requests to write values (with comments as notes) to all sheets."""
+    return [
+        get_update_cells_request(spreadsheet, idx)
+        for idx, spreadsheet in enumerate(spreadsheets)
+    ]
+
+
 def get_update_cells_request(spreadsheet: Spreadsheet, sheet_id: int) -> Dict[str, Any]:
     """Get request to update cells with properties."""
     if spreadsheet.examples:
@@ -431,14 +483,22 @@ def format_column_widths(
     sheets_client: SheetsClient, spreadsheets: List[Spreadsheet]
 ) -> None:
     """Format column widths in the Google Sheets."""
+    requests = get_format_column_widths_requests(spreadsheets)
+    if requests:
+        sheets_client.submit_requests(requests)
+
+
+def get_format_column_widths_requests(
+    spreadsheets: List[Spreadsheet],
+) -> List[Dict[str, Any]]:
+    """Get requests to format the column widths of all sheets."""
     requests = []
     column_width_multiplier = 7  # 7 pixels per character seemed to work well
     for idx, spreadsheet in enumerate(spreadsheets):
         for index, property_ in enumerate(spreadsheet.properties):
             width = len(property_.name) * column_width_multiplier
             requests.append(get_format_column_request(idx, index, width))
-    if requests:
-        sheets_client.submit_requests(requests)
+    return requests
 
 
 def get_format_column_request(
@@ -496,14 +556,15 @@ def write_item_spreadsheets(
     gcc: bool = False,
     eqm: Union[str, None] = None,
     separate_comments: bool = False,
-    example: bool = False
+    example: bool = False,
+    bulk: bool = False,
 ) -> None:
     """Write submission spreadsheets for specified items"""
-    submission_schemas = get_submission_schemas(items, request_handler)
+    submission_schemas = get_submission_schemas(items, request_handler, bulk=bulk)
     eqm_schema = None
     if eqm:
         eqm_schema = {
-            'schema': get_submission_schema('ExternalQualityMetric', request_handler)
+            'schema': get_eqm_submission_schema(request_handler, bulk=bulk)
         }
     if not submission_schemas:
         log.error("No submission schemas found for given items. Exiting...")
@@ -519,24 +580,52 @@ def write_item_spreadsheets(
             f" {submission_schemas.keys()}"
         )
     if workbook:
-        write_workbook(output, submission_schemas, request_handler, separate_comments=separate_comments, tpc=tpc, gcc=gcc, eqm=eqm, eqm_schema=eqm_schema, example=example)
+        write_workbook(output, submission_schemas, request_handler, separate_comments=separate_comments, tpc=tpc, gcc=gcc, eqm=eqm, eqm_schema=eqm_schema, example=example, bulk=bulk)
     else:
         write_spreadsheets(
-            output, submission_schemas, request_handler, separate_comments=separate_comments, eqm=eqm, eqm_schema=eqm_schema, example=example
+            output, submission_schemas, request_handler, separate_comments=separate_comments, eqm=eqm, eqm_schema=eqm_schema, example=example, bulk=bulk
         )
 
 
 def get_submission_schemas(
-    items: List[str], request_handler: RequestHandler
+    items: List[str], request_handler: RequestHandler, bulk: bool = False
 ) -> Dict[str, Dict[str, Any]]:
-    """Get submission schemas for items."""
-    submission_schemas = {
-        to_camel_case(item): get_submission_schema(item, request_handler)
-        for item in items
-    }
+    """Get submission schemas for items.
+
+    If bulk, get all submission schemas in one request, rather than
+    one request per item.
+    """
+    if bulk:
+        all_submission_schemas = get_all_submission_schemas(request_handler)
+        submission_schemas = {
+            to_camel_case(item): all_submission_schemas.get(to_camel_case(item), {})
+            for item in items
+        }
+    else:
+        submission_schemas = {
+            to_camel_case(item): get_submission_schema(item, request_handler)
+            for item in items
+        }
     return {key: value for key, value in submission_schemas.items() if value}
 
 
+def get_eqm_submission_schema(
+    request_handler: RequestHandler,
+    submission_schemas: Optional[Dict[str, Dict[str, Any]]] = None,
+    bulk: bool = False,
+) -> Dict[str, Any]:
+    """Get the ExternalQualityMetric submission schema.
+
+    If bulk, taken from all submission schemas (given, or in one request).
+    """
+    if bulk:
+        if submission_schemas is None:
+            submission_schemas = get_all_submission_schemas(request_handler)
+        if eqm_schema := submission_schemas.get("ExternalQualityMetric"):
+            return eqm_schema
+    return get_submission_schema("ExternalQualityMetric", request_handler)
+
+
 def get_submission_schema(item: str, request_handler: RequestHandler) -> Dict[str, Any]:
     """Get the submission schema for the item."""
     try:
@@ -560,13 +649,14 @@ def write_workbook(
     separate_comments: bool = False,
     eqm: Union[str, None] = None,
     eqm_schema: Union[Dict[str, Any], None] = None,
-    example: bool = False
+    example: bool = False,
+    bulk: bool = False,
 ) -> None:
     """Write a single workbook containing all submission spreadsheets."""
     workbook = openpyxl.Workbook()
     ordered_submission_schemas = get_ordered_submission_schemas(submission_schemas,tpc=tpc,gcc=gcc)
     write_workbook_sheets(
-        workbook, ordered_submission_schemas, request_handler, separate_comments=separate_comments, eqm=eqm, eqm_schema=eqm_schema, example=example
+        workbook, ordered_submission_schemas, request_handler, separate_comments=separate_comments, eqm=eqm, eqm_schema=eqm_schema, example=example, bulk=bulk
     )
     file_path = Path(output, WORKBOOK_FILENAME)
     save_workbook(workbook, file_path)
@@ -625,7 +715,8 @@ def write_workbook_sheets(
     separate_comments: bool = False,
     eqm: Union[str, None] = None,
     eqm_schema: Union[Dict[str, Any], None] = None,
-    example: bool = False
+    example: bool = False,
+    bulk: bool = False,
 ) -> None:
     """Write workbook sheets for given schemas."""
     if example:
@@ -634,10 +725,10 @@ def write_workbook_sheets(
         submission_schemas = get_ordered_submission_schemas(submission_schemas,order=POPULATE_ORDER)
         for index, (item, submission_schema) in enumerate(submission_schemas.items()):
             unlinked_spreadsheet = get_example_spreadsheet(
-                item, request_handler, example_fields, submission_schema
+                item, request_handler, example_fields, submission_schema, bulk=bulk
             )
             spreadsheet, example_fields = get_linked_spreadsheet(
-                request_handler, unlinked_spreadsheet, example_fields
+                request_handler, unlinked_spreadsheet, example_fields, bulk=bulk
             )
             spreadsheets.append(spreadsheet)
         ordered_spreadsheets = reorder_spreadsheets(spreadsheets, GCC_SUBMISSION_ITEMS)
@@ -667,7 +758,8 @@ def write_spreadsheets(
     separate_comments: bool = False,
     eqm: Union[str, None] = None,
     eqm_schema: Union[Dict[str, Any], None] = None,
-    example: bool = False
+    example: bool = False,
+    bulk: bool = False,
 ) -> None:
     """Write submission spreadsheets."""
     if example:
@@ -675,10 +767,10 @@ def write_spreadsheets(
         submission_schemas = get_ordered_submission_schemas(submission_schemas,order=POPULATE_ORDER)
         for item, submission_schema in submission_schemas.items():
             unlinked_spreadsheet = get_example_spreadsheet(
-                item,request_handler,example_fields,submission_schema
+                item,request_handler,example_fields,submission_schema,bulk=bulk
             )
             spreadsheet,example_fields = get_linked_spreadsheet(
-                request_handler,unlinked_spreadsheet,example_fields
+                request_handler,unlinked_spreadsheet,example_fields,bulk=bulk
             )
             write_spreadsheet(output, spreadsheet, separate_comments, example=example)
     else:
@@ -766,15 +858,16 @@ def get_example_spreadsheet(
         item: str,
         request_handler: RequestHandler,
         example_fields: ExampleFields,
-        submission_schema: Dict[str,Any]
+        submission_schema: Dict[str,Any],
+        bulk: bool = False
     ) -> Spreadsheet:
     """Get example property values of spreadsheet information for item."""
     starting = ['AlignedReads'] # Currently just aligned reads
     #starting = ['AlignedReads','VariantCalls']
     if item in starting:
-        example = get_submission_examples(request_handler,example_fields,seed=True)
+        example = get_submission_examples(request_handler,example_fields,seed=True,bulk=bulk)
     else:
-        example = get_submission_examples(request_handler,example_fields,item_type=item)
+        example = get_submission_examples(request_handler,example_fields,item_type=item,bulk=bulk)
     properties = get_properties(item, submission_schema)
     return Spreadsheet(
         item=item,
@@ -787,49 +880,94 @@ def get_submission_examples(
     request_handler: RequestHandler,
     example_fields: ExampleFields,
     item_type: str = None,
-    seed: bool = False
+    seed: bool = False,
+    bulk: bool = False
     ):
-    """Get examples of property values for items."""
+    """Get examples of property values for items.
+
+    If bulk, the items are fetched concurrently.
+    """
     items = example_fields.seed_files if seed else example_fields.fields[item_type]
+    if bulk:
+        return get_items_concurrently(request_handler, items)
     return [request_handler.get_item(obj_id) for obj_id in items]
 
 
+def get_items_concurrently(
+    request_handler: RequestHandler, identifiers: List[str]
+) -> List[Dict[str, Any]]:
+    """Get items, in the given order, with concurrent requests."""
+    with ThreadPoolExecutor(max_workers=BULK_WORKERS) as executor:
+        return list(executor.map(request_handler.get_item, identifiers))
+
+
 def get_linked_spreadsheet(
     request_handler: RequestHandler,
     spreadsheet: Spreadsheet,
-    example_fields: ExampleFields
+    example_fields: ExampleFields,
+    bulk: bool = False
 ):
-    """Get spreadsheet with links filled out with submitted_id or identifier."""
+    """Get spreadsheet with links filled out with submitted_id or identifier.
+
+    If bulk, all linked items of all examples are fetched concurrently first.
+    """
     links = get_all_links(spreadsheet)
     nested_links = get_nested_links(spreadsheet)
+    linked_items = get_linked_items(request_handler, spreadsheet, links, nested_links) if bulk else None
     for link in links:
         for idx, example in enumerate(spreadsheet.examples):
             if link in nested_links:   
                 values = get_nested_example(example,link)
                 parent_property, nested_property, n_index = extract_nested_property_names(link)
-                id_values, example_fields = get_id_list(request_handler,values,example_fields)
+                id_values, example_fields = get_id_list(request_handler,values,example_fields,linked_items)
                 spreadsheet.examples[idx][parent_property][n_index][nested_property] = " | ".join(id_values)
             elif link in example:
                 values = example[link]
-                id_values, example_fields = get_id_list(request_handler,values,example_fields)
+                id_values, example_fields = get_id_list(request_handler,values,example_fields,linked_items)
                 spreadsheet.examples[idx][link] = " | ".join(id_values)
     return spreadsheet, example_fields
 
 
+def get_linked_items(
+    request_handler: RequestHandler,
+    spreadsheet: Spreadsheet,
+    links: List[str],
+    nested_links: List[str],
+) -> Dict[str, Dict[str, Any]]:
+    """Get all items linked from the examples, by link value."""
+    values = []
+    for link in links:
+        for example in spreadsheet.examples:
+            if link in nested_links:
+                value = get_nested_example(example, link)
+            elif link in example:
+                value = example[link]
+            else:
+                continue
+            values.extend(value if is_list(value) else [value])
+    identifiers = list(dict.fromkeys(value for value in values if value))
+    return dict(zip(identifiers, get_items_concurrently(request_handler, identifiers)))
+
+
 def get_id_list(
     request_handler: RequestHandler,
     values: Union[str,List[str]],
-    example_fields: ExampleFields
+    example_fields: ExampleFields,
+    linked_items: Optional[Dict[str, Dict[str, Any]]] = None
     ):
-    """Return list of submitted_id or identifier values from @ids."""
+    """Return list of submitted_id or identifier values from @ids.
+
+    Items are taken from linked_items, if given, rather than requested.
+    """
+    linked_items = linked_items or {}
     id_values = []
     if type(values) is list:
         for value in values:
-            item = request_handler.get_item(value)
+            item = linked_items.get(value) or request_handler.get_item(value)
             example_fields = update_example_fields(item,example_fields)
             id_values.append(get_linked_item_id(item))
     else:
-        item = request_handler.get_item(values)
+        item = linked_items.get(values) or request_handler.get_item(values)
         example_fields = update_example_fields(item,example_fields)
         id_values.append(get_linked_item_id(item))
     return id_values, example_fields
@@ -1540,6 +1678,16 @@ def main():
         ),
         action="store_true"
     )
+    parser.add_argument(
+        "--bulk",
+        help=(
+            "Fetch submission schemas and example items with as few (or concurrent)"
+            " requests as possible, and write Google sheets with as few"
+            f" batchUpdate calls as possible (up to {MAX_BATCH_UPDATE_REQUESTS}"
+            " requests each)"
+        ),
+        action="store_true",
+    )
     args = parser.parse_args()
 
     keys = SMaHTKeyManager().get_keydict_for_env(args.env)
@@ -1571,10 +1719,10 @@ def main():
             spreadsheet_client = get_google_sheet_client(args.google)
             if args.gcc:
                 log.info("Writing GCC submission example to Google sheet")
-                update_google_sheets(spreadsheet_client, request_handler,gcc=True,example=True)
+                update_google_sheets(spreadsheet_client, request_handler,gcc=True,example=True, bulk=args.bulk)
             elif args.item:
                 log.info(f"Writing submission example to Google sheet for item(s): {args.item}")
-                update_google_sheets(spreadsheet_client, request_handler,items=args.item,example=True)
+                update_google_sheets(spreadsheet_client, request_handler,items=args.item,example=True, bulk=args.bulk)
         elif args.item:
             log.info(f"Writing example submission spreadsheets for item(s): {args.item}")
             write_item_spreadsheets(
@@ -1583,7 +1731,8 @@ def main():
                 request_handler,
                 workbook=args.workbook,
                 separate_comments=args.separate,
-                example=True
+                example=True,
+                bulk=args.bulk,
             )
         elif args.gcc:
             log.info("Writing example submission spreadsheet for GCC submission")
@@ -1594,7 +1743,8 @@ def main():
                 workbook=args.workbook,
                 separate_comments=args.separate,
                 example=True,
-                gcc=True
+                gcc=True,
+                bulk=args.bulk,
             )
         else: 
             parser.error("--example argument currently only works for individual item lists or --gcc")
@@ -1605,16 +1755,16 @@ def main():
             log.info(f"Google Token Path: {GOOGLE_TOKEN_PATH}")
             spreadsheet_client = get_google_sheet_client(args.google)
             if args.all:
-                update_google_sheets(spreadsheet_client, request_handler)
+                update_google_sheets(spreadsheet_client, request_handler, bulk=args.bulk)
             elif args.gcc:
                 log.info("Writing GCC submission Google sheet")
-                update_google_sheets(spreadsheet_client, request_handler,gcc=True, eqm=args.eqm)
+                update_google_sheets(spreadsheet_client, request_handler,gcc=True, eqm=args.eqm, bulk=args.bulk)
             elif args.tpc:
                 log.info("Writing TPC submission Google sheet")
-                update_google_sheets(spreadsheet_client, request_handler,tpc=True)
+                update_google_sheets(spreadsheet_client, request_handler,tpc=True, bulk=args.bulk)
             elif args.item:
                 log.info(f"Writing submission Google sheet for item(s): {args.item}")
-                update_google_sheets(spreadsheet_client, request_handler,items=args.item, eqm=args.eqm)
+                update_google_sheets(spreadsheet_client, request_handler,items=args.item, eqm=args.eqm, bulk=args.bulk)
             else:
                 parser.error("No items specified to write or update Google spreadsheets for")
         elif args.all:
@@ -1635,6 +1785,7 @@ def main():
                 tpc = True,
                 gcc = False,
                 separate_comments=args.separate,
+                bulk=args.bulk,
             )
         elif args.gcc:
             log.info("Writing GCC/TTD submission spreadsheet")
@@ -1646,7 +1797,8 @@ def main():
                 tpc = False,
                 gcc = True,
                 separate_comments=args.separate,
-                eqm=args.eqm
+                eqm=args.eqm,
+                bulk=args.bulk,
             )
         elif args.item:
             log.info(f"Writing submission spreadsheets for item(s): {args.item}")
@@ -1656,7 +1808,8 @@ def main():
                 request_handler,
                 workbook=args.workbook,
                 separate_comments=args.separate,
-                eqm=args.eqm
+                eqm=args.eqm,
+                bulk=args.bulk,
             )
         else:
             parser.error("No items specified to write or update spreadsheets for")
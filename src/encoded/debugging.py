@@ -1,10 +1,14 @@
 from pyramid.security import Authenticated
 from pyramid.view import view_config
 from snovault.util import debug_log
+from encoded.authorization import get_principals_cache
+from encoded.download_analytics import get_ga_dispatcher
 
 
 def includeme(config):
     config.add_route("debug_user_principals", "/debug_user_principals")
+    config.add_route("debug_principals_cache", "/debug_principals_cache")
+    config.add_route("debug_download_analytics", "/debug_download_analytics")
     config.scan(__name__)
 
 @view_config(route_name="debug_user_principals", request_method=["GET"], effective_principals=Authenticated)
@@ -15,3 +19,23 @@ def debug_user_principals(context, request):
     For debugging/troubleshooting/understanding only.
     """
     return request.effective_principals
+
+
+@view_config(route_name="debug_principals_cache", request_method=["GET"], effective_principals="group.admin")
+@debug_log
+def debug_principals_cache(context, request):
+    """
+    Returns the metrics (size, hits, misses, hit rate, invalidations) for the principals cache
+    (see authorization.PrincipalsCache) of this process. For debugging/troubleshooting only.
+    """
+    return get_principals_cache(request.registry).info()
+
+
+@view_config(route_name="debug_download_analytics", request_method=["GET"], effective_principals="group.admin")
+@debug_log
+def debug_download_analytics(context, request):
+    """
+    Returns the counts (queued, dropped, sent, failed) for the download analytics dispatcher
+    (see download_analytics.GoogleAnalyticsDispatcher) of this process. For debugging/troubleshooting only.
+    """
+    return get_ga_dispatcher(request.registry).info()
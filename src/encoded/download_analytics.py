@@ -0,0 +1,224 @@
+import datetime
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+import structlog
+from pyramid.registry import Registry
+
+# Non-blocking Google Analytics (GA4) tracking of file downloads (see types/file.download).
+# Rather than posting to GA (as encoded_core.file_views.update_google_analytics does) before
+# the download redirect is issued, the same download event is built (and timestamped) in the
+# request and put on a bounded in-memory queue, and posted by a background thread, batched (per
+# GA client) with up to 25 events per request, which is the maximum for the GA4 Measurement
+# Protocol. If the queue is full (i.e. GA is slow or unreachable) events are dropped, and
+# counted, rather than blocking downloads.
+
+log = structlog.getLogger(__name__)
+
+GA_DISPATCHER = "ga_dispatcher"
+GA4_COLLECT_URL = "https://www.google-analytics.com/mp/collect?measurement_id={measurement_id}&api_secret={api_secret}"
+GA4_MAX_EVENTS_PER_REQUEST = 25
+
+
+def includeme(config):
+    get_ga_dispatcher(config.registry)
+
+
+class GoogleAnalyticsDispatcher:
+    """
+    Bounded queue of GA4 events with a background sender thread; the thread is started on first use,
+    and again if the process has forked since (e.g. app preloaded by the server before forking workers).
+    The counters are updated by both the request threads and the background thread, so under the lock.
+    """
+    QUEUE_SIZE = 10000
+    FLUSH_INTERVAL_SECONDS = 2.0
+    POST_TIMEOUT_SECONDS = 10
+
+    def __init__(self, queue_size: int = QUEUE_SIZE, flush_interval: float = FLUSH_INTERVAL_SECONDS,
+                 post: Optional[Callable] = None) -> None:
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._flush_interval = flush_interval
+        self._post = post or requests.post
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+        self.queued = 0
+        self.dropped = 0
+        self.sent = 0
+        self.failed = 0
+
+    def dispatch(self, measurement_id: str, api_secret: str, client_id: str,
+                 user_id: Optional[str], event: dict) -> bool:
+        """
+        Queues the given GA4 event for the given GA client (and user) for posting; never blocks.
+        Returns True if queued, or False if dropped because the queue is full.
+        """
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(((measurement_id, api_secret, client_id, user_id), event))
+            with self._lock:
+                self.queued += 1
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped == 1 or dropped % 1000 == 0:
+                log.warning(f"Dropped download analytics event(s) as queue is full (total dropped: {dropped})")
+            return False
+
+    def flush(self) -> None:
+        """ Posts all currently queued events, in the calling thread. """
+        batches = {}
+        while True:
+            try:
+                key, event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batches.setdefault(key, []).append(event)
+        self._post_batches(batches)
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"queue_size": self._queue.qsize(), "queued": self.queued, "dropped": self.dropped,
+                    "sent": self.sent, "failed": self.failed}
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._thread_pid != os.getpid() or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="ga-dispatcher", daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def _run(self) -> None:
+        batches = {}
+        flush_time = time.time() + self._flush_interval
+        while True:
+            try:
+                key, event = self._queue.get(timeout=max(flush_time - time.time(), 0.01))
+                batches.setdefault(key, []).append(event)
+                if len(batches[key]) >= GA4_MAX_EVENTS_PER_REQUEST:
+                    self._post_batches({key: batches.pop(key)})
+            except queue.Empty:
+                pass
+            if time.time() >= flush_time:
+                self._post_batches(batches)
+                batches = {}
+                flush_time = time.time() + self._flush_interval
+
+    def _post_batches(self, batches: Dict[Tuple, List[dict]]) -> None:
+        for (measurement_id, api_secret, client_id, user_id), events in batches.items():
+            for index in range(0, len(events), GA4_MAX_EVENTS_PER_REQUEST):
+                payload = {"client_id": client_id, "non_personalized_ads": False,
+                           "events": events[index:index + GA4_MAX_EVENTS_PER_REQUEST]}
+                if user_id:
+                    payload["user_id"] = user_id
+                try:
+                    response = self._post(url=GA4_COLLECT_URL.format(measurement_id=measurement_id,
+                                                                     api_secret=api_secret),
+                                          data=json.dumps(_remove_none_fields(payload)), verify=True,
+                                          timeout=self.POST_TIMEOUT_SECONDS)
+                    response.raise_for_status()
+                    with self._lock:
+                        self.sent += len(payload["events"])
+                except Exception as e:
+                    with self._lock:
+                        self.failed += len(payload["events"])
+                    log.error(f"Exception encountered posting to GA: {e}")
+
+
+def get_ga_dispatcher(registry: Registry) -> GoogleAnalyticsDispatcher:
+    """ Returns the GoogleAnalyticsDispatcher held by the given registry (created on startup). """
+    if (dispatcher := registry.get(GA_DISPATCHER)) is None:
+        settings = registry.settings or {}
+        dispatcher = registry.setdefault(GA_DISPATCHER, GoogleAnalyticsDispatcher(
+            queue_size=int(settings.get("ga4.dispatch_queue_size", GoogleAnalyticsDispatcher.QUEUE_SIZE)),
+            flush_interval=float(settings.get("ga4.dispatch_flush_interval",
+                                              GoogleAnalyticsDispatcher.FLUSH_INTERVAL_SECONDS))))
+    return dispatcher
+
+
+def dispatch_download_to_google_analytics(context, request, ga_config, filename, file_size_downloaded,
+                                          file_at_id, submitter_title, user_uuid, user_groups,
+                                          exp_or_assay_type, dataset, file_type="other") -> bool:
+    """
+    Same as encoded_core.file_views.update_google_analytics, i.e. with the same event, timestamped now,
+    but queued for posting to GA by the (background) GoogleAnalyticsDispatcher rather than posted directly.
+    """
+    ga4_secret = request.registry.settings.get("ga4.secret")
+    if not ga4_secret:
+        raise Exception("No valid GA4 api secret found")
+
+    ga_cid = request.cookies.get("clientIdentifier")
+    if not ga_cid:  # Fallback, potentially can stop working as GA is updated
+        ga_cid = request.cookies.get("_ga")
+        if ga_cid:
+            ga_cid = ".".join(ga_cid.split(".")[2:])
+        else:
+            ga_cid = "programmatic"
+
+    ga_tid_mapping = ga_config["hostnameTrackerIDMapping"].get(request.host,
+                                                               ga_config["hostnameTrackerIDMapping"].get("default"))
+    ga_tid = ga_tid_mapping[1] if isinstance(ga_tid_mapping, list) and len(ga_tid_mapping) > 1 else None
+    if ga_tid is None:
+        raise Exception("No valid tracker id found in ga_config.json > hostnameTrackerIDMapping")
+
+    file_extension = os.path.splitext(filename)[1][1:]
+    item_types = [ty for ty in reversed(context.jsonld_type()[:-1])]
+    event = {
+        "name": "purchase",
+        # N.B. Per event (rather than per request) since events for the same client are posted together.
+        "timestamp_micros": str(int(datetime.datetime.now().timestamp() * 1000000)),
+        "params": {
+            "name": filename,
+            "source": "Serverside File Download",
+            "action": "Range Query" if request.range else "File Download",
+            "file_name": filename,
+            "file_extension": file_extension,
+            "link_url": request.url,
+            "file_size": file_size_downloaded,
+            "downloads": 0 if request.range else 1,
+            "experiment_type": exp_or_assay_type or "None",
+            "dataset": dataset or "None",
+            "lab": submitter_title or "None",
+            # Product Category from @type, e.g. "File/FileProcessed"
+            "file_classification": "/".join(item_types),
+            "file_type": file_type,
+            "items": [
+                {
+                    "item_id": file_at_id,
+                    "item_name": filename,
+                    "item_category": item_types[0] if len(item_types) >= 1 else "Unknown",
+                    "item_category2": item_types[1] if len(item_types) >= 2 else "Unknown",
+                    "item_category3": item_types[2] if len(item_types) >= 3 else "Unknown",
+                    "item_category4": exp_or_assay_type or "None",
+                    "item_category5": dataset or "None",
+                    "item_brand": submitter_title or "None",
+                    "item_variant": file_type,
+                    "quantity": 1
+                }
+            ]
+        }
+    }
+    if user_uuid:
+        event["params"]["user_uuid"] = user_uuid
+    if user_groups:
+        # Compact JSON; aligns with what is passed from JS.
+        event["params"]["user_groups"] = json.dumps(user_groups, separators=(",", ":"))
+
+    return get_ga_dispatcher(request.registry).dispatch(ga_tid, ga4_secret, ga_cid, user_uuid, event)
+
+
+def _remove_none_fields(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _remove_none_fields(element) for key, element in value.items() if element is not None}
+    elif isinstance(value, (list, tuple)):
+        return [_remove_none_fields(element) for element in value if element is not None]
+    return value
@@ -0,0 +1,135 @@
+from hashlib import md5
+import json
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+from dcicutils.data_readers import RowReader
+from dcicutils.structured_data import Portal, StructuredDataSet
+
+# Bulk alternative to StructuredDataSet.compare for the purpose of finding submitted items which have
+# no changes with respect to their existing Portal items (see ingestion_processors.get_no_diff_items).
+# Rather than looking up each submitted item individually, existing items are fetched per type, with
+# batched submitted_id searches (with frame=raw, which restricts the ES source to just the properties);
+# and each submitted item is compared to its existing item by a content hash of the normalized submitted
+# item against the same hash of the existing item projected onto the (shape of the) submitted item.
+#
+# N.B. Since search is only as up to date as the (eventually consistent) index, an item found to be
+# unchanged with respect to its search result is compared again with the item from the database, so
+# only items which are found (by search) to be changed are spared the individual lookup; this errs on
+# the side of treating an item as changed, e.g. if it is not found (by search or in the database) or
+# if any of its references could not be resolved to a uuid, since such items are simply (re)submitted.
+
+SEARCH_BATCH_SIZE = 100
+
+
+def get_no_diff_items_bulk(structured_data: StructuredDataSet, batch_size: int = SEARCH_BATCH_SIZE) -> set:
+    """
+    Same as ingestion_processors.get_no_diff_items but done in bulk; returns the set
+    of submitted_id values of items which are not being changed in the given StructuredDataSet.
+    """
+    if not (portal := structured_data.portal):
+        return set()
+    refs = {ref["path"]: ref["uuid"] for ref in structured_data.resolved_refs_with_uuids if ref.get("uuid")}
+    no_diff_items = set()
+    for type_name in structured_data.data:
+        items = {item["submitted_id"]: item for item in structured_data.data[type_name]
+                 if isinstance(item.get("submitted_id"), str)}
+        if not items:
+            continue
+        schema = portal.get_schema(type_name)
+        existing_items = _get_existing_items(portal, type_name, list(items.keys()), batch_size=batch_size)
+        for submitted_id, item in items.items():
+            if (existing_item := existing_items.get(submitted_id)) is None:
+                continue
+            if _has_deletions(item):
+                continue
+            item = _normalize_refs(item, schema, refs)
+            if _is_unchanged(item, existing_item) and _is_unchanged_in_database(portal, type_name, submitted_id, item):
+                no_diff_items.add(submitted_id)
+    return no_diff_items
+
+
+def _is_unchanged(item: dict, existing_item: dict) -> bool:
+    return _content_hash(item) == _content_hash(_project(existing_item, item))
+
+
+def _is_unchanged_in_database(portal: Portal, type_name: str, submitted_id: str, item: dict) -> bool:
+    try:
+        existing_item = portal.get_metadata(f"/{type_name}/{submitted_id}", raw=True, database=True)
+    except Exception:
+        return False
+    return isinstance(existing_item, dict) and _is_unchanged(item, existing_item)
+
+
+def _get_existing_items(portal: Portal, type_name: str,
+                        submitted_ids: List[str], batch_size: int = SEARCH_BATCH_SIZE) -> Dict[str, dict]:
+    existing_items = {}
+    for index in range(0, len(submitted_ids), batch_size):
+        batch = submitted_ids[index:index + batch_size]
+        query = urlencode([("type", type_name), ("frame", "raw"), ("limit", len(batch))] +
+                          [("submitted_id", submitted_id) for submitted_id in batch])
+        try:
+            response = portal.get(f"/search/?{query}")
+            if response.status_code != 200:
+                continue
+            for existing_item in response.json().get("@graph", []):
+                if submitted_id := existing_item.get("submitted_id"):
+                    existing_items[submitted_id] = existing_item
+        except Exception:
+            # N.B. Search responds with a 404 if there are no results.
+            pass
+    return existing_items
+
+
+def _normalize_refs(value: Any, schema: Optional[dict], refs: Dict[str, str]) -> Any:
+    """
+    Returns a copy of the given (submitted) value with its references (linkTo), which are
+    identifying values, e.g. submitted_id, replaced with their uuids, per the given refs.
+    """
+    if not isinstance(schema, dict):
+        return value
+    if isinstance(value, dict):
+        properties = schema.get("properties") or {}
+        return {key: _normalize_refs(key_value, properties.get(key), refs) for key, key_value in value.items()}
+    elif isinstance(value, list):
+        return [_normalize_refs(element, schema.get("items"), refs) for element in value]
+    elif isinstance(value, str) and (link_to := schema.get("linkTo")):
+        return refs.get(f"/{link_to}/{value}", value)
+    return value
+
+
+def _project(existing: Any, submitted: Any) -> Any:
+    """
+    Returns the given existing value restricted to the shape of the given submitted value, i.e. with any
+    (nested) properties not in the submitted value removed, as these are not considered to be changes;
+    this follows the semantics of dcicutils.portal_object_utils.PortalObject.compare.
+    """
+    if isinstance(existing, dict) and isinstance(submitted, dict):
+        return {key: _project(existing[key], submitted[key]) for key in submitted if key in existing}
+    elif isinstance(existing, list) and isinstance(submitted, list):
+        return [_project(element, submitted[index]) if index < len(submitted) else element
+                for index, element in enumerate(existing)]
+    return existing
+
+
+def _has_deletions(value: Any) -> bool:
+    if isinstance(value, dict):
+        return any(_has_deletions(element) for element in value.values())
+    elif isinstance(value, list):
+        return any(_has_deletions(element) for element in value)
+    return value == RowReader.CELL_DELETION_SENTINEL
+
+
+def _content_hash(value: Any) -> str:
+    return md5(json.dumps(_canonical(value), sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _canonical(value: Any) -> Any:
+    # Order of array elements is ignored (as for PortalObject.compare) for arrays of simple values.
+    if isinstance(value, dict):
+        return {key: _canonical(element) for key, element in value.items()}
+    elif isinstance(value, list):
+        elements = [_canonical(element) for element in value]
+        if not any(isinstance(element, (dict, list)) for element in elements):
+            return sorted(set(json.dumps(element, default=str) for element in elements))
+        return elements
+    return value
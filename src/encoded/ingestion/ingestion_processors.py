@@ -1,18 +1,28 @@
+from contextlib import ExitStack
 import re
-from typing import Optional
+from typing import Generator, List, Optional, Set, Tuple
 from dcicutils.submitr.custom_excel import CustomExcel
 from dcicutils.submitr.progress_constants import PROGRESS_INGESTER
 from dcicutils.structured_data import Portal, StructuredDataSet
 from snovault.ingestion.ingestion_processors import ingestion_processor
 from snovault.types.ingestion import SubmissionFolio
+from structlog import getLogger as get_logger
 from encoded.project.loadxl import ITEM_INDEX_ORDER
+from encoded.ingestion.bulk_compare import get_no_diff_items_bulk
+from encoded.ingestion.ingestion_profile import IngestionProfile
 from encoded.ingestion.ingestion_status_cache import IngestionStatusCache
-from encoded.ingestion.loadxl_extensions import load_data_into_database, summary_of_load_data_results
+from encoded.ingestion.loadxl_extensions import (
+    define_shared_progress_tracker, get_loadxl_dependency_levels, load_data_into_database,
+    load_data_into_database_concurrently, merge_load_data_results, summary_of_load_data_results
+)
+from encoded.ingestion.reference_cache import ReferenceCache, ReferenceCacheStats
+from encoded.ingestion.structured_data_streaming import StreamingStructuredDataSet
 from encoded.ingestion.submission_folio import SmahtSubmissionFolio
 # from ..schema_formats import is_accession  # TODO: Problem with circular dependencies.
 
 
 def includeme(config):
+    config.include("encoded.ingestion.reference_cache")
     config.scan(__name__)
 
 
@@ -32,19 +42,31 @@ def handle_metadata_bundle(submission: SubmissionFolio) -> None:
                                  "user_uuid": submission.user.get("uuid") if submission.user else None,
                                  "consortium": submission.consortium,
                                  "submission_center": submission.submission_center})
-        _process_submission(submission)
+        profile = IngestionProfile()
+        try:
+            if submission.streaming:
+                _process_submission_streaming(submission, profile=profile)
+            else:
+                _process_submission(submission, profile=profile)
+        finally:
+            _record_profile(submission, profile)
         ingestion_status.update({PROGRESS_INGESTER.CLEANUP: PROGRESS_INGESTER.NOW()})
     ingestion_status.update({PROGRESS_INGESTER.OUTCOME: submission.outcome})
     ingestion_status.update({PROGRESS_INGESTER.DONE: PROGRESS_INGESTER.NOW()})
     ingestion_status.flush()
 
 
-def _process_submission(submission: SmahtSubmissionFolio) -> None:
-    with submission.s3_file() as file:
+def _process_submission(submission: SmahtSubmissionFolio, profile: Optional[IngestionProfile] = None) -> None:
+    profile = profile or IngestionProfile()
+    with ExitStack() as context:
+        with profile.phase("s3_fetch"):
+            file = context.enter_context(submission.s3_file())
         structured_data = parse_structured_data(file, portal=submission.portal_vapp,
                                                 submission=submission,
                                                 ref_nocache=submission.ref_nocache,
-                                                novalidate=submission.validate_skip)
+                                                novalidate=submission.validate_skip,
+                                                bulk_compare=submission.bulk_compare,
+                                                profile=profile)
         if (errors := structured_data.errors):
             submission.record_results(errors, _summarize_errors(structured_data, submission))
             # If there are data validation errors then trigger an exception so that a traceback.txt
@@ -53,7 +75,7 @@ def _process_submission(submission: SmahtSubmissionFolio) -> None:
             # this (traceback.txt) is done in snovault.types.ingestion.SubmissionFolio.processing_context.
             # raise Exception(validation_errors)
             return
-        load_data_response = load_data_into_database(
+        load_data_kwargs = dict(
             submission_uuid=submission.id,
             nrows=structured_data.nrows,
             data=structured_data.data,
@@ -61,17 +83,154 @@ def _process_submission(submission: SmahtSubmissionFolio) -> None:
             post_only=submission.post_only,
             patch_only=submission.patch_only,
             validate_only=submission.validate_only,
-            resolved_refs=(structured_data.resolved_refs if submission.validate_only else None))
+            resolved_refs=(structured_data.resolved_refs if submission.validate_only else None),
+            profile=profile)
+        if submission.loadxl_workers > 1:
+            load_data_response = load_data_into_database_concurrently(**load_data_kwargs,
+                                                                      max_workers=submission.loadxl_workers)
+        else:
+            load_data_response = load_data_into_database(**load_data_kwargs)
         load_data_summary = summary_of_load_data_results(load_data_response, submission)
         submission.record_results(load_data_response, load_data_summary)
 
 
+def _process_submission_streaming(submission: SmahtSubmissionFolio,
+                                  profile: Optional[IngestionProfile] = None) -> None:
+    """
+    Streaming variant of _process_submission (enabled via the streaming submission parameter); rather
+    than parsing, diffing, validating, and then loading the entire submission in strict serial phases,
+    processes the submission one item type at a time, so only (roughly) one type need be in memory at a
+    time. This is done in two passes over the file. The first parses, diffs, and validates each type, in
+    ITEM_INDEX_ORDER order; references (linkTo) are checked only once every type has been parsed, so those
+    to items of types which come later in the file resolve (internally) as for _process_submission. Only
+    if there are no errors does the second pass parse and load each type; this is done in dependency order
+    (see get_loadxl_dependency_levels), a type group (of mutually dependent types) at a time, so that every
+    item is loaded after any items (of other types) which it references. As with _process_submission,
+    nothing is loaded if there are any errors; the cost of bounding the memory used is parsing the file twice.
+    """
+    profile = profile or IngestionProfile()
+    ingestion_status = IngestionStatusCache.connection(submission.id, submission.portal_vapp)
+    with ExitStack() as context:
+        with profile.phase("s3_fetch"):
+            file = context.enter_context(submission.s3_file())
+        ingestion_status.update({PROGRESS_INGESTER.PARSE_LOAD_INITIATE: PROGRESS_INGESTER.NOW()})
+        structured_data, reference_cache_stats = _streaming_structured_data(submission, ITEM_INDEX_ORDER, profile)
+        # N.B. The no-diff items are found (by comparison with the database) on this first pass only,
+        # and are pruned using this same set on the second pass, so that the two passes agree.
+        no_diff_items = set()
+        load_type_names = []
+        for type_name in _stream_types(structured_data, file, submission, no_diff_items, compare=True,
+                                       validate=not submission.validate_skip, profile=profile):
+            if structured_data.data.get(type_name):
+                load_type_names.append(type_name)
+        if reference_cache_stats:
+            ingestion_status.update(reference_cache_stats.as_dict())
+        if (errors := structured_data.errors):
+            ingestion_status.update({PROGRESS_INGESTER.PARSE_LOAD_DONE: PROGRESS_INGESTER.NOW()})
+            submission.record_results(errors, _summarize_errors(structured_data, submission))
+            return
+        nrows = structured_data.nrows
+        resolved_refs = structured_data.resolved_refs if submission.validate_only else None
+        type_groups = [type_group for type_groups in get_loadxl_dependency_levels(
+            {type_name: [] for type_name in load_type_names}, structured_data.portal) for type_group in type_groups]
+        type_group_by_type_name = {type_name: type_group for type_group in type_groups for type_name in type_group}
+        # Every type is valid; now parse each type again, in dependency order, and load each type group
+        # once all of its types have been parsed (already validated, so not again).
+        structured_data, _ = _streaming_structured_data(
+            submission, [type_name for type_group in type_groups for type_name in type_group], profile)
+        progress = define_shared_progress_tracker(submission.id, validation=submission.validate_only,
+                                                  total=nrows, nloads=len(type_groups),
+                                                  vapp=submission.portal_vapp)
+        load_data_responses = []
+
+        def load_type_group(data: dict) -> None:
+            load_data_responses.append(load_data_into_database(
+                submission_uuid=submission.id,
+                nrows=nrows,
+                data=data,
+                portal_vapp=submission.portal_vapp,
+                post_only=submission.post_only,
+                patch_only=submission.patch_only,
+                validate_only=submission.validate_only,
+                resolved_refs=resolved_refs,
+                progress=progress,
+                profile=profile,
+                record_status=False))
+
+        ingestion_status.update({PROGRESS_INGESTER.LOADXL_INITIATE: PROGRESS_INGESTER.NOW()})
+        try:
+            type_group_data = {}
+            for type_name in _stream_types(structured_data, file, submission, no_diff_items, compare=False,
+                                           validate=False, profile=profile):
+                if not (type_data := structured_data.data.get(type_name)) or not (
+                        type_group := type_group_by_type_name.get(type_name)):
+                    continue
+                # N.B. Copied since the data of a type is reduced to identifying stubs once handed off.
+                type_group_data[type_name] = list(type_data)
+                if all(type_name in type_group_data for type_name in type_group):
+                    load_type_group(type_group_data)
+                    type_group_data = {}
+            if type_group_data:  # Should not happen; i.e. types of a group not all parsed again.
+                load_type_group(type_group_data)
+        finally:
+            progress.finish()
+        ingestion_status.update({PROGRESS_INGESTER.LOADXL_DONE: PROGRESS_INGESTER.NOW()})
+        ingestion_status.update({PROGRESS_INGESTER.PARSE_LOAD_DONE: PROGRESS_INGESTER.NOW()})
+        load_data_response = merge_load_data_results(load_data_responses)
+        load_data_summary = summary_of_load_data_results(load_data_response, submission)
+        submission.record_results(load_data_response, load_data_summary)
+
+
+def _streaming_structured_data(submission: SmahtSubmissionFolio, order: List[str],
+                               profile: IngestionProfile) -> Tuple[StreamingStructuredDataSet,
+                                                                   Optional[ReferenceCacheStats]]:
+    ingestion_status = IngestionStatusCache.connection(submission.id, submission.portal_vapp)
+    structured_data = StreamingStructuredDataSet(portal=submission.portal_vapp,
+                                                 autoadd=submission.autoadd,
+                                                 ref_lookup_nocache=submission.ref_nocache,
+                                                 order=order,
+                                                 merge=submission.merge,
+                                                 excel_class=CustomExcel,
+                                                 progress=ingestion_status.update,
+                                                 debug_sleep=submission.debug_sleep)
+    reference_cache_stats = _install_ref_lookup_extensions(structured_data, submission,
+                                                           ref_nocache=submission.ref_nocache, profile=profile)
+    return structured_data, reference_cache_stats
+
+
+def _stream_types(structured_data: StreamingStructuredDataSet, file: str, submission: SmahtSubmissionFolio,
+                  no_diff_items: Set[str], compare: bool, validate: bool,
+                  profile: IngestionProfile) -> Generator[str, None, None]:
+    """
+    Yields the name of each type of the given streaming data set, in turn, parsed and pruned of the
+    given no-diff items, first adding to these (by comparison) if so specified, and validated if so
+    specified; during the yield the data property contains only that type.
+    """
+    type_names = structured_data.load_types(file)
+    while True:
+        # N.B. Iterating explicitly so the parse phase (of each type) can be timed.
+        with profile.phase("parse"):
+            if (type_name := next(type_names, None)) is None:
+                break
+        if compare:
+            with profile.phase("compare"):
+                no_diff_items.update(prune_no_diff_items(structured_data, bulk=submission.bulk_compare))
+        else:
+            prune_no_diff_items(structured_data, no_diff_items=no_diff_items)
+        if validate:
+            with profile.phase("validate"):
+                structured_data.validate(force=True)
+        yield type_name
+
+
 def parse_structured_data(file: str,
                           submission: SubmissionFolio,
                           ref_nocache: bool = False,
                           prune: bool = True,
                           novalidate: bool = False,
-                          portal: Optional[Portal] = None) -> StructuredDataSet:
+                          portal: Optional[Portal] = None,
+                          bulk_compare: bool = False,
+                          profile: Optional[IngestionProfile] = None) -> StructuredDataSet:
 
     def structured_data_set_progress(status: dict) -> None:
         nonlocal ingestion_status
@@ -79,20 +238,49 @@ def parse_structured_data(file: str,
         # structured_data_set_status = {"ingester_parse_" + key: value for key, value in status.items()}
         # ingestion_status.update(structured_data_set_status)
 
+    profile = profile or IngestionProfile()
     ingestion_status = IngestionStatusCache.connection(submission.id, submission.portal_vapp)
     ingestion_status.update({PROGRESS_INGESTER.PARSE_LOAD_INITIATE: PROGRESS_INGESTER.NOW()})
 
-    structured_data = StructuredDataSet.load(file=file,
-                                             portal=submission.portal_vapp,
-                                             autoadd=submission.autoadd,
-                                             ref_lookup_nocache=ref_nocache,
-                                             order=ITEM_INDEX_ORDER, prune=prune,
-                                             merge=submission.merge,
-                                             excel_class=CustomExcel,
-                                             progress=structured_data_set_progress,
-                                             debug_sleep=submission.debug_sleep if submission else None)
+    structured_data = StructuredDataSet(portal=submission.portal_vapp,
+                                        autoadd=submission.autoadd,
+                                        ref_lookup_nocache=ref_nocache,
+                                        order=ITEM_INDEX_ORDER, prune=prune,
+                                        merge=submission.merge,
+                                        excel_class=CustomExcel,
+                                        progress=structured_data_set_progress,
+                                        debug_sleep=submission.debug_sleep if submission else None)
+    reference_cache_stats = _install_ref_lookup_extensions(structured_data, submission,
+                                                           ref_nocache=ref_nocache, profile=profile)
+    with profile.phase("parse"):
+        structured_data.load_file(file)
+    if reference_cache_stats:
+        ingestion_status.update(reference_cache_stats.as_dict())
 
     # Check for diffs and remove any items (excluding SubmittedFile items) without any substantial changes
+    with profile.phase("compare"):
+        prune_no_diff_items(structured_data, bulk=bulk_compare)
+
+    ingestion_status.update({PROGRESS_INGESTER.PARSE_LOAD_DONE: PROGRESS_INGESTER.NOW()})
+
+    if not novalidate:
+        ingestion_status.update({PROGRESS_INGESTER.VALIDATE_LOAD_INITIATE: PROGRESS_INGESTER.NOW()})
+        with profile.phase("validate"):
+            structured_data.validate()
+        ingestion_status.update({PROGRESS_INGESTER.VALIDATE_LOAD_DONE: PROGRESS_INGESTER.NOW()})
+
+    return structured_data
+
+
+def prune_no_diff_items(structured_data: StructuredDataSet, bulk: bool = False,
+                        no_diff_items: Optional[Set[str]] = None) -> Set[str]:
+    """
+    Removes from the given StructuredDataSet (in place) any items (excluding
+    SubmittedFile items) which do not have any substantial changes, and returns their
+    submitted_ids. If bulk is True then the (search based) bulk comparison is used; see
+    bulk_compare.get_no_diff_items_bulk. If no_diff_items is given then these are the items
+    removed, without any comparison (e.g. as already found for the same data).
+    """
     submittable_file_item_types = [
         "AlignedReads",
         "UnalignedReads",
@@ -101,21 +289,52 @@ def parse_structured_data(file: str,
         "HistologyImage"
     ]
 
-    no_diff_items = get_no_diff_items(structured_data)
+    if no_diff_items is None:
+        no_diff_items = get_no_diff_items_bulk(structured_data) if bulk else get_no_diff_items(structured_data)
     for object_type in structured_data.data:
-        structured_data.data[object_type] = [
+        # N.B. Modify the list in place as the data may be a view (see StreamingStructuredDataSet.data).
+        structured_data.data[object_type][:] = [
             item for item in structured_data.data[object_type]
             if item.get('submitted_id') not in no_diff_items or object_type in submittable_file_item_types
         ]
+    return no_diff_items
 
-    ingestion_status.update({PROGRESS_INGESTER.PARSE_LOAD_DONE: PROGRESS_INGESTER.NOW()})
 
-    if not novalidate:
-        ingestion_status.update({PROGRESS_INGESTER.VALIDATE_LOAD_INITIATE: PROGRESS_INGESTER.NOW()})
-        structured_data.validate()
-        ingestion_status.update({PROGRESS_INGESTER.VALIDATE_LOAD_DONE: PROGRESS_INGESTER.NOW()})
+def _install_ref_lookup_extensions(structured_data: StructuredDataSet, submission: SmahtSubmissionFolio,
+                                   ref_nocache: bool = False,
+                                   profile: Optional[IngestionProfile] = None) -> Optional[ReferenceCacheStats]:
+    """
+    Installs the given profile lookup timing, and the process-wide (cross-submission) reference cache (unless
+    reference caching is disabled), into the reference lookup of the given StructuredDataSet; returns the
+    reference cache stats for this submission, i.e. the number of lookups saved (if reference caching).
+    """
+    if not structured_data.portal:
+        return None
+    if profile:
+        # N.B. Installed first so only lookups not satisfied by the reference cache are timed.
+        structured_data.portal.ref_lookup = profile.timed_lookup_function(structured_data.portal.ref_lookup)
+    if ref_nocache:
+        return None
+    try:
+        return ReferenceCache.instance(submission.portal_vapp).install(structured_data.portal)
+    except Exception as e:
+        # N.B. The reference cache is only an optimization; lookups still work (uncached) without it.
+        _log.warning(f"Cannot install ingestion reference cache for submission: {submission.id}: {e}")
+        return None
 
-    return structured_data
+
+def _record_profile(submission: SmahtSubmissionFolio, profile: IngestionProfile) -> None:
+    """
+    Records the given ingestion profile to S3 (alongside the submission results) and to
+    the ingestion-status, from where it is available via the /ingestion-status endpoint.
+    """
+    profile.finish()
+    profile = profile.as_dict()
+    IngestionStatusCache.connection(submission.id, submission.portal_vapp).update({"ingester_profile": profile})
+    try:
+        submission.record_profile(profile)
+    except Exception as e:
+        _log.warning(f"Cannot record ingestion profile for submission: {submission.id}: {e}")
 
 
 def get_no_diff_items(structured_data: StructuredDataSet) -> set:
@@ -168,3 +387,6 @@ def _is_accession_id(value: str) -> bool:
     # See schema_formats.py
     # TODO: Problem with circular dependencies.
     return isinstance(value, str) and re.match(r"^SMA[1-9A-Z]{9}$", value) is not None
+
+
+_log = get_logger(__name__)
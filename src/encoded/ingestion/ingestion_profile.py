@@ -0,0 +1,124 @@
+from contextlib import contextmanager
+import heapq
+import threading
+import time
+from typing import Callable, Generator, List, Optional
+from dcicutils.submitr.progress_constants import PROGRESS_LOADXL
+
+
+class IngestionProfile:
+    """
+    Structured timing profile for a single metadata bundle ingestion (see handle_metadata_bundle);
+    records per-phase wall time (S3 fetch, parse, compare, validate, loadxl rounds), per-item-type
+    counts and latencies (from loadxl), and the slowest N items and (reference) lookups. This gets
+    written to S3 alongside the submission results and to the ingestion-status (IngestionStatusCache).
+    Thread-safe as loadxl may run concurrently; see loadxl_extensions.load_data_into_database_concurrently.
+    """
+    SLOWEST_COUNT = 20
+
+    def __init__(self, slowest_count: int = SLOWEST_COUNT) -> None:
+        self._lock = threading.Lock()
+        self._slowest_count = slowest_count
+        self._started = time.time()
+        self._finished = None
+        self._phases = {}
+        self._types = {}
+        self._slowest_items = []
+        self._slowest_lookups = []
+        self._lookup_count = 0
+        self._lookup_seconds = 0.0
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None, None, None]:
+        started = time.time()
+        try:
+            yield
+        finally:
+            self.record_phase(name, time.time() - started)
+
+    def record_phase(self, name: str, seconds: float) -> None:
+        # N.B. Phases may occur more than once (e.g. per type for streaming or concurrent loading).
+        with self._lock:
+            phase = self._phases.setdefault(name, {"count": 0, "seconds": 0.0})
+            phase["count"] += 1
+            phase["seconds"] += seconds
+
+    def record_item(self, type_name: str, action: str, identifier: str, seconds: float) -> None:
+        with self._lock:
+            item_type = self._types.setdefault(type_name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            item_type["count"] += 1
+            item_type["seconds"] += seconds
+            item_type["max_seconds"] = max(item_type["max_seconds"], seconds)
+            item_type[action] = item_type.get(action, 0) + 1
+            self._push_slowest(self._slowest_items,
+                               seconds, {"type": type_name, "action": action, "identifier": identifier})
+
+    def record_lookup(self, path: str, seconds: float) -> None:
+        with self._lock:
+            self._lookup_count += 1
+            self._lookup_seconds += seconds
+            self._push_slowest(self._slowest_lookups, seconds, {"path": path})
+
+    def timed_lookup_function(self, lookup: Callable) -> Callable:
+        """
+        Returns the given (dcicutils.structured_data.Portal.ref_lookup) lookup function wrapped
+        so that the time of each (reference) lookup is recorded in this profile.
+        """
+        def timed_lookup(path: str) -> Optional[dict]:
+            started = time.time()
+            try:
+                return lookup(path)
+            finally:
+                self.record_lookup(path, time.time() - started)
+        return timed_lookup
+
+    def loadxl_progress_tracker(self, progress: Optional[Callable]) -> Callable:
+        """
+        Returns the given loadxl progress tracker wrapped so that the wall time of each of the
+        loadxl rounds is recorded in this profile (from the loadxl start/second-round/done events).
+        """
+        round_started = None
+        def loadxl_progress(event: PROGRESS_LOADXL) -> None:  # noqa
+            nonlocal round_started
+            if event == PROGRESS_LOADXL.START:
+                round_started = time.time()
+            elif event in [PROGRESS_LOADXL.START_SECOND_ROUND, PROGRESS_LOADXL.DONE] and round_started:
+                now = time.time()
+                self.record_phase("loadxl_first_round" if event == PROGRESS_LOADXL.START_SECOND_ROUND
+                                  else "loadxl_second_round", now - round_started)
+                round_started = now if event == PROGRESS_LOADXL.START_SECOND_ROUND else None
+            if callable(progress):
+                progress(event)
+        return loadxl_progress
+
+    def finish(self) -> None:
+        self._finished = time.time()
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            finished = self._finished or time.time()
+            return {
+                "seconds": round(finished - self._started, 3),
+                "phases": {name: {"count": phase["count"], "seconds": round(phase["seconds"], 3)}
+                           for name, phase in self._phases.items()},
+                "types": {name: {**item_type,
+                                 "seconds": round(item_type["seconds"], 3),
+                                 "max_seconds": round(item_type["max_seconds"], 3),
+                                 "average_seconds": round(item_type["seconds"] / item_type["count"], 3)}
+                          for name, item_type in self._types.items()},
+                "lookups": {"count": self._lookup_count, "seconds": round(self._lookup_seconds, 3)},
+                "slowest_items": self._slowest(self._slowest_items),
+                "slowest_lookups": self._slowest(self._slowest_lookups)
+            }
+
+    def _push_slowest(self, slowest: List, seconds: float, value: dict) -> None:
+        # Min-heap of the N slowest; the id is only a tiebreaker so that dictionaries are never compared.
+        entry = (seconds, id(value), value)
+        if len(slowest) < self._slowest_count:
+            heapq.heappush(slowest, entry)
+        elif seconds > slowest[0][0]:
+            heapq.heapreplace(slowest, entry)
+
+    @staticmethod
+    def _slowest(slowest: List) -> List[dict]:
+        return [{**value, "seconds": round(seconds, 3)} for seconds, _, value in sorted(slowest, reverse=True)]
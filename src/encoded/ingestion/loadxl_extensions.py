@@ -1,11 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 import re
-from typing import Callable, Dict, List, Generator, Optional, Tuple, Union
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Generator, Optional, Set, Tuple, Union
 from dcicutils.misc_utils import VirtualApp
 from dcicutils.submitr.progress_constants import PROGRESS_INGESTER, PROGRESS_LOADXL
 from dcicutils.structured_data import Portal
 from snovault.loadxl import load_all_gen as loadxl
 from encoded.ingestion.submission_folio import SmahtSubmissionFolio
+from encoded.ingestion.ingestion_profile import IngestionProfile
 from encoded.ingestion.ingestion_status_cache import IngestionStatusCache
+from encoded.project.loadxl import ITEM_INDEX_ORDER
 
 
 def load_data_into_database(submission_uuid: str,
@@ -15,10 +21,16 @@ def load_data_into_database(submission_uuid: str,
                             post_only: bool = False,
                             patch_only: bool = False,
                             validate_only: bool = False,
-                            resolved_refs: List[str] = None) -> Dict:
+                            resolved_refs: List[str] = None,
+                            progress: Optional[Callable] = None,
+                            profile: Optional[IngestionProfile] = None,
+                            record_status: bool = True) -> Dict:
 
+    # N.B. The record_status argument is False when this is one of several calls making up a single
+    # load (see SharedProgressTracker), in which case the caller records the LOADXL_INITIATE/DONE status.
     ingestion_status = IngestionStatusCache.connection(submission_uuid, portal_vapp)
-    ingestion_status.update({PROGRESS_INGESTER.LOADXL_INITIATE: PROGRESS_INGESTER.NOW()})
+    if record_status:
+        ingestion_status.update({PROGRESS_INGESTER.LOADXL_INITIATE: PROGRESS_INGESTER.NOW()})
 
     def package_loadxl_response(loadxl_response: Generator[bytes, None, None]) -> Dict:
         nonlocal portal_vapp
@@ -27,7 +39,11 @@ def load_data_into_database(submission_uuid: str,
         LOADXL_RESPONSE_PATTERN = re.compile(r"^([A-Z]+):\s*([a-zA-Z\/\d_-]+)\s*(\S+)\s*(\S+)?\s*(.*)$")
         LOADXL_ACTION_NAME = {"POST": "created", "PATCH": "updated", "SKIP": "skipped", "CHECK": "validated", "ERROR": "errors"}
         response = {value: [] for value in LOADXL_ACTION_NAME.values()}
+        # For the profile, the time for each item is taken to be the time since the previous item.
+        item_started = time.time()
         for item in loadxl_response:
+            now = time.time()
+            item_seconds, item_started = now - item_started, now
             # ASSUME each item in the loadxl response looks something like one of (string or bytes):
             # POST: beefcafe-01ce-4e61-be5d-cd04401dff29 FileFormat
             # PATCH: deadbabe-7b4f-4923-824b-d0864a689bb Software
@@ -67,6 +83,8 @@ def load_data_into_database(submission_uuid: str,
                 identifying_value = match.group(2)
                 item_type = match.group(3)
                 response_value = {"uuid": identifying_value, "type": item_type}
+                if profile:
+                    profile.record_item(item_type, action, identifying_value, item_seconds)
                 if match.re.groups >= 4 and (file := match.group(4)) and (action in ["updated", "created"]):
                     # Get filename info if applicable (i.e if this is a File type or sub-type).
                     try:
@@ -100,72 +118,10 @@ def load_data_into_database(submission_uuid: str,
         )
         return response
 
-    def define_progress_tracker(submission_uuid: str, validation: bool, total: int,
-                                vapp: Optional[VirtualApp] = None) -> Optional[Callable]:
-        nonlocal ingestion_status
-        progress_status_datetime_values = [PROGRESS_LOADXL.START,
-                                           PROGRESS_LOADXL.START_SECOND_ROUND,
-                                           PROGRESS_LOADXL.DONE]
-        progress_status_string_values = [PROGRESS_LOADXL.MESSAGE,
-                                         PROGRESS_LOADXL.MESSAGE_VERBOSE,
-                                         PROGRESS_LOADXL.MESSAGE_DEBUG]
-        progress_status = {}
-        for progress_status_enum in PROGRESS_LOADXL.values():
-            if ((progress_status_enum in progress_status_datetime_values) or
-                (progress_status_enum in progress_status_string_values)):  # noqa
-                progress_status[progress_status_enum] = None
-            else:
-                progress_status[progress_status_enum] = 0
-        progress_status = {**progress_status,
-                           PROGRESS_LOADXL.TOTAL: total,
-                           PROGRESS_INGESTER.VALIDATION: validation}
-        def progress_tracker(progress: PROGRESS_LOADXL) -> None:  # noqa
-            nonlocal progress_status
-            def progress_message() -> None:  # noqa
-                # Just a convenience/courtesy so the consumer (smaht-submitr) doesn't have to cobble
-                # together a status message; but the data is still there of course if they want/need to.
-                nonlocal progress_status, total, validate_only
-                processed = progress_status[PROGRESS_LOADXL.ITEM]
-                gets = progress_status[PROGRESS_LOADXL.GET]
-                posts = progress_status[PROGRESS_LOADXL.POST]
-                patches = progress_status[PROGRESS_LOADXL.PATCH]
-                errors = progress_status[PROGRESS_LOADXL.ERROR]
-                started_second_round = progress_status[PROGRESS_LOADXL.START_SECOND_ROUND]
-                processed_second_round = progress_status[PROGRESS_LOADXL.ITEM_SECOND_ROUND]
-                done = progress_status[PROGRESS_LOADXL.DONE]
-                message = f"Items: {total}"
-                if started_second_round is not None:
-                    # We call the first round verified/preprocessed and the second validated/processed.
-                    if done is not None:
-                        message += (f" | {'Validated' if validate_only else 'Processed'}:"
-                                    f" {max(processed, processed_second_round)}")
-                    else:
-                        message += f" | {'Validated' if validate_only else 'Processed'}: {processed_second_round}"
-                elif processed > 0:
-                    message += f" | {'Verified' if validate_only else 'Preprocessed'}: {processed}"
-                message_verbose = message
-                if posts > 0:
-                    message_verbose += f" | {'Posts' if validate_only else 'Creates'}: {posts}"
-                if patches > 0:
-                    message_verbose += f" | {'Patches' if validate_only else 'Updates'}: {patches}"
-                if gets > 0:
-                    message_verbose += f" | Lookups: {gets}"
-                if errors > 0:
-                    message += (message_errors := f" | Errors: {errors}")
-                    message_verbose += message_errors
-                message_debug = message_verbose  # TODO
-                return message, message_verbose, message_debug
-            # Here is the actual count increment for the loadxl event.
-            if progress in progress_status_datetime_values:
-                progress_status[progress] = PROGRESS_LOADXL.NOW()
-            elif progress not in progress_status_string_values:
-                progress_status[progress] += 1
-            message, message_verbose, message_debug = progress_message()
-            ingestion_status.update({**progress_status,
-                                     PROGRESS_LOADXL.MESSAGE: message,
-                                     PROGRESS_LOADXL.MESSAGE_VERBOSE: message_verbose,
-                                     PROGRESS_LOADXL.MESSAGE_DEBUG: message_debug})
-        return progress_tracker
+    if not progress:
+        progress = define_progress_tracker(submission_uuid, validation=validate_only, total=nrows, vapp=portal_vapp)
+    if profile:
+        progress = profile.loadxl_progress_tracker(progress)
 
     loadxl_response = loadxl(
         testapp=portal_vapp,
@@ -182,15 +138,276 @@ def load_data_into_database(submission_uuid: str,
         skip_links=True,
         # 2025-02-12: Added noset_last_modified; non-admin user error on setting last_modified (willr confirmed).
         noset_last_modified=True,
-        progress=define_progress_tracker(submission_uuid, validation=validate_only, total=nrows, vapp=portal_vapp))
+        progress=progress)
 
     loadxl_response = package_loadxl_response(loadxl_response)
 
-    ingestion_status.update({PROGRESS_INGESTER.LOADXL_DONE: PROGRESS_INGESTER.NOW()})
+    if record_status:
+        ingestion_status.update({PROGRESS_INGESTER.LOADXL_DONE: PROGRESS_INGESTER.NOW()})
 
     return loadxl_response
 
 
+def load_data_into_database_concurrently(submission_uuid: str,
+                                         data: Dict[str, List[Dict]],
+                                         portal_vapp: VirtualApp,
+                                         nrows: Optional[int] = None,
+                                         post_only: bool = False,
+                                         patch_only: bool = False,
+                                         validate_only: bool = False,
+                                         resolved_refs: List[str] = None,
+                                         max_workers: int = 4,
+                                         profile: Optional[IngestionProfile] = None) -> Dict:
+    """
+    Same as load_data_into_database but loads item types which do not depend on each other (via linkTo)
+    concurrently, with a bounded pool of worker threads, each with its own VirtualApp, and so its own
+    request/transaction and DB session. The types are partitioned into dependency levels (see
+    get_loadxl_dependency_levels); the levels are loaded in order, and the type groups within each
+    level are loaded concurrently. A single (thread-safe) SharedProgressTracker is shared across all
+    workers so the progress seen by smaht-submitr is the same as for load_data_into_database.
+    """
+    ingestion_status = IngestionStatusCache.connection(submission_uuid, portal_vapp)
+    ingestion_status.update({PROGRESS_INGESTER.LOADXL_INITIATE: PROGRESS_INGESTER.NOW()})
+    levels = get_loadxl_dependency_levels(data, Portal(portal_vapp))
+    progress = define_shared_progress_tracker(submission_uuid, validation=validate_only, total=nrows,
+                                              nloads=sum(len(type_groups) for type_groups in levels),
+                                              vapp=portal_vapp)
+    load_data_responses = []
+    try:
+        for type_groups in levels:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(type_groups)))) as executor:
+                futures = [executor.submit(load_data_into_database,
+                                           submission_uuid=submission_uuid,
+                                           data={type_name: data[type_name] for type_name in type_group},
+                                           portal_vapp=VirtualApp(portal_vapp.app,
+                                                                  portal_vapp.wrapped_app.extra_environ),
+                                           nrows=nrows,
+                                           post_only=post_only,
+                                           patch_only=patch_only,
+                                           validate_only=validate_only,
+                                           resolved_refs=resolved_refs,
+                                           progress=progress,
+                                           profile=profile,
+                                           record_status=False) for type_group in type_groups]
+                load_data_responses.extend(future.result() for future in futures)
+    finally:
+        progress.finish()
+    ingestion_status.update({PROGRESS_INGESTER.LOADXL_DONE: PROGRESS_INGESTER.NOW()})
+    return merge_load_data_results(load_data_responses)
+
+
+def get_loadxl_dependency_levels(data: Dict[str, List[Dict]], portal: Portal) -> List[List[List[str]]]:
+    """
+    Returns the item types of the given (submission) data partitioned into dependency levels; each level
+    is a list of type groups, where each type group is a list of types; no type group in a level depends
+    (via linkTo, including to super types) on another type group in that level or in a later level; so the
+    levels must be loaded in order but the type groups within a level may be loaded concurrently. Types
+    which (transitively) depend on each other are in the same type group, so each group may be loaded by
+    a single (two-round) loadxl call; types within a group (and groups within a level) are ordered by
+    ITEM_INDEX_ORDER.
+    """
+    order = {_snake_to_camel_case(type_name): index for index, type_name in enumerate(ITEM_INDEX_ORDER)}
+    type_names = sorted(data.keys(), key=lambda type_name: order.get(type_name, sys.maxsize))
+    dependencies = {}
+    for type_name in type_names:
+        link_tos = _get_schema_link_tos(portal.get_schema(type_name))
+        dependencies[type_name] = {
+            other_type_name for other_type_name in type_names if other_type_name != type_name and
+            ({other_type_name} | set(portal.get_schema_super_type_names(other_type_name))) & link_tos
+        }
+    def reachable(type_name: str) -> Set[str]:  # noqa
+        result, stack = set(), [type_name]
+        while stack:
+            for dependency in dependencies[stack.pop()]:
+                if dependency not in result:
+                    result.add(dependency)
+                    stack.append(dependency)
+        return result
+    reachables = {type_name: reachable(type_name) for type_name in type_names}
+    # Group types which depend (transitively) on each other (strongly connected components).
+    groups = []
+    for type_name in type_names:
+        if not any(type_name in group for group in groups):
+            groups.append([other_type_name for other_type_name in type_names
+                           if other_type_name == type_name or
+                           (other_type_name in reachables[type_name] and type_name in reachables[other_type_name])])
+    levels = {}
+    def group_level(group: List[str]) -> int:  # noqa
+        if (key := tuple(group)) not in levels:
+            dependency_groups = [other_group for other_group in groups if other_group is not group and
+                                 any(dependency in other_group for type_name in group
+                                     for dependency in dependencies[type_name])]
+            levels[key] = 1 + max([group_level(other_group) for other_group in dependency_groups], default=-1)
+        return levels[key]
+    result = []
+    for group in groups:
+        while len(result) <= (level := group_level(group)):
+            result.append([])
+        result[level].append(group)
+    return result
+
+
+def _get_schema_link_tos(schema: Optional[dict]) -> Set[str]:
+    link_tos = set()
+    if isinstance(schema, dict):
+        if link_to := schema.get("linkTo"):
+            link_tos.update(link_to if isinstance(link_to, list) else [link_to])
+        for property_name, property_schema in (schema.get("properties") or {}).items():
+            if isinstance(property_schema, dict) and not property_schema.get("calculatedProperty"):
+                link_tos.update(_get_schema_link_tos(property_schema))
+        if isinstance(items := schema.get("items"), dict):
+            link_tos.update(_get_schema_link_tos(items))
+    return link_tos
+
+
+def _snake_to_camel_case(value: str) -> str:
+    return "".join(component.capitalize() for component in value.split("_"))
+
+
+def define_progress_tracker(submission_uuid: str, validation: bool, total: int,
+                            vapp: Optional[VirtualApp] = None) -> Optional[Callable]:
+    """
+    Returns a snovault.loadxl progress callback which accumulates loadxl event counts and writes them,
+    along with summary messages, to the IngestionStatusCache for the given submission (for smaht-submitr).
+    """
+    ingestion_status = IngestionStatusCache.connection(submission_uuid, vapp)
+    validate_only = validation
+    # N.B. Locked since this may be shared across worker threads; see load_data_into_database_concurrently.
+    progress_lock = threading.Lock()
+    progress_status_datetime_values = [PROGRESS_LOADXL.START,
+                                       PROGRESS_LOADXL.START_SECOND_ROUND,
+                                       PROGRESS_LOADXL.DONE]
+    progress_status_string_values = [PROGRESS_LOADXL.MESSAGE,
+                                     PROGRESS_LOADXL.MESSAGE_VERBOSE,
+                                     PROGRESS_LOADXL.MESSAGE_DEBUG]
+    progress_status = {}
+    for progress_status_enum in PROGRESS_LOADXL.values():
+        if ((progress_status_enum in progress_status_datetime_values) or
+            (progress_status_enum in progress_status_string_values)):  # noqa
+            progress_status[progress_status_enum] = None
+        else:
+            progress_status[progress_status_enum] = 0
+    progress_status = {**progress_status,
+                       PROGRESS_LOADXL.TOTAL: total,
+                       PROGRESS_INGESTER.VALIDATION: validation}
+    def progress_tracker(progress: PROGRESS_LOADXL) -> None:  # noqa
+        nonlocal progress_status
+        def progress_message() -> None:  # noqa
+            # Just a convenience/courtesy so the consumer (smaht-submitr) doesn't have to cobble
+            # together a status message; but the data is still there of course if they want/need to.
+            nonlocal progress_status
+            processed = progress_status[PROGRESS_LOADXL.ITEM]
+            gets = progress_status[PROGRESS_LOADXL.GET]
+            posts = progress_status[PROGRESS_LOADXL.POST]
+            patches = progress_status[PROGRESS_LOADXL.PATCH]
+            errors = progress_status[PROGRESS_LOADXL.ERROR]
+            started_second_round = progress_status[PROGRESS_LOADXL.START_SECOND_ROUND]
+            processed_second_round = progress_status[PROGRESS_LOADXL.ITEM_SECOND_ROUND]
+            done = progress_status[PROGRESS_LOADXL.DONE]
+            message = f"Items: {total}"
+            if started_second_round is not None:
+                # We call the first round verified/preprocessed and the second validated/processed.
+                if done is not None:
+                    message += (f" | {'Validated' if validate_only else 'Processed'}:"
+                                f" {max(processed, processed_second_round)}")
+                else:
+                    message += f" | {'Validated' if validate_only else 'Processed'}: {processed_second_round}"
+            elif processed > 0:
+                message += f" | {'Verified' if validate_only else 'Preprocessed'}: {processed}"
+            message_verbose = message
+            if posts > 0:
+                message_verbose += f" | {'Posts' if validate_only else 'Creates'}: {posts}"
+            if patches > 0:
+                message_verbose += f" | {'Patches' if validate_only else 'Updates'}: {patches}"
+            if gets > 0:
+                message_verbose += f" | Lookups: {gets}"
+            if errors > 0:
+                message += (message_errors := f" | Errors: {errors}")
+                message_verbose += message_errors
+            message_debug = message_verbose  # TODO
+            return message, message_verbose, message_debug
+        with progress_lock:
+            # Here is the actual count increment for the loadxl event.
+            if progress in progress_status_datetime_values:
+                progress_status[progress] = PROGRESS_LOADXL.NOW()
+            elif progress not in progress_status_string_values:
+                progress_status[progress] += 1
+            message, message_verbose, message_debug = progress_message()
+            ingestion_status.update({**progress_status,
+                                     PROGRESS_LOADXL.MESSAGE: message,
+                                     PROGRESS_LOADXL.MESSAGE_VERBOSE: message_verbose,
+                                     PROGRESS_LOADXL.MESSAGE_DEBUG: message_debug})
+    return progress_tracker
+
+
+def define_shared_progress_tracker(submission_uuid: str, validation: bool, total: int, nloads: int,
+                                   vapp: Optional[VirtualApp] = None) -> "SharedProgressTracker":
+    """
+    Same as define_progress_tracker but for sharing across the given number of separate loadxl calls
+    (e.g. one per item type for streaming, or per type group for concurrent loading); see SharedProgressTracker.
+    """
+    return SharedProgressTracker(define_progress_tracker(submission_uuid, validation=validation,
+                                                         total=total, vapp=vapp), nloads=nloads)
+
+
+class SharedProgressTracker:
+    """
+    Wraps a (define_progress_tracker) loadxl progress callback which is shared across the given number of
+    separate loadxl calls, each of which emits its own START, START_SECOND_ROUND, and DONE events; these
+    are aggregated so that smaht-submitr sees each just once, as for a single loadxl call: START from the
+    first call, START_SECOND_ROUND once every call has finished its first round, and DONE once every call
+    is done. The finish method should be called when all loads are complete, in case (e.g. on exception)
+    some call did not emit all of its events; DONE is then emitted if it has not been already.
+    """
+
+    def __init__(self, progress: Callable, nloads: int) -> None:
+        self._progress = progress
+        self._nloads = max(nloads, 1)
+        self._counts = {PROGRESS_LOADXL.START: 0, PROGRESS_LOADXL.START_SECOND_ROUND: 0, PROGRESS_LOADXL.DONE: 0}
+        self._lock = threading.Lock()
+
+    def __call__(self, progress: PROGRESS_LOADXL) -> None:
+        if progress in self._counts:
+            with self._lock:
+                self._counts[progress] += 1
+                count = self._counts[progress]
+            if count != (1 if progress == PROGRESS_LOADXL.START else self._nloads):
+                return
+        self._progress(progress)
+
+    def finish(self) -> None:
+        with self._lock:
+            pending = [progress for progress in self._counts if self._counts[progress] < self._nloads]
+            for progress in self._counts:
+                self._counts[progress] = max(self._counts[progress], self._nloads)
+        if PROGRESS_LOADXL.START_SECOND_ROUND in pending:
+            self._progress(PROGRESS_LOADXL.START_SECOND_ROUND)
+        if PROGRESS_LOADXL.DONE in pending:
+            self._progress(PROGRESS_LOADXL.DONE)
+
+
+def merge_load_data_results(load_data_responses: List[Dict]) -> Dict:
+    """
+    Merges the given list of load_data_into_database results (e.g. one per item type, as
+    produced by streaming ingestion) into a single result of the same shape as a whole
+    submission loaded by one call to load_data_into_database would have produced.
+    """
+    response = {"created": [], "updated": [], "skipped": [], "validated": [], "errors": [], "types": []}
+    upload_info = []
+    for load_data_response in load_data_responses:
+        for action in ["created", "updated", "skipped", "validated", "errors"]:
+            response[action].extend(load_data_response.get(action) or [])
+        for item_type in load_data_response.get("types") or []:
+            if item_type not in response["types"]:
+                response["types"].append(item_type)
+        upload_info.extend(load_data_response.get("upload_info") or [])
+    if upload_info:
+        response["upload_info"] = upload_info
+    response["total"] = sum(len(response[action])
+                            for action in ["created", "updated", "skipped", "validated", "errors"])
+    return response
+
+
 def summary_of_load_data_results(load_data_response: Optional[Dict],
                                  submission: SmahtSubmissionFolio = None) -> List[str]:
     """
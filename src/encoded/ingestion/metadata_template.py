@@ -1,8 +1,15 @@
+import gzip
+import hashlib
+import json
 from googleapiclient.discovery import build as google_sheets_build
+from pyramid.httpexceptions import HTTPNotModified
+from pyramid.request import Request
+from pyramid.response import Response
 from pyramid.view import view_config
 from structlog import getLogger as get_logger
-from typing import Optional
+from typing import Any, Dict, Optional
 from dcicutils.misc_utils import get_error_message
+from snovault.schema_views import SubmissionSchemaConstants
 from snovault.util import debug_log
 from encoded.utils import get_configuration_value
 
@@ -29,10 +36,21 @@ METADATA_TEMPLATE_VERSION_CELL = "B1"
 METADATA_TEMPLATE_VERSION_LOCATION = f"{METADATA_TEMPLATE_VERSION_SHEET}!{METADATA_TEMPLATE_VERSION_CELL}"
 GOOGLE_SHEETS_BASE_URL = f"https://docs.google.com/spreadsheets/d"
 
+# This endpoint is to support the retrieval of ALL of the submission schemas (i.e. the same as from
+# /submission-schemas/) in one (conditional) request, e.g. by smaht-submitr and write-submission-spreadsheets,
+# rather than one /submission-schemas/{type}.json request per type, each computed anew from the type schemas.
+#
+# The submission schemas do not depend on the user (properties with a permission are never submittable),
+# nor change while the app is running, so the bundle is computed once, on first use, from /submission-schemas/
+# itself (by subrequest), and held by the registry; its version is a hash of its contents, used as its ETag;
+# so a client can keep the bundle and only get it again if it has changed (i.e. otherwise gets a 304 Not Modified).
+SUBMISSION_SCHEMAS_BUNDLE = "submission_schemas_bundle"
+
 
 def includeme(config):
     config.add_route("submitr_metadata_template", "/submitr-metadata-template/{arg}")
     # config.add_route("ingestion_status", "/ingestion-status/{submission_uuid}")
+    config.add_route("submission_schemas_bundle", "/submission-schemas-bundle")
     config.scan(__name__)
 
 
@@ -66,6 +84,55 @@ def submitr_metadata_template(context, request):
     return {}
 
 
+class SubmissionSchemasBundle:
+    """
+    All of the submission schemas, with their version (a hash of their contents) and their
+    JSON response body, uncompressed and gzipped; all computed once, on creation.
+    """
+    def __init__(self, submission_schemas: Dict[str, Any], app_version: Optional[str] = None) -> None:
+        self.submission_schemas = submission_schemas
+        self.version = hashlib.sha256(json.dumps(submission_schemas, sort_keys=True).encode("utf-8")).hexdigest()
+        self.body = json.dumps({"version": self.version, "app_version": app_version,
+                                "submission_schemas": submission_schemas}).encode("utf-8")
+        self.gzipped_body = gzip.compress(self.body)
+
+
+def get_submission_schemas_bundle(request: Request) -> SubmissionSchemasBundle:
+    """ Returns the SubmissionSchemasBundle held by the registry, created on first use. """
+    if (bundle := request.registry.get(SUBMISSION_SCHEMAS_BUNDLE)) is None:
+        bundle = request.registry.setdefault(SUBMISSION_SCHEMAS_BUNDLE, SubmissionSchemasBundle(
+            request.embed(SubmissionSchemaConstants.ENDPOINT),
+            app_version=request.registry.settings.get("snovault.app_version")))
+    return bundle
+
+
+@view_config(route_name="submission_schemas_bundle", request_method=["GET"])
+@debug_log
+def submission_schemas_bundle(context, request):
+    """
+    Returns all submission schemas, with their version, as JSON like:
+
+      {"version": "<sha256>", "app_version": "<version>", "submission_schemas": {"Donor": {...}, ...}}
+
+    The version is also the ETag, so a request with an If-None-Match of that version returns 304
+    Not Modified if unchanged; the response is gzipped for clients which accept that.
+    """
+    bundle = get_submission_schemas_bundle(request)
+    if bundle.version in request.if_none_match:
+        not_modified = HTTPNotModified()
+        not_modified.etag = bundle.version
+        return not_modified
+    response = Response(content_type="application/json", charset="utf-8")
+    response.etag = bundle.version
+    response.vary = ["Accept-Encoding"]
+    if request.headers.get("Accept-Encoding") and request.accept_encoding.acceptable_offers(["gzip"]):
+        response.content_encoding = "gzip"
+        response.body = bundle.gzipped_body
+    else:
+        response.body = bundle.body
+    return response
+
+
 def _parse_metadata_template_version(value: str) -> Optional[str]:
     """
     Parses and returns the version from a string like "version: 1.2.3".
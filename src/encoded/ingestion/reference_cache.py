@@ -0,0 +1,179 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+from dcicutils.misc_utils import VirtualApp
+from dcicutils.structured_data import Portal
+from snovault.interfaces import AfterModified
+from structlog import getLogger as get_logger
+
+
+def includeme(config):
+    config.add_subscriber(_invalidate_reference_cache_on_modified, AfterModified)
+
+
+class ReferenceCache:
+    """
+    Process-wide cache of resolved references (linkTo) for the slowly changing reference item types below,
+    shared across ingestion submissions; without this, every submission resolves references to these same
+    items again (via the virtual app), since the dcicutils.structured_data.Portal reference cache is only
+    per StructuredDataSet (i.e. per submission). Since what may be resolved depends on the principals of
+    the submitting user, the cache is partitioned by (remote) user, and items are only ever served to the
+    user on whose behalf they were looked up. Each partition is warmed (via one search per type) on first
+    use, and again whenever it is older than the TTL; OntologyTerm (large) is not warmed but is cached as
+    its items are looked up. Any item of these types modified within this process (e.g. via ingestion) is
+    invalidated; changes made by other processes are reflected within the TTL. Only found references
+    are cached, so newly created items are never missed.
+    """
+    CACHED_TYPES = ["SubmissionCenter", "Consortium", "FileFormat", "Assay", "Sequencer", "OntologyTerm"]
+    WARMED_TYPES = ["SubmissionCenter", "Consortium", "FileFormat", "Assay", "Sequencer"]
+    TTL_SETTING_NAME = "ingestion.reference_cache_ttl"
+    TTL_SECONDS = 60 * 10
+
+    _singleton_instance = None
+    _singleton_lock = threading.Lock()
+
+    def __init__(self, ttl: int = TTL_SECONDS) -> None:
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._items = {}  # (user, identifying path) -> (expiration time, item)
+        self._keys_by_uuid = {}  # uuid -> (user, identifying path) keys
+        self._warmed = {}  # user -> time warmed
+        self._hit_count = 0
+        self._miss_count = 0
+
+    @staticmethod
+    def instance(vapp: Optional[VirtualApp] = None) -> ReferenceCache:
+        if ReferenceCache._singleton_instance is None:
+            with ReferenceCache._singleton_lock:
+                if ReferenceCache._singleton_instance is None:
+                    ttl = ReferenceCache.TTL_SECONDS
+                    if vapp is not None:
+                        ttl = int(vapp.app.registry.settings.get(ReferenceCache.TTL_SETTING_NAME, ttl))
+                    ReferenceCache._singleton_instance = ReferenceCache(ttl=ttl)
+        return ReferenceCache._singleton_instance
+
+    def install(self, portal: Portal) -> ReferenceCacheStats:
+        """
+        Installs this cache into the given (dcicutils.structured_data) Portal, i.e. into its reference
+        lookup function, warming this cache first if needed; returns an object containing the counts of
+        lookups saved (hits) and not saved (misses) by this cache for this Portal (i.e. submission).
+        """
+        user = _get_remote_user(portal)
+        self.warm(portal, user=user)
+        stats = ReferenceCacheStats()
+        portal.ref_lookup = self._ref_lookup_function(portal.ref_lookup, stats, user=user)
+        return stats
+
+    def warm(self, portal: Portal, user: Optional[str] = None, force: bool = False) -> None:
+        with self._lock:
+            if not force and (warmed := self._warmed.get(user)) is not None and (time.time() - warmed) < self._ttl:
+                return
+            for key in [key for key in self._items if key[0] == user]:
+                del self._items[key]
+            self._warmed[user] = time.time()
+        for type_name in self.WARMED_TYPES:
+            identifying_properties = ["uuid"]
+            if isinstance(schema := portal.get_schema(type_name), dict):
+                identifying_properties += schema.get("identifyingProperties", [])
+            for item in _search_all(portal, type_name):
+                paths = []
+                for identifying_property in identifying_properties:
+                    values = item.get(identifying_property)
+                    for value in (values if isinstance(values, list) else [values]):
+                        if isinstance(value, str) and value:
+                            paths.append(f"/{type_name}/{value}")
+                self.put(paths, item, user=user)
+
+    def get(self, path: str, user: Optional[str] = None) -> Optional[dict]:
+        with self._lock:
+            if (cached := self._items.get((user, path))) is not None:
+                expiration, item = cached
+                if expiration > time.time():
+                    self._hit_count += 1
+                    return item
+                del self._items[(user, path)]
+            self._miss_count += 1
+        return None
+
+    def put(self, paths: List[str], item: dict, user: Optional[str] = None) -> None:
+        if not isinstance(item, dict) or not (uuid := item.get("uuid")):
+            return
+        with self._lock:
+            expiration = time.time() + self._ttl
+            for path in paths:
+                self._items[(user, path)] = (expiration, item)
+            self._keys_by_uuid.setdefault(uuid, set()).update((user, path) for path in paths)
+
+    def invalidate(self, uuid: str) -> None:
+        with self._lock:
+            for key in self._keys_by_uuid.pop(uuid, set()):
+                self._items.pop(key, None)
+
+    def is_cached_type(self, path: str) -> bool:
+        type_name, _ = _get_type_name_and_value_from_path(path)
+        return type_name in self.CACHED_TYPES
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"ttl": self._ttl, "size": len(self._items), "items": len(self._keys_by_uuid),
+                    "users": len(self._warmed), "hits": self._hit_count, "misses": self._miss_count}
+
+    def _ref_lookup_function(self, ref_lookup: Callable, stats: ReferenceCacheStats,
+                             user: Optional[str] = None) -> Callable:
+        def ref_lookup_with_reference_cache(path: str) -> Optional[dict]:
+            nonlocal ref_lookup, stats
+            if not self.is_cached_type(path):
+                return ref_lookup(path)
+            if (item := self.get(path, user=user)) is not None:
+                stats.hits += 1
+                return item
+            stats.misses += 1
+            if (item := ref_lookup(path)) is not None:
+                self.put([path], item, user=user)
+            return item
+        return ref_lookup_with_reference_cache
+
+
+class ReferenceCacheStats:
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"ref_cache_hits": self.hits, "ref_cache_misses": self.misses}
+
+
+def _search_all(portal: Portal, type_name: str) -> List[dict]:
+    try:
+        response = portal.get(f"/search/?{urlencode({'type': type_name, 'frame': 'object', 'limit': 'all'})}")
+        return response.json().get("@graph", []) if response.status_code == 200 else []
+    except Exception as e:
+        # N.B. Search responds with a 404 if there are no results.
+        if "HTTPNotFound" not in str(e) and "404" not in str(e):
+            _log.warning(f"Cannot warm ingestion reference cache for type: {type_name}: {e}")
+        return []
+
+
+def _get_remote_user(portal: Portal) -> Optional[str]:
+    # N.B. The (ingestion) portal virtual app makes its requests as the submitting user; see VirtualApp.
+    vapp = getattr(portal, "vapp", None)
+    extra_environ = getattr(getattr(vapp, "wrapped_app", vapp), "extra_environ", None)
+    return extra_environ.get("REMOTE_USER") if isinstance(extra_environ, dict) else None
+
+
+def _get_type_name_and_value_from_path(path: str) -> Tuple[Optional[str], Optional[str]]:
+    if isinstance(path, str) and path.startswith("/") and len(parts := path[1:].split("/")) == 2:
+        return parts[0], parts[1]
+    return None, None
+
+
+def _invalidate_reference_cache_on_modified(event: AfterModified) -> None:
+    if ReferenceCache._singleton_instance is not None:
+        if getattr(event.object.type_info, "name", None) in ReferenceCache.CACHED_TYPES:
+            ReferenceCache._singleton_instance.invalidate(str(event.object.uuid))
+
+
+_log = get_logger(__name__)
@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+from itertools import groupby
+import sys
+from typing import Generator, List, Optional
+from dcicutils.structured_data import Schema, StructuredDataSet
+from dcicutils.submitr.progress_constants import PROGRESS_PARSE
+
+
+class StreamingStructuredDataSet(StructuredDataSet):
+    """
+    StructuredDataSet which parses its file one item type at a time, in the specified (e.g. ITEM_INDEX_ORDER)
+    order, handing each type to the caller (via load_types) before parsing the next; this is to support
+    streaming ingestion, where each type is diffed and validated, or loaded, before moving on to the next.
+
+    While a type is being handed to the caller, the data property exposes ONLY that type, so that the
+    usual (whole data set) StructuredDataSet.compare and StructuredDataSet.validate functions operate on
+    just that type. Once the caller is done with a type, its rows are reduced to just their identifying
+    properties; these are kept only so that references (linkTo) from subsequent types to items within
+    this submission can still be resolved internally (e.g. in validate_only mode, where nothing actually
+    gets written to the database); this is what bounds the memory used to (roughly) the largest type.
+    References to items of types parsed later are resolved (internally) once those types are parsed,
+    so ref_errors is complete only once load_types is done.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._current_type = None
+        self._ref_resolved_later_count = 0
+
+    @property
+    def data(self) -> dict:
+        if self._current_type is not None:
+            return {self._current_type: self._data.get(self._current_type, [])}
+        return self._data
+
+    def load_types(self, file: str) -> Generator[str, None, None]:
+        """
+        Parses the given file one type at a time, yielding the name of each type after parsing it;
+        during the yield the data property contains only that type. Only Excel files are actually
+        parsed incrementally; other files are parsed whole and then yielded one type at a time.
+        """
+        if not self._is_excel_file(file):
+            self.load_file(file)
+            order = self._type_order()
+            for type_name in sorted(list(self._data.keys()), key=lambda key: order.get(key, sys.maxsize)):
+                with self._handing_off(type_name):
+                    yield type_name
+            return
+        excel = self._excel_class(file)
+        order = self._type_order()
+        if self._progress:
+            self._progress({PROGRESS_PARSE.LOAD_START: PROGRESS_PARSE.NOW(),
+                            PROGRESS_PARSE.LOAD_COUNT_SHEETS: len(excel.sheet_names)})
+        sheet_names = sorted(excel.sheet_names,
+                             key=lambda key: order.get(Schema.type_name(excel.effective_sheet_name(key)), sys.maxsize))
+        # Multiple sheets may contain the same type (see Excel.effective_sheet_name); these are adjacent
+        # after the above sort, and are grouped together here so that each type is handed off only once.
+        for _, sheet_group in groupby(sheet_names, key=lambda key: Schema.type_name(excel.effective_sheet_name(key))):
+            counts = {type_name: len(items) for type_name, items in self._data.items()}
+            for sheet_name in sheet_group:
+                type_name = Schema.type_name(excel.effective_sheet_name(sheet_name))
+                self._load_reader(excel.sheet_reader(sheet_name), type_name=type_name)
+            self._resolve_ref_errors()
+            # N.B. The type name actually used (by _load_reader) is that from the schema, if any,
+            # which may differ from that of the sheet name; so look for the type(s) which grew.
+            for type_name in [type_name for type_name, items in self._data.items()
+                              if len(items) > counts.get(type_name, 0)]:
+                with self._handing_off(type_name):
+                    yield type_name
+        if self._progress:
+            self._progress({PROGRESS_PARSE.LOAD_DONE: PROGRESS_PARSE.NOW(),
+                            PROGRESS_PARSE.LOAD_COUNT_REFS: self.ref_total_count,
+                            PROGRESS_PARSE.LOAD_COUNT_REFS_FOUND: self.ref_total_found_count,
+                            PROGRESS_PARSE.LOAD_COUNT_REFS_NOT_FOUND: (self.ref_total_notfound_count -
+                                                                       self._ref_resolved_later_count)})
+
+    @contextmanager
+    def _handing_off(self, type_name: str) -> Generator[None, None, None]:
+        self._current_type = type_name
+        try:
+            yield
+        finally:
+            self._current_type = None
+            self._data[type_name] = self._identifying_stubs(type_name, self._data.get(type_name, []))
+
+    def _identifying_stubs(self, type_name: str, items: List[dict]) -> List[dict]:
+        identifying_properties = {"identifier", "uuid"}
+        if self._portal and (schema := self._portal.get_schema(type_name)):
+            identifying_properties |= set(schema.get("identifyingProperties", []))
+        return [{name: value for name, value in item.items() if name in identifying_properties} for item in items]
+
+    def _resolve_ref_errors(self) -> None:
+        # Same as done at the end of StructuredDataSet._load_excel_file, but here done after each type;
+        # references to items (internally) from types which were parsed earlier will resolve here, as
+        # will any to items which have already been loaded into the database (by the streaming caller).
+        # These were counted as not found when first looked up, which is adjusted for in LOAD_COUNT_REFS_NOT_FOUND.
+        if not self._portal or not (ref_errors := self.ref_errors):
+            return
+        ref_errors_actual = []
+        for ref_error in ref_errors:
+            if not (resolved := self._portal.ref_exists(ref := ref_error["error"])):
+                ref_errors_actual.append(ref_error)
+            else:
+                self._ref_resolved_later_count += 1
+                self._resolved_refs.add((ref, resolved.get("uuid")))
+        if ref_errors_actual:
+            self._errors["ref"] = ref_errors_actual
+        else:
+            del self._errors["ref"]
+
+    def _type_order(self) -> dict:
+        return {Schema.type_name(key): index for index, key in enumerate(self._order)} if self._order else {}
+
+    @staticmethod
+    def _is_excel_file(file: Optional[str]) -> bool:
+        return isinstance(file, str) and (file.endswith(".xls") or file.endswith(".xlsx"))
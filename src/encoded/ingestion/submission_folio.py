@@ -25,6 +25,7 @@ class SmahtSubmissionFolio:
         self.s3_bucket = submission.bucket
         self.s3_data_file_location = f"s3://{submission.bucket}/{submission.object_name}"
         self.s3_details_location = f"s3://{submission.bucket}/{submission.submission_id}/submission.json"
+        self.s3_profile_location = f"s3://{submission.bucket}/{submission.submission_id}/profile.json"
         self.post_only = get_parameter(submission.parameters, "post_only", as_type=bool, default=False)
         self.patch_only = get_parameter(submission.parameters, "patch_only", as_type=bool, default=False)
         self.validate_only = get_parameter(submission.parameters, "validate_only", as_type=bool, default=False)
@@ -32,6 +33,8 @@ class SmahtSubmissionFolio:
         self.ref_nocache = get_parameter(submission.parameters, "ref_nocache", as_type=bool, default=False)
         self.autoadd = get_parameter(submission.parameters, "autoadd", as_type=str, default=None)
         self.merge = get_parameter(submission.parameters, "merge", as_type=bool, default=False)
+        self.bulk_compare = get_parameter(submission.parameters, "bulk_compare", as_type=bool, default=False)
+        self.streaming = get_parameter(submission.parameters, "streaming", as_type=bool, default=False)
         # N.B. 2025-02-11: We no longer assume consortia is passed throught to the ingester smaht-submitr;
         # so if not then we get it elsewhere from the autoadd field; which we will pickup below if not set here.
         # This came up with permission problems for non-admin users using submitr.
@@ -59,6 +62,9 @@ class SmahtSubmissionFolio:
                 self.user = None
         self.portal_vapp = submission.vapp
         self.s3_encrypt_key_id = self.portal_vapp.app.registry.settings.get(SettingsKey.S3_ENCRYPT_KEY_ID, None)
+        # Number of worker threads for loading independent item types concurrently (one means sequentially);
+        # see loadxl_extensions.load_data_into_database_concurrently.
+        self.loadxl_workers = int(self.portal_vapp.app.registry.settings.get("ingestion.loadxl_workers", 1))
         if not self.validate_only and self.data_file_name == "null":
             validation_uuid = get_parameter(submission.parameters, "validation_uuid", as_type=str, default=None)
             if (validation_uuid and
@@ -165,6 +171,14 @@ class SmahtSubmissionFolio:
         #
         self.submission.process_standard_bundle_results(results, s3_only=True)
 
+    def record_profile(self, profile: dict) -> None:
+        """
+        Records/writes the given (ingestion_profile.IngestionProfile) timing profile of this submission
+        to S3, alongside the results (see record_results), i.e. s3://<submission-bucket>/<uuid>/profile.json.
+        """
+        with self.submission.s3_output(key_name="profile.json", key_type="json") as fp:
+            fp.write(json.dumps(profile, indent=2))
+
     @staticmethod
     def _construct_data_file_name_suitable_for_s3(filename: str) -> str:
         # This code adapted from snovault.ingestion.submit_for_ingestion.
@@ -26,11 +26,23 @@ def get_grouping_term_from_tag(
 
     Search through linked OntologyTerms to grab the first item with the appropriate tag 
     (e.g. germ_layer, tissue_type). If it is not present, return None
+
+    With a request (e.g. when indexing), linked OntologyTerms are found from the
+    OntologyTermClosure held by the registry rather than retrieved one at a time
+    (and linked from the item being indexed likewise).
     """
     tags = item_utils.get_tags(properties)
     if tag in tags:
         return item_utils.get_display_title(properties)
     grouping_term = get_grouping_term(properties)
+    if grouping_term and request_handler.request is not None:
+        from ..types.ontology_term import get_ontology_term_closure
+        if isinstance(grouping_term, dict):  # e.g. embedded
+            grouping_term = item_utils.get_uuid(grouping_term)
+        request = request_handler.request
+        return get_ontology_term_closure(request.registry).get_grouping_term_from_tag(
+            grouping_term, tag, request=request
+        )
     if grouping_term:
         to_get = set(
             get_property_values_from_identifiers(
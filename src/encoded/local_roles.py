@@ -2,13 +2,63 @@ from dcicutils.misc_utils import environ_bool, PRINT
 from pyramid.authorization import ACLAuthorizationPolicy
 from pyramid.interfaces import IAuthorizationPolicy
 from pyramid.location import lineage
+from pyramid.threadlocal import get_current_request
 from pyramid.util import is_nonstr_iter
+from snovault.interfaces import AfterModified, Created
 from zope.interface import implementer
 
 
 DEBUG_PERMISSIONS = environ_bool("DEBUG_PERMISSIONS", default=False)
+LOCAL_ROLES_MEMO_ATTRIBUTE = "_local_roles_memo"
 
 
+def includeme(config):
+    config.add_subscriber(clear_local_roles_memo, Created)
+    config.add_subscriber(clear_local_roles_memo, AfterModified)
+
+
+def get_local_roles_memo(request=None):
+    """ Returns the memo of local principals for the current (top-level) request, i.e. shared with all
+        of its subrequests (e.g. embeds); or None if there is no current request (or DEBUG_PERMISSIONS).
+        Local roles only depend on the context, not on the user, so sharing across subrequests is fine.
+    """
+    if DEBUG_PERMISSIONS or (request := request or get_current_request()) is None:
+        return None
+    while getattr(request, "__parent__", None) is not None:
+        request = request.__parent__
+    if (memo := getattr(request, LOCAL_ROLES_MEMO_ATTRIBUTE, None)) is None:
+        memo = {}
+        setattr(request, LOCAL_ROLES_MEMO_ATTRIBUTE, memo)
+    return memo
+
+
+def clear_local_roles_memo(event):
+    """ Clears the local principals memo of the request when an item is created or edited,
+        as its (and so possibly other items') local roles may have changed within the request.
+    """
+    if (memo := get_local_roles_memo(event.request)) is not None:
+        memo.clear()
+
+
+def _memoized(function):
+    """ Memoizes the given local principals function per request (see get_local_roles_memo),
+        keyed by (function, context uuid, frozenset of principals); contexts with no uuid
+        (i.e. which are not items, e.g. collections or root) are not memoized.
+    """
+    def memoized_function(context, principals):
+        if (uuid := getattr(context, "uuid", None)) is None or (memo := get_local_roles_memo()) is None:
+            return function(context, principals)
+        key = (function.__name__, str(uuid), frozenset(principals))
+        if (result := memo.get(key)) is None:
+            result = function(context, principals)
+            memo[key] = result = type(result)(result)  # i.e. not the given principals object
+        return type(result)(result)  # i.e. a copy, as callers may modify
+    memoized_function.__name__ = function.__name__
+    memoized_function.__doc__ = function.__doc__
+    return memoized_function
+
+
+@_memoized
 def local_principals(context, principals):
     """ The idea behind this is to process __ac_local_roles__ (and a boolean __ac_local_roles_block__
         to disable) and add local principals. This only works if you're in correct context, though,
@@ -54,6 +104,7 @@ def local_principals(context, principals):
     return local_principals
 
 
+@_memoized
 def merged_local_principals(context, principals):
     # XXX Possibly limit to prefix like 'role.'
     set_principals = frozenset(principals)
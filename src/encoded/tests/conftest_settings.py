@@ -12,6 +12,8 @@ _app_settings = {
     "item_datastore": "database",
     "multiauth.policies": "session remoteuser accesskey auth0",
     "multiauth.groupfinder": "encoded.authorization.smaht_groupfinder",
+    "principals_cache_ttl": 0,  # Test database rollbacks do not invalidate cached principals
+    "registry_cache_ttl": 0,  # Nor registry caches (see types.registry_cache)
     "multiauth.policy.session.use": "encoded.authentication.SMAHTNamespacedAuthenticationPolicy",
     "multiauth.policy.session.base": "pyramid.authentication.SessionAuthenticationPolicy",
     "multiauth.policy.session.namespace": "mailto",
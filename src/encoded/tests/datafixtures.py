@@ -535,7 +535,8 @@ def test_tissue_sample(
         "external_id": "SMHT001-3Q-001A1",
         "category": "Core"
     }
-    return post_item(testapp, item, "TissueSample")
+    # N.B. With force_pass as there is no TPC TissueSample with this external_id.
+    return testapp.post_json("/TissueSample?force_pass", item, status=201).json["@graph"][0]
 
 
 @pytest.fixture
@@ -12,6 +12,7 @@ from ..commands.create_annotated_filenames import (
     FILENAME_SEPARATOR,
     AnnotatedFilename,
     FilenamePart,
+    PrefetchRequestHandler,
     collect_errors,
     get_aliquot_id,
     get_analysis,
@@ -21,12 +22,14 @@ from ..commands.create_annotated_filenames import (
     get_file_extension,
     get_filename_part,
     get_filename_part_for_values,
+    get_patch_body_from_raw_file,
     get_project_id,
     get_protocol_id,
     get_sample_source_id,
     get_sequencing_and_assay_codes,
     get_sequencing_center_code,
     get_software_and_versions,
+    prefetch_associated_items,
 )
 from ..item_utils import constants, file as file_utils, item as item_utils
 from ..item_utils.utils import RequestHandler
@@ -1140,3 +1143,77 @@ def test_collect_errors(errors: List[FilenamePart], expected: List[str]) -> None
     """Test error collection across filename parts."""
     result = collect_errors(*errors)
     assert result == expected
+
+
+SOME_UUIDS = [f"{index:08d}-0000-4000-8000-000000000000" for index in range(4)]
+
+
+def test_prefetch_associated_items() -> None:
+    """Test associated items fetched level by level with a search per chunk."""
+    file_format = {"uuid": SOME_UUIDS[1], "@id": f"/file-formats/{SOME_UUIDS[1]}/"}
+    file_set = {
+        "uuid": SOME_UUIDS[2],
+        "@id": f"/file-sets/{SOME_UUIDS[2]}/",
+        "samples": [f"/tissue-samples/{SOME_UUIDS[3]}/"],
+    }
+    sample = {"uuid": SOME_UUIDS[3], "@id": f"/tissue-samples/{SOME_UUIDS[3]}/"}
+    software = {"uuid": "not-a-uuid", "@id": "/software/foo/"}
+    file = {
+        "uuid": SOME_UUIDS[0],
+        "file_format": file_format["@id"],
+        "file_sets": [file_set["@id"]],
+        "software": ["/software/foo/"],
+    }
+    items = {item["uuid"]: item for item in [file_format, file_set, sample]}
+    searches = []
+
+    def search_metadata(query, key=None):
+        searches.append(query)
+        return [items[uuid] for uuid in items if f"uuid={uuid}" in query]
+
+    with mock.patch(
+        "encoded.commands.create_annotated_filenames.ff_utils.search_metadata",
+        side_effect=search_metadata,
+    ), mock.patch(
+        "encoded.item_utils.utils.ff_utils.get_metadata", return_value=software
+    ) as mock_get_metadata:
+        request_handler = PrefetchRequestHandler(auth_key={"key": "prefetch"})
+        prefetch_associated_items([file], request_handler)
+        assert len(searches) == 2  # File set and file format, then sample
+        assert mock_get_metadata.call_count == 1  # Software not identified by UUID
+        assert request_handler.get_item(file_set["@id"]) == file_set
+        assert request_handler.get_item(SOME_UUIDS[3]) == sample
+        assert request_handler.get_item("/software/foo/") == software
+        assert len(searches) == 2 and mock_get_metadata.call_count == 1
+
+
+def test_get_patch_body_from_raw_file() -> None:
+    """Test patch body for extra files from raw view and cached file formats."""
+    annotated_filename = AnnotatedFilename(
+        project_id="ST",
+        sample_source_id="001",
+        protocol_id="1A",
+        aliquot_id="001A1",
+        donor_sex_and_age="M45",
+        sequencing_and_assay_codes="IWGS",
+        sequencing_center_code="BCM",
+        accession="SMAFI1234567",
+        analysis_info="bwamem_0.7.17_GRCh38",
+        file_extension="bam",
+        errors=[],
+    )
+    request_handler = PrefetchRequestHandler(auth_key={"key": "patch"})
+    request_handler.add_items(
+        [{"uuid": SOME_UUIDS[1], "standard_file_extension": "bam.bai"}]
+    )
+    raw_file = {
+        "accession": "SMAFI1234567",
+        "extra_files": [{"file_format": SOME_UUIDS[1], "filename": "foo.bam.bai"}],
+    }
+    filename = str(annotated_filename)
+    assert get_patch_body_from_raw_file(
+        annotated_filename, raw_file, request_handler
+    ) == {
+        "annotated_filename": filename,
+        "extra_files": [{"file_format": SOME_UUIDS[1], "filename": f"{filename}.bai"}],
+    }
@@ -3,6 +3,7 @@ import pytest
 
 from .test_search import MockedRequest
 from snovault.util import is_admin_request
+from ..authorization import PrincipalsCache
 
 
 pytestmark = [pytest.mark.working]
@@ -26,3 +27,26 @@ pytestmark = [pytest.mark.working]
 def test_authorization_is_admin_request(mock_request, expected):
     """ Checks that the request tests correctly resolve. """
     assert is_admin_request(mock_request) is expected
+
+
+def test_principals_cache() -> None:
+    principals_cache = PrincipalsCache(ttl=60)
+    assert principals_cache.get("mailto.user@example.com") is None
+    principals_cache.put("mailto.user@example.com", "user-uuid", ["userid.user-uuid", "group.admin"])
+    principals_cache.put("accesskey.ABCDEF", "user-uuid", ["userid.user-uuid", "group.admin"])
+    principals_cache.put("mailto.other@example.com", "other-uuid", ["userid.other-uuid"])
+    assert principals_cache.get("mailto.user@example.com") == ["userid.user-uuid", "group.admin"]
+    principals_cache.invalidate(user_uuid="user-uuid")
+    assert principals_cache.get("mailto.user@example.com") is None
+    assert principals_cache.get("accesskey.ABCDEF") is None
+    assert principals_cache.get("mailto.other@example.com") == ["userid.other-uuid"]
+    principals_cache.invalidate(localname="other@example.com")
+    assert principals_cache.get("mailto.other@example.com") is None
+    info = principals_cache.info()
+    assert info["hits"] == 2 and info["misses"] == 4 and info["invalidations"] == 3
+
+
+def test_principals_cache_ttl() -> None:
+    principals_cache = PrincipalsCache(ttl=0)
+    principals_cache.put("mailto.user@example.com", "user-uuid", ["userid.user-uuid"])
+    assert principals_cache.get("mailto.user@example.com") is None
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+from typing import Any, Dict
+from unittest import mock
+
+from webtest.app import TestApp
+
+from ..bulk_patch import STATUS_NOT_ATTEMPTED, _apply_patches
+
+
+def test_bulk_patch(
+    testapp: TestApp,
+    test_submission_center: Dict[str, Any],
+    test_consortium: Dict[str, Any],
+) -> None:
+    """Test patches validated and applied together, or not at all."""
+    patches = [
+        {"uuid": test_submission_center["uuid"], "patch": {"title": "Bulk Patched GCC"}},
+        {"uuid": test_consortium["uuid"], "patch": {"title": "Bulk Patched Consortium"}},
+    ]
+    res = testapp.post_json("/bulk_patch?check_only=true", {"patches": patches}, status=200).json
+    assert res["check_only"] is True
+    assert [result["status"] for result in res["results"]] == ["success", "success"]
+    assert testapp.get(test_consortium["@id"]).json["title"] == "SMaHT Test Consortium"
+
+    testapp.post_json("/bulk_patch", {"patches": patches}, status=200)
+    assert testapp.get(test_submission_center["@id"]).json["title"] == "Bulk Patched GCC"
+    assert testapp.get(test_consortium["@id"]).json["title"] == "Bulk Patched Consortium"
+
+    invalid_patches = [
+        {"uuid": test_consortium["uuid"], "patch": {"title": "Not Patched"}},
+        {"uuid": test_submission_center["uuid"], "patch": {"not_a_property": "value"}},
+    ]
+    res = testapp.post_json("/bulk_patch", {"patches": invalid_patches}, status=422).json
+    assert [result["status"] for result in res["results"]] == ["success", "error"]
+    assert res["results"][1]["errors"]
+    assert testapp.get(test_consortium["@id"]).json["title"] == "Bulk Patched Consortium"
+
+
+def test_bulk_patch_bad_request(testapp: TestApp) -> None:
+    testapp.post_json("/bulk_patch", {"patches": [{"uuid": "some-uuid"}]}, status=400)
+
+
+def test_apply_patches_stops_at_first_failure() -> None:
+    """Test patches after a failed one not attempted, with the transaction doomed."""
+    request = SimpleNamespace(tm=mock.Mock())
+    patches = [{"uuid": f"uuid-{index}", "patch": {}} for index in range(4)]
+    patch_results = [{"uuid": "uuid-0", "status": "success"}, {"uuid": "uuid-1", "status": "error", "errors": []}]
+    with mock.patch("encoded.bulk_patch._patch_item", side_effect=patch_results) as patch_item:
+        results = _apply_patches(request, patches)
+    assert patch_item.call_count == 2
+    assert [result["status"] for result in results] == ["success", "error", STATUS_NOT_ATTEMPTED, STATUS_NOT_ATTEMPTED]
+    assert [result["uuid"] for result in results] == [patch["uuid"] for patch in patches]
+    request.tm.doom.assert_called_once()
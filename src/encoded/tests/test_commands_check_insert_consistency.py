@@ -0,0 +1,122 @@
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+import pytest
+
+from encoded.commands.check_insert_consistency import SEARCH_CHUNK_SIZE, InsertConsistencyChecker
+
+
+SERVER = "https://data.smaht.org"
+INSERTS = {
+    "ontology_term": [
+        {"uuid": "uuid-1", "identifier": "UBERON:1"},
+        {"uuid": "uuid-2", "identifier": "UBERON:2"},
+        {"uuid": "uuid-3", "identifier": "UBERON:3"},
+    ],
+    "donor": [
+        {"uuid": "uuid-4", "accession": "SMADOACCESS4"},
+    ],
+}
+
+
+class MockServer:
+    """Items (by uuid) on the server, of which those deleted are not found by search."""
+
+    def __init__(self, items: Dict[str, Dict[str, Any]], deleted: Optional[List[str]] = None) -> None:
+        self.items = items
+        self.deleted = deleted or []
+        self.searches = []
+        self.gets = []
+
+    def search_metadata(self, query: str, key: Dict[str, str]) -> List[Dict[str, Any]]:
+        self.searches.append(query)
+        uuids = [part[len("uuid="):] for part in query.split("&") if part.startswith("uuid=")]
+        return [self.items[uuid] for uuid in uuids if uuid in self.items and uuid not in self.deleted]
+
+    def get_metadata(self, uuid: str, key: Dict[str, str]) -> Dict[str, Any]:
+        self.gets.append(uuid)
+        if uuid not in self.items:
+            raise Exception(f"Bad status code for GET request for {uuid}: 404. Reason: HTTPNotFound")
+        return self.items[uuid]
+
+
+def get_checker(inserts: Dict[str, List[Dict[str, Any]]], item_type: str = "all") -> InsertConsistencyChecker:
+    with mock.patch("encoded.commands.check_insert_consistency.SMaHTKeyManager") as key_manager:
+        key_manager.return_value.get_keydict_for_env.return_value = {"server": SERVER}
+        with mock.patch.object(InsertConsistencyChecker, "get_master_inserts", return_value=inserts):
+            return InsertConsistencyChecker(item_type=item_type)
+
+
+def check_bulk(checker: InsertConsistencyChecker, server: MockServer) -> dict:
+    with mock.patch("encoded.commands.check_insert_consistency.ff_utils.search_metadata",
+                    server.search_metadata):
+        with mock.patch("encoded.commands.check_insert_consistency.ff_utils.get_metadata",
+                        server.get_metadata):
+            return checker.check_bulk(max_workers=2)
+
+
+def test_check_bulk() -> None:
+    """Test items found by search, deleted items got individually, and missing ones new."""
+    server = MockServer({
+        "uuid-1": {"uuid": "uuid-1", "identifier": "UBERON:1"},
+        "uuid-2": {"uuid": "uuid-2", "identifier": "UBERON:2"},
+        "uuid-4": {"uuid": "uuid-4", "accession": "SMADOOTHER4"},
+    }, deleted=["uuid-2"])
+    result = check_bulk(get_checker(INSERTS), server)
+    assert result == {
+        "new": {"ontology_term": ["uuid-3"], "donor": []},
+        "mismatched_identifier": {"ontology_term": [], "donor": []},
+        "mismatched_accession": {"ontology_term": [], "donor": ["uuid-4"]},
+    }
+    assert sorted(server.gets) == ["uuid-2", "uuid-3"]
+    assert sorted(query.split("&")[0] for query in server.searches) == [
+        "search/?type=Donor", "search/?type=OntologyTerm"
+    ]
+
+
+def test_check_bulk_matches_check() -> None:
+    """Test same result as checking one item at a time."""
+    server = MockServer({
+        "uuid-1": {"uuid": "uuid-1", "identifier": "UBERON:1"},
+        "uuid-2": {"uuid": "uuid-2", "identifier": "UBERON:OTHER"},
+        "uuid-4": {"uuid": "uuid-4", "accession": "SMADOACCESS4"},
+    }, deleted=["uuid-1"])
+    checker = get_checker(INSERTS)
+    with mock.patch("encoded.commands.check_insert_consistency.ff_utils.get_metadata", server.get_metadata):
+        expected = checker.check()
+    assert check_bulk(checker, server) == expected
+    assert expected["new"]["ontology_term"] == ["uuid-3"]
+    assert expected["mismatched_identifier"]["ontology_term"] == ["uuid-2"]
+
+
+def test_get_metadata_bulk_chunks() -> None:
+    """Test uuids searched for in chunks, once each."""
+    items = [{"uuid": f"uuid-{i}"} for i in range(SEARCH_CHUNK_SIZE + 1)]
+    server = MockServer({item["uuid"]: item for item in items})
+    checker = get_checker({"ontology_term": items})
+    with mock.patch("encoded.commands.check_insert_consistency.ff_utils.search_metadata",
+                    server.search_metadata):
+        metadata = checker.get_metadata_bulk("ontology_term", items + items[:1])
+    assert sorted(metadata) == sorted(item["uuid"] for item in items)
+    assert [query.count("&uuid=") for query in server.searches] == [SEARCH_CHUNK_SIZE, 1]
+
+
+@pytest.mark.parametrize("error,expected", [
+    ("Bad status code for GET request: 401. Reason: HTTPUnauthorized",
+     {"new": {"ontology_term": ["uuid-2", "uuid-3"]}, "mismatched_identifier": {"ontology_term": []},
+      "mismatched_accession": {"ontology_term": []}}),
+    ("Bad status code for GET request: 500. Reason: HTTPInternalServerError", {}),
+])
+def test_check_bulk_error(error: str, expected: dict) -> None:
+    """Test partial result on authorization error, otherwise empty, as for check."""
+    checker = get_checker(INSERTS)
+    server = MockServer({"uuid-1": {"uuid": "uuid-1", "identifier": "UBERON:1"}})
+
+    def search_metadata(query: str, key: Dict[str, str]) -> List[Dict[str, Any]]:
+        if "type=Donor" in query:
+            raise Exception(error)
+        return server.search_metadata(query, key)
+
+    with mock.patch("encoded.commands.check_insert_consistency.ff_utils.search_metadata", search_metadata):
+        with mock.patch("encoded.commands.check_insert_consistency.ff_utils.get_metadata", server.get_metadata):
+            assert checker.check_bulk(max_workers=2) == expected
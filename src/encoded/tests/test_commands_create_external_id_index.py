@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from sqlalchemy import text
+from snovault import DBSESSION
+
+from encoded.commands.create_external_id_index import create_external_id_index, get_create_index_statement
+from encoded.types.tissue_sample import EXTERNAL_ID_INDEX
+
+
+def test_get_create_index_statement():
+    assert get_create_index_statement() == (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_propsheets_external_id ON propsheets"
+        " ((properties ->> 'external_id')) WHERE (properties ->> 'external_id') IS NOT NULL"
+    )
+
+
+def test_create_external_id_index(app):
+    """Test index created with the tables, and command a no-op when it exists."""
+    create_external_id_index(app)
+    session = app.registry[DBSESSION]()
+    indexes = session.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = 'propsheets'")
+    ).scalars().all()
+    assert EXTERNAL_ID_INDEX.name in indexes
+
+
+def test_deployment_invokes_create_external_id_index():
+    deployment_contents = Path("deploy/docker/production/entrypoint_deployment.sh").read_text()
+    assert "poetry run create-external-id-index production.ini --app-name app" in deployment_contents
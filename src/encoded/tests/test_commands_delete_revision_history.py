@@ -674,7 +674,7 @@ def test_main_reports_inventory_before_dry_run_cleanup(monkeypatch):
     monkeypatch.setattr(
         delete_revision_history_command,
         "report_revision_inventory",
-        lambda received_app, scan_batch_size: calls.append(
+        lambda received_app, scan_batch_size, **_parallel_options: calls.append(
             ("report", received_app, scan_batch_size)
         )
         or report,
@@ -687,7 +687,7 @@ def test_main_reports_inventory_before_dry_run_cleanup(monkeypatch):
     monkeypatch.setattr(
         delete_revision_history_command,
         "delete_revision_history",
-        lambda received_app, prod, dry_run, batch_size: calls.append(
+        lambda received_app, prod, dry_run, batch_size, **_parallel_options: calls.append(
             ("cleanup", received_app, prod, dry_run, batch_size)
         )
         or {"workflow": 0, "meta_workflow_run": 0},
@@ -1084,7 +1084,7 @@ def test_main_logs_initialization_event_before_inventory(monkeypatch):
     monkeypatch.setattr(
         delete_revision_history_command,
         "report_revision_inventory",
-        lambda received_app, scan_batch_size: calls.append(
+        lambda received_app, scan_batch_size, **_parallel_options: calls.append(
             ("report", received_app, scan_batch_size)
         )
         or report,
@@ -1097,7 +1097,7 @@ def test_main_logs_initialization_event_before_inventory(monkeypatch):
     monkeypatch.setattr(
         delete_revision_history_command,
         "delete_revision_history",
-        lambda received_app, prod, dry_run, batch_size: calls.append(
+        lambda received_app, prod, dry_run, batch_size, **_parallel_options: calls.append(
             ("cleanup", received_app, prod, dry_run, batch_size)
         )
         or {"workflow": 0, "meta_workflow_run": 0},
@@ -1630,7 +1630,7 @@ def test_main_reports_distinct_batch_sizes_per_phase(monkeypatch, capsys):
     monkeypatch.setattr(
         delete_revision_history_command,
         "report_revision_inventory",
-        lambda received_app, scan_batch_size: report,
+        lambda received_app, scan_batch_size, **_parallel_options: report,
     )
     monkeypatch.setattr(
         delete_revision_history_command, "log_revision_inventory", lambda received_report: None
@@ -1638,7 +1638,7 @@ def test_main_reports_distinct_batch_sizes_per_phase(monkeypatch, capsys):
     monkeypatch.setattr(
         delete_revision_history_command,
         "delete_revision_history",
-        lambda received_app, prod, dry_run, batch_size: {
+        lambda received_app, prod, dry_run, batch_size, **_parallel_options: {
             "workflow": 0, "meta_workflow_run": 0
         },
     )
@@ -1833,3 +1833,231 @@ def test_access_key_cleanup_preserves_current_secret_hash(session):
     assert len(remaining_rows) == 1
     assert remaining_rows[0].sid in current_sids
     assert remaining_rows[0].properties["secret_access_key_hash"] == "current-hash"
+
+
+def test_rid_partitions_split_each_type_into_contiguous_rid_ranges():
+    rids_by_type = {"workflow": [1, 2, 3, 4, 5], "page": [7], "static_section": []}
+
+    partitions = delete_revision_history_command._rid_partitions(rids_by_type, 2)
+
+    assert partitions == [("workflow", 1, 3), ("workflow", 4, 5), ("page", 7, 7)]
+
+
+def test_throughput_limiter_paces_rows_across_callers():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = delete_revision_history_command._ThroughputLimiter(
+        100, clock=lambda: now[0], sleep=sleep
+    )
+
+    assert [limiter.throttle(50) for _ in range(3)] == [0.0, 0.5, 0.5]
+    assert sleeps == [0.5, 0.5]
+    assert delete_revision_history_command._ThroughputLimiter().throttle(10**6) == 0.0
+
+
+def test_serial_cleanup_is_paced_by_the_throughput_limiter(monkeypatch):
+    pages = {None: [1, 2], 2: [3], 3: []}
+    monkeypatch.setattr(
+        delete_revision_history_command,
+        "_old_revision_sids",
+        lambda session, item_type, rids, batch_size, after_sid=None: pages[after_sid],
+    )
+    throttled = []
+    limiter = delete_revision_history_command._ThroughputLimiter(100)
+    monkeypatch.setattr(limiter, "throttle", throttled.append)
+
+    total = delete_old_revision_history_for_item_type(
+        None, "workflow", dry_run=True, batch_size=2, rids=[7], limiter=limiter
+    )
+
+    assert total == 3
+    assert throttled == [2, 1]
+
+
+@pytest.mark.parametrize("workers", [0, -1, True, "2"])
+def test_workers_validation(workers):
+    with pytest.raises(ValueError, match="workers must be a positive integer"):
+        delete_revision_history_command._validate_workers(workers)
+
+
+class _FakeResult:
+    def __init__(self, rows=(), rowcount=0):
+        self._rows = list(rows)
+        self.rowcount = rowcount
+
+    def fetchall(self):
+        return self._rows
+
+    def scalar(self):
+        return self._rows[0][0] if self._rows else None
+
+
+class _FakeTransaction:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _FakePartitionConnection:
+    """Serves old sids per item type; deletes report every selected sid."""
+
+    def __init__(self, old_sids_by_type, statements):
+        self._old_sids_by_type = old_sids_by_type
+        self._statements = statements
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def begin(self):
+        return _FakeTransaction()
+
+    def execute(self, statement, parameters=None):
+        sql = " ".join(statement.text.split())
+        self._statements.append(sql)
+        if sql.startswith("SELECT max(sid)"):
+            return _FakeResult([(100,)])
+        if sql.startswith("SELECT p.sid"):
+            assert "LEFT JOIN revision_cleanup_current_sids" in sql
+            sids = [
+                sid
+                for sid in self._old_sids_by_type[parameters["item_type"]]
+                if parameters["after_sid"] < sid <= parameters["max_sid"]
+            ]
+            return _FakeResult([(sid,) for sid in sids[: parameters["batch_size"]]])
+        if sql.startswith("DELETE FROM propsheets"):
+            assert "NOT EXISTS" in sql
+            return _FakeResult(rowcount=len(parameters["sids"]))
+        return _FakeResult()
+
+
+class _FakeEngine:
+    def __init__(self, old_sids_by_type):
+        self.old_sids_by_type = old_sids_by_type
+        self.statements = []
+
+    def connect(self):
+        return _FakePartitionConnection(self.old_sids_by_type, self.statements)
+
+
+def test_parallel_cleanup_pages_each_partition_on_its_own_connection(monkeypatch):
+    monkeypatch.setattr(
+        delete_revision_history_command.logger, "info", _drop_log_record
+    )
+    engine = _FakeEngine({"workflow": [1, 2, 3, 4, 5], "page": [6, 200]})
+
+    deleted_by_type = delete_revision_history_command.delete_old_revision_history_in_parallel(
+        engine,
+        {"workflow": ["rid-1"], "page": ["rid-2"], "static_section": []},
+        batch_size=2,
+        workers=2,
+    )
+
+    # Rows written after the max(sid) snapshot (sid 200) are never candidates.
+    assert deleted_by_type == {"workflow": 5, "page": 1, "static_section": 0}
+    assert sum(sql.startswith("CREATE TEMPORARY TABLE") for sql in engine.statements) == 2
+    assert sum(sql.startswith("DROP TABLE") for sql in engine.statements) == 2
+    assert sum(sql.startswith("DELETE FROM propsheets") for sql in engine.statements) == 4
+
+
+_INVENTORY_RESOURCES = [
+    (str(uuid4()), item_type)
+    for item_type in ["workflow"] * 7 + ["page"] * 3 + ["tissue"] * 5
+]
+_INVENTORY_REVISIONS = [
+    (sid, _INVENTORY_RESOURCES[sid % len(_INVENTORY_RESOURCES)][1], sid if sid % 3 else None)
+    for sid in range(1, 41)
+]
+
+
+class _FakeInventoryConnection:
+    """Serves the range-scan pages of the module-level inventory fixture rows."""
+
+    def __init__(self, engine):
+        self._engine = engine
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, statement, parameters=None):
+        sql = " ".join(statement.text.split())
+        if sql.startswith("SELECT max(sid)"):
+            return _FakeResult([(_INVENTORY_REVISIONS[-1][0],)])
+        self._engine.pages += 1
+        if self._engine.pages == self._engine.fail_on_page:
+            raise RuntimeError("connection lost")
+        rows = _INVENTORY_RESOURCES if sql.startswith("SELECT rid") else _INVENTORY_REVISIONS
+        if "after" in parameters:
+            rows = [row for row in rows if parameters["after"] < row[0] <= parameters["last"]]
+        else:
+            rows = [row for row in rows if parameters["first"] <= row[0] <= parameters["last"]]
+        return _FakeResult(sorted(rows)[: parameters["batch_size"]])
+
+
+class _FakeInventoryEngine:
+    def __init__(self, fail_on_page=None):
+        self.fail_on_page = fail_on_page
+        self.pages = 0
+
+    def connect(self):
+        return _FakeInventoryConnection(self)
+
+
+def test_parallel_inventory_matches_serial_inventory(monkeypatch):
+    _capture_log_events(monkeypatch)
+    serial_report = collect_revision_inventory(
+        _CannedPagedSession(
+            [sorted(_INVENTORY_RESOURCES)], [sorted(_INVENTORY_REVISIONS)]
+        ),
+        scan_batch_size=100,
+    )
+
+    parallel_report = delete_revision_history_command.collect_revision_inventory_in_parallel(
+        _FakeInventoryEngine(), scan_batch_size=2, workers=3
+    )
+
+    assert parallel_report == serial_report
+    assert parallel_report["totals"] == {
+        "resource_count": 15,
+        "total_revision_count": 40,
+        "excess_historical_revisions": 13,
+    }
+
+
+def test_parallel_inventory_resumes_from_checkpoint(monkeypatch, tmp_path):
+    events = _capture_log_events(monkeypatch)
+    checkpoint_path = str(tmp_path / "inventory.json")
+    expected = delete_revision_history_command.collect_revision_inventory_in_parallel(
+        _FakeInventoryEngine(), scan_batch_size=2, workers=2
+    )
+
+    with pytest.raises(RuntimeError, match="connection lost"):
+        delete_revision_history_command.collect_revision_inventory_in_parallel(
+            _FakeInventoryEngine(fail_on_page=20),
+            scan_batch_size=2,
+            workers=2,
+            checkpoint_path=checkpoint_path,
+        )
+    assert Path(checkpoint_path).exists()
+
+    resumed_engine = _FakeInventoryEngine()
+    resumed = delete_revision_history_command.collect_revision_inventory_in_parallel(
+        resumed_engine, scan_batch_size=2, workers=2, checkpoint_path=checkpoint_path
+    )
+
+    assert resumed == expected
+    assert resumed_engine.pages < 20
+    assert not Path(checkpoint_path).exists()
+    assert any(name == "revision_inventory_checkpoint_resumed" for name, _ in events)
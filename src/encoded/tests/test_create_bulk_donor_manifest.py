@@ -0,0 +1,94 @@
+from typing import Any, Dict, List
+from unittest import mock
+
+from ..commands import create_bulk_donor_manifest as manifest
+from ..item_utils.utils import RequestHandler
+
+
+SCHEMAS = {
+    "Donor": {"properties": {"age": {}, "sex": {}}},
+    "ProtectedDonor": {"properties": {"age": {}, "sex": {}, "medical_history": {"linkTo": "MedicalHistory"}}},
+    "Demographic": {"properties": {"ethnicities": {}, "donor": {"linkTo": "AbstractDonor"}}},
+    "DeathCircumstances": {"properties": {"season_of_death": {}}},
+    "MedicalHistory": {"properties": {"height": {}}},
+    "TissueCollection": {"properties": {"ischemic_time": {}}},
+    "FamilyHistory": {"properties": {}},
+    "MedicalTreatment": {"properties": {}},
+    "Diagnosis": {"properties": {"disease": {}}},
+    "Exposure": {"properties": {}},
+}
+DONORS = [
+    {"uuid": "donor-1", "accession": "SMADO1", "external_id": "ST001", "age": 45, "sex": "Male"},
+    {"uuid": "donor-2", "accession": "SMADO2", "external_id": "ST002", "age": 0, "sex": ""},
+]
+SEARCH_HITS = {
+    "Demographic": [
+        {"donor": "donor-1", "ethnicities": ["Asian", "White"]},
+        {"donor": "donor-2", "ethnicities": ["White"]},
+        {"donor": "donor-2", "ethnicities": []},
+    ],
+    "MedicalHistory": [
+        {"uuid": "mh-1", "submitted_id": "TEST_MH_1", "donor": {"display_title": "ST001"}, "height": 1.8},
+    ],
+    "Diagnosis": [
+        {"medical_history": "mh-1", "disease": "Cancer"},
+    ],
+    "Donor": [
+        {"external_id": "ST001", "accession": "SMADOPUB1"},
+        {"external_id": "ST002", "accession": "SMADOPUB2"},
+    ],
+}
+
+
+# Search values (external IDs, submitted IDs) to UUIDs of (raw) links
+SEARCH_VALUE_UUIDS = {"ST001": "donor-1", "ST002": "donor-2", "TEST_MH_1": "mh-1"}
+
+
+def search_metadata(query: str, key: Dict[str, str]) -> List[Dict[str, Any]]:
+    params = [param.split("=") for param in query.split("?")[1].split("&")]
+    item_type = dict(params)["type"]
+    filters = {}
+    for field, value in params:
+        if field not in ["type", "frame"]:
+            filters.setdefault(field, set()).update([value, SEARCH_VALUE_UUIDS.get(value)])
+    return [
+        hit for hit in SEARCH_HITS.get(item_type, [])
+        if all(
+            (hit.get(field).get("display_title") if isinstance(hit.get(field), dict)
+             else hit.get(field)) in values
+            for field, values in filters.items()
+        )
+    ]
+
+
+def test_get_bulk_donor_manifest() -> None:
+    request_handler = RequestHandler(auth_key={"key": "manifest"})
+    with mock.patch.object(
+        manifest.ff_utils, "search_metadata", side_effect=search_metadata
+    ) as mock_search_metadata:
+        result = manifest.get_bulk_donor_manifest(DONORS, SCHEMAS, request_handler)
+        # One search per linked item type with columns (and public Donors), not per donor
+        assert mock_search_metadata.call_count == 6
+    assert list(result["Donor.accession"]) == ["SMADOPUB1", "SMADOPUB2"]
+    assert list(result["ProtectedDonor.age"]) == [45, 0]
+    assert list(result["ProtectedDonor.sex"]) == ["Male", "NA"]
+    assert list(result["Demographic.ethnicities"]) == ["Asian;White", "White|NA"]
+    assert list(result["MedicalHistory.height_m"]) == [1.8, "NA"]
+    assert list(result["Diagnosis.disease"]) == ["Cancer", "NA"]
+    assert list(result["DeathCircumstances.season_of_death"]) == ["NA", "NA"]
+
+
+def test_write_bulk_donor_manifest_streaming(tmp_path) -> None:
+    request_handler = RequestHandler(auth_key={"key": "manifest"})
+    output = tmp_path / "manifest.tsv"
+    streamed_output = tmp_path / "streamed_manifest.tsv"
+    with mock.patch.object(
+        manifest.ff_utils, "search_metadata", side_effect=search_metadata
+    ):
+        manifest.write_bulk_donor_manifest(
+            manifest.get_bulk_donor_manifest(DONORS, SCHEMAS, request_handler), output
+        )
+        manifest.write_bulk_donor_manifest_streaming(
+            DONORS, SCHEMAS, request_handler, streamed_output, chunk_size=1
+        )
+    assert streamed_output.read_text() == output.read_text()
@@ -0,0 +1,106 @@
+from types import ModuleType
+from typing import Any, Dict, List
+from unittest import mock
+
+import pytest
+
+SMAHT_KEY = {"key": "key", "secret": "secret", "server": "https://data.smaht.org"}
+
+
+@pytest.fixture(scope="module")
+def qc_overview() -> ModuleType:
+    """The create_qc_overview_json module, which gets its keys on import."""
+    pytest.importorskip("click")  # Not a dependency of the portal itself
+    with mock.patch("dcicutils.creds_utils.SMaHTKeyManager.get_keydict_for_env", return_value=SMAHT_KEY):
+        from ..commands import create_qc_overview_json
+    return create_qc_overview_json
+
+
+def get_file_stats(qc_overview: ModuleType, **kwargs) -> Any:
+    with mock.patch.object(qc_overview, "search", return_value=[]):  # i.e. no tissues
+        return qc_overview.FileStats("output.json", "somalier.json", **kwargs)
+
+
+def get_qc_metric(derived_from: str, value: Any) -> Dict[str, Any]:
+    return {"derived_from": derived_from, "tooltip": f"{derived_from} tooltip", "key": derived_from, "value": value}
+
+
+def test_checkpoint(qc_overview: ModuleType, tmp_path) -> None:
+    """Test processed file sets saved and loaded, unless of a different version."""
+    checkpoint = str(tmp_path / "checkpoint.json")
+    file_stats = get_file_stats(qc_overview, checkpoint=checkpoint)
+    assert file_stats.load_checkpoint() == {}
+    processed = {"uuid-1": {"record": None, "warnings": ["Warning"]}}
+    file_stats.save_checkpoint(processed)
+    assert file_stats.load_checkpoint() == processed
+    with mock.patch.object(qc_overview, "CHECKPOINT_VERSION", qc_overview.CHECKPOINT_VERSION + 1):
+        assert file_stats.load_checkpoint() == {}
+    file_stats.remove_checkpoint()
+    assert file_stats.load_checkpoint() == {}
+    get_file_stats(qc_overview).save_checkpoint(processed)  # i.e. no checkpoint; nothing saved
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_get_unmodified_from_previous(qc_overview: ModuleType) -> None:
+    """Test previous results reused only for file sets not modified or processed since."""
+    previous = {
+        "generated": "2026-01-02T03:04:05+00:00",
+        "qc_results": [
+            {"fileset": f"SMAFS{index}", "quality_metrics": {"qc_values": {"coverage": {"value": 30}}}}
+            for index in range(1, 4)
+        ],
+        "qc_info": {"coverage": {"derived_from": "coverage", "tooltip": "Coverage", "key": "Coverage"}},
+    }
+    file_stats = get_file_stats(qc_overview, previous=previous)
+    filesets = [{"uuid": f"uuid-{index}", "accession": f"SMAFS{index}"} for index in range(1, 5)]
+    with mock.patch.object(qc_overview, "get_modified_fileset_identifiers",
+                           return_value={"uuid-2"}) as get_modified_fileset_identifiers:
+        unmodified = file_stats.get_unmodified_from_previous(filesets, processed={"uuid-3": {}})
+    get_modified_fileset_identifiers.assert_called_once_with("2026-01-02")
+    assert list(unmodified) == ["uuid-1"]  # i.e. not modified, processed, or without previous result
+    assert unmodified["uuid-1"]["record"] == {
+        "result": previous["qc_results"][0],
+        "qc_metrics": [{"derived_from": "coverage", "tooltip": "Coverage", "key": "Coverage", "value": 30}],
+    }
+
+
+def test_add_qc_metrics(qc_overview: ModuleType) -> None:
+    """Test QC metrics added to the QC info, and numeric ones once to the sorted facets of the assay."""
+    file_stats = get_file_stats(qc_overview)
+    file_stats.add_qc_metrics("WGS", [get_qc_metric("mosdepth:total", 30), get_qc_metric("samtools:reads", 100),
+                                      get_qc_metric("verifybamid:status", "PASS")])
+    file_stats.add_qc_metrics("WGS", [get_qc_metric("mosdepth:total", 40)])
+    file_stats.add_qc_metrics("RNA-seq", [get_qc_metric("mosdepth:total", 50)])
+    facets = file_stats.viz_info["facets"]["qc_metrics"]
+    assert [qc_metric["derived_from"] for qc_metric in facets["WGS"]] == ["mosdepth:total", "samtools:reads"]
+    assert [qc_metric["derived_from"] for qc_metric in facets["RNA-seq"]] == ["mosdepth:total"]
+    assert set(file_stats.qc_info) == {"mosdepth:total", "samtools:reads", "verifybamid:status"}
+    assert "value" not in file_stats.qc_info["mosdepth:total"]
+
+
+def test_get_modified_fileset_identifiers(qc_overview: ModuleType) -> None:
+    """Test file sets of modified items (directly, or via files, tissues and donors) found."""
+    results = {
+        "type=FileSet&field=uuid&last": [{"uuid": "fs-1"}],
+        "type=MetaWorkflowRun&field=file_sets": [{"file_sets": [{"uuid": "fs-2"}]}],
+        "type=File&field=file_sets&last": [{"file_sets": ["/file-sets/fs-3/"]}],
+        "type=QualityMetric&field=uuid": [{"uuid": "qm-1"}],
+        "type=File&field=file_sets&quality_metrics.uuid=qm-1": [{"file_sets": [{"uuid": "fs-4"}]}],
+        "type=Tissue&field=uuid&last": [{"uuid": "tissue-1"}],
+        "type=Donor&field=uuid": [{"uuid": "donor-1"}],
+        "type=Tissue&field=uuid&donor.uuid=donor-1": [{"uuid": "tissue-2"}],
+        "type=FileSet&field=uuid&libraries.analytes.samples.sample_sources.uuid=tissue-1"
+        "&libraries.analytes.samples.sample_sources.uuid=tissue-2": [{"uuid": "fs-5"}],
+    }
+    queries: List[str] = []
+
+    def search(query: str) -> List[Dict[str, Any]]:
+        queries.append(query)
+        [result] = [result for prefix, result in results.items() if query.startswith(f"search/?{prefix}")]
+        return result
+
+    with mock.patch.object(qc_overview, "search", side_effect=search):
+        assert qc_overview.get_modified_fileset_identifiers("2026-01-02") == {
+            "fs-1", "fs-2", "fs-3", "fs-4", "fs-5"
+        }
+    assert len(queries) == len(results)
@@ -0,0 +1,127 @@
+import json
+from typing import List
+from unittest import mock
+
+import pytest
+from encoded_core.file_views import update_google_analytics
+from pyramid.registry import Registry
+from webob import Request
+
+from ..download_analytics import (
+    GA_DISPATCHER, GA4_MAX_EVENTS_PER_REQUEST, GoogleAnalyticsDispatcher, dispatch_download_to_google_analytics
+)
+
+
+GA_CONFIG = {"hostnameTrackerIDMapping": {"default": ["UA-TEST", "G-TEST"]}}
+
+
+class MockResponse:
+
+    def __init__(self, status_code: int) -> None:
+        self.status_code = status_code
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise Exception(f"{self.status_code} Error")
+
+
+class MockPost:
+
+    def __init__(self, status_code: int = 204) -> None:
+        self.status_code = status_code
+        self.urls: List[str] = []
+        self.payloads: List[dict] = []
+
+    def __call__(self, url: str, data: str, **kwargs) -> MockResponse:
+        self.urls.append(url)
+        self.payloads.append(json.loads(data))
+        return MockResponse(self.status_code)
+
+
+class MockContext:
+
+    def jsonld_type(self) -> List[str]:
+        return ["OutputFile", "File", "Item"]
+
+
+def get_dispatcher(queue_size: int, post: MockPost) -> GoogleAnalyticsDispatcher:
+    dispatcher = GoogleAnalyticsDispatcher(queue_size=queue_size, post=post)
+    dispatcher._ensure_thread = lambda: None  # i.e. no background thread; flush explicitly
+    return dispatcher
+
+
+def get_download_request(dispatcher: GoogleAnalyticsDispatcher, client_id: str = "client-a") -> Request:
+    request = Request.blank("/output-files/SMAFITEST/@@download/test.bam", host="data.smaht.org",
+                            cookies={"clientIdentifier": client_id})
+    request.registry = Registry()
+    request.registry.settings = {"ga4.secret": "secret"}
+    request.registry[GA_DISPATCHER] = dispatcher
+    return request
+
+
+def dispatch_download(request: Request, user_uuid: str = "user-a") -> bool:
+    return dispatch_download_to_google_analytics(MockContext(), request, GA_CONFIG, "test.bam", 100,
+                                                 "/output-files/SMAFITEST/", "Test Center", user_uuid,
+                                                 ["admin"], None, None, "Aligned Reads")
+
+
+def test_dispatch_download_to_google_analytics_matches_upstream_payload() -> None:
+    post = MockPost()
+    dispatcher = get_dispatcher(100, post)
+    request = get_download_request(dispatcher)
+    assert dispatch_download(request) is True
+    dispatcher.flush()
+    upstream_post = MockPost()
+    with mock.patch("encoded_core.file_views.requests.post", upstream_post):
+        update_google_analytics(MockContext(), request, GA_CONFIG, "test.bam", 100, "/output-files/SMAFITEST/",
+                                "Test Center", "user-a", ["admin"], None, None, "Aligned Reads")
+    [payload], [upstream_payload] = post.payloads, upstream_post.payloads
+    assert post.urls == upstream_post.urls
+    [event], [upstream_event] = payload["events"], upstream_payload["events"]
+    assert int(event.pop("timestamp_micros")) <= int(upstream_payload.pop("timestamp_micros"))
+    assert payload == upstream_payload
+    assert event == upstream_event
+    assert dispatcher.info() == {"queue_size": 0, "queued": 1, "dropped": 0, "sent": 1, "failed": 0}
+
+
+def test_dispatch_download_to_google_analytics_timestamps_at_download() -> None:
+    post = MockPost()
+    dispatcher = get_dispatcher(100, post)
+    with mock.patch("encoded.download_analytics.datetime") as mock_datetime:
+        mock_datetime.datetime.now.return_value.timestamp.return_value = 1700000000.5
+        dispatch_download(get_download_request(dispatcher))
+    dispatcher.flush()
+    [payload] = post.payloads
+    assert payload["events"][0]["timestamp_micros"] == "1700000000500000"
+
+
+def test_ga_dispatcher_batches_per_client() -> None:
+    post = MockPost()
+    dispatcher = get_dispatcher(100, post)
+    for _ in range(GA4_MAX_EVENTS_PER_REQUEST + 1):
+        dispatch_download(get_download_request(dispatcher, "client-a"))
+    dispatch_download(get_download_request(dispatcher, "client-b"), user_uuid=None)
+    dispatcher.flush()
+    assert [(payload["client_id"], payload.get("user_id"), len(payload["events"])) for payload in post.payloads] == [
+        ("client-a", "user-a", GA4_MAX_EVENTS_PER_REQUEST), ("client-a", "user-a", 1), ("client-b", None, 1)
+    ]
+    assert dispatcher.info()["sent"] == GA4_MAX_EVENTS_PER_REQUEST + 2
+
+
+@pytest.mark.parametrize("post", [MockPost(500), mock.Mock(side_effect=Exception("Connection refused"))])
+def test_ga_dispatcher_counts_failed(post) -> None:
+    dispatcher = get_dispatcher(100, post)
+    dispatch_download(get_download_request(dispatcher))
+    dispatch_download(get_download_request(dispatcher))
+    dispatcher.flush()
+    assert dispatcher.info() == {"queue_size": 0, "queued": 2, "dropped": 0, "sent": 0, "failed": 2}
+
+
+def test_ga_dispatcher_drops_when_full() -> None:
+    post = MockPost()
+    dispatcher = get_dispatcher(2, post)
+    results = [dispatch_download(get_download_request(dispatcher)) for _ in range(3)]
+    assert results == [True, True, False]
+    assert dispatcher.info()["dropped"] == 1
+    dispatcher.flush()
+    assert [len(payload["events"]) for payload in post.payloads] == [2]
@@ -5,7 +5,7 @@ import pytest
 from webtest import TestApp
 
 from .utils import get_search
-from ..commands.release_file import FileRelease
+from ..commands.release_file import FileRelease, FileReleaseBatch, ReleaseItemCache
 from ..item_utils import (
     file as file_utils,
     item as item_utils,
@@ -156,3 +156,61 @@ def test_file_release(es_testapp: TestApp, workbook: None) -> None:
             assert file_release.cell_lines or file_release.donors
             assert file_release.patch_infos
             assert file_release.patch_dicts
+
+
+def test_release_item_cache() -> None:
+    """Test items fetched once, across frames, identifiers, and uuids."""
+    fetched = []
+
+    def fetch(identifier: str) -> dict:
+        fetched.append(identifier)
+        uuid = identifier.strip("/").split("/")[-1]
+        return {"uuid": uuid, "@id": f"/libraries/{uuid}/"}
+
+    item_cache = ReleaseItemCache(concurrency=4)
+    items = item_cache.get_items(["uuid-1", "uuid-2", "uuid-1", {"uuid": "uuid-2"}], fetch)
+    assert [item["uuid"] for item in items] == ["uuid-1", "uuid-2"]
+    assert sorted(fetched) == ["uuid-1", "uuid-2"]
+    assert item_cache.get_item("/libraries/uuid-1/", fetch)["uuid"] == "uuid-1"
+    assert item_cache.get_item("uuid-1", fetch, frame="embedded")["uuid"] == "uuid-1"
+    assert sorted(fetched) == ["uuid-1", "uuid-1", "uuid-2"]
+    assert item_cache.search("/search/?type=Library", lambda query: [{"uuid": "uuid-3"}]) == [{"uuid": "uuid-3"}]
+    assert item_cache.search("/search/?type=Library", lambda query: []) == [{"uuid": "uuid-3"}]
+
+
+def test_file_release_batch_merge_patch_dicts() -> None:
+    with mock.patch("encoded.commands.release_file.FileRelease.__init__", return_value=None):
+        file_release_batch = FileReleaseBatch({}, ["SMAFI1", "SMAFI2"])
+    merged = file_release_batch.merge_patch_dicts([
+        {"uuid": "uuid-1", "status": "open-early"},
+        {"uuid": "uuid-2", "status": "open-early"},
+        {"uuid": "uuid-1", "status": "open-early", "dataset": "tissue"},
+    ])
+    assert merged == [
+        {"uuid": "uuid-1", "status": "open-early", "dataset": "tissue"},
+        {"uuid": "uuid-2", "status": "open-early"},
+    ]
+    with pytest.raises(SystemExit):
+        file_release_batch.merge_patch_dicts([
+            {"uuid": "uuid-1", "status": "open-early"},
+            {"uuid": "uuid-1", "status": "open"},
+        ])
+
+
+def test_file_release_batch_bulk_patch_stops_at_failed_chunk() -> None:
+    """Test chunks applied in order, stopping at the first failed chunk."""
+    with mock.patch("encoded.commands.release_file.FileRelease.__init__", return_value=None):
+        file_release_batch = FileReleaseBatch({}, ["SMAFI1"])
+    patch_dicts = [{"uuid": f"uuid-{index}", "status": "open-early"} for index in range(5)]
+    with mock.patch("encoded.commands.release_file.BULK_PATCH_CHUNK_SIZE", 2), \
+            mock.patch("encoded.commands.release_file.bulk_patch_metadata",
+                       side_effect=[None, Exception("Bulk patch failed")]) as bulk_patch_metadata:
+        with pytest.raises(Exception) as exc_info:
+            file_release_batch.bulk_patch(patch_dicts)
+    assert [call.args[0] for call in bulk_patch_metadata.call_args_list] == [patch_dicts[:2], patch_dicts[2:4]]
+    assert str(exc_info.value).splitlines() == [
+        "Bulk patch failed",
+        "Chunk 1 of 3 (2 patches): applied",
+        "Chunk 2 of 3 (2 patches): failed",
+        "Chunk 3 of 3 (1 patches): not attempted",
+    ]
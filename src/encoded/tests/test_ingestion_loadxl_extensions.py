@@ -0,0 +1,70 @@
+from typing import List, Optional
+from unittest import mock
+
+from dcicutils.submitr.progress_constants import PROGRESS_LOADXL
+
+from encoded.ingestion import loadxl_extensions
+from encoded.ingestion.loadxl_extensions import get_loadxl_dependency_levels
+
+
+class MockPortal:
+
+    SCHEMAS = {
+        "Donor": {"properties": {"submission_centers": {"type": "array", "items": {"linkTo": "SubmissionCenter"}}}},
+        "MedicalHistory": {"properties": {"donor": {"linkTo": "AbstractDonor"}}},
+        "Diagnosis": {"properties": {"medical_history": {"linkTo": "MedicalHistory"}}},
+        "Exposure": {"properties": {"medical_history": {"linkTo": "MedicalHistory"}}},
+        "Tissue": {
+            "properties": {
+                "donor": {"linkTo": "Donor"},
+                "tissue_samples": {"calculatedProperty": True, "items": {"linkTo": "TissueSample"}},
+            }
+        },
+        "TissueSample": {"properties": {"sample_sources": {"items": {"linkTo": "Tissue"}}}},
+        "Library": {"properties": {"analytes": {"items": {"linkTo": "Analyte"}}}},
+        "Analyte": {"properties": {"libraries": {"items": {"linkTo": "Library"}}}},
+    }
+
+    def get_schema(self, type_name: str) -> Optional[dict]:
+        return self.SCHEMAS.get(type_name)
+
+    def get_schema_super_type_names(self, type_name: str) -> List[str]:
+        return ["AbstractDonor"] if type_name == "Donor" else []
+
+
+def test_get_loadxl_dependency_levels() -> None:
+    data = {type_name: [] for type_name in MockPortal.SCHEMAS}
+    assert get_loadxl_dependency_levels(data, MockPortal()) == [
+        [["Donor"], ["Analyte", "Library"]],
+        [["MedicalHistory"], ["Tissue"]],
+        [["Diagnosis"], ["Exposure"], ["TissueSample"]],
+    ]
+
+
+def test_get_loadxl_dependency_levels_independent_types() -> None:
+    data = {"Exposure": [], "Diagnosis": []}
+    assert get_loadxl_dependency_levels(data, MockPortal()) == [[["Diagnosis"], ["Exposure"]]]
+
+
+def test_load_data_into_database_concurrently_reports_done_once() -> None:
+    events = []
+
+    def load_data_into_database(data: dict, progress, **kwargs) -> dict:
+        for event in [PROGRESS_LOADXL.START, PROGRESS_LOADXL.ITEM, PROGRESS_LOADXL.START_SECOND_ROUND,
+                      PROGRESS_LOADXL.DONE]:
+            progress(event)
+        return {"created": [{"uuid": type_name, "type": type_name} for type_name in data], "types": list(data)}
+
+    data = {type_name: [] for type_name in MockPortal.SCHEMAS}
+    with mock.patch.object(loadxl_extensions, "Portal", return_value=MockPortal()):
+        with mock.patch.object(loadxl_extensions, "VirtualApp"):
+            with mock.patch.object(loadxl_extensions, "IngestionStatusCache"):
+                with mock.patch.object(loadxl_extensions, "define_progress_tracker", return_value=events.append):
+                    with mock.patch.object(loadxl_extensions, "load_data_into_database", load_data_into_database):
+                        response = loadxl_extensions.load_data_into_database_concurrently(
+                            "some-uuid", data=data, portal_vapp=mock.MagicMock(), max_workers=2)
+    assert len(response["created"]) == len(data)
+    assert events.count(PROGRESS_LOADXL.ITEM) == 7  # One per type group.
+    assert [event for event in events if event != PROGRESS_LOADXL.ITEM] == [
+        PROGRESS_LOADXL.START, PROGRESS_LOADXL.START_SECOND_ROUND, PROGRESS_LOADXL.DONE]
+    assert events[-1] == PROGRESS_LOADXL.DONE
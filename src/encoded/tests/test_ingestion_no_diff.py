@@ -1,5 +1,10 @@
+from types import SimpleNamespace
+from typing import Dict, List
+from unittest import mock
+
 import pytest
 from dcicutils.structured_data import Portal, StructuredDataSet
+from encoded.ingestion.bulk_compare import _content_hash, _normalize_refs, _project, get_no_diff_items_bulk
 from encoded.ingestion.ingestion_processors import get_no_diff_items
 from webtest.app import TestApp
 
@@ -33,3 +38,77 @@ def test_donor_diff(portal, workbook: None, donor_data, expected_no_diff):
     structured_data = add_items(donor_data, StructuredDataSet(portal=portal))
     no_diff_items = get_no_diff_items(structured_data)
     assert no_diff_items == expected_no_diff, no_diff_items
+    no_diff_items_bulk = get_no_diff_items_bulk(structured_data)
+    assert no_diff_items_bulk == expected_no_diff, no_diff_items_bulk
+
+
+@pytest.mark.parametrize(
+    "submitted,existing,expected_same",
+    [
+        ({"age": 45}, {"age": 45, "uuid": "abc"}, True),
+        ({"age": 5}, {"age": 45}, False),
+        ({"age": 5}, {}, False),
+        ({"tags": ["a", "b"]}, {"tags": ["b", "a"]}, True),
+        ({"tags": ["a"]}, {"tags": ["a", "b"]}, False),
+        ({"obj": {"x": 1}}, {"obj": {"x": 1, "y": 2}}, True),
+        ({"objs": [{"x": 1}]}, {"objs": [{"x": 1, "y": 2}]}, True),
+        ({"objs": [{"x": 1}]}, {"objs": [{"x": 1}, {"x": 2}]}, False),
+    ]
+)
+def test_bulk_compare_content_hash(submitted, existing, expected_same):
+    same = _content_hash(submitted) == _content_hash(_project(existing, submitted))
+    assert same is expected_same
+
+
+def test_bulk_compare_normalize_refs():
+    schema = {
+        "properties": {
+            "donor": {"type": "string", "linkTo": "Donor"},
+            "samples": {"type": "array", "items": {"type": "string", "linkTo": "Sample"}},
+            "age": {"type": "integer"},
+        }
+    }
+    refs = {"/Donor/TEST_DONOR": "donor-uuid", "/Sample/TEST_SAMPLE": "sample-uuid"}
+    item = {"donor": "TEST_DONOR", "samples": ["TEST_SAMPLE", "OTHER_SAMPLE"], "age": 45}
+    assert _normalize_refs(item, schema, refs) == {
+        "donor": "donor-uuid", "samples": ["sample-uuid", "OTHER_SAMPLE"], "age": 45
+    }
+
+
+class MockPortal:
+    """Portal with given (possibly stale) search results, and given items in the database."""
+
+    def __init__(self, searched: List[dict], database: Dict[str, dict]) -> None:
+        self.searched = searched
+        self.database = database
+
+    def get_schema(self, type_name: str) -> dict:
+        return {"properties": {"submitted_id": {"type": "string"}, "age": {"type": "integer"}}}
+
+    def get(self, url: str) -> mock.Mock:
+        return mock.Mock(status_code=200, json=mock.Mock(return_value={"@graph": self.searched}))
+
+    def get_metadata(self, object_id: str, raw: bool = False, database: bool = False) -> dict:
+        assert raw and database
+        if (item := self.database.get(object_id)) is None:
+            raise Exception("HTTPNotFound")
+        return item
+
+
+@pytest.mark.parametrize(
+    "searched,database,expected_no_diff",
+    [
+        ([{"submitted_id": "TEST_DONOR", "age": 45}], {"/Donor/TEST_DONOR": {"submitted_id": "TEST_DONOR", "age": 45}},
+         {"TEST_DONOR"}),
+        # Search copy stale: submission reverts a recent change, so it is a change.
+        ([{"submitted_id": "TEST_DONOR", "age": 45}], {"/Donor/TEST_DONOR": {"submitted_id": "TEST_DONOR", "age": 5}},
+         set()),
+        ([{"submitted_id": "TEST_DONOR", "age": 45}], {}, set()),
+        ([{"submitted_id": "TEST_DONOR", "age": 5}], {"/Donor/TEST_DONOR": {"submitted_id": "TEST_DONOR", "age": 45}},
+         set()),
+    ]
+)
+def test_get_no_diff_items_bulk_confirmed_from_database(searched, database, expected_no_diff):
+    structured_data = SimpleNamespace(portal=MockPortal(searched, database), resolved_refs_with_uuids=[],
+                                      data={"Donor": [{"submitted_id": "TEST_DONOR", "age": 45}]})
+    assert get_no_diff_items_bulk(structured_data) == expected_no_diff
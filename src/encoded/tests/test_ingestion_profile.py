@@ -0,0 +1,49 @@
+from dcicutils.submitr.progress_constants import PROGRESS_LOADXL
+
+from encoded.ingestion.ingestion_profile import IngestionProfile
+
+
+def test_ingestion_profile_phases() -> None:
+    profile = IngestionProfile()
+    with profile.phase("parse"):
+        pass
+    with profile.phase("parse"):
+        pass
+    profile.record_phase("validate", 1.5)
+    profile.finish()
+    profile = profile.as_dict()
+    assert profile["phases"]["parse"]["count"] == 2
+    assert profile["phases"]["validate"] == {"count": 1, "seconds": 1.5}
+
+
+def test_ingestion_profile_items() -> None:
+    profile = IngestionProfile(slowest_count=2)
+    profile.record_item("Donor", "create", "TEST_DONOR_1", 1.0)
+    profile.record_item("Donor", "update", "TEST_DONOR_2", 3.0)
+    profile.record_item("Tissue", "create", "TEST_TISSUE_1", 2.0)
+    profile = profile.as_dict()
+    assert profile["types"]["Donor"] == {"count": 2, "seconds": 4.0, "max_seconds": 3.0,
+                                         "average_seconds": 2.0, "create": 1, "update": 1}
+    assert profile["slowest_items"] == [
+        {"type": "Donor", "action": "update", "identifier": "TEST_DONOR_2", "seconds": 3.0},
+        {"type": "Tissue", "action": "create", "identifier": "TEST_TISSUE_1", "seconds": 2.0}
+    ]
+
+
+def test_ingestion_profile_lookups() -> None:
+    profile = IngestionProfile()
+    lookup = profile.timed_lookup_function(lambda path: {"path": path})
+    assert lookup("/Donor/TEST_DONOR_1") == {"path": "/Donor/TEST_DONOR_1"}
+    profile = profile.as_dict()
+    assert profile["lookups"]["count"] == 1
+    assert profile["slowest_lookups"][0]["path"] == "/Donor/TEST_DONOR_1"
+
+
+def test_ingestion_profile_loadxl_progress_tracker() -> None:
+    events = []
+    profile = IngestionProfile()
+    progress = profile.loadxl_progress_tracker(events.append)
+    for event in [PROGRESS_LOADXL.START, PROGRESS_LOADXL.START_SECOND_ROUND, PROGRESS_LOADXL.DONE]:
+        progress(event)
+    assert events == [PROGRESS_LOADXL.START, PROGRESS_LOADXL.START_SECOND_ROUND, PROGRESS_LOADXL.DONE]
+    assert set(profile.as_dict()["phases"]) == {"loadxl_first_round", "loadxl_second_round"}
@@ -0,0 +1,85 @@
+from typing import List, Optional
+
+from encoded.ingestion.reference_cache import ReferenceCache
+
+
+class MockVirtualApp:
+
+    def __init__(self, user: Optional[str] = None) -> None:
+        self.extra_environ = {"REMOTE_USER": user}
+
+
+class MockPortal:
+
+    def __init__(self, user: Optional[str] = None) -> None:
+        self.lookups = []
+        self.ref_lookup = self.ref_lookup_uncached
+        self.vapp = MockVirtualApp(user)
+
+    def ref_lookup_uncached(self, path: str) -> Optional[dict]:
+        self.lookups.append(path)
+        return {"uuid": f"uuid-for-{path}"}
+
+
+def get_warmed_reference_cache(items: List[dict], ttl: int = 600, user: Optional[str] = None) -> ReferenceCache:
+    reference_cache = ReferenceCache(ttl=ttl)
+    for item in items:
+        reference_cache.put([f"/SubmissionCenter/{item['identifier']}", f"/SubmissionCenter/{item['uuid']}"], item,
+                            user=user)
+    reference_cache._warmed[user] = float("inf")  # i.e. never rewarm
+    return reference_cache
+
+
+def test_reference_cache_lookups() -> None:
+    reference_cache = get_warmed_reference_cache([{"uuid": "sc-uuid", "identifier": "some_center"}])
+    portal = MockPortal()
+    stats = reference_cache.install(portal)
+    assert portal.ref_lookup("/SubmissionCenter/some_center") == {"uuid": "sc-uuid", "identifier": "some_center"}
+    assert portal.ref_lookup("/SubmissionCenter/sc-uuid")["uuid"] == "sc-uuid"
+    assert portal.lookups == []
+    # Not yet cached but of a cached type; looked up once and then cached.
+    assert portal.ref_lookup("/Consortium/smaht") == {"uuid": "uuid-for-/Consortium/smaht"}
+    assert portal.ref_lookup("/Consortium/smaht") == {"uuid": "uuid-for-/Consortium/smaht"}
+    # Not of a cached type; always looked up.
+    assert portal.ref_lookup("/Donor/SOME_DONOR") == {"uuid": "uuid-for-/Donor/SOME_DONOR"}
+    assert portal.ref_lookup("/Donor/SOME_DONOR") == {"uuid": "uuid-for-/Donor/SOME_DONOR"}
+    assert portal.lookups == ["/Consortium/smaht", "/Donor/SOME_DONOR", "/Donor/SOME_DONOR"]
+    assert stats.as_dict() == {"ref_cache_hits": 3, "ref_cache_misses": 1}
+
+
+def test_reference_cache_invalidate() -> None:
+    reference_cache = get_warmed_reference_cache([{"uuid": "sc-uuid", "identifier": "some_center"}])
+    assert reference_cache.get("/SubmissionCenter/some_center") is not None
+    reference_cache.invalidate("sc-uuid")
+    assert reference_cache.get("/SubmissionCenter/some_center") is None
+    assert reference_cache.get("/SubmissionCenter/sc-uuid") is None
+
+
+def test_reference_cache_ttl() -> None:
+    reference_cache = get_warmed_reference_cache([{"uuid": "sc-uuid", "identifier": "some_center"}], ttl=-1)
+    assert reference_cache.get("/SubmissionCenter/some_center") is None
+
+
+def test_reference_cache_is_per_user() -> None:
+    reference_cache = get_warmed_reference_cache([{"uuid": "sc-uuid", "identifier": "some_center"}], user="alice")
+    reference_cache._warmed["bob"] = float("inf")
+    alice, bob = MockPortal(user="alice"), MockPortal(user="bob")
+    reference_cache.install(alice)
+    reference_cache.install(bob)
+    assert alice.ref_lookup("/SubmissionCenter/some_center")["uuid"] == "sc-uuid"
+    assert alice.lookups == []
+    # Not served what was resolved for another user, but looked up (with the user's own permissions).
+    assert bob.ref_lookup("/SubmissionCenter/some_center") == {"uuid": "uuid-for-/SubmissionCenter/some_center"}
+    assert bob.lookups == ["/SubmissionCenter/some_center"]
+    assert reference_cache.get("/SubmissionCenter/some_center", user="carol") is None
+
+
+def test_reference_cache_does_not_warm_ontology_terms() -> None:
+    assert "OntologyTerm" in ReferenceCache.CACHED_TYPES
+    assert "OntologyTerm" not in ReferenceCache.WARMED_TYPES
+    reference_cache = get_warmed_reference_cache([])
+    portal = MockPortal()
+    reference_cache.install(portal)
+    assert portal.ref_lookup("/OntologyTerm/UBERON:0000955") == {"uuid": "uuid-for-/OntologyTerm/UBERON:0000955"}
+    assert portal.ref_lookup("/OntologyTerm/UBERON:0000955") == {"uuid": "uuid-for-/OntologyTerm/UBERON:0000955"}
+    assert portal.lookups == ["/OntologyTerm/UBERON:0000955"]
@@ -0,0 +1,175 @@
+from contextlib import contextmanager
+from typing import Generator, List
+from unittest import mock
+
+import openpyxl
+from dcicutils.structured_data import Portal
+from dcicutils.submitr.progress_constants import PROGRESS_LOADXL
+from encoded.ingestion import ingestion_processors
+from encoded.ingestion.loadxl_extensions import SharedProgressTracker, merge_load_data_results
+from encoded.ingestion.structured_data_streaming import StreamingStructuredDataSet
+from webtest.app import TestApp
+
+
+SCHEMAS = {
+    "Analyte": {
+        "title": "Analyte",
+        "identifyingProperties": ["submitted_id", "uuid"],
+        "properties": {
+            "submitted_id": {"type": "string"},
+            "analyte_preparation": {"type": "string", "linkTo": "AnalytePreparation"},
+        },
+    },
+    "AnalytePreparation": {
+        "title": "AnalytePreparation",
+        "identifyingProperties": ["submitted_id", "uuid"],
+        "properties": {"submitted_id": {"type": "string"}},
+    },
+}
+
+
+class MockSubmission:
+
+    def __init__(self, file: str) -> None:
+        self.id = "submission-uuid"
+        self.file = file
+        self.portal_vapp = TestApp(mock.Mock())  # i.e. no requests (see process_submission_streaming)
+        self.validate_skip = self.validate_only = self.post_only = self.patch_only = False
+        self.bulk_compare = self.merge = False
+        self.ref_nocache = True
+        self.autoadd = self.debug_sleep = None
+        self.data_file_name = self.s3_data_file_location = self.s3_details_location = file
+        self.record_results = mock.Mock()
+
+    @contextmanager
+    def s3_file(self) -> Generator[str, None, None]:
+        yield self.file
+
+
+def write_workbook(file: str, sheets: dict) -> None:
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for sheet_name, rows in sheets.items():
+        sheet = workbook.create_sheet(sheet_name)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(file)
+
+
+def process_submission_streaming(submission: MockSubmission) -> List[dict]:
+    """Returns the data of each load for the given submission (with nothing in the database)."""
+    loads = []
+
+    def load_data_into_database(data: dict, **kwargs) -> dict:
+        loads.append(data)
+        return {"created": [{"uuid": item["submitted_id"], "type": type_name}
+                            for type_name, items in data.items() for item in items],
+                "updated": [], "skipped": [], "validated": [], "errors": [], "types": list(data)}
+
+    with mock.patch.object(Portal, "get_schemas", return_value=SCHEMAS), \
+            mock.patch.object(Portal, "ref_lookup_uncached", return_value=None), \
+            mock.patch.object(ingestion_processors, "IngestionStatusCache"), \
+            mock.patch.object(ingestion_processors, "define_shared_progress_tracker"), \
+            mock.patch.object(ingestion_processors, "summary_of_load_data_results"), \
+            mock.patch.object(ingestion_processors, "get_no_diff_items", return_value=set()), \
+            mock.patch.object(ingestion_processors, "load_data_into_database", side_effect=load_data_into_database):
+        ingestion_processors._process_submission_streaming(submission)
+    return loads
+
+
+def test_process_submission_streaming_forward_reference(tmp_path) -> None:
+    """Test reference to an item of a later type (in ITEM_INDEX_ORDER) resolved, and loaded after it."""
+    file = str(tmp_path / "submission.xlsx")
+    write_workbook(file, {
+        "Analyte": [["submitted_id", "analyte_preparation"], ["TEST_ANALYTE_1", "TEST_ANALYTE-PREPARATION_1"]],
+        "AnalytePreparation": [["submitted_id"], ["TEST_ANALYTE-PREPARATION_1"]],
+    })
+    submission = MockSubmission(file)
+    assert process_submission_streaming(submission) == [
+        {"AnalytePreparation": [{"submitted_id": "TEST_ANALYTE-PREPARATION_1"}]},
+        {"Analyte": [{"submitted_id": "TEST_ANALYTE_1", "analyte_preparation": "TEST_ANALYTE-PREPARATION_1"}]},
+    ]
+    [(load_data_response, _), _] = submission.record_results.call_args
+    assert len(load_data_response["created"]) == 2
+
+
+def test_process_submission_streaming_unresolved_reference(tmp_path) -> None:
+    """Test reference to an item neither in the submission nor the database an error, and nothing loaded."""
+    file = str(tmp_path / "submission.xlsx")
+    write_workbook(file, {
+        "Analyte": [["submitted_id", "analyte_preparation"], ["TEST_ANALYTE_1", "TEST_ANALYTE-PREPARATION_2"]],
+        "AnalytePreparation": [["submitted_id"], ["TEST_ANALYTE-PREPARATION_1"]],
+    })
+    submission = MockSubmission(file)
+    assert process_submission_streaming(submission) == []
+    [(errors, _), _] = submission.record_results.call_args
+    assert [ref_error["error"] for ref_error in errors["ref"]] == ["/AnalytePreparation/TEST_ANALYTE-PREPARATION_2"]
+
+
+def test_streaming_structured_data_set_hand_off() -> None:
+    structured_data = StreamingStructuredDataSet()
+    structured_data._add("Donor", [{"uuid": "donor-uuid", "identifier": "DONOR_1", "age": 45}])
+    structured_data._add("Tissue", [{"uuid": "tissue-uuid", "donor": "DONOR_1"}])
+    assert set(structured_data.data.keys()) == {"Donor", "Tissue"}
+    with structured_data._handing_off("Tissue"):
+        # While handed off only the given type is visible.
+        assert structured_data.data == {"Tissue": [{"uuid": "tissue-uuid", "donor": "DONOR_1"}]}
+    # Once handed off only the identifying properties of the type are retained.
+    assert structured_data.data == {"Donor": [{"uuid": "donor-uuid", "identifier": "DONOR_1", "age": 45}],
+                                    "Tissue": [{"uuid": "tissue-uuid"}]}
+
+
+def test_merge_load_data_results() -> None:
+    donor_response = {
+        "created": [{"uuid": "a", "type": "Donor"}],
+        "updated": [],
+        "skipped": [],
+        "validated": [],
+        "errors": [],
+        "types": ["Donor"],
+        "total": 1,
+    }
+    file_response = {
+        "created": [{"uuid": "b", "type": "UnalignedReads"}],
+        "updated": [{"uuid": "c", "type": "UnalignedReads"}],
+        "skipped": [],
+        "validated": [],
+        "errors": ["ERROR: some error"],
+        "types": ["UnalignedReads"],
+        "upload_info": [{"uuid": "b", "filename": "b.fastq.gz"}],
+        "total": 3,
+    }
+    assert merge_load_data_results([donor_response, file_response]) == {
+        "created": [{"uuid": "a", "type": "Donor"}, {"uuid": "b", "type": "UnalignedReads"}],
+        "updated": [{"uuid": "c", "type": "UnalignedReads"}],
+        "skipped": [],
+        "validated": [],
+        "errors": ["ERROR: some error"],
+        "types": ["Donor", "UnalignedReads"],
+        "upload_info": [{"uuid": "b", "filename": "b.fastq.gz"}],
+        "total": 4,
+    }
+    assert merge_load_data_results([])["total"] == 0
+
+
+def test_shared_progress_tracker_reports_start_and_done_once() -> None:
+    events = []
+    progress = SharedProgressTracker(events.append, nloads=2)
+    for _ in range(2):
+        for event in [PROGRESS_LOADXL.START, PROGRESS_LOADXL.ITEM,
+                      PROGRESS_LOADXL.START_SECOND_ROUND, PROGRESS_LOADXL.ITEM_SECOND_ROUND, PROGRESS_LOADXL.DONE]:
+            progress(event)
+    progress.finish()
+    assert events == [PROGRESS_LOADXL.START, PROGRESS_LOADXL.ITEM, PROGRESS_LOADXL.ITEM_SECOND_ROUND,
+                      PROGRESS_LOADXL.ITEM, PROGRESS_LOADXL.START_SECOND_ROUND, PROGRESS_LOADXL.ITEM_SECOND_ROUND,
+                      PROGRESS_LOADXL.DONE]
+
+
+def test_shared_progress_tracker_finish_reports_done_if_a_load_did_not() -> None:
+    events = []
+    progress = SharedProgressTracker(events.append, nloads=2)
+    progress(PROGRESS_LOADXL.START)
+    progress(PROGRESS_LOADXL.DONE)
+    progress.finish()
+    progress.finish()
+    assert events == [PROGRESS_LOADXL.START, PROGRESS_LOADXL.START_SECOND_ROUND, PROGRESS_LOADXL.DONE]
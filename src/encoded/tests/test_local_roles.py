@@ -0,0 +1,56 @@
+from pyramid.threadlocal import manager
+
+from ..local_roles import LOCAL_ROLES_MEMO_ATTRIBUTE, local_principals, merged_local_principals
+from ..types.base import get_attribution_local_roles
+
+
+class MockContext:
+
+    __parent__ = None
+
+    def __init__(self, uuid: str, roles: dict) -> None:
+        self.uuid = uuid
+        self.roles = roles
+        self.call_count = 0
+
+    def __ac_local_roles__(self) -> dict:
+        self.call_count += 1
+        return self.roles
+
+
+class MockRequest:
+
+    __parent__ = None
+
+
+def test_local_principals_memoized_per_request() -> None:
+    context = MockContext("some-uuid", {"submits_for.center": "role.submitter"})
+    request, subrequest = MockRequest(), MockRequest()
+    subrequest.__parent__ = request
+    manager.push({"request": subrequest, "registry": None})
+    try:
+        for _ in range(3):
+            assert local_principals(context, ["submits_for.center"]) == {"submits_for.center", "role.submitter"}
+            merged = merged_local_principals(context, ["role.submitter"])
+            assert set(merged) == {"submits_for.center", "role.submitter"}
+        assert local_principals(context, ["other"]) == ["other"]
+    finally:
+        manager.pop()
+    assert context.call_count == 3  # i.e. once each per distinct key
+    assert getattr(request, LOCAL_ROLES_MEMO_ATTRIBUTE)  # i.e. memo held by top-level request
+
+
+def test_local_principals_without_request() -> None:
+    context = MockContext("some-uuid", {"submits_for.center": "role.submitter"})
+    local_principals(context, ["submits_for.center"])
+    local_principals(context, ["submits_for.center"])
+    assert context.call_count == 2
+
+
+def test_get_attribution_local_roles() -> None:
+    roles = dict(get_attribution_local_roles(("center-uuid",), ("consortium-uuid",)))
+    assert roles == {
+        "role.submission_center_member_rw.center-uuid": "role.submission_center_member_rw",
+        "submits_for.center-uuid": "role.submission_center_member_create",
+        "role.consortium_member_rw.consortium-uuid": "role.consortium_member_rw",
+    }
@@ -0,0 +1,54 @@
+import gzip
+import json
+
+import webtest
+from pyramid.config import Configurator
+from webob import Request
+
+from encoded.ingestion.metadata_template import (
+    SUBMISSION_SCHEMAS_BUNDLE,
+    SubmissionSchemasBundle,
+    includeme as include_metadata_template,
+)
+
+SUBMISSION_SCHEMAS = {"Foo": {"title": "Foo", "properties": {"bar": {"type": "string"}}}}
+
+
+def get_bare_testapp(bundle: SubmissionSchemasBundle) -> webtest.TestApp:
+    """ Bare Pyramid app with only the metadata template routes, and the given bundle. """
+    config = Configurator(settings={})
+    config.registry[SUBMISSION_SCHEMAS_BUNDLE] = bundle
+    config.include(include_metadata_template)
+    return webtest.TestApp(config.make_wsgi_app())
+
+
+def test_submission_schemas_bundle_version_is_content_hash():
+    bundle = SubmissionSchemasBundle(SUBMISSION_SCHEMAS, app_version="1.0")
+    assert bundle.version == SubmissionSchemasBundle(json.loads(json.dumps(SUBMISSION_SCHEMAS))).version
+    assert bundle.version != SubmissionSchemasBundle({"Foo": {"title": "Fu"}}).version
+    assert json.loads(bundle.body) == {"version": bundle.version, "app_version": "1.0",
+                                       "submission_schemas": SUBMISSION_SCHEMAS}
+    assert gzip.decompress(bundle.gzipped_body) == bundle.body
+
+
+def test_submission_schemas_bundle_etag_and_gzip():
+    bundle = SubmissionSchemasBundle(SUBMISSION_SCHEMAS)
+    testapp = get_bare_testapp(bundle)
+    response = testapp.get("/submission-schemas-bundle", headers={"Accept-Encoding": "identity"})
+    assert response.etag == bundle.version
+    assert response.json["submission_schemas"] == SUBMISSION_SCHEMAS
+    # N.B. Directly, as webtest decodes gzipped responses (and drops their Content-Encoding).
+    response = Request.blank("/submission-schemas-bundle", headers={"Accept-Encoding": "gzip"}).get_response(
+        testapp.app)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.body) == bundle.body
+    response = testapp.get("/submission-schemas-bundle", headers={"If-None-Match": f'"{bundle.version}"'},
+                           status=304)
+    assert response.etag == bundle.version
+    assert not response.body
+
+
+def test_submission_schemas_bundle_matches_submission_schemas(testapp):
+    submission_schemas = testapp.get("/submission-schemas/").json
+    response = testapp.get("/submission-schemas-bundle", headers={"Accept-Encoding": "identity"})
+    assert response.json["submission_schemas"] == submission_schemas
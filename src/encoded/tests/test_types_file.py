@@ -1,4 +1,5 @@
 import functools
+import json
 from dataclasses import dataclass
 from botocore.exceptions import ClientError
 from typing import Any, Dict, List, Optional
@@ -288,6 +289,19 @@ def test_output_file_download(testapp: TestApp, output_file: Dict[str, Any],
     assert 'smaht-unit-testing-wfout.s3.amazonaws.com' in res['message']
 
 
+def test_output_file_bulk_download(testapp: TestApp, output_file: Dict[str, Any],
+                                   file_formats: Dict[str, Dict[str, Any]]) -> None:
+    """ Tests that bulk download returns a JSON line with a download URL per file, in order """
+    res = testapp.post_json('/bulk_download', {'accessions': [output_file['accession'], 'SMAFINOTFOUND']},
+                            status=200)
+    assert res.content_type == 'application/x-ndjson'
+    lines = [json.loads(line) for line in res.text.splitlines()]
+    assert [line['accession'] for line in lines] == [output_file['accession'], 'SMAFINOTFOUND']
+    assert 'smaht-unit-testing-wfout.s3.amazonaws.com' in lines[0]['url']
+    assert lines[1]['error'] == 'Not found'
+    testapp.post_json('/bulk_download', {'accessions': output_file['accession']}, status=400)
+
+
 @pytest.mark.parametrize(
     "extra_files,expected_status",
     [
@@ -0,0 +1,80 @@
+from typing import Any, Dict
+from unittest import mock
+
+from pyramid.registry import Registry
+from snovault import COLLECTIONS
+
+from .test_types_submission_center import MockCollection
+from ..types.file_format import FileFormatCache, get_cached_file_format, FILE_FORMAT_CACHE
+
+
+class MockRequest:
+    """Request with embed of the object view of given file formats, by uuid."""
+
+    def __init__(self, registry: Registry, file_formats: Dict[str, Dict[str, Any]]) -> None:
+        self.registry = registry
+        self.file_formats = file_formats
+        self._indexing_view = True
+        self._linked_uuids = set()
+
+    def embed(self, path: str, frame: str) -> Dict[str, Any]:
+        assert frame == "@@object"
+        uuid = path.strip("/").split("/")[-1]
+        self._linked_uuids.add(uuid)
+        return self.file_formats[uuid]
+
+
+def get_registry_with_file_formats(collection: MockCollection) -> Registry:
+    registry = Registry()
+    registry.settings = {}
+    registry[COLLECTIONS] = {"FileFormat": collection}
+    return registry
+
+
+def test_file_format_cache() -> None:
+    """Test object views of file formats found by uuid, identifier, and alias.
+
+    Cache loaded once, and again only on invalidation or unknown format
+    (here, with no minimum time between reloads). Only the file formats
+    used are linked from the item being indexed.
+    """
+    file_formats = {
+        "uuid-1": {"uuid": "uuid-1", "identifier": "BAM", "display_title": "BAM",
+                   "standard_file_extension": "bam", "extra_file_formats": ["/file-formats/BAI/"],
+                   "aliases": ["smaht:bam"]},
+        "uuid-2": {"uuid": "uuid-2", "identifier": "BAI", "display_title": "BAI",
+                   "standard_file_extension": "bam.bai"},
+    }
+    collection = MockCollection({"uuid-1": None, "uuid-2": None})
+    registry = get_registry_with_file_formats(collection)
+    request = MockRequest(registry, file_formats)
+    cache = registry[FILE_FORMAT_CACHE] = FileFormatCache(registry, min_reload_seconds=0)
+    cache._get_version = mock.Mock(return_value=1)  # i.e. no edits when indexing
+    bam = get_cached_file_format(request, "uuid-1")
+    assert bam is file_formats["uuid-1"]
+    assert request._linked_uuids == {"uuid-1"}
+    assert get_cached_file_format(request, "BAM") is bam
+    assert get_cached_file_format(request, "smaht:bam") is bam
+    assert get_cached_file_format(request, "uuid-2")["standard_file_extension"] == "bam.bai"
+    assert request._linked_uuids == {"uuid-1", "uuid-2"}
+    assert get_cached_file_format(request, None) is None
+    assert collection.load_count == 1
+    assert get_cached_file_format(request, "not-a-format") is None
+    assert collection.load_count == 2
+    file_formats["uuid-2"] = {**file_formats["uuid-2"], "standard_file_extension": "bai"}
+    cache.invalidate()
+    assert cache.get(request, "BAI")["standard_file_extension"] == "bai"
+    assert collection.load_count == 3
+
+
+def test_file_format_cache_reload_rate_limited() -> None:
+    """Test unknown file formats do not reload the cache every time."""
+    collection = MockCollection({"uuid-1": None})
+    registry = get_registry_with_file_formats(collection)
+    request = MockRequest(registry, {"uuid-1": {"uuid": "uuid-1", "identifier": "BAM"}})
+    cache = FileFormatCache(registry)
+    cache._get_version = mock.Mock(return_value=1)
+    assert cache.get(request, "BAM")["uuid"] == "uuid-1"
+    assert cache.get(request, "not-a-format") is None
+    assert cache.get(request, "not-a-format") is None
+    assert collection.load_count == 1
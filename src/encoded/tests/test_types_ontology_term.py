@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+from typing import Any, Dict
+from unittest import mock
+
+from pyramid.registry import Registry
+from snovault import COLLECTIONS
+
+from .test_types_submission_center import MockCollection, MockItem
+from ..types.ontology_term import OntologyTerm, OntologyTermClosure
+
+
+class MockOntologyTerm(MockItem):
+    """OntologyTerm with given properties, upgraded by the given upgrade (if any)."""
+
+    display_title = OntologyTerm.display_title
+
+    def __init__(self, properties: Dict[str, Any], upgrade: Dict[str, Any] = None, uuid: str = None) -> None:
+        super().__init__(properties)
+        self.upgrade = upgrade or {}
+        self.uuid = uuid
+
+    def upgrade_properties(self) -> Dict[str, Any]:
+        return {**self.properties, **self.upgrade}
+
+
+def get_registry_with_ontology_terms(collection: MockCollection) -> Registry:
+    registry = Registry()
+    registry.settings = {}
+    registry[COLLECTIONS] = {"OntologyTerm": collection}
+    return registry
+
+
+def test_ontology_term_closure() -> None:
+    """Test ancestors and tagged grouping terms found for terms.
+
+    Closure loaded once, and again only on invalidation or unknown term
+    (here, with no minimum time between reloads); cycles in grouping terms
+    are tolerated.
+    """
+    collection = MockCollection({
+        "uuid-1": MockOntologyTerm({"identifier": "UBERON:1", "preferred_name": "Liver lobe",
+                            "grouping_term": "uuid-2"}),
+        "uuid-2": MockOntologyTerm({"identifier": "UBERON:2", "preferred_name": "Liver",
+                            "grouping_term": "UBERON:3", "tags": ["tissue_type"]}),
+        "uuid-3": MockOntologyTerm({"identifier": "UBERON:3", "title": "Endoderm",
+                            "tags": ["germ_layer", "tissue_type"]}),
+        "uuid-4": MockOntologyTerm({"identifier": "UBERON:4", "grouping_term": "uuid-5"}),
+        "uuid-5": MockOntologyTerm({"identifier": "UBERON:5", "grouping_term": "uuid-4"}),
+    })
+    closure = OntologyTermClosure(get_registry_with_ontology_terms(collection), min_reload_seconds=0)
+    assert closure.get_ancestors("uuid-1") == ["uuid-2", "uuid-3"]
+    assert closure.get_ancestors("/ontology-terms/UBERON:1/") == ["uuid-2", "uuid-3"]
+    assert closure.get_grouping_term_from_tag("uuid-1", "tissue_type") == "Liver"
+    assert closure.get_grouping_term_from_tag("UBERON:1", "germ_layer") == "Endoderm"
+    assert closure.get_grouping_term_from_tag("uuid-1", "other") is None
+    assert closure.get_ancestors("uuid-4") == ["uuid-5"]
+    assert collection.load_count == 1
+    assert closure.get_grouping_term_from_tag("not-a-term", "tissue_type") is None
+    assert collection.load_count == 2
+    collection["uuid-2"].properties["tags"] = []
+    closure.invalidate()
+    assert closure.get_grouping_term_from_tag("uuid-1", "tissue_type") == "Endoderm"
+    assert collection.load_count == 3
+
+
+def test_ontology_term_closure_linked_uuids() -> None:
+    """Test term and its ancestors linked from the item being indexed."""
+    collection = MockCollection({
+        "uuid-1": MockOntologyTerm({"identifier": "UBERON:1", "grouping_term": "uuid-2"}),
+        "uuid-2": MockOntologyTerm({"identifier": "UBERON:2", "tags": ["tissue_type"], "title": "Liver"}),
+        "uuid-3": MockOntologyTerm({"identifier": "UBERON:3"}),
+    })
+    closure = OntologyTermClosure(get_registry_with_ontology_terms(collection))
+    request = SimpleNamespace(_indexing_view=True, _linked_uuids=set())
+    with mock.patch.object(closure, "_get_version", return_value=1):
+        assert closure.get_grouping_term_from_tag("UBERON:1", "tissue_type", request=request) == "Liver"
+    assert request._linked_uuids == {"uuid-1", "uuid-2"}
+
+
+def test_ontology_term_closure_display_title() -> None:
+    """Test display titles as calculated for the item, from upgraded properties."""
+    collection = MockCollection({
+        "uuid-1": MockOntologyTerm({"identifier": "UBERON:1", "grouping_term": "uuid-2"}),
+        "uuid-2": MockOntologyTerm({"identifier": "UBERON:2", "title": "Liver", "tags": ["tissue_type"]},
+                                   upgrade={"preferred_name": "Liver (upgraded)"}),
+        "uuid-3": MockOntologyTerm({"tags": ["germ_layer"]}, uuid="uuid-3"),
+    })
+    closure = OntologyTermClosure(get_registry_with_ontology_terms(collection))
+    assert closure.get_grouping_term_from_tag("uuid-1", "tissue_type") == "Liver (upgraded)"
+    assert closure.get_grouping_term_from_tag("uuid-3", "germ_layer") == "uuid-3"
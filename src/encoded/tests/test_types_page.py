@@ -1,7 +1,11 @@
+from typing import Any, Dict, List
+
 import pytest
+from pyramid.registry import Registry
 from webtest.app import TestApp
 
 from .utils import get_item
+from ..types.page import PageTreeCache, select_fields
 
 
 @pytest.mark.workbook
@@ -11,3 +15,60 @@ def test_identifier_resource_path(es_testapp: TestApp, workbook: None) -> None:
     Note: Must match a Page 'identifier' in workbook-inserts.
     """
     get_item(es_testapp, "about")
+
+
+class MockRequest:
+
+    def __init__(self, principals: List[str]) -> None:
+        self.effective_principals = principals
+        self.embeds = []
+
+    def embed(self, path: str, *args, **kwargs) -> Dict[str, Any]:
+        self.embeds.append(path)
+        return {"@id": path, "content": [{"identifier": "section"}]}
+
+
+def test_select_fields() -> None:
+    page = {
+        "identifier": "about",
+        "status": "public",
+        "content": [{"identifier": "section", "title": "Section", "body": "..."}],
+        "children": [{"identifier": "about/team", "title": "Team"}],
+    }
+    assert select_fields(page, ["identifier", "content.identifier", "children", "children.identifier"]) == {
+        "identifier": "about",
+        "content": [{"identifier": "section"}],
+        "children": [{"identifier": "about/team", "title": "Team"}],
+    }
+
+
+def test_page_tree_cache_embedded() -> None:
+    """Test embedded pages cached per principals, until invalidated."""
+    page_tree_cache = PageTreeCache(Registry())
+    request = MockRequest(["system.Everyone"])
+    embedded = page_tree_cache.get_embedded(request, "/about/")
+    embedded["content"].append({"identifier": "modified"})
+    assert page_tree_cache.get_embedded(request, "/about/")["content"] == [{"identifier": "section"}]
+    assert request.embeds == ["/about/"]
+    other_request = MockRequest(["system.Everyone", "group.admin"])
+    page_tree_cache.get_embedded(other_request, "/about/")
+    assert other_request.embeds == ["/about/"]
+    page_tree_cache.invalidate()
+    page_tree_cache.get_embedded(request, "/about/")
+    assert request.embeds == ["/about/", "/about/"]
+
+
+def test_page_tree_cache_shared_by_users_with_same_principals() -> None:
+    """Test embedded pages cached per (visibility) principals, not per user."""
+    page_tree_cache = PageTreeCache(Registry())
+    request = MockRequest(["system.Everyone", "system.Authenticated", "userid.user-a",
+                           "group.submitter", "role.consortium_member_rw"])
+    page_tree_cache.get_embedded(request, "/about/")
+    other_request = MockRequest(["system.Everyone", "system.Authenticated", "userid.user-b",
+                                 "group.submitter", "role.consortium_member_rw"])
+    page_tree_cache.get_embedded(other_request, "/about/")
+    assert request.embeds == ["/about/"] and other_request.embeds == []
+    assert len(page_tree_cache._entries) == 1
+    indexer_request = MockRequest(["system.Everyone", "system.Authenticated", "remoteuser.INDEXER"])
+    page_tree_cache.get_embedded(indexer_request, "/about/")
+    assert indexer_request.embeds == ["/about/"]
@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+from typing import Any, Optional
+from unittest import mock
+
+import transaction
+from pyramid.registry import Registry
+
+from ..types.registry_cache import (
+    REGISTRY_CACHE_TTL_SETTING,
+    LoadedRegistryCache,
+    add_linked_uuids,
+    get_registry_cache,
+    invalidate_registry_caches,
+)
+
+
+class SomeCache(LoadedRegistryCache):
+
+    NAME = "some_cache"
+    TTL_SETTING = "some_cache_ttl"
+    ITEM_TYPES = ("SomeItem", "AbstractItem")
+
+    def __init__(self, registry: Registry, **kwargs) -> None:
+        super().__init__(registry, **kwargs)
+        self.load_count = 0
+
+    def get(self, value: str, request: Optional[Any] = None) -> bool:
+        with self._lock:
+            self._ensure_loaded(value, request)
+            return value == "known"
+
+    def _contains(self, value: Any) -> bool:
+        return value == "known"
+
+    def _load(self, request: Optional[Any] = None) -> None:
+        self.load_count += 1
+
+
+def get_registry(**settings) -> Registry:
+    registry = Registry()
+    registry.settings = settings
+    return registry
+
+
+def get_event(registry: Registry, type_name: str, base_types=()) -> SimpleNamespace:
+    return SimpleNamespace(
+        request=SimpleNamespace(registry=registry),
+        object=SimpleNamespace(type_info=SimpleNamespace(name=type_name, base_types=list(base_types))),
+    )
+
+
+def test_get_registry_cache_ttl() -> None:
+    """Test TTL from the cache's own setting, else the general one."""
+    registry = get_registry(some_cache_ttl=5, **{REGISTRY_CACHE_TTL_SETTING: 0})
+    assert get_registry_cache(registry, SomeCache)._ttl == 5
+    assert get_registry_cache(registry, SomeCache) is registry[SomeCache.NAME]
+    assert get_registry_cache(get_registry(**{REGISTRY_CACHE_TTL_SETTING: 0}), SomeCache)._ttl == 0
+    assert get_registry_cache(get_registry(), SomeCache)._ttl == SomeCache.TTL_SECONDS
+
+
+def test_registry_cache_invalidated_after_commit() -> None:
+    """Test invalidation deferred to the end of the transaction."""
+    registry = get_registry()
+    cache = get_registry_cache(registry, SomeCache)
+    manager = transaction.TransactionManager()
+    with mock.patch("transaction.get", manager.get):
+        for txn_end in [manager.commit, manager.abort]:
+            manager.begin()
+            assert cache.get("known")
+            invalidate_registry_caches(get_event(registry, "OtherItem"))
+            invalidate_registry_caches(get_event(registry, "ConcreteItem", base_types=["AbstractItem"]))
+            assert cache.get("known")
+            load_count = cache.load_count
+            txn_end()
+            assert cache.get("known")
+            assert cache.load_count == load_count + 1
+
+
+def test_registry_cache_reloaded_when_indexing_if_edited() -> None:
+    """Test edits made elsewhere reloaded when indexing, checked once per transaction."""
+    cache = get_registry_cache(get_registry(), SomeCache)
+    request = SimpleNamespace(_indexing_view=True)
+    versions = [1, 1, 2]
+    manager = transaction.TransactionManager()
+    with mock.patch("transaction.get", manager.get), \
+            mock.patch.object(cache, "_get_version", side_effect=versions) as get_version:
+        for expected_load_count in [1, 1, 2]:
+            manager.begin()
+            assert cache.get("known", request) and cache.get("known", request)
+            assert cache.get("known")  # i.e. not indexing
+            assert cache.load_count == expected_load_count
+            manager.abort()
+        assert get_version.call_count == len(versions)
+
+
+def test_add_linked_uuids() -> None:
+    request = SimpleNamespace(_indexing_view=True, _linked_uuids={"uuid-1"})
+    add_linked_uuids(request, ["uuid-2"])
+    assert request._linked_uuids == {"uuid-1", "uuid-2"}
+    request = SimpleNamespace(_indexing_view=False, _linked_uuids=set())
+    add_linked_uuids(request, ["uuid-2"])
+    assert request._linked_uuids == set()
+    add_linked_uuids(None, ["uuid-2"])
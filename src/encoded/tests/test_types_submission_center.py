@@ -0,0 +1,98 @@
+from typing import Any, Dict, Optional
+from unittest import mock
+
+from pyramid.registry import Registry
+from snovault import COLLECTIONS
+
+from ..types.submission_center import (
+    SUBMISSION_CENTER_CODE_INDEX,
+    SubmissionCenterCodeIndex,
+)
+from ..types.submitted_item import get_submission_center_codes
+from ..validators import _lookup_submission_center_codes
+
+
+class MockItem:
+
+    def __init__(self, properties: Dict[str, Any]) -> None:
+        self.properties = properties
+
+
+class MockCollection(dict):
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.load_count = 0
+
+    def __iter__(self):
+        self.load_count += 1
+        return super().__iter__()
+
+    def get(self, uuid: str, default: Optional[MockItem] = None) -> Optional[MockItem]:
+        return super().get(uuid, default)
+
+
+def get_registry_with_submission_centers(collection: MockCollection) -> Registry:
+    registry = Registry()
+    registry.settings = {}
+    registry[COLLECTIONS] = {"SubmissionCenter": collection}
+    return registry
+
+
+def test_submission_center_code_index() -> None:
+    """Test codes/identifiers found by uuid, identifier, and alias.
+
+    Index loaded once, and again only on invalidation or unknown center
+    (here, with no minimum time between reloads).
+    """
+    collection = MockCollection({
+        "uuid-1": MockItem({"identifier": "some_center", "code": "some", "aliases": ["smaht:some"]}),
+        "uuid-2": MockItem({"identifier": "other_center", "code": "other"}),
+    })
+    index = SubmissionCenterCodeIndex(
+        get_registry_with_submission_centers(collection), min_reload_seconds=0
+    )
+    assert index.get_codes(["uuid-1", "other_center"]) == ["SOME", "OTHER"]
+    assert index.get_codes(["smaht:some"]) == ["SOME"]
+    assert index.get_identifiers(["uuid-2"]) == ["other_center"]
+    assert collection.load_count == 1
+    collection["uuid-3"] = MockItem({"identifier": "new_center", "code": "new"})
+    assert index.get_codes(["uuid-3"]) == ["NEW"]
+    assert collection.load_count == 2
+    collection["uuid-2"].properties["code"] = "changed"
+    index.invalidate()
+    assert index.get_codes(["uuid-2"]) == ["CHANGED"]
+    assert collection.load_count == 3
+
+
+def test_submission_center_code_index_reload_on_unknown_is_rate_limited() -> None:
+    """Test unknown centers do not force a reload within min_reload_seconds."""
+    collection = MockCollection({
+        "uuid-1": MockItem({"identifier": "some_center", "code": "some"}),
+    })
+    index = SubmissionCenterCodeIndex(get_registry_with_submission_centers(collection))
+    assert index.get_codes(["uuid-1"]) == ["SOME"]
+    for _ in range(5):
+        assert index.get_codes(["bogus"]) == []
+    assert collection.load_count == 1
+    with mock.patch("time.time", return_value=index._loaded + index.MIN_RELOAD_SECONDS):
+        assert index.get_codes(["bogus"]) == []
+    assert collection.load_count == 2
+
+
+def test_submission_center_codes_not_permission_checked() -> None:
+    """Test codes found irrespective of the requesting user's permissions.
+
+    As before, when looked up with subrequests as the EMBED user.
+    """
+    collection = MockCollection({
+        "uuid-1": MockItem({"identifier": "some_center", "code": "some"}),
+    })
+    registry = get_registry_with_submission_centers(collection)
+    registry[SUBMISSION_CENTER_CODE_INDEX] = SubmissionCenterCodeIndex(registry)
+    request = mock.MagicMock(registry=registry, effective_principals=["system.Everyone"])
+    request.has_permission.return_value = False
+    request.embed.side_effect = AssertionError("No subrequests expected")
+    assert get_submission_center_codes(request, ["uuid-1"]) == ["SOME"]
+    assert _lookup_submission_center_codes(request, ["uuid-1"]) == ["some_center"]
+    request.has_permission.assert_not_called()
@@ -0,0 +1,60 @@
+from typing import Any, Dict
+
+from webtest.app import TestApp
+
+
+def test_validators_submitted_id_batch(
+    testapp: TestApp, test_submission_center: Dict[str, Any]
+) -> None:
+    """Test batch submitted_id validation gives per-value status, in order."""
+    submitted_ids = ["TEST_SOFTWARE_LIMA", "FOOBAR_SOFTWARE_LIMA"]
+    response = testapp.post_json(
+        f"/validators/submitted_id?submission_centers={test_submission_center['identifier']}",
+        {"values": submitted_ids},
+        status=200,
+    ).json
+    results = response["results"]
+    assert [result["submitted_id"] for result in results] == submitted_ids
+    assert results[0]["status"] == "OK"
+    assert results[1]["status"] != "OK"
+    single = testapp.get(
+        f"/validators/submitted_id/{submitted_ids[1]}"
+        f"?submission_centers={test_submission_center['identifier']}",
+        status=200,
+    ).json
+    assert single == results[1]
+
+
+def test_validators_batch_empty_value(
+    testapp: TestApp, test_submission_center: Dict[str, Any]
+) -> None:
+    """Test batch validation gives an error result for an empty value, in place."""
+    submitted_ids = ["TEST_SOFTWARE_LIMA", "", "FOOBAR_SOFTWARE_LIMA"]
+    results = testapp.post_json(
+        f"/validators/submitted_id?submission_centers={test_submission_center['identifier']}",
+        {"values": submitted_ids},
+        status=200,
+    ).json["results"]
+    assert [result["submitted_id"] for result in results] == submitted_ids
+    assert results[0]["status"] == "OK"
+    assert results[1]["status"] == "No value given"
+    assert results[2]["status"] not in ["OK", "No value given"]
+
+
+def test_validators_batch_bad_request(testapp: TestApp) -> None:
+    """Test batch validation requires a list of values."""
+    testapp.post_json("/validators/submitted_id", {"values": "FOO"}, status=400)
+
+
+def test_validators_external_id_batch(
+    testapp: TestApp, test_tissue_sample: Dict[str, Any]
+) -> None:
+    """Test batch external_id validation finds existing (non-TPC) TissueSamples."""
+    external_ids = [test_tissue_sample["external_id"], "SMHT999-3Q-001A1"]
+    results = testapp.post_json(
+        "/validators/external_id", {"values": external_ids}, status=200
+    ).json["results"]
+    assert [result["external_id"] for result in results] == external_ids
+    assert results[0]["submitted_ids"] == [test_tissue_sample["submitted_id"]]
+    assert results[0]["status"] != "OK"  # No TPC TissueSample
+    assert results[1]["submitted_ids"] == []
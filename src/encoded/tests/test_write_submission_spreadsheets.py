@@ -15,6 +15,7 @@ from ..commands.write_submission_spreadsheets import (
     ITEM_SPREADSHEET_SUFFIX,
     WORKBOOK_FILENAME,
     Property,
+    SheetsClient,
     Spreadsheet,
     get_array_subtype,
     get_comment_text,
@@ -24,7 +25,9 @@ from ..commands.write_submission_spreadsheets import (
     get_property,
     get_nested_properties,
     get_spreadsheet,
+    get_submission_schemas,
     is_link,
+    update_google_sheets_in_bulk,
     write_all_spreadsheets,
     write_item_spreadsheets,
 )
@@ -648,3 +651,42 @@ def test_get_font(
         assert result.italic
     else:
         assert not result.italic
+
+
+def test_get_submission_schemas_bulk(
+    submission_schemas: Dict[str, Dict[str, Any]],
+) -> None:
+    """Test getting submission schemas for items with one request in bulk."""
+    request_handler = get_mock_request_handler()
+    with patch_get_all_submission_schemas(submission_schemas) as mock_get_all:
+        result = get_submission_schemas(["foo", "Fu"], request_handler, bulk=True)
+    assert result == {"Foo": submission_schemas["Foo"]}
+    mock_get_all.assert_called_once_with(request_handler)
+    request_handler.get_item.assert_not_called()
+
+
+def test_update_google_sheets_in_bulk() -> None:
+    """Test all sheet updates are submitted together, in order."""
+    sheets_client = mock.create_autospec(SheetsClient, instance=True)
+    sheets_client.get_worksheets.return_value = [
+        {"properties": {"sheetId": 0}},
+        {"properties": {"sheetId": 1}},
+    ]
+    spreadsheets = [
+        Spreadsheet(item="Foo", properties=[Property(name="bar"), Property(name="baz")]),
+        Spreadsheet(item="Qux", properties=[Property(name="quux")]),
+    ]
+    update_google_sheets_in_bulk(sheets_client, spreadsheets)
+    sheets_client.submit_requests.assert_called_once()
+    requests = sheets_client.submit_requests.call_args[0][0]
+    assert [list(request.keys())[0] for request in requests] == [
+        "deleteRange",
+        "deleteSheet",
+        "updateSheetProperties",
+        "addSheet",
+        "updateCells",
+        "updateCells",
+        "updateDimensionProperties",
+        "updateDimensionProperties",
+        "updateDimensionProperties",
+    ]
@@ -1,2 +1,8 @@
 def includeme(config):
+    from .file_format import get_file_format_cache
+    from .ontology_term import get_ontology_term_closure
+    from .submission_center import get_submission_center_code_index
     config.scan()
+    get_submission_center_code_index(config.registry)  # i.e. create the index on startup
+    get_file_format_cache(config.registry)
+    get_ontology_term_closure(config.registry)
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from dcicutils.misc_utils import PRINT
@@ -32,6 +33,26 @@ from ..schema_formats import is_accession
 from ..utils import get_remote_user
 
 
+@lru_cache(maxsize=1024)
+def get_attribution_local_roles(submission_centers: Tuple[str, ...],
+                                consortia: Tuple[str, ...]) -> Tuple[Tuple[str, str], ...]:
+    """ Returns the (flattened) local roles, as (principal, role) pairs, for an item with the given
+        submission_centers and consortia; cached, as there are few distinct such attributions.
+    """
+    roles = {}
+    for submission_center in submission_centers:
+        # add standard rw role
+        center = f'{acl.SUBMISSION_CENTER_RW}.{submission_center}'
+        roles[center] = acl.SUBMISSION_CENTER_RW
+        # add create role
+        submitter = f'submits_for.{submission_center}'
+        roles[submitter] = acl.SUBMISSION_CENTER_SUBMITTER
+    for consortium in consortia:
+        consortium_identifier = f'{acl.CONSORTIUM_MEMBER_RW}.{consortium}'
+        roles[consortium_identifier] = acl.CONSORTIUM_MEMBER_RW
+    return tuple(roles.items())
+
+
 def mixin_smaht_permission_types(schema: dict) -> dict:
     """ Runs a manual 'mixin' of attribution entries for SMaHT types
         NOTE: this function will be replaced by dynamic dispatch later
@@ -224,20 +245,11 @@ class Item(SnovaultItem):
         """ Overrides the default permissioning to add some additional roles to the item based on
             properties it may have.
         """
-        roles = {}
         properties = self.upgrade_properties()
-        if 'submission_centers' in properties:
-            for submission_center in properties['submission_centers']:
-                # add standard rw role
-                center = f'{acl.SUBMISSION_CENTER_RW}.{submission_center}'
-                roles[center] = acl.SUBMISSION_CENTER_RW
-                # add create role
-                submitter = f'submits_for.{submission_center}'
-                roles[submitter] = acl.SUBMISSION_CENTER_SUBMITTER
-        if 'consortia' in properties:
-            for consortium in properties['consortia']:
-                consortium_identifier = f'{acl.CONSORTIUM_MEMBER_RW}.{consortium}'
-                roles[consortium_identifier] = acl.CONSORTIUM_MEMBER_RW
+        # Roles derived from submission_centers/consortia come from a precomputed table, as they
+        # are shared by all items with the same attribution; see get_attribution_local_roles.
+        roles = dict(get_attribution_local_roles(tuple(properties.get('submission_centers', ())),
+                                                 tuple(properties.get('consortia', ()))))
         if 'submitted_by' in properties:
             submitter = 'userid.%s' % properties['submitted_by']
             roles[submitter] = 'role.owner'
@@ -29,7 +29,6 @@ from encoded_core.file_views import (
     get_submitter_title,
     get_experiment_or_assay_type,
     get_file_type,
-    update_google_analytics,
     drs as CoreDRS,
     post_upload as CorePostUpload,
     get_upload as CoreGetUpload,
@@ -51,6 +50,7 @@ from .base import (
     item_edit,
     validate_user_submission_consistency
 )
+from .file_format import get_cached_file_format
 from ..item_utils import (
     analyte as analyte_utils,
     file as file_utils,
@@ -95,6 +95,7 @@ from snovault.types.base import (
     item_edit,
 )
 from encoded import OPEN_DATA_S3_CLIENT
+from encoded.download_analytics import dispatch_download_to_google_analytics
 
 
 log = structlog.getLogger(__name__)
@@ -1503,7 +1504,7 @@ class File(Item, CoreFile):
         if status not in ['open', 'protected', 'protected-network', 'protected-early']:
             return None
 
-        fformat = get_item_or_none(request, file_format, frame='raw')  # no calc props needed
+        fformat = get_cached_file_format(request, file_format)
         filename = "{}.{}".format(accession, fformat.get('standard_file_extension', ''))
         s3_client = self.registry[OPEN_DATA_S3_CLIENT]
         return self._open_data_url(s3_client, status, filename)
@@ -1607,7 +1608,7 @@ def download(context, request):
     # or one of the files in extra files, the following logic will
     # search to find the "right" file and redirect to a download link for that one
     properties = context.upgrade_properties()
-    file_format = get_item_or_none(request, properties.get('file_format'), 'file-formats')
+    file_format = get_cached_file_format(request, properties.get('file_format'))
     _filename = None
     if request.subpath:
         _filename, = request.subpath
@@ -1615,7 +1616,7 @@ def download(context, request):
     if not filename:
         found = False
         for extra in properties.get('extra_files', []):
-            eformat = get_item_or_none(request, extra.get('file_format'), 'file-formats')
+            eformat = get_cached_file_format(request, extra.get('file_format'))
             filename = is_file_to_download(extra, eformat, _filename)
             if filename:
                 found = True
@@ -1667,9 +1668,10 @@ def download(context, request):
         file_type = get_file_type(request, context, properties)
         file_at_id = context.jsonld_id(request)
         dataset = properties.get('dataset')
-        update_google_analytics(context, request, ga_config, filename, file_size_downloaded, file_at_id,
-                                submitter_title,
-                                user_uuid, user_groups, exp_or_assay_type, dataset, file_type)
+        # Queued for posting to GA in the background, i.e. not delaying the redirect.
+        dispatch_download_to_google_analytics(context, request, ga_config, filename, file_size_downloaded,
+                                              file_at_id, submitter_title,
+                                              user_uuid, user_groups, exp_or_assay_type, dataset, file_type)
 
     if asbool(request.params.get('soft')):
         expires = int(parse_qs(urlparse(location).query)['Expires'][0])
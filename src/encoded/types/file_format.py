@@ -1,8 +1,15 @@
+from __future__ import annotations
+from typing import Optional
+
 from encoded_core.types.file_format import FileFormat as CoreFileFormat
-from snovault import collection, load_schema
+from pyramid.registry import Registry
+from pyramid.request import Request
+from snovault import COLLECTIONS, collection, load_schema
+from snovault.util import get_item_or_none
 
 from .acl import ONLY_ADMIN_VIEW_ACL
 from .base import Item
+from .registry_cache import LoadedRegistryCache, add_linked_uuids, get_registry_cache
 
 
 @collection(
@@ -22,3 +29,76 @@ class FileFormat(Item, CoreFileFormat):
     # without useful audit value.
     track_revisions = False
     embedded_list = []
+
+
+FILE_FORMAT_CACHE = "file_format_cache"
+FILE_FORMAT_CACHE_TTL_SETTING = "file_format_cache_ttl"
+
+
+class FileFormatCache(LoadedRegistryCache):
+    """Registry-held cache of FileFormat uuid/identifier/alias to object view.
+
+    Used for File downloads (main and extra files) and the open_data_url
+    calculated property, which otherwise look up the file format(s) of each
+    file on every download and every time a file is indexed.
+
+    Each cached value is the object frame of the FileFormat, as returned by
+    get_item_or_none(request, file_format, 'file-formats') which it replaces
+    (i.e. via the same EMBED subrequest, so upgraded and with calculated
+    properties); these must not be modified by callers.
+    """
+
+    NAME = FILE_FORMAT_CACHE
+    TTL_SETTING = FILE_FORMAT_CACHE_TTL_SETTING
+    ITEM_TYPES = ("FileFormat",)
+
+    def __init__(self, registry: Registry, **kwargs) -> None:
+        super().__init__(registry, **kwargs)
+        self._file_formats = {}  # uuid/identifier/alias -> object view
+
+    def get(self, request: Request, file_format: Optional[str]) -> Optional[dict]:
+        """Get object view of given file format, if any."""
+        if not file_format:
+            return None
+        with self._lock:
+            self._ensure_loaded(file_format, request)
+            return self._file_formats.get(file_format)
+
+    def _contains(self, file_format: str) -> bool:
+        return file_format in self._file_formats
+
+    def _load(self, request: Optional[Request] = None) -> None:
+        file_formats = {}
+        # N.B. Not linked to the item being indexed (if any) as a whole; only
+        # the file formats actually used are (see get_cached_file_format).
+        linked_uuids = set(request._linked_uuids)
+        try:
+            for uuid in self._registry[COLLECTIONS]["FileFormat"]:
+                if (file_format := get_item_or_none(request, str(uuid), "file-formats")) is None:
+                    continue
+                for value in [
+                    file_format.get("uuid"),
+                    file_format.get("identifier"),
+                    *file_format.get("aliases", []),
+                ]:
+                    if value:
+                        file_formats[value] = file_format
+        finally:
+            request._linked_uuids.clear()
+            request._linked_uuids.update(linked_uuids)
+        self._file_formats = file_formats
+
+
+def get_file_format_cache(registry: Registry) -> FileFormatCache:
+    """Get the FileFormatCache held by given registry."""
+    return get_registry_cache(registry, FileFormatCache)
+
+
+def get_cached_file_format(request: Request, file_format: Optional[str]) -> Optional[dict]:
+    """Get object view of given FileFormat (uuid/identifier/alias) from the cache.
+
+    Also linked from the item being indexed (if any), as if embedded.
+    """
+    if (cached := get_file_format_cache(request.registry).get(request, file_format)) is not None:
+        add_linked_uuids(request, [cached["uuid"]])
+    return cached
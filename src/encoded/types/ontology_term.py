@@ -1,14 +1,19 @@
-from typing import List, Optional, Union
+from __future__ import annotations
+import inspect
+from typing import Any, Dict, List, Optional, Tuple, Union
 from snovault import (
+    COLLECTIONS,
     collection,
     load_schema,
     calculated_property,
     display_title_schema,
 )
 
+from pyramid.registry import Registry
 from pyramid.request import Request
 from .acl import ONLY_ADMIN_VIEW_ACL
 from .base import Item
+from .registry_cache import LoadedRegistryCache, add_linked_uuids, get_registry_cache
 
 @collection(
     name="ontology-terms",
@@ -40,3 +45,124 @@ class OntologyTerm(Item):
         if preferred_name:
             return preferred_name
         return Item.display_title(self, request, title, name, external_id, identifier, submitted_id, accession, uuid)
+
+
+ONTOLOGY_TERM_CLOSURE = "ontology_term_closure"
+ONTOLOGY_TERM_CLOSURE_TTL_SETTING = "ontology_term_closure_ttl"
+ONTOLOGY_TERMS_PATH = "/ontology-terms/"
+
+
+class OntologyTermClosure(LoadedRegistryCache):
+    """Registry-held ancestor closure over OntologyTerm grouping_term links.
+
+    For each term, holds its ancestors (grouping term, its grouping term,
+    and so on), in order, and for each tag found on the term or any of
+    its ancestors, the display title of the first (i.e. most specific)
+    such term. Used for get_grouping_term_from_tag (e.g. tissue_type or
+    germ_layer of tissues when indexing), which otherwise gets each
+    ancestor in turn; the term and its ancestors are linked from the item
+    being indexed, as they were when got in turn.
+    """
+
+    NAME = ONTOLOGY_TERM_CLOSURE
+    TTL_SETTING = ONTOLOGY_TERM_CLOSURE_TTL_SETTING
+    ITEM_TYPES = ("OntologyTerm",)
+
+    def __init__(self, registry: Registry, **kwargs) -> None:
+        super().__init__(registry, **kwargs)
+        self._uuids = {}  # uuid/identifier/alias -> uuid
+        self._ancestors = {}  # uuid -> ancestor uuids, in order
+        self._tags = {}  # uuid -> tag -> display title of term itself or first ancestor with tag
+
+    def get_ancestors(
+        self, term: str, request: Optional[Request] = None
+    ) -> List[str]:
+        """Get uuids of ancestors of given term (uuid/identifier/alias/@id), in order."""
+        with self._lock:
+            if (uuid := self._get_uuid(term, request)) is None:
+                return []
+            add_linked_uuids(request, [uuid, *self._ancestors[uuid]])
+            return list(self._ancestors[uuid])
+
+    def get_grouping_term_from_tag(
+        self, term: str, tag: str, request: Optional[Request] = None
+    ) -> Union[str, None]:
+        """Get display title of given term, or first of its ancestors, with given tag."""
+        with self._lock:
+            if (uuid := self._get_uuid(term, request)) is None:
+                return None
+            add_linked_uuids(request, [uuid, *self._ancestors[uuid]])
+            return self._tags[uuid].get(tag)
+
+    def _get_uuid(self, term: str, request: Optional[Request]) -> Union[str, None]:
+        if isinstance(term, str) and term.startswith(ONTOLOGY_TERMS_PATH):
+            term = term[len(ONTOLOGY_TERMS_PATH):].strip("/")
+        self._ensure_loaded(term, request)
+        return self._uuids.get(term)
+
+    def _contains(self, term: str) -> bool:
+        return term in self._uuids
+
+    def _load(self, request: Optional[Request] = None) -> None:
+        uuids = {}
+        terms = {}  # uuid -> (grouping term, tags, display title)
+        collection = self._registry[COLLECTIONS]["OntologyTerm"]
+        for uuid in collection:
+            if (item := collection.get(uuid)) is None:
+                continue
+            properties = item.upgrade_properties()
+            uuid = str(uuid)
+            terms[uuid] = (
+                properties.get("grouping_term"),
+                properties.get("tags", []),
+                get_display_title(item, uuid, properties, request),
+            )
+            for value in [uuid, properties.get("identifier"), *properties.get("aliases", [])]:
+                if value:
+                    uuids[value] = uuid
+        ancestors = {}
+        tags = {}
+        for uuid in terms:
+            ancestors[uuid], tags[uuid] = self._get_closure(uuid, terms, uuids)
+        self._uuids = uuids
+        self._ancestors = ancestors
+        self._tags = tags
+
+    @staticmethod
+    def _get_closure(
+        uuid: str, terms: Dict[str, Tuple[Any, List[str], str]], uuids: Dict[str, str]
+    ) -> Tuple[Tuple[str, ...], Dict[str, str]]:
+        ancestors = []
+        seen = {uuid}
+        tags = {}
+        current = uuid
+        while current is not None:
+            grouping_term, current_tags, display_title = terms[current]
+            for tag in current_tags:
+                tags.setdefault(tag, display_title)
+            current = uuids.get(grouping_term) if grouping_term else None
+            if current is None or current in seen:  # i.e. top, or cycle
+                break
+            seen.add(current)
+            ancestors.append(current)
+        return tuple(ancestors), tags
+
+
+def get_display_title(
+    item: OntologyTerm, uuid: str, properties: Dict[str, Any], request: Optional[Request] = None
+) -> str:
+    """Get display title of given OntologyTerm from its (upgraded) properties.
+
+    Calculated by its display_title calculated property, with the properties
+    it takes, as when the item is rendered.
+    """
+    parameters = inspect.signature(item.display_title).parameters
+    values = dict(properties, uuid=uuid)
+    return item.display_title(
+        request, **{name: values.get(name) for name in parameters if name != "request"}
+    )
+
+
+def get_ontology_term_closure(registry: Registry) -> OntologyTermClosure:
+    """Get the OntologyTermClosure held by given registry."""
+    return get_registry_cache(registry, OntologyTermClosure)
@@ -1,9 +1,11 @@
+import time
+from collections import OrderedDict
+from copy import deepcopy
 from dcicutils.misc_utils import filtered_warnings
 from urllib.parse import urlparse, urlencode
 from snovault import collection, COLLECTIONS, CONNECTION
 from snovault.util import debug_log
 from snovault.schema_utils import load_schema
-from snovault.search.search import get_iterable_search_results
 from snovault.validators import (
     validate_item_content_post,
     validate_item_content_put,
@@ -23,6 +25,7 @@ from encoded_core.page_views import (
 from .acl import ONLY_ADMIN_VIEW_ACL
 from .base import Item
 from .base import collection_add, item_edit
+from .registry_cache import RegistryCache, get_registry_cache
 
 
 #### Must add validators for add/edit since 'identifier' path is now lookup_key, not unique_key
@@ -58,22 +61,13 @@ def generate_page_tree(request, page_name = None):
 
     root = { "identifier" : "", "children" : [], "@id" : '/', "display_title" : "Home" }
 
-    for page in get_iterable_search_results(
-        request,
-        search_path='/search/',
-        param_lists={
-            'type'              : ['Page'],
-            'sort'              : ['identifier', 'uuid'],
-            'field'             : ['identifier', 'uuid', '@id', 'display_title', 'children', 'children.identifier',
-                                   'children.children.identifier', 'children.children.identifier', 'content.identifier',
-                                   'content.title', 'content.@id', 'description', 'redirect.enabled']
-        }
-    ):
+    page_tree_cache = get_page_tree_cache(request.registry)
+    for page in page_tree_cache.get_pages(request):
         path_components = [ path_component for path_component in page['identifier'].split('/') if path_component ]
         if len(path_components) != 1:
             continue
         if current_page_route_root is not None and current_page_route_root == page['identifier']:
-            page.update(request.embed(page['@id'], '@@embedded', as_user=True))
+            page.update(page_tree_cache.get_embedded(request, page['@id']))
         child_node = {
             "identifier"          : path_components[0],
             "children"      : page.get('children', []),
@@ -91,6 +85,122 @@ def generate_page_tree(request, page_name = None):
     return root
 
 
+PAGE_TREE_CACHE = "page_tree_cache"
+PAGE_TREE_CACHE_TTL_SETTING = "page_tree_cache_ttl"
+PAGE_TREE_FIELDS = ['identifier', 'uuid', '@id', 'display_title', 'children', 'children.identifier',
+                    'children.children.identifier', 'content.identifier', 'content.title', 'content.@id',
+                    'description', 'redirect.enabled']
+
+
+class PageTreeCache(RegistryCache):
+    """ Registry-held cache of the (top-level) Pages used by generate_page_tree, and of the
+        embedded content of the current route root page, so that static pages are rendered
+        without a search (of all Pages) and an embed on every view.
+
+        The top-level Pages are read from the database and embedded (as the user), with only
+        the PAGE_TREE_FIELDS kept, i.e. as formerly returned by the search. As which Pages (and
+        which of their children and content) are viewable depends on the user, entries are kept
+        per set of VISIBILITY_PRINCIPALS (see get_visibility_principals), up to MAX_ENTRIES (least
+        recently used dropped first), each for up to the TTL. Copies are returned, as
+        generate_page_tree modifies these.
+    """
+    NAME = PAGE_TREE_CACHE
+    TTL_SETTING = PAGE_TREE_CACHE_TTL_SETTING
+    ITEM_TYPES = ('Page', 'UserContent')  # e.g. StaticSection content of Pages
+    MAX_ENTRIES = 1000
+    # Principals (by prefix) which can affect the visibility of Pages and UserContent, i.e. those in
+    # their (status) ACLs and local roles, so not e.g. userid.<uuid>, which is only given role.owner of
+    # items submitted by the user, and Pages/UserContent can only be added by admins (group.admin).
+    VISIBILITY_PRINCIPAL_PREFIXES = ('system.', 'group.', 'role.', 'submits_for.', 'submission_centers.',
+                                     'remoteuser.INDEXER', 'remoteuser.EMBED')
+
+    def __init__(self, registry, ttl=RegistryCache.TTL_SECONDS, max_entries=MAX_ENTRIES):
+        super().__init__(registry, ttl=ttl)
+        self._max_entries = max_entries
+        self._entries = OrderedDict()  # (principals, page @id or None) -> (expiration time, value)
+        self._generation = 0
+
+    def get_pages(self, request):
+        """ Returns the top-level Pages viewable by the user of the given request, sorted by identifier. """
+        return self._get(request, None, lambda: self._load_pages(request))
+
+    def get_embedded(self, request, page_id):
+        """ Returns the embedded (@@embedded) Page with the given @id, as the user of the given request. """
+        return self._get(request, page_id, lambda: request.embed(page_id, '@@embedded', as_user=True))
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self._generation += 1
+
+    @classmethod
+    def get_visibility_principals(cls, request):
+        """ Returns the effective principals of the given request which can affect which Pages
+            (and content) are viewable, so that users with the same groups/roles share entries.
+        """
+        return frozenset(principal for principal in request.effective_principals
+                         if principal.startswith(cls.VISIBILITY_PRINCIPAL_PREFIXES))
+
+    def _get(self, request, page_id, load):
+        key = (self.get_visibility_principals(request), page_id)
+        with self._lock:
+            if (entry := self._entries.get(key)) is not None:
+                expiration, value = entry
+                if expiration > time.time():
+                    self._entries.move_to_end(key)
+                    return deepcopy(value)
+                del self._entries[key]
+            generation = self._generation
+        value = load()  # N.B. Not under the lock as this does subrequests
+        with self._lock:
+            if generation == self._generation:  # i.e. not invalidated while loading
+                self._entries[key] = (time.time() + self._ttl, value)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return deepcopy(value)
+
+    @staticmethod
+    def _load_pages(request):
+        pages = []
+        collection = request.registry[COLLECTIONS]['Page']
+        for uuid in collection:
+            if (item := collection.get(uuid)) is None:
+                continue
+            identifier = item.properties.get('identifier', '')
+            if len([ path_component for path_component in identifier.split('/') if path_component ]) != 1:
+                continue
+            if item.properties.get('status') == 'deleted' or not request.has_permission('view', item):
+                continue
+            page = request.embed(request.resource_path(item), '@@embedded', as_user=True)
+            pages.append(select_fields(page, PAGE_TREE_FIELDS))
+        return sorted(pages, key=lambda page: (page.get('identifier', ''), page.get('uuid', '')))
+
+
+def select_fields(value, fields):
+    """ Returns (a copy of) the given dictionary, or of each dictionary in the given list, with only
+        the given (dotted) fields, e.g. as for the field parameter of a search; a field without
+        subfields (e.g. children) is kept whole, even if subfields of it are also given.
+    """
+    if isinstance(value, list):
+        return [ select_fields(element, fields) for element in value ]
+    if not isinstance(value, dict):
+        return value
+    subfields = {}
+    for field in fields:
+        name, _, subfield = field.partition('.')
+        if not subfield:
+            subfields[name] = None
+        elif subfields.setdefault(name, []) is not None:
+            subfields[name].append(subfield)
+    return { name: (select_fields(value[name], subfields[name]) if subfields[name] else deepcopy(value[name]))
+             for name in subfields if name in value }
+
+
+def get_page_tree_cache(registry):
+    """ Returns the PageTreeCache held by the given registry (created on startup; see includeme). """
+    return get_registry_cache(registry, PageTreeCache)
+
+
 def generate_at_type_for_page(node):
     capitalized_path_names = [ pg.capitalize() for pg in filter(lambda pg: pg, node['@id'].split('/')) ]
     page_type = []
@@ -168,6 +278,7 @@ def includeme(config):
             request_method="GET"
         )
     config.add_view(static_page, route_name='staticpage')
+    get_page_tree_cache(config.registry)
 
 
 @collection(
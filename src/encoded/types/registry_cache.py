@@ -0,0 +1,180 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Iterable, Optional, Type, TypeVar, Union
+
+import transaction
+from pyramid.events import subscriber
+from pyramid.registry import Registry
+from pyramid.request import Request
+from snovault import DBSESSION, TYPES
+from snovault.interfaces import AfterModified, Created
+from snovault.storage import CurrentPropertySheet, Resource
+from sqlalchemy import func
+
+
+REGISTRY_CACHES = "registry_caches"
+REGISTRY_CACHE_TTL_SETTING = "registry_cache_ttl"
+
+RegistryCacheType = TypeVar("RegistryCacheType", bound="RegistryCache")
+
+
+class RegistryCache:
+    """Base class for caches held by the registry (see get_registry_cache).
+
+    For data derived from items of the ITEM_TYPES (including abstract
+    types) which are read often and edited rarely. A cache is invalidated
+    after the commit of any transaction within this process which creates
+    or edits such an item (see subscriber below), not before, so that
+    neither a concurrent reload nor one within the transaction itself can
+    leave it holding data which is then rolled back or superseded. Edits
+    made by other processes are reflected after the TTL, which is given by
+    the TTL_SETTING setting, else the registry_cache_ttl setting.
+    """
+
+    NAME = None  # Registry key
+    TTL_SETTING = None
+    TTL_SECONDS = 60 * 10
+    ITEM_TYPES = ()
+
+    def __init__(self, registry: Registry, ttl: int = TTL_SECONDS) -> None:
+        self._registry = registry
+        self._ttl = ttl
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        raise NotImplementedError
+
+    def is_invalidated_by(self, item: Any) -> bool:
+        """Whether the creation or edit of given item invalidates this cache."""
+        type_info = getattr(item, "type_info", None)
+        type_names = [getattr(type_info, "name", None), *getattr(type_info, "base_types", [])]
+        return any(type_name in self.ITEM_TYPES for type_name in type_names)
+
+
+class LoadedRegistryCache(RegistryCache):
+    """RegistryCache loaded whole, from the database, on first use.
+
+    Reloaded when invalidated, when older than the TTL, or when a value is
+    not found (e.g. an item just created by another process); the last
+    only if not loaded within MIN_RELOAD_SECONDS, so that lookups of
+    unknown (or bogus) values cannot force a reload every time.
+
+    When indexing, also reloaded if any item of the ITEM_TYPES has been
+    created or edited since it was loaded, as checked (once per indexing
+    transaction) against the database; edits made by other processes would
+    otherwise be indexed only after the TTL, and so not when the items
+    (linked to them, see add_linked_uuids) are reindexed for the edits.
+
+    Subclasses implement _load and _contains, called with the lock held,
+    and call _ensure_loaded (likewise) before each lookup.
+    """
+
+    MIN_RELOAD_SECONDS = 30
+
+    def __init__(
+        self,
+        registry: Registry,
+        ttl: int = RegistryCache.TTL_SECONDS,
+        min_reload_seconds: int = MIN_RELOAD_SECONDS,
+    ) -> None:
+        super().__init__(registry, ttl=ttl)
+        self._min_reload_seconds = min_reload_seconds
+        self._loaded = None
+        self._version = None  # Max sid of items of ITEM_TYPES, if loaded when indexing
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded = None
+
+    def _ensure_loaded(self, value: Any, request: Optional[Request] = None) -> None:
+        version = self._get_indexing_version(request)
+        now = time.time()
+        if (
+            self._loaded is None
+            or (now - self._loaded) >= self._ttl
+            or (version is not None and version != self._version)
+            or (
+                not self._contains(value)
+                and (now - self._loaded) >= self._min_reload_seconds
+            )
+        ):
+            self._load(request)
+            self._loaded = time.time()
+            self._version = version
+
+    def _get_indexing_version(self, request: Optional[Request]) -> Optional[int]:
+        if request is None or not getattr(request, "_indexing_view", False):
+            return None
+        txn = transaction.get()
+        try:
+            return txn.data(self)
+        except KeyError:
+            version = self._get_version(request)
+            txn.set_data(self, version)
+            return version
+
+    def _get_version(self, request: Request) -> Optional[int]:
+        types = request.registry[TYPES]
+        item_types = [types[name].item_type for name in self.ITEM_TYPES]
+        session = request.registry[DBSESSION]()
+        return (
+            session.query(func.max(CurrentPropertySheet.sid))
+            .join(CurrentPropertySheet.resource)
+            .filter(Resource.item_type.in_(item_types))
+            .scalar()
+        )
+
+    def _contains(self, value: Any) -> bool:
+        raise NotImplementedError
+
+    def _load(self, request: Optional[Request] = None) -> None:
+        raise NotImplementedError
+
+
+def get_registry_cache(
+    registry: Registry, cache_class: Type[RegistryCacheType]
+) -> RegistryCacheType:
+    """Get the cache of given class held by given registry.
+
+    Normally created on startup (see types includeme); created here if not.
+    """
+    if (cache := registry.get(cache_class.NAME)) is None:
+        ttl = int(
+            registry.settings.get(
+                cache_class.TTL_SETTING,
+                registry.settings.get(REGISTRY_CACHE_TTL_SETTING, cache_class.TTL_SECONDS),
+            )
+        )
+        cache = registry.setdefault(cache_class.NAME, cache_class(registry, ttl=ttl))
+        registry.setdefault(REGISTRY_CACHES, {}).setdefault(cache_class.NAME, cache)
+    return cache
+
+
+def add_linked_uuids(request: Optional[Request], uuids: Iterable[str]) -> None:
+    """Record given uuids as linked from the item being indexed, if any.
+
+    As for items embedded when indexing, so that the indexed item is
+    invalidated (reindexed) when any of the items used from a cache, in
+    place of embedding them, are edited.
+    """
+    if request is not None and getattr(request, "_indexing_view", False):
+        if isinstance(linked_uuids := request._linked_uuids, set):
+            linked_uuids.update(uuids)
+
+
+@subscriber(Created)
+@subscriber(AfterModified)
+def invalidate_registry_caches(event: Union[Created, AfterModified]) -> None:
+    """Invalidate, after commit, caches invalidated by the created/edited item."""
+    for cache in list(event.request.registry.get(REGISTRY_CACHES, {}).values()):
+        if cache.is_invalidated_by(event.object):
+            # N.B. Also if the commit fails or the transaction is aborted, as
+            # a load within the transaction may have seen its changes.
+            txn = transaction.get()
+            txn.addAfterCommitHook(_invalidate_after_commit, args=(cache,))
+            txn.addAfterAbortHook(cache.invalidate)
+
+
+def _invalidate_after_commit(success: bool, cache: RegistryCache) -> None:
+    cache.invalidate()
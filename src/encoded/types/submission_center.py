@@ -1,7 +1,14 @@
-from snovault import collection, load_schema
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Optional
+
+from pyramid.registry import Registry
+from pyramid.request import Request
+from snovault import COLLECTIONS, collection, load_schema
 
 from .acl import ONLY_ADMIN_VIEW_ACL, SUBMISSION_CENTER_SUBMITTER, SUBMISSION_CENTER_RW
 from .base import Item
+from .registry_cache import LoadedRegistryCache, get_registry_cache
 
 
 @collection(
@@ -26,3 +33,87 @@ class SubmissionCenter(Item):
         sc_member = f'submission_centers.{self.uuid}'
         roles[sc_member] = SUBMISSION_CENTER_RW
         return roles
+
+
+SUBMISSION_CENTER_CODE_INDEX = "submission_center_code_index"
+SUBMISSION_CENTER_CODE_INDEX_TTL_SETTING = "submission_center_code_index_ttl"
+
+
+class SubmissionCenterCodeIndex(LoadedRegistryCache):
+    """Registry-held index of SubmissionCenter uuid/identifier/alias to code.
+
+    Used for submitted_id validation, which otherwise looks up each of an
+    item's submission centers on every POST/PATCH of a SubmittedItem.
+
+    All submission centers are indexed, irrespective of the user. This is
+    as before: those lookups were subrequests as the internal EMBED user,
+    which may view every item (see ONLY_ADMIN_VIEW_ACL), and codes are
+    only checked against submission centers the item already links to.
+    """
+
+    NAME = SUBMISSION_CENTER_CODE_INDEX
+    TTL_SETTING = SUBMISSION_CENTER_CODE_INDEX_TTL_SETTING
+    ITEM_TYPES = ("SubmissionCenter",)
+
+    def __init__(self, registry: Registry, **kwargs) -> None:
+        super().__init__(registry, **kwargs)
+        self._entries = {}  # uuid/identifier/alias -> SubmissionCenterCodeEntry
+
+    def get_codes(self, submission_centers: List[str]) -> List[str]:
+        """Get codes (upper-cased, as for submitted_id) for given centers."""
+        return [
+            entry.code.upper()
+            for entry in self.get_entries(submission_centers)
+            if entry.code
+        ]
+
+    def get_identifiers(self, submission_centers: List[str]) -> List[str]:
+        """Get identifiers (e.g. washu_gcc) for given centers."""
+        return [
+            entry.identifier
+            for entry in self.get_entries(submission_centers)
+            if entry.identifier
+        ]
+
+    def get_entries(
+        self, submission_centers: List[str]
+    ) -> List[SubmissionCenterCodeEntry]:
+        with self._lock:
+            self._ensure_loaded(submission_centers)
+            return [
+                self._entries[value]
+                for value in submission_centers
+                if value in self._entries
+            ]
+
+    def _contains(self, submission_centers: List[str]) -> bool:
+        return all(value in self._entries for value in submission_centers)
+
+    def _load(self, request: Optional[Request] = None) -> None:
+        entries = {}
+        collection = self._registry[COLLECTIONS]["SubmissionCenter"]
+        for uuid in collection:
+            if (item := collection.get(uuid)) is None:
+                continue
+            properties = item.properties
+            entry = SubmissionCenterCodeEntry(
+                uuid=str(uuid),
+                identifier=properties.get("identifier", ""),
+                code=properties.get("code", ""),
+            )
+            for value in [entry.uuid, entry.identifier, *properties.get("aliases", [])]:
+                if value:
+                    entries[value] = entry
+        self._entries = entries
+
+
+@dataclass(frozen=True)
+class SubmissionCenterCodeEntry:
+    uuid: str
+    identifier: str
+    code: str
+
+
+def get_submission_center_code_index(registry: Registry) -> SubmissionCenterCodeIndex:
+    """Get the SubmissionCenterCodeIndex held by given registry."""
+    return get_registry_cache(registry, SubmissionCenterCodeIndex)
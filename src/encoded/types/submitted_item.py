@@ -13,7 +13,8 @@ from snovault.validators import (
 from snovault.validation import ValidationFailure
 
 from .base import Item, SMAHTCollection, collection_add, item_edit
-from .utils import get_item, get_properties
+from .submission_center import get_submission_center_code_index
+from .utils import get_properties
 
 
 """
@@ -150,21 +151,35 @@ def get_submission_centers(properties: Dict[str, Any]) -> List[str]:
     return properties.get("submission_centers", [])
 
 
-def get_submitted_id_code(properties: Dict[str, Any]) -> str:
-    """Get submission center code from properties.
+def validate_submitted_id(
+    request: Request, submitted_id: str, submission_centers: List[str]
+) -> Union[ValidationFailure, None]:
+    """Validate submitted_id for given submission centers."""
+    submission_center_codes = get_submission_center_codes(request, submission_centers)
+    return validate_submitted_id_for_codes(submitted_id, submission_center_codes)
 
-    Note: `code` is lower-cased for file naming purposes but
-    upper-cased for `submitted_id` purposes.
+
+def validate_submitted_ids(
+    request: Request, submitted_ids: List[str], submission_centers: List[str]
+) -> Dict[str, Union[ValidationFailure, None]]:
+    """Validate many submitted_ids for given submission centers.
+
+    Submission center codes are looked up once for all submitted_ids.
     """
-    return properties.get("code", "").upper()
+    submission_center_codes = get_submission_center_codes(request, submission_centers)
+    return {
+        submitted_id: validate_submitted_id_for_codes(
+            submitted_id, submission_center_codes
+        )
+        for submitted_id in submitted_ids
+    }
 
 
-def validate_submitted_id(
-    request: Request, submitted_id: str, submission_centers: List[str]
+def validate_submitted_id_for_codes(
+    submitted_id: str, submission_center_codes: List[str]
 ) -> Union[ValidationFailure, None]:
-    """Validate submitted_id for given submission centers."""
+    """Validate submitted_id for given submission center codes."""
     submitted_id_data = parse_submitted_id(submitted_id)
-    submission_center_codes = get_submission_center_codes(request, submission_centers)
     if (
         submitted_id_data
         and submitted_id_data.center_code not in submission_center_codes
@@ -193,14 +208,15 @@ def get_submitted_id_validation_error(
 def get_submission_center_codes(
     request: Request, submission_centers: List[str]
 ) -> List[str]:
-    """Get submission center codes for given submission centers."""
-    submission_center_codes = [
-        get_submitted_id_code(
-            get_item(request, submission_center, collection="SubmissionCenter")
-        )
-        for submission_center in submission_centers
-    ]
-    return [code for code in submission_center_codes if code]
+    """Get submission center codes for given submission centers.
+
+    Codes come from the registry-held SubmissionCenterCodeIndex, so no
+    lookups are made here per submission center; nor are these permission
+    checked (see SubmissionCenterCodeIndex).
+    """
+    return get_submission_center_code_index(request.registry).get_codes(
+        submission_centers
+    )
 
 
 def validate_submitted_id_on_edit(
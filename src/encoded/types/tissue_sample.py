@@ -1,11 +1,11 @@
 from typing import List, Dict, Any
 
 import re
-from snovault import collection, load_schema
+from snovault import DBSESSION, collection, load_schema
 from snovault.util import debug_log, get_item_or_none
-from snovault.elasticsearch import ELASTIC_SEARCH
-from snovault.search.search_utils import make_search_subreq
+from snovault.storage import CurrentPropertySheet, PropertySheet, Resource
 from pyramid.view import view_config
+from sqlalchemy import Index
 from encoded.validator_decorators import link_related_validator
 
 from .sample import Sample
@@ -17,6 +17,7 @@ from .submitted_item import (
 )
 
 from .base import collection_add, item_edit, Item
+from .submission_center import get_submission_center_code_index
 from .utils import (
     get_properties,
     get_property_for_validation,
@@ -28,7 +29,15 @@ from ..item_utils import (
 )
 
 NDRI_TPC_ID = "ndri_tpc"
-NDRI_TPC_DT = "NDRI TPC"
+
+# Expression index for get_tissue_samples_by_external_ids (on the properties of all item types,
+# but only the rows with an external_id); created along with the tables, and in an existing
+# database by the create-external-id-index command (run on deploy).
+EXTERNAL_ID_INDEX = Index(
+    "ix_propsheets_external_id",
+    PropertySheet.properties["external_id"].astext,
+    postgresql_where=PropertySheet.properties["external_id"].astext.isnot(None),
+)
 
 
 @collection(
@@ -48,6 +57,55 @@ class TissueSample(Sample):
         pass
 
 
+def get_tissue_samples_by_external_id(request, external_id: str) -> List[Dict[str, Any]]:
+    """Get properties of (non-deleted) TissueSamples with given external_id.
+
+    Looked up from the current properties in the database (by EXTERNAL_ID_INDEX)
+    rather than with search, so this is consistent with the database, including
+    writes made within the current transaction.
+    """
+    return get_tissue_samples_by_external_ids(request, [external_id]).get(
+        external_id, []
+    )
+
+
+def get_tissue_samples_by_external_ids(
+    request, external_ids: List[str]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Get properties of TissueSamples for each of given external_ids.
+
+    As for get_tissue_samples_by_external_id, with one query for all.
+    """
+    if not (external_ids := [external_id for external_id in external_ids if external_id]):
+        return {}
+    session = request.registry[DBSESSION]()
+    external_id_property = PropertySheet.properties["external_id"].astext
+    query = (
+        session.query(CurrentPropertySheet.rid, PropertySheet.properties)
+        .join(CurrentPropertySheet.propsheet)
+        .join(CurrentPropertySheet.resource)
+        .filter(
+            Resource.item_type == TissueSample.item_type,
+            CurrentPropertySheet.name == "",
+            external_id_property.in_(external_ids),
+        )
+    )
+    samples = {}
+    for rid, properties in query:
+        if properties.get("status") != "deleted":
+            samples.setdefault(item_utils.get_external_id(properties), []).append(
+                {**properties, "uuid": str(rid)}
+            )
+    return samples
+
+
+def is_tpc_sample(request, sample: Dict[str, Any]) -> bool:
+    """Check if given (TissueSample properties) is from NDRI TPC."""
+    return NDRI_TPC_ID in get_submission_center_code_index(
+        request.registry
+    ).get_identifiers(item_utils.get_submission_centers(sample))
+
+
 def get_request_data_for_edit(context, request):
     """Return properties ."""
     existing = get_properties(context)
@@ -170,32 +228,12 @@ def run_sample_metadata_validation(context, request, data, mode):
     if not (tissue_utils.get_study(sample_source) in ["Benchmarking", "Production"]):
         return
 
-    """
-    NOTE: there is non-standard validation that depends on ELASTICSEARCH and therefore
-    there could be inconsistency with the database state. This generally should be avoided
-    but in this case we need to compare against existing TissueSample records with search.
-    """
-    if ELASTIC_SEARCH not in request.registry:
-        return
-
-    # search for all tissue samples with this external_id
-    ts_search_url = f"/search/?type=TissueSample&status!=deleted&external_id={external_id}"
-    ts_req = make_search_subreq(request, ts_search_url)
-    ts_resp = request.invoke_subrequest(ts_req, True)
-    samples = ts_resp.json_body.get("@graph", [])
-
-    tpc_samples = [
-        s
-        for s in samples
-        if NDRI_TPC_DT
-        in [sc.get("display_title") for sc in item_utils.get_submission_centers(s)]
-    ]
-    non_tpc_samples = [
-        s
-        for s in samples
-        if NDRI_TPC_DT
-        not in [sc.get("display_title") for sc in item_utils.get_submission_centers(s)]
-    ]
+    # NOTE: existing TissueSample records are looked up by external_id from the
+    # database (see get_tissue_samples_by_external_id) rather than with search.
+    # all tissue samples with this external_id
+    samples = get_tissue_samples_by_external_id(request, external_id)
+    tpc_samples = [s for s in samples if is_tpc_sample(request, s)]
+    non_tpc_samples = [s for s in samples if not is_tpc_sample(request, s)]
 
     check_properties = ["category", "preservation_type"]
     from_tpc = is_tpc_submission(request, submission_centers)
@@ -240,7 +278,7 @@ def run_sample_metadata_validation(context, request, data, mode):
     # now we check against TPC sample as we know we have one of each
     tpc_sample = tpc_samples[0]
     found = tpc_sample["accession"]  # for error message
-    tpc_sample_source_uid = tpc_sample["sample_sources"][0]["uuid"]
+    tpc_sample_source_uid = tpc_sample["sample_sources"][0]
     gcc_uuid = item_utils.get_uuid(sample_source)
     if tpc_sample_source_uid != gcc_uuid:
         return request.errors.add(
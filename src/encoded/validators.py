@@ -1,13 +1,22 @@
+from pyramid.httpexceptions import HTTPBadRequest
 from pyramid.view import view_config
 from snovault.util import debug_log
-from encoded.types.submitted_item import validate_submitted_id
-from typing import List
+from encoded.types.submission_center import get_submission_center_code_index
+from encoded.types.submitted_item import validate_submitted_id, validate_submitted_ids
+from encoded.types.tissue_sample import get_tissue_samples_by_external_ids, is_tpc_sample
+from typing import List, Optional
 
 # Module with custom validators exposed as APIs.
 # First used for submitted_id validation for smaht-submitr.
 
+STATUS_OK = "OK"
+STATUS_NO_VALUE = "No value given"
+MAX_BATCH_VALUES = 10000
+
+
 def includeme(config):
     config.add_route("validators", "/validators/{validator}/{value}")
+    config.add_route("validators_batch", "/validators/{validator}")
     config.scan(__name__)
 
 
@@ -29,58 +38,124 @@ def _validator_submitted_id(context, request, submitted_id):
        "status": "Submitted ID BCM_SOFTWARE_LIMA start (XYZ) does not match options for submission centers: ['DAC', 'WASHU']"}
 
     """
-    EFFECTIVE_PRINCIPALS_SUBMITS_FOR_PREFIX = "submits_for."
-    STATUS_OK = "OK"
     if submitted_id:
-        if (submission_centers := request.GET.get("submission_centers")):
-            # Allow passing in submission_centers just in case we need explicit control.
-            submission_centers = [item.strip() for item in submission_centers.split(",")]
-        elif "group.admin" in request.effective_principals:
-            # For admin users we let anything be valid. Not 100% technically correct; really should
-            # be using the list of ALL known submission centers; but will get checked later for real
-            # during server-side validation (for our smaht-submitr use-case); and (described above)
-            # we can also explicitly pass in submission_centers as the allowed list.
+        if (submission_centers := _get_allowed_submission_centers(request)) is None:
             return {"submitted_id": submitted_id, "status": STATUS_OK}
-        elif (isinstance(request.effective_principals, list) and
-              (submits_for := [item[len(EFFECTIVE_PRINCIPALS_SUBMITS_FOR_PREFIX):]
-                               for item in request.effective_principals
-                               if item.startswith(EFFECTIVE_PRINCIPALS_SUBMITS_FOR_PREFIX)])):
-            # Common case: Get the list of allowed submission centers by looking at
-            # the effective_principals list for "submits_for.{submission_center_uuid}". 
-            submission_centers = _lookup_submission_center_codes(request, submits_for)
-        else:
-            submission_centers = []
         # Call the real custom validator in submitted_item.py.
         result = validate_submitted_id(request, submitted_id=submitted_id, submission_centers=submission_centers)
-        if result is None:
-            status = STATUS_OK
-        elif (isinstance(error_detail := result.detail, dict) and 
-              isinstance(error_description := error_detail.get("description"), str)):
-            status = error_description
-        else:
-            status = str(result)
-        return {"submitted_id": submitted_id, "status": status}
+        return {"submitted_id": submitted_id, "status": _get_validation_status(result)}
+    return {}
+
+
+def _validator_submitted_id_batch(context, request, submitted_ids: List[str]) -> List[dict]:
+    """
+    Same as _validator_submitted_id but for the given list of submitted_id values, all validated in one
+    pass, i.e. with the allowed submission centers (and their codes) looked up just once; returns a list
+    of dictionaries, one for each of the given submitted_id values, in order, as for _validator_submitted_id.
+    """
+    if (submission_centers := _get_allowed_submission_centers(request)) is None:
+        return [{"submitted_id": submitted_id, "status": STATUS_OK} for submitted_id in submitted_ids]
+    results = validate_submitted_ids(request, submitted_ids=submitted_ids, submission_centers=submission_centers)
+    return [{"submitted_id": submitted_id, "status": _get_validation_status(results.get(submitted_id))}
+            for submitted_id in submitted_ids]
+
+
+def _validator_external_id(context, request, external_id):
+    """
+    Validates the given (TissueSample) external_id argument and returns a dictionary with an indication of
+    whether or not it may be submitted by a GCC (i.e. non-TPC submission center), i.e. whether or not there
+    exists a TPC (NDRI) TissueSample with this external_id (see tissue_sample.run_sample_metadata_validation).
+    The submitted_id values of any existing non-TPC TissueSamples with this external_id are also returned,
+    so that the caller can tell if its TissueSample would be a (disallowed) duplicate. For example:
+
+      {"external_id": "SMHT001-3A-001A1", "status": "OK", "submitted_ids": ["BCM_TISSUE-SAMPLE_ABC"]}
+
+    or if there is no such TPC TissueSample:
+
+      {"external_id": "SMHT001-3A-001A1",
+       "status": "No TPC Tissue Sample found with external_id SMHT001-3A-001A1", "submitted_ids": []}
+    """
+    if external_id:
+        return _validator_external_id_batch(context, request, [external_id])[0]
     return {}
 
 
+def _validator_external_id_batch(context, request, external_ids: List[str]) -> List[dict]:
+    """
+    Same as _validator_external_id but for the given list of external_id values, all validated in one
+    pass, i.e. with all of the existing TissueSamples with any of these external_id values resolved with
+    a single (indexed, database) lookup; returns a list of dictionaries, one for each of the given
+    external_id values, in order, as for _validator_external_id.
+    """
+    tpc_external_ids, submitted_ids = set(), {}
+    for external_id, tissue_samples in get_tissue_samples_by_external_ids(request, external_ids).items():
+        for tissue_sample in tissue_samples:
+            if is_tpc_sample(request, tissue_sample):
+                tpc_external_ids.add(external_id)
+            elif submitted_id := tissue_sample.get("submitted_id"):
+                submitted_ids.setdefault(external_id, []).append(submitted_id)
+    return [{"external_id": external_id,
+             "status": (STATUS_OK if external_id in tpc_external_ids
+                        else f"No TPC Tissue Sample found with external_id {external_id}"),
+             "submitted_ids": submitted_ids.get(external_id, [])} for external_id in external_ids]
+
+
+def _get_allowed_submission_centers(request) -> Optional[List[str]]:
+    """
+    Returns the list of submission centers allowed for the submitted_id validation of the given request,
+    i.e. from the submission_centers request argument, if given, or from the effective_principals for the
+    USER of the request; or None if the user has admin priviliges, i.e. if anything should be valid.
+    """
+    EFFECTIVE_PRINCIPALS_SUBMITS_FOR_PREFIX = "submits_for."
+    if (submission_centers := request.GET.get("submission_centers")):
+        # Allow passing in submission_centers just in case we need explicit control.
+        return [item.strip() for item in submission_centers.split(",")]
+    elif "group.admin" in request.effective_principals:
+        # For admin users we let anything be valid. Not 100% technically correct; really should
+        # be using the list of ALL known submission centers; but will get checked later for real
+        # during server-side validation (for our smaht-submitr use-case); and (described above)
+        # we can also explicitly pass in submission_centers as the allowed list.
+        return None
+    elif (isinstance(request.effective_principals, list) and
+          (submits_for := [item[len(EFFECTIVE_PRINCIPALS_SUBMITS_FOR_PREFIX):]
+                           for item in request.effective_principals
+                           if item.startswith(EFFECTIVE_PRINCIPALS_SUBMITS_FOR_PREFIX)])):
+        # Common case: Get the list of allowed submission centers by looking at
+        # the effective_principals list for "submits_for.{submission_center_uuid}".
+        return _lookup_submission_center_codes(request, submits_for)
+    return []
+
+
+def _get_validation_status(result) -> str:
+    if result is None:
+        return STATUS_OK
+    elif (isinstance(error_detail := result.detail, dict) and
+          isinstance(error_description := error_detail.get("description"), str)):
+        return error_description
+    return str(result)
+
+
 def _lookup_submission_center_codes(request, submission_centers: List[str]) -> List[str]:
     """
     Returns the list of submission code identifiers (e.g. ['washu_gcc']) given a
-    list of submission center uuids (e.g. ['6030743e-631e-48e5-876d-df336066fa6e']).
+    list of submission center uuids (e.g. ['6030743e-631e-48e5-876d-df336066fa6e']);
+    via the registry-held SubmissionCenterCodeIndex, i.e. with no lookups per submission center.
+    N.B. Not permission checked, as before (see SubmissionCenterCodeIndex); the given submission
+    centers come from the (submits_for) effective principals of the requesting user anyways.
     """
-    submission_center_codes = []
-    for submission_center in submission_centers:
-        # TODO: Do we need an as_user="INGESTION" argument or something with the request.embed call below?
-        if submission_center := request.embed(f"/submission-centers/{submission_center}"):
-            if submission_center_code := submission_center.get("identifier"):
-                submission_center_codes.append(submission_center_code)
-    return submission_center_codes
+    return get_submission_center_code_index(request.registry).get_identifiers(submission_centers)
 
 
 # Names of validators, i.e. the {validator} part of the endpoint /validators/{validator},
-# and its mapping to its specific validator function; currently just submitted_id.
+# and its mapping to its specific validator function; and likewise for the batch variants
+# (POST /validators/{validator} with a JSON body like {"values": [...]}).
 _VALIDATORS = {
-    "submitted_id": _validator_submitted_id
+    "submitted_id": _validator_submitted_id,
+    "external_id": _validator_external_id
+}
+_BATCH_VALIDATORS = {
+    "submitted_id": _validator_submitted_id_batch,
+    "external_id": _validator_external_id_batch
 }
 
 @view_config(route_name="validators", request_method=["GET"])
@@ -89,3 +164,29 @@ def validators(context, request):
     if (validator := request.matchdict.get("validator")) and (validator := _VALIDATORS.get(validator)):
         return validator(context, request, request.matchdict.get("value"))
     return {}
+
+
+@view_config(route_name="validators_batch", request_method=["POST"])
+@debug_log
+def validators_batch(context, request):
+    """
+    Batch variant of the validators endpoint for validating many (up to MAX_BATCH_VALUES) values in one
+    request, e.g. for smaht-submitr pre-validation of a large workbook; the body should be a JSON object
+    with a "values" list, e.g. {"values": ["BCM_SOFTWARE_LIMA", "WASHU_SOFTWARE_LIMA"]}; and this returns
+    an object with a "results" list containing a result (as returned by the validators endpoint) for each
+    of the given values, in order, e.g. {"results": [{"submitted_id": "BCM_SOFTWARE_LIMA", "status": "OK"}, ...]};
+    the result for an empty value is an error, e.g. {"submitted_id": "", "status": "No value given"}.
+    """
+    if not (validator := _BATCH_VALIDATORS.get(validator_name := request.matchdict.get("validator"))):
+        return {"results": []}
+    try:
+        values = request.json_body.get("values")
+    except Exception:
+        values = None
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise HTTPBadRequest(detail="Request body must be a JSON object with a values list of strings.")
+    if len(values) > MAX_BATCH_VALUES:
+        raise HTTPBadRequest(detail=f"Too many values ({len(values)}); the maximum is {MAX_BATCH_VALUES}.")
+    results = iter(validator(context, request, [value for value in values if value]))
+    return {"results": [next(results) if value else {validator_name: value, "status": STATUS_NO_VALUE}
+                        for value in values]}